@@ -24,6 +24,9 @@ class AnnotationGroup(object):
     Describes subdomains of a scaffold with attached names and terms.
     """
 
+    # incremented whenever any annotation group's name or id changes, so AnnotationGroupList indexes can be rebuilt
+    _termChangesCount = 0
+
     def __init__(self, region, term, isMarker=False):
         """
         :param region: The Zinc region the AnnotationGroup is to be made for.
@@ -444,6 +447,7 @@ class AnnotationGroup(object):
             if RESULT_OK != self._group.setName(name):
                 return False
         self._name = name
+        AnnotationGroup._termChangesCount += 1
         return True
 
     def getMarkerNode(self):
@@ -466,7 +470,9 @@ class AnnotationGroup(object):
         Client must ensure id is unique for all annotation groups.
         :return:  True on success, otherwise False
         """
-        self._id = id
+        if self._id != id:
+            self._id = id
+            AnnotationGroup._termChangesCount += 1
         return True
 
     def getTerm(self):
@@ -527,13 +533,136 @@ class AnnotationGroup(object):
                 meshGroup.addElementsConditional(self._group)  # use whole group as conditional field
 
 
+class AnnotationGroupList(list):
+    """
+    List of AnnotationGroup with indexes for finding groups by name or id, and testing membership, in constant time.
+    Usable wherever a list(AnnotationGroup) is expected; indexes are updated as groups are appended, and
+    rebuilt on next lookup after any other change to the list or to the name or id of any annotation group.
+    Where several groups have the same name or id, lookups find the first in the list.
+    """
+
+    def __init__(self, annotationGroups=()):
+        """
+        :param annotationGroups: Optional iterable over AnnotationGroup to initialise list with.
+        """
+        super(AnnotationGroupList, self).__init__(annotationGroups)
+        self._nameMap = None
+        self._idMap = None
+        self._termChangesCount = None
+        self._objectIds = None  # set of id() of groups in list, for membership tests
+
+    def _invalidate(self):
+        self._nameMap = None
+        self._idMap = None
+        self._objectIds = None
+
+    def _updateIndexes(self):
+        """
+        Rebuild name and id indexes if out of date.
+        """
+        if (self._nameMap is None) or (self._termChangesCount != AnnotationGroup._termChangesCount):
+            self._nameMap = {}
+            self._idMap = {}
+            for annotationGroup in self:
+                self._nameMap.setdefault(annotationGroup._name, annotationGroup)
+                self._idMap.setdefault(annotationGroup._id, annotationGroup)
+            self._termChangesCount = AnnotationGroup._termChangesCount
+
+    def findByName(self, name: str):
+        """
+        :param name: Name of group.
+        :return: AnnotationGroup or None if not found.
+        """
+        self._updateIndexes()
+        return self._nameMap.get(name)
+
+    def findById(self, id: str):
+        """
+        :param id: Ontology id of group. Not for use with empty id.
+        :return: AnnotationGroup or None if not found.
+        """
+        self._updateIndexes()
+        return self._idMap.get(id)
+
+    def __contains__(self, annotationGroup):
+        """
+        :return: True if annotationGroup object is in list. AnnotationGroup has no equality operator, so this is the
+        same identity test as for list, but in constant time.
+        """
+        if self._objectIds is None:
+            self._objectIds = set(id(listAnnotationGroup) for listAnnotationGroup in self)
+        return id(annotationGroup) in self._objectIds
+
+    def append(self, annotationGroup):
+        super(AnnotationGroupList, self).append(annotationGroup)
+        if (self._nameMap is not None) and (self._termChangesCount == AnnotationGroup._termChangesCount):
+            self._nameMap.setdefault(annotationGroup._name, annotationGroup)
+            self._idMap.setdefault(annotationGroup._id, annotationGroup)
+        if self._objectIds is not None:
+            self._objectIds.add(id(annotationGroup))
+
+    def extend(self, annotationGroups):
+        for annotationGroup in annotationGroups:
+            self.append(annotationGroup)
+
+    def __iadd__(self, annotationGroups):
+        self.extend(annotationGroups)
+        return self
+
+    def __add__(self, annotationGroups):
+        result = AnnotationGroupList(self)
+        result.extend(annotationGroups)
+        return result
+
+    def __copy__(self):
+        return AnnotationGroupList(self)
+
+    def copy(self):
+        return AnnotationGroupList(self)
+
+    def insert(self, index, annotationGroup):
+        super(AnnotationGroupList, self).insert(index, annotationGroup)
+        self._invalidate()
+
+    def remove(self, annotationGroup):
+        super(AnnotationGroupList, self).remove(annotationGroup)
+        self._invalidate()
+
+    def pop(self, index=-1):
+        annotationGroup = super(AnnotationGroupList, self).pop(index)
+        self._invalidate()
+        return annotationGroup
+
+    def clear(self):
+        super(AnnotationGroupList, self).clear()
+        self._invalidate()
+
+    def sort(self, *args, **kwargs):
+        super(AnnotationGroupList, self).sort(*args, **kwargs)
+        self._invalidate()
+
+    def reverse(self):
+        super(AnnotationGroupList, self).reverse()
+        self._invalidate()
+
+    def __setitem__(self, index, value):
+        super(AnnotationGroupList, self).__setitem__(index, value)
+        self._invalidate()
+
+    def __delitem__(self, index):
+        super(AnnotationGroupList, self).__delitem__(index)
+        self._invalidate()
+
+
 def findAnnotationGroupByName(annotationGroups: list, name: str):
     """
     Find existing annotation group for name.
-    :param annotationGroups: list(AnnotationGroup)
+    :param annotationGroups: list(AnnotationGroup), found in constant time if an AnnotationGroupList.
     :param name: Name of group.
     :return: AnnotationGroup or None if not found.
     """
+    if isinstance(annotationGroups, AnnotationGroupList):
+        return annotationGroups.findByName(name)
     for annotationGroup in annotationGroups:
         if annotationGroup._name == name:
             return annotationGroup
@@ -587,16 +716,66 @@ def mergeAnnotationGroups(*annotationGroupsIn):
     without duplicates.
     :param annotationGroupsIn: Variable number of list(AnnotationGroup) to merge.
      Groups must be for the same region.
-    :return: Merged list(AnnotationGroup)
+    :return: Merged AnnotationGroupList
     """
-    annotationGroups = []
+    annotationGroups = AnnotationGroupList()
     for agroups in annotationGroupsIn:
         for agroup in agroups:
-            if not findAnnotationGroupByName(annotationGroups, agroup._name):
+            if not annotationGroups.findByName(agroup._name):
                 annotationGroups.append(agroup)
     return annotationGroups
 
 
+def getAnnotationGroupsMeshDimensions(annotationGroups: list):
+    """
+    Get the dimensions of meshes each annotation group has elements in. Call before defining faces to
+    determine which dimensions need subelements added with addAnnotationGroupsSubelements().
+    :param annotationGroups: list(AnnotationGroup)
+    :return: dict mapping annotation group name to list of dimensions with elements in group, highest first.
+    """
+    meshDimensions = {}
+    if annotationGroups:
+        fieldmodule = annotationGroups[0].getGroup().getFieldmodule()
+        meshes = [fieldmodule.findMeshByDimension(dimension) for dimension in range(3, 0, -1)]
+        for annotationGroup in annotationGroups:
+            meshDimensions[annotationGroup.getName()] = \
+                [mesh.getDimension() for mesh in meshes if annotationGroup.hasMeshGroup(mesh)]
+    return meshDimensions
+
+
+def addAnnotationGroupsSubelements(annotationGroups: list, meshDimensions: dict=None):
+    """
+    Add faces, lines and nodes of elements in all annotation groups to their related subgroups.
+    Each Zinc group is processed once, even if shared e.g. by markers, and only for the dimensions it
+    has elements in. Since groups use full subelement handling, one pass over the highest dimension
+    elements also adds their faces and lines, so lower dimensions only need processing for elements
+    added to the group directly.
+    Call after groups are complete and faces have been defined.
+    :param annotationGroups: list(AnnotationGroup)
+    :param meshDimensions: Optional dict mapping annotation group name to list of dimensions it has elements in
+    directly, as returned by getAnnotationGroupsMeshDimensions() before faces are defined. If not supplied or
+    group is not in it, all dimensions with elements in group are processed.
+    """
+    if not annotationGroups:
+        return
+    fieldmodule = annotationGroups[0].getGroup().getFieldmodule()
+    meshes = [fieldmodule.findMeshByDimension(dimension) for dimension in range(3, 0, -1)]
+    processedGroupNames = set()
+    with ChangeManager(fieldmodule):
+        for annotationGroup in annotationGroups:
+            group = annotationGroup.getGroup()
+            groupName = group.getName()
+            if groupName in processedGroupNames:
+                continue
+            processedGroupNames.add(groupName)
+            dimensions = meshDimensions.get(annotationGroup.getName()) if meshDimensions else None
+            for mesh in meshes:
+                if (dimensions is None) or (mesh.getDimension() in dimensions):
+                    meshGroup = group.getMeshGroup(mesh)
+                    if meshGroup.isValid() and (meshGroup.getSize() > 0):
+                        meshGroup.addElementsConditional(group)  # use whole group as conditional field
+
+
 def getAnnotationMarkerGroup(fieldmodule: Fieldmodule) -> FieldGroup:
     """
     Find or create the standard Zinc Group which marker points are created in.
@@ -673,3 +852,170 @@ def evaluateAnnotationMarkerNearestMeshLocation(fieldmodule: Fieldmodule, fieldc
     if element.isValid():
         return element, xi
     return None, None
+
+
+def findAnnotationMarkersNearestMeshLocations(markerGroups: list, materialCoordinatesField: Field, mesh: Mesh):
+    """
+    Find nearest mesh locations for the marker material coordinates of many marker points in a single field
+    assignment, and store them in the marker location field. Markers which are not found keep no location.
+    Assumes called while ChangeManager(fieldmodule) is active.
+    :param markerGroups: list(AnnotationGroup) with marker nodes with marker material coordinates defined for
+    materialCoordinatesField.
+    :param materialCoordinatesField: Material coordinates field defined on highest dimension mesh.
+    :param mesh: Highest dimension mesh to find locations in.
+    :return: list(AnnotationGroup) of markers for which no location was found.
+    """
+    if not markerGroups:
+        return []
+    fieldmodule = mesh.getFieldmodule()
+    fieldcache = fieldmodule.createFieldcache()
+    fieldcache.setMeshLocation(mesh.createElementiterator().next(), [0.5] * mesh.getDimension())
+    if not materialCoordinatesField.isDefinedAtLocation(fieldcache):
+        # can't search a field not defined on the mesh
+        return list(markerGroups)
+    nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+    markerLocation = getAnnotationMarkerLocationField(fieldmodule, mesh)
+    markerMaterialCoordinatesField = getAnnotationMarkerMaterialCoordinatesField(materialCoordinatesField)
+    markerNodes = []
+    # temporary group of the marker nodes to assign over
+    findGroup = fieldmodule.createFieldGroup()
+    findNodesetGroup = findGroup.createNodesetGroup(nodes)
+    for markerGroup in markerGroups:
+        markerNode = markerGroup.getMarkerNode()
+        markerNodes.append(markerNode)
+        findNodesetGroup.addNode(markerNode)
+    findMeshLocationField = fieldmodule.createFieldFindMeshLocation(
+        markerMaterialCoordinatesField, materialCoordinatesField, mesh)
+    findMeshLocationField.setSearchMode(FieldFindMeshLocation.SEARCH_MODE_NEAREST)
+    fieldassignment = markerLocation.createFieldassignment(findMeshLocationField)
+    fieldassignment.setNodeset(findNodesetGroup)
+    fieldassignment.assign()
+    del fieldassignment
+    del findMeshLocationField
+    del findNodesetGroup
+    del findGroup
+    notFoundMarkerGroups = []
+    meshDimension = mesh.getDimension()
+    for markerGroup, markerNode in zip(markerGroups, markerNodes):
+        fieldcache.setNode(markerNode)
+        element, xi = markerLocation.evaluateMeshLocation(fieldcache, meshDimension)
+        if not element.isValid():
+            notFoundMarkerGroups.append(markerGroup)
+    return notFoundMarkerGroups
+
+
+def createAnnotationMarkers(annotationGroups: list, region, terms: list, startNodeIdentifier=1,
+                            materialCoordinatesField: FieldFiniteElement=None, materialCoordinatesList: list=None,
+                            elements: list=None, xiList: list=None):
+    """
+    Create many marker point annotation groups and their marker nodes together, as for createMarkerNode but
+    finding all locations from material coordinates in a single pass.
+    Marker groups are found or created for terms as in findOrCreateAnnotationGroupForTerm, and must not already
+    have marker nodes.
+    Supply either materialCoordinatesField with materialCoordinatesList, or elements with optional xiList, or
+    neither in which case markers are put at xi [0.0, 0.0, 0.0] in the first element of the highest dimension mesh.
+    Markers whose location could not be found from material coordinates are created without a location.
+    :param annotationGroups: list(AnnotationGroup) to find marker groups in, and append new ones to.
+    :param region: Zinc region to create markers in.
+    :param terms: List of identifiers for anatomical terms, each a tuple of name, id.
+    :param startNodeIdentifier: First node identifier to try using for marker nodes. Each marker uses the next
+    unused identifier after the previous one.
+    :param materialCoordinatesField: Material coordinates field to define location of marker points in, with the
+    same requirements as for createMarkerNode.
+    :param materialCoordinatesList: List of material coordinates for each term.
+    :param elements: List of elements in highest dimension mesh for each term.
+    :param xiList: List of xi coordinates in elements, for each term. Defaults to [0.0, 0.0, 0.0] for all.
+    :return: list(AnnotationGroup) of markers in order of terms, list of names of markers for which no location
+    was found.
+    """
+    fieldmodule = region.getFieldmodule()
+    mesh = get_highest_dimension_mesh(fieldmodule)
+    assert mesh, "Can only create marker points if there is a mesh with elements"
+    assert not (elements and materialCoordinatesField)
+    markersCount = len(terms)
+    if materialCoordinatesField:
+        coordinatesCount = materialCoordinatesField.getNumberOfComponents()
+        assert materialCoordinatesList and (len(materialCoordinatesList) == markersCount) and \
+            all((len(materialCoordinates) >= coordinatesCount) for materialCoordinates in materialCoordinatesList) and \
+            materialCoordinatesField.castFiniteElement().isValid() and \
+            materialCoordinatesField.isTypeCoordinate() and (mesh.getDimension() <= coordinatesCount <= 3)
+    elif elements:
+        assert len(elements) == markersCount
+    if xiList:
+        assert len(xiList) == markersCount
+    nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+    markerGroups = []
+    notFoundMarkerNames = []
+    with ChangeManager(fieldmodule):
+        markerLocation = getAnnotationMarkerLocationField(fieldmodule, mesh)
+        markerName = getAnnotationMarkerNameField(fieldmodule)
+        nodetemplate = nodes.createNodetemplate()
+        markerMaterialCoordinatesField = None
+        if materialCoordinatesField:
+            markerMaterialCoordinatesField = getAnnotationMarkerMaterialCoordinatesField(materialCoordinatesField)
+            assert RESULT_OK == nodetemplate.defineField(markerMaterialCoordinatesField)
+        assert RESULT_OK == nodetemplate.defineField(markerLocation)
+        assert RESULT_OK == nodetemplate.defineField(markerName)
+        markerNodesetGroup = getAnnotationMarkerGroup(fieldmodule).getOrCreateNodesetGroup(nodes)
+        defaultElement = None if (materialCoordinatesField or elements) else mesh.createElementiterator().next()
+        fieldcache = fieldmodule.createFieldcache()
+        nodeIdentifier = startNodeIdentifier
+        for m, term in enumerate(terms):
+            markerGroup = findOrCreateAnnotationGroupForTerm(annotationGroups, region, term, isMarker=True)
+            assert not markerGroup._markerIdentifier, \
+                "createAnnotationMarkers  Marker node already exists for " + markerGroup.getName()
+            if not markerGroup._isMarker:
+                # as for createMarkerNode, can change an empty annotation group into a marker group
+                assert markerGroup._group.isEmpty()
+                markerGroup._group = getAnnotationMarkerGroup(fieldmodule)
+                markerGroup._isMarker = True
+            nodeIdentifier = get_next_unused_node_identifier(nodes, nodeIdentifier)
+            markerNode = nodes.createNode(nodeIdentifier, nodetemplate)
+            assert RESULT_OK == markerNodesetGroup.addNode(markerNode)
+            markerGroup._markerIdentifier = nodeIdentifier
+            fieldcache.setNode(markerNode)
+            markerName.assignString(fieldcache, markerGroup.getName())
+            if materialCoordinatesField:
+                markerGroup._materialCoordinatesField = materialCoordinatesField
+                markerGroup._markerMaterialCoordinatesField = markerMaterialCoordinatesField
+                markerMaterialCoordinatesField.assignReal(fieldcache, materialCoordinatesList[m])
+            else:
+                element = elements[m] if elements else defaultElement
+                xi = xiList[m] if xiList else [0.0, 0.0, 0.0]
+                assert mesh.containsElement(element), "Invalid element, not in highest dimension mesh"
+                markerLocation.assignMeshLocation(fieldcache, element, xi)
+            markerGroups.append(markerGroup)
+            nodeIdentifier += 1
+        if materialCoordinatesField:
+            notFoundMarkerGroups = findAnnotationMarkersNearestMeshLocations(
+                markerGroups, materialCoordinatesField, mesh)
+            notFoundMarkerNames = [markerGroup.getName() for markerGroup in notFoundMarkerGroups]
+    return markerGroups, notFoundMarkerNames
+
+
+def relocateAnnotationMarkers(markerGroups: list):
+    """
+    Re-find the element:xi locations of marker points from their stored material coordinates, for all markers
+    using the same material coordinates field in a single pass. Markers without material coordinates are ignored.
+    :param markerGroups: list(AnnotationGroup) of markers.
+    :return: list(AnnotationGroup) of markers for which no location was found; these are left without location.
+    """
+    materialCoordinatesFieldMarkerGroups = []  # list of (materialCoordinatesField, list(AnnotationGroup))
+    for markerGroup in markerGroups:
+        materialCoordinatesField = markerGroup._materialCoordinatesField
+        if markerGroup.isMarker() and materialCoordinatesField:
+            for fieldMarkerGroups in materialCoordinatesFieldMarkerGroups:
+                if fieldMarkerGroups[0] == materialCoordinatesField:
+                    fieldMarkerGroups[1].append(markerGroup)
+                    break
+            else:
+                materialCoordinatesFieldMarkerGroups.append((materialCoordinatesField, [markerGroup]))
+    notFoundMarkerGroups = []
+    if materialCoordinatesFieldMarkerGroups:
+        fieldmodule = materialCoordinatesFieldMarkerGroups[0][0].getFieldmodule()
+        mesh = get_highest_dimension_mesh(fieldmodule)
+        with ChangeManager(fieldmodule):
+            for materialCoordinatesField, fieldMarkerGroups in materialCoordinatesFieldMarkerGroups:
+                notFoundMarkerGroups += findAnnotationMarkersNearestMeshLocations(
+                    fieldMarkerGroups, materialCoordinatesField, mesh)
+    return notFoundMarkerGroups
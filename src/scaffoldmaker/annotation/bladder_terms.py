@@ -1,6 +1,7 @@
 """
 Common resource for bladder annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 bladder_terms = [
@@ -46,6 +47,8 @@ bladder_terms = [
     ("urethra junction of ventral bladder neck", "ILX:0738410")
 ]
 
+register_terms("bladder", bladder_terms)
+
 
 def get_bladder_term(name: str):
     """
@@ -53,7 +56,7 @@ def get_bladder_term(name: str):
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in bladder_terms:
-        if name in term:
-            return (term[0], term[1])
+    term = lookup_term("bladder", name)
+    if term:
+        return term
     raise NameError("Bladder annotation term '" + name + "' not found.")
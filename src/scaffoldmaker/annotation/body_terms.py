@@ -1,6 +1,7 @@
 """
 Common resource for body annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 body_terms = [
@@ -41,13 +42,16 @@ body_terms = [
     ("ventral", "")
     ]
 
+register_terms("body", body_terms)
+
+
 def get_body_term(name : str):
     """
     Find term by matching name to any identifier held for a term.
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in body_terms:
-        if name in term:
-            return ( term[0], term[1] )
+    term = lookup_term("body", name)
+    if term:
+        return term
     raise NameError("Body annotation term '" + name + "' not found.")
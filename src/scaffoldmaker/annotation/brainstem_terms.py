@@ -1,6 +1,7 @@
 """
 Common resource for testing annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 brainstem_terms = [ # Landmarks and groups
@@ -35,13 +36,16 @@ brainstem_terms = [ # Landmarks and groups
 
 ]
 
+register_terms("brainstem", brainstem_terms)
+
+
 def get_brainstem_term(name : str):
     """
     Find term by matching name to any identifier held for a term.
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in brainstem_terms:
-        if name in term:
-            return ( term[0], term[1] )
+    term = lookup_term("brainstem", name)
+    if term:
+        return term
     raise NameError("Brainstem annotation term '" + name + "' not found.")
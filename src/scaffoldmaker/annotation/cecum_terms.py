@@ -1,6 +1,7 @@
 """
 Common resource for cecum annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 cecum_terms = [
@@ -13,6 +14,8 @@ cecum_terms = [
     ("submucosa of cecum", "UBERON:0004927", "ILX:0725500", "FMA:14999")
     ]
 
+register_terms("cecum", cecum_terms)
+
 
 def get_cecum_term(name: str):
     """
@@ -20,7 +23,7 @@ def get_cecum_term(name: str):
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in cecum_terms:
-        if name in term:
-            return (term[0], term[1])
+    term = lookup_term("cecum", name)
+    if term:
+        return term
     raise NameError("Cecum annotation term '" + name + "' not found.")
@@ -1,6 +1,7 @@
 """
 Common resource for colon annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 colon_terms = [
@@ -25,6 +26,8 @@ colon_terms = [
     ("transverse colon", "UBERON:0001157", "ILX:0728767", "FMA:14546")
     ]
 
+register_terms("colon", colon_terms)
+
 
 def get_colon_term(name: str):
     """
@@ -32,7 +35,7 @@ def get_colon_term(name: str):
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in colon_terms:
-        if name in term:
-            return (term[0], term[1])
+    term = lookup_term("colon", name)
+    if term:
+        return term
     raise NameError("Colon annotation term '" + name + "' not found.")
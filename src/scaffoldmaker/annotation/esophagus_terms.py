@@ -1,6 +1,7 @@
 """
 Common resource for esophagus annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 esophagus_terms = [
@@ -21,13 +22,16 @@ esophagus_terms = [
     ("thoracic part of esophagus", "UBERON:0035216", "ILX:0732442", "FMA:9396"),
     ]
 
+register_terms("esophagus", esophagus_terms)
+
+
 def get_esophagus_term(name : str):
     """
     Find term by matching name to any identifier held for a term.
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in esophagus_terms:
-        if name in term:
-            return ( term[0], term[1] )
+    term = lookup_term("esophagus", name)
+    if term:
+        return term
     raise NameError("Esophagus annotation term '" + name + "' not found.")
@@ -1,6 +1,7 @@
 """
 Common resource for heart annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 heart_terms = [
@@ -94,13 +95,16 @@ heart_terms = [
     ("right atrium epicardium venous midpoint", "ILX:0778117")
 ]
 
+register_terms("heart", heart_terms)
+
+
 def get_heart_term(name : str):
     """
     Find term by matching name to any identifier held for a term.
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in heart_terms:
-        if name in term:
-            return ( term[0], term[1] )
+    term = lookup_term("heart", name)
+    if term:
+        return term
     raise NameError("Heart annotation term '" + name + "' not found.")
@@ -1,6 +1,7 @@
 """
 Common resource for lungs annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 lung_terms = [
@@ -84,13 +85,16 @@ lung_terms = [
 
 ]
 
+register_terms("lung", lung_terms)
+
+
 def get_lung_term(name : str):
     """
     Find term by matching name to any identifier held for a term.
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in lung_terms:
-        if name in term:
-            return ( term[0], term[1] )
+    term = lookup_term("lung", name)
+    if term:
+        return term
     raise NameError("Lung annotation term '" + name + "' not found.")
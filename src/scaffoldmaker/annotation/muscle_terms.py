@@ -1,6 +1,7 @@
 """
 Common resource for muscle annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 muscle_terms = [
@@ -9,6 +10,8 @@ muscle_terms = [
     ("biceps femoris", "UBERON:0001374 ", "ILX:0730686"),
     ]
 
+register_terms("muscle", muscle_terms)
+
 
 def get_muscle_term(name : str):
     """
@@ -16,7 +19,7 @@ def get_muscle_term(name : str):
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in muscle_terms:
-        if name in term:
-            return ( term[0], term[1] )
+    term = lookup_term("muscle", name)
+    if term:
+        return term
     raise NameError("Muscle annotation term '" + name + "' not found.")
@@ -1,6 +1,7 @@
 """
 Common resource for nerve centreline annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 
@@ -485,6 +486,8 @@ nerve_terms = [
     ('sympathetic_trunk_T7-T8', ''),
     ]
 
+register_terms("nerve", nerve_terms)
+
 
 def get_nerve_term(name : str):
     """
@@ -492,7 +495,7 @@ def get_nerve_term(name : str):
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in nerve_terms:
-        if name in term:
-            return ( term[0], term[1] )
+    term = lookup_term("nerve", name)
+    if term:
+        return term
     raise NameError("Nerve annotation term '" + name + "' not found.")
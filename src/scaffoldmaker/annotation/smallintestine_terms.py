@@ -1,6 +1,7 @@
 """
 Common resource for small intestine annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 smallintestine_terms = [
@@ -24,6 +25,8 @@ smallintestine_terms = [
     ("submucosa of small intestine", "UBERON:0001205", "ILX:0735609", "FMA:14934")
     ]
 
+register_terms("smallintestine", smallintestine_terms)
+
 
 def get_smallintestine_term(name: str):
     """
@@ -31,7 +34,7 @@ def get_smallintestine_term(name: str):
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in smallintestine_terms:
-        if name in term:
-            return (term[0], term[1])
+    term = lookup_term("smallintestine", name)
+    if term:
+        return term
     raise NameError("Small intestine annotation term '" + name + "' not found.")
@@ -1,6 +1,7 @@
 """
 Common resource for spinal nerve annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 spinal_nerve_terms = [
@@ -45,13 +46,16 @@ spinal_nerve_terms = [
     ("ventral root of spinal cord", "UBERON:0002260", "ILX:0724498", "FMA:5979")
     ]
 
+register_terms("spinal_nerve", spinal_nerve_terms)
+
+
 def get_spinal_nerve_term(name : str):
     """
     Find term by matching name to any identifier held for a term.
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in spinal_nerve_terms:
-        if name in term:
-            return ( term[0], term[1] )
+    term = lookup_term("spinal_nerve", name)
+    if term:
+        return term
     raise NameError("Spinal nerve annotation term '" + name + "' not found.")
@@ -1,19 +1,23 @@
 """
 Common resource for stellate annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 stellate_terms = [
     ( "cervicothoracic ganglion", "UBERON:2441", "ILX:733799", "FMA:6469")
     ]
 
+register_terms("stellate", stellate_terms)
+
+
 def get_stellate_term(name : str):
     """
     Find term by matching name to any identifier held for a term.
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in stellate_terms:
-        if name in term:
-            return ( term[0], term[1] )
+    term = lookup_term("stellate", name)
+    if term:
+        return term
     raise NameError("Stellate annotation term '" + name + "' not found.")
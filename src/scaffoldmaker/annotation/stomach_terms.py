@@ -1,6 +1,7 @@
 """
 Common resource for stomach annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 stomach_terms = [
@@ -73,6 +74,8 @@ stomach_terms = [
     ("ventral stomach", "ILX:0793085")
     ]
 
+register_terms("stomach", stomach_terms)
+
 
 def get_stomach_term(name: str):
     """
@@ -80,7 +83,7 @@ def get_stomach_term(name: str):
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in stomach_terms:
-        if name in term:
-            return (term[0], term[1])
+    term = lookup_term("stomach", name)
+    if term:
+        return term
     raise NameError("Stomach annotation term '" + name + "' not found.")
@@ -0,0 +1,119 @@
+"""
+Shared registry indexing the annotation terms lists of all *_terms modules for constant time lookup.
+"""
+import importlib
+
+
+# modules registering terms lists on import, for cross-organ lookup and validation
+_terms_module_names = [
+    "bladder_terms",
+    "body_terms",
+    "brainstem_terms",
+    "cecum_terms",
+    "colon_terms",
+    "esophagus_terms",
+    "heart_terms",
+    "lung_terms",
+    "muscle_terms",
+    "nerve_terms",
+    "smallintestine_terms",
+    "spinal_nerve_terms",
+    "stellate_terms",
+    "stomach_terms",
+    "trigeminal_nerve_terms",
+    "uterus_terms",
+    "vagus_terms"
+]
+
+# map from terms list name to terms list, in order of registration
+_terms_lists = {}
+# map from terms list name to dict mapping every name, id and alias to (preferred name, preferred id)
+_terms_indexes = {}
+
+
+def register_terms(terms_name: str, terms: list):
+    """
+    Register terms list and build its index. Called by *_terms modules after defining their terms lists.
+    Where a name, id or alias is held by several terms, it maps to the first, matching a linear search.
+    :param terms_name: Unique name of terms list e.g. "heart".
+    :param terms: List of terms, each a tuple of preferred name, preferred id, followed by any other ids and
+    alternative names.
+    """
+    index = {}
+    for term in terms:
+        preferred_term = (term[0], term[1])
+        for identifier in term:
+            index.setdefault(identifier, preferred_term)
+    _terms_lists[terms_name] = terms
+    _terms_indexes[terms_name] = index
+
+
+def unregister_terms(terms_name: str):
+    """
+    Remove terms list from registry, if registered.
+    :param terms_name: Name of registered terms list.
+    """
+    _terms_lists.pop(terms_name, None)
+    _terms_indexes.pop(terms_name, None)
+
+
+def lookup_term(terms_name: str, name: str):
+    """
+    Find term in registered terms list by matching name to any identifier held for a term.
+    :param terms_name: Name of registered terms list e.g. "heart".
+    :param name: Any name, id or alias of term.
+    :return: ( preferred name, preferred id ), or None if not found.
+    """
+    return _terms_indexes[terms_name].get(name)
+
+
+def _register_all_terms():
+    """
+    Import all *_terms modules so their terms lists are registered.
+    """
+    for module_name in _terms_module_names:
+        importlib.import_module("scaffoldmaker.annotation." + module_name)
+
+
+def find_term_all_organs(name: str):
+    """
+    Find term by matching name to any identifier held for a term in any registered terms list.
+    :param name: Any name, id or alias of term.
+    :return: list of (terms list name, ( preferred name, preferred id )) for all terms lists holding name,
+    in order of registration; empty if not found.
+    """
+    _register_all_terms()
+    matches = []
+    for terms_name, index in _terms_indexes.items():
+        term = index.get(name)
+        if term:
+            matches.append((terms_name, term))
+    return matches
+
+
+def validate_terms():
+    """
+    Check all terms lists for names with multiple ids, and ids with multiple names, within and across organs.
+    Terms with the same preferred name and id in several terms lists are not reported. Only identifiers
+    containing a colon are treated as ids.
+    :return: list of strings describing each conflict found; empty if none.
+    """
+    _register_all_terms()
+    name_terms = {}  # map from preferred name to list of (terms list name, id)
+    id_terms = {}  # map from any id to list of (terms list name, preferred name)
+    for terms_name, terms in _terms_lists.items():
+        for term in terms:
+            name_terms.setdefault(term[0], []).append((terms_name, term[1]))
+            for identifier in term[1:]:
+                if identifier and (":" in identifier):
+                    id_terms.setdefault(identifier, []).append((terms_name, term[0]))
+    conflicts = []
+    for name, uses in name_terms.items():
+        if len(set(use[1] for use in uses)) > 1:
+            conflicts.append("Name '" + name + "' has different ids: " +
+                             ", ".join(use[0] + " '" + use[1] + "'" for use in uses))
+    for identifier, uses in id_terms.items():
+        if len(set(use[1] for use in uses)) > 1:
+            conflicts.append("Id '" + identifier + "' has different names: " +
+                             ", ".join(use[0] + " '" + use[1] + "'" for use in uses))
+    return conflicts
@@ -1,6 +1,7 @@
 """
 Common resource for trigeminal nerve annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 trigeminal_nerve_terms = [
@@ -12,13 +13,16 @@ trigeminal_nerve_terms = [
     ("trigeminal nerve root", "UBERON:0004673", "ILX:0111966", "FMA:52610")
     ]
 
+register_terms("trigeminal_nerve", trigeminal_nerve_terms)
+
+
 def get_trigeminal_nerve_term(name : str):
     """
     Find term by matching name to any identifier held for a term.
     Raise exception if name not found.
     :return ( preferred name, preferred id )
     """
-    for term in trigeminal_nerve_terms:
-        if name in term:
-            return ( term[0], term[1] )
+    term = lookup_term("trigeminal_nerve", name)
+    if term:
+        return term
     raise NameError("Trigeminal nerve annotation term '" + name + "' not found.")
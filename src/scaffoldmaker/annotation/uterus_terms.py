@@ -1,6 +1,7 @@
 """
 Common resource for uterus annotation terms.
 """
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 
 # convention: preferred name, preferred id, followed by any other ids and alternative names
 uterus_terms = [
@@ -55,6 +56,8 @@ uterus_terms = [
     ("vaginal canal", "UBERON:0011894", "ILX:0735924", "FMA:19982"),
     ("vagina orifice", "UBERON:0012317", "ILX:0729556", "FMA:19984")]
 
+register_terms("uterus", uterus_terms)
+
 
 def get_uterus_term(name: str):
     """
@@ -62,7 +65,7 @@ def get_uterus_term(name: str):
     Raise exception if name not found.
     :return: ( preferred name, preferred id )
     """
-    for term in uterus_terms:
-        if name in term:
-            return term[0], term[1]
+    term = lookup_term("uterus", name)
+    if term:
+        return term
     raise NameError("Uterus annotation term '" + name + "' not found.")
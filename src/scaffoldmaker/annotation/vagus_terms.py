@@ -2,6 +2,7 @@
 Common resource for vagus annotation terms.
 """
 from scaffoldmaker.annotation.annotation_utils import annotation_term_id_to_url
+from scaffoldmaker.annotation.terms_registry import lookup_term, register_terms
 import logging
 
 logger = logging.getLogger(__name__)
@@ -237,6 +238,9 @@ vagus_branch_terms = [
     ("orientation anterior", "")  # line on the epineurium in anterior direction
 ]
 
+register_terms("vagus marker", vagus_marker_terms)
+register_terms("vagus", vagus_branch_terms)
+
 
 def get_vagus_term(name):
     """
@@ -245,9 +249,9 @@ def get_vagus_term(name):
     :param name: Any name or ID to match against known terms.
     :return: ( preferred name, preferred id )
     """
-    for term in vagus_branch_terms:
-        if name in term:
-            return annotation_term_id_to_url((term[0], term[1]))
+    term = lookup_term("vagus", name)
+    if term:
+        return annotation_term_id_to_url(term)
     logger.warning("Unknown vagus term name or ID: '" + name + "'. Using as name without ID")
     return name, ""
 
@@ -258,9 +262,9 @@ def get_vagus_marker_term(name: str):
     Raise exception if name not found.
     return: ( preferred name, preferred id )
     """
-    for term in vagus_marker_terms:
-        if name in term:
-            return annotation_term_id_to_url((term[0], term[1]))
+    term = lookup_term("vagus marker", name)
+    if term:
+        return annotation_term_id_to_url(term)
     raise NameError("Vagus annotation term '" + name + "' not found.")
 
 
@@ -268,10 +272,7 @@ def marker_name_in_terms(name: str):
     """
     Check if term exists in approved marker terms
     """
-    for term in vagus_marker_terms:
-        if name in term:
-            return True
-    return False
+    return lookup_term("vagus marker", name) is not None
 
 
 def get_left_vagus_marker_locations_list():
@@ -109,7 +109,8 @@ class MeshType_2d_tubenetwork1(Scaffold_base):
         Generate the base bicubic hermite mesh. See also generateMesh().
         :param region: Zinc region to define model in. Must be empty.
         :param options: Dict containing options. See getDefaultOptions().
-        :return: list of AnnotationGroup, None
+        :return: list of AnnotationGroup, NetworkMeshBuildProfile if profiling is enabled otherwise None.
+        See NetworkMeshBuilder.setDefaultProfiling().
         """
         layoutRegion = region.createRegion()
         networkLayout = options["Network layout"]
@@ -132,4 +133,4 @@ class MeshType_2d_tubenetwork1(Scaffold_base):
         tubeNetworkMeshBuilder.generateMesh(generateData)
         annotationGroups = generateData.getAnnotationGroups()
 
-        return annotationGroups, None
+        return annotationGroups, tubeNetworkMeshBuilder.getProfile()
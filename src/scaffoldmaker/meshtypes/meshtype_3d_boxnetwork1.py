@@ -90,7 +90,8 @@ class MeshType_3d_boxnetwork1(Scaffold_base):
         Generate hermite-bilinear mesh from network layout.
         :param region: Zinc region to define model in. Must be empty.
         :param options: Dict containing options. See getDefaultOptions().
-        :return: list of AnnotationGroup, None
+        :return: list of AnnotationGroup, NetworkMeshBuildProfile if profiling is enabled otherwise None.
+        See NetworkMeshBuilder.setDefaultProfiling().
         """
         networkLayout = options["Network layout"]
         targetElementDensityAlongLongestSegment = options["Target element density along longest segment"]
@@ -108,4 +109,4 @@ class MeshType_3d_boxnetwork1(Scaffold_base):
         boxNetworkMeshBuilder.generateMesh(generateData)
         annotationGroups = generateData.getAnnotationGroups()
 
-        return annotationGroups, None
+        return annotationGroups, boxNetworkMeshBuilder.getProfile()
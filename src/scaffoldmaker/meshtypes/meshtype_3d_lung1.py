@@ -10,7 +10,6 @@ from cmlibs.zinc.node import Node
 from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, findOrCreateAnnotationGroupForTerm, getAnnotationGroupForTerm
 from scaffoldmaker.annotation.lung_terms import get_lung_term
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
-from scaffoldmaker.utils.eft_utils import remapEftLocalNodes, remapEftNodeValueLabel, setEftScaleFactorIds
 from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
 
@@ -178,13 +177,13 @@ class MeshType_3d_lung1(Scaffold_base):
         cache = fm.createFieldcache()
 
         # common element field templates
-        eftWedgeCollapseXi1_15 = eftfactory.createEftWedgeCollapseXi1Quadrant([1, 5])
-        eftWedgeCollapseXi1_37 = eftfactory.createEftWedgeCollapseXi1Quadrant([3, 7])
-        eftWedgeCollapseXi1_57 = eftfactory.createEftWedgeCollapseXi1Quadrant([5, 7])
-        eftWedgeCollapseXi2_56 = eftfactory.createEftWedgeCollapseXi2Quadrant([5, 6])
-        eftWedgeCollapseXi2_78 = eftfactory.createEftWedgeCollapseXi2Quadrant([7, 8])
-        eftTetCollapseXi1Xi2_82 = eftfactory.createEftTetrahedronCollapseXi1Xi2Quadrant(8, 2)
-        eftTetCollapseXi1Xi2_63 = eftfactory.createEftTetrahedronCollapseXi1Xi2Quadrant(6, 3)
+        eftWedgeCollapseXi1_15 = eftfactory.getCachedEft("createEftWedgeCollapseXi1Quadrant", ([1, 5],))
+        eftWedgeCollapseXi1_37 = eftfactory.getCachedEft("createEftWedgeCollapseXi1Quadrant", ([3, 7],))
+        eftWedgeCollapseXi1_57 = eftfactory.getCachedEft("createEftWedgeCollapseXi1Quadrant", ([5, 7],))
+        eftWedgeCollapseXi2_56 = eftfactory.getCachedEft("createEftWedgeCollapseXi2Quadrant", ([5, 6],))
+        eftWedgeCollapseXi2_78 = eftfactory.getCachedEft("createEftWedgeCollapseXi2Quadrant", ([7, 8],))
+        eftTetCollapseXi1Xi2_82 = eftfactory.getCachedEft("createEftTetrahedronCollapseXi1Xi2Quadrant", (8, 2))
+        eftTetCollapseXi1Xi2_63 = eftfactory.getCachedEft("createEftTetrahedronCollapseXi1Xi2Quadrant", (6, 3))
 
         # common parameters in species
         generateParameters = False
@@ -1396,19 +1395,20 @@ def getLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegular,
     :return: elementIdentifier
     """
 
-    eftWedgeCollapseXi1_15 = eftfactory.createEftWedgeCollapseXi1Quadrant([1, 5])
-    eftWedgeCollapseXi1_26 = eftfactory.createEftWedgeCollapseXi1Quadrant([2, 6])
-    eftWedgeCollapseXi1_57 = eftfactory.createEftWedgeCollapseXi1Quadrant([5, 7])
-    eftWedgeCollapseXi1_68 = eftfactory.createEftWedgeCollapseXi1Quadrant([6, 8])
-    eftWedgeCollapseXi2_78 = eftfactory.createEftWedgeCollapseXi2Quadrant([7, 8])
-    eftTetCollapseXi1Xi2_71 = eftfactory.createEftTetrahedronCollapseXi1Xi2Quadrant(7, 1)
-    eftTetCollapseXi1Xi2_82 = eftfactory.createEftTetrahedronCollapseXi1Xi2Quadrant(8, 2)
+    eftWedgeCollapseXi1_15 = eftfactory.getCachedEft("createEftWedgeCollapseXi1Quadrant", ([1, 5],))
+    eftWedgeCollapseXi1_26 = eftfactory.getCachedEft("createEftWedgeCollapseXi1Quadrant", ([2, 6],))
+    eftWedgeCollapseXi1_57 = eftfactory.getCachedEft("createEftWedgeCollapseXi1Quadrant", ([5, 7],))
+    eftWedgeCollapseXi1_68 = eftfactory.getCachedEft("createEftWedgeCollapseXi1Quadrant", ([6, 8],))
+    eftWedgeCollapseXi2_78 = eftfactory.getCachedEft("createEftWedgeCollapseXi2Quadrant", ([7, 8],))
+    eftTetCollapseXi1Xi2_71 = eftfactory.getCachedEft("createEftTetrahedronCollapseXi1Xi2Quadrant", (7, 1))
+    eftTetCollapseXi1Xi2_82 = eftfactory.getCachedEft("createEftTetrahedronCollapseXi1Xi2Quadrant", (8, 2))
 
     # Lower lobe elements
     for e3 in range(lElementsCount3):
         for e2 in range(lElementsCount2):
             for e1 in range(lElementsCount1):
                 eft = eftRegular
+                eftRemaps = None
                 nodeIdentifiers = [
                     lowerNodeIds[e3][e2][e1], lowerNodeIds[e3][e2][e1 + 1], lowerNodeIds[e3][e2 + 1][e1],
                     lowerNodeIds[e3][e2 + 1][e1 + 1],
@@ -1432,27 +1432,33 @@ def getLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegular,
                     eft = eftWedgeCollapseXi2_78
                 elif (e3 == (lElementsCount3 - 1)) and (e2 == (lElementsCount2 - 3)):
                     # Remapped cube element 1
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
-                    remapEftNodeValueLabel(eft, [7, 8], Node.VALUE_LABEL_D_DS2, [(Node.VALUE_LABEL_D_DS3, [1])])
-                    remapEftNodeValueLabel(eft, [7, 8], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS2, [])])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [7, 8], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS3, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [7, 8], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, [])]))
                 elif (e3 == (lElementsCount3 - 1)) and (e2 == (lElementsCount2 - 2)):
                     # Remapped cube element 2
                     nodeIdentifiers[2] = lowerNodeIds[e3 - 1][e2 + 1][e1]
                     nodeIdentifiers[3] = lowerNodeIds[e3 - 1][e2 + 1][e1 + 1]
                     nodeIdentifiers[6] = lowerNodeIds[e3 - 1][e2 + 2][e1]
                     nodeIdentifiers[7] = lowerNodeIds[e3 - 1][e2 + 2][e1 + 1]
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
-                    remapEftNodeValueLabel(eft, [5, 6], Node.VALUE_LABEL_D_DS2, [(Node.VALUE_LABEL_D_DS3, [1])])
-                    remapEftNodeValueLabel(eft, [5, 6], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS2, [])])
-                    remapEftNodeValueLabel(eft, [3, 4, 7, 8], Node.VALUE_LABEL_D_DS2,
-                                           [(Node.VALUE_LABEL_D_DS3, [1])])
-                    remapEftNodeValueLabel(eft, [3, 4, 7, 8], Node.VALUE_LABEL_D_DS3,
-                                           [(Node.VALUE_LABEL_D_DS2, [])])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [5, 6], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS3, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [5, 6], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, [])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4, 7, 8], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS3, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4, 7, 8], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, [])]))
                 elif None in nodeIdentifiers:
                     continue
 
+                if eftRemaps is not None:
+                    eft = eftfactory.getCachedEft("createEftBasic", (), eftRemaps)
                 if eft is eftRegular:
                     element = mesh.createElement(elementIdentifier, elementtemplateRegular)
                 else:
@@ -1474,6 +1480,7 @@ def getLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegular,
         for e2 in range(uElementsCount2):
             for e1 in range(uElementsCount1):
                 eft = eftRegular
+                eftRemaps = None
                 nodeIdentifiers = [
                     upperNodeIds[e3][e2][e1], upperNodeIds[e3][e2][e1 + 1], upperNodeIds[e3][e2 + 1][e1],
                     upperNodeIds[e3][e2 + 1][e1 + 1],
@@ -1484,29 +1491,29 @@ def getLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegular,
                     # Distal-front wedge elements
                     nodeIdentifiers.pop(6)
                     nodeIdentifiers.pop(2)
-                    eft = eftfactory.createEftBasic()
+                    eftRemaps = []
                     nodes = [3, 4, 7, 8]
                     collapseNodes = [3, 7]
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, collapseNodes, Node.VALUE_LABEL_D_DS2,
-                                           [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])])
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", collapseNodes, Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])]))
                     ln_map = [1, 2, 3, 3, 4, 5, 6, 6]
-                    remapEftLocalNodes(eft, 6, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 6, ln_map))
 
                 elif (e3 < (uElementsCount3 - 1)) and (e2 == (uElementsCount2 - 1)) and (
                         e1 == (uElementsCount1 - 1)):
                     # Distal-back wedge elements
                     nodeIdentifiers.pop(7)
                     nodeIdentifiers.pop(3)
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
                     nodes = [3, 4, 7, 8]
                     collapseNodes = [4, 8]
-                    remapEftNodeValueLabel(eft, collapseNodes, Node.VALUE_LABEL_D_DS2,
-                                           [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])])
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
+                    eftRemaps.append(("remapEftNodeValueLabel", collapseNodes, Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
                     ln_map = [1, 2, 3, 3, 4, 5, 6, 6]
-                    remapEftLocalNodes(eft, 6, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 6, ln_map))
 
                 elif (e3 == (uElementsCount3 - 2)) and (e2 == 0) and (e1 == 0):
                     # Medial-front wedge elements
@@ -1549,19 +1556,21 @@ def getLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegular,
                     nodeIdentifiers.pop(6)
                     nodeIdentifiers.pop(4)
                     nodeIdentifiers.pop(2)
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
                     nodes = [5, 6, 7, 8]
                     # remap parameters on xi3 = 1 before collapsing nodes
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS2, [])
-                    remapEftNodeValueLabel(eft, [7, 8], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS2, [1])])
-                    remapEftNodeValueLabel(eft, [5], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS1, [])])
-                    remapEftNodeValueLabel(eft, [3, 4], Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, [3], Node.VALUE_LABEL_D_DS2,
-                                           [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])])
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS2, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [7, 8], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [5], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS1, [])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4], Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])]))
                     ln_map = [1, 2, 3, 3, 4, 4, 4, 4]
-                    remapEftLocalNodes(eft, 4, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 4, ln_map))
 
                 elif (e3 == (uElementsCount3 - 1)) and (e2 == (uElementsCount2 - 1)) and (
                         e1 == (uElementsCount1 - 1)):
@@ -1570,35 +1579,40 @@ def getLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegular,
                     nodeIdentifiers.pop(6)
                     nodeIdentifiers.pop(5)
                     nodeIdentifiers.pop(3)
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
                     nodes = [5, 6, 7, 8]
                     # remap parameters on xi3 = 1 before collapsing nodes
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS2, [])
-                    remapEftNodeValueLabel(eft, [7, 8], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS2, [1])])
-                    remapEftNodeValueLabel(eft, [6], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS1, [1])])
-                    remapEftNodeValueLabel(eft, [3, 4], Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, [4], Node.VALUE_LABEL_D_DS2,
-                                           [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])])
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS2, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [7, 8], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [6], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS1, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4], Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [4], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])]))
                     ln_map = [1, 2, 3, 3, 4, 4, 4, 4]
-                    remapEftLocalNodes(eft, 4, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 4, ln_map))
 
                 elif (e3 == (uElementsCount3 - 2)) and (e2 == (uElementsCount2 - 3)):
                     # Remapped cube element 1
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
-                    remapEftNodeValueLabel(eft, [3, 4], Node.VALUE_LABEL_D_DS2, [(Node.VALUE_LABEL_D_DS3, [1])])
-                    remapEftNodeValueLabel(eft, [3, 4], Node.VALUE_LABEL_D_DS3,
-                                           [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS3, [])])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS3, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS3, [])]))
                 elif (e3 == (uElementsCount3 - 2)) and (e2 == (uElementsCount2 - 2)):
                     # Remapped cube element 2
-                    eft = eftfactory.createEftBasic()
-                    remapEftNodeValueLabel(eft, [1, 2], Node.VALUE_LABEL_D_DS3,
-                                           [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS3, [])])
+                    eftRemaps = []
+                    eftRemaps.append(("remapEftNodeValueLabel", [1, 2], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS3, [])]))
                 elif None in nodeIdentifiers:
                     continue
 
+                if eftRemaps is not None:
+                    eft = eftfactory.getCachedEft("createEftBasic", (), eftRemaps)
                 if eft is eftRegular:
                     element = mesh.createElement(elementIdentifier, elementtemplateRegular)
                 else:
@@ -1683,6 +1697,7 @@ def getDiaphragmaticLungElements(coordinates, eftfactory, eftRegular, elementtem
         for e2 in range(elementsCount2):
             for e1 in range(elementsCount1):
                 eft = eftRegular
+                eftRemaps = None
                 nodeIdentifiers = [
                     NodeIds[e3][e2][e1], NodeIds[e3][e2][e1 + 1], NodeIds[e3][e2 + 1][e1],
                     NodeIds[e3][e2 + 1][e1 + 1],
@@ -1693,64 +1708,66 @@ def getDiaphragmaticLungElements(coordinates, eftfactory, eftRegular, elementtem
                     # wedge elements along crest
                     nodeIdentifiers.pop(6)
                     nodeIdentifiers.pop(4)
-                    eft = eftfactory.createEftBasic()
+                    eftRemaps = []
                     nodes = [5, 6, 7, 8]
                     collapseNodes = [5, 7]
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, collapseNodes, Node.VALUE_LABEL_D_DS3,
-                                           [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS3, [])])
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", collapseNodes, Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS3, [])]))
                     if e2 == 0:
-                        setEftScaleFactorIds(eft, [1], [])
-                        remapEftNodeValueLabel(eft, [3], Node.VALUE_LABEL_D_DS2,
-                                               [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS1, [1])])
+                        eftRemaps.append(("setEftScaleFactorIds", [1], []))
+                        eftRemaps.append(("remapEftNodeValueLabel", [3], Node.VALUE_LABEL_D_DS2,
+                                          [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS1, [1])]))
                     ln_map = [1, 2, 3, 4, 5, 5, 6, 6]
-                    remapEftLocalNodes(eft, 6, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 6, ln_map))
 
                 elif (e1 == 1) and (e2 == 0) and (e3 < (elementsCount3 - 1)):
                     # Remapping the elements
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
-                    remapEftNodeValueLabel(eft, [3, 7], Node.VALUE_LABEL_D_DS2,
-                                           [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS1, [1])])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS1, [1])]))
 
                 elif (e1 == elementsCount1 - 1) and (e3 == (elementsCount3 - 1)):
                     nodeIdentifiers.pop(7)
                     nodeIdentifiers.pop(5)
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
                     nodes = [5, 6, 7, 8]
                     collapseNodes = [6, 8]
-                    remapEftNodeValueLabel(eft, collapseNodes, Node.VALUE_LABEL_D_DS3,
-                                           [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS3, [])])
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
+                    eftRemaps.append(("remapEftNodeValueLabel", collapseNodes, Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS3, [])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
                     ln_map = [1, 2, 3, 4, 5, 5, 6, 6]
-                    remapEftLocalNodes(eft, 6, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 6, ln_map))
 
                 elif (e1 == 0) and (e2 == 0):
                     # Remapping the elements
                     if e3 == 0:
-                        eft = eftfactory.createEftBasic()
-                        setEftScaleFactorIds(eft, [1], [])
-                        remapEftNodeValueLabel(eft, [4, 8], Node.VALUE_LABEL_D_DS2,
-                                               [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS1, [1])])
-                        remapEftNodeValueLabel(eft, [4, 8], Node.VALUE_LABEL_D_DS1,
-                                               [(Node.VALUE_LABEL_D_DS2, [])])
+                        eftRemaps = []
+                        eftRemaps.append(("setEftScaleFactorIds", [1], []))
+                        eftRemaps.append(("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS2,
+                                          [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS1, [1])]))
+                        eftRemaps.append(("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS1,
+                                          [(Node.VALUE_LABEL_D_DS2, [])]))
                     elif (e3 == (elementsCount3 - 1)):
                         nodeIdentifiers[7] = NodeIds[e3 + 1][e2 + 1][e1 + 2]
                         nodeIdentifiers[5] = NodeIds[e3 + 1][e2][e1 + 2]
-                        eft = eftfactory.createEftBasic()
-                        setEftScaleFactorIds(eft, [1], [])
+                        eftRemaps = []
+                        eftRemaps.append(("setEftScaleFactorIds", [1], []))
                         collapseNodes = [6, 8]
-                        remapEftNodeValueLabel(eft, collapseNodes, Node.VALUE_LABEL_D_DS3,
-                                               [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS3, [])])
-                        remapEftNodeValueLabel(eft, [4], Node.VALUE_LABEL_D_DS2,
-                                               [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS1, [1])])
-                        remapEftNodeValueLabel(eft, [4], Node.VALUE_LABEL_D_DS1,
-                                               [(Node.VALUE_LABEL_D_DS2, [])])
+                        eftRemaps.append(("remapEftNodeValueLabel", collapseNodes, Node.VALUE_LABEL_D_DS3,
+                                          [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS3, [])]))
+                        eftRemaps.append(("remapEftNodeValueLabel", [4], Node.VALUE_LABEL_D_DS2,
+                                          [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS1, [1])]))
+                        eftRemaps.append(("remapEftNodeValueLabel", [4], Node.VALUE_LABEL_D_DS1,
+                                          [(Node.VALUE_LABEL_D_DS2, [])]))
 
                 elif None in nodeIdentifiers:
                     continue
 
+                if eftRemaps is not None:
+                    eft = eftfactory.getCachedEft("createEftBasic", (), eftRemaps)
                 if eft is eftRegular:
                     element = mesh.createElement(elementIdentifier, elementtemplateRegular)
                 else:
@@ -13,7 +13,6 @@ from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, findOrCrea
     getAnnotationGroupForTerm
 from scaffoldmaker.annotation.lung_terms import get_lung_term
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
-from scaffoldmaker.utils.eft_utils import remapEftLocalNodes, remapEftNodeValueLabel, setEftScaleFactorIds
 from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
 from scaffoldmaker.utils.geometry import sampleEllipsePoints, getEllipsoidPlaneA, \
     getEllipsoidPolarCoordinatesFromPosition, getEllipsoidPolarCoordinatesTangents
@@ -1543,14 +1542,14 @@ def createLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegul
     :return: elementIdentifier
     """
 
-    eftWedgeCollapseXi1_15 = eftfactory.createEftWedgeCollapseXi1Quadrant([1, 5])
-    eftWedgeCollapseXi1_26 = eftfactory.createEftWedgeCollapseXi1Quadrant([2, 6])
-    eftWedgeCollapseXi1_57 = eftfactory.createEftWedgeCollapseXi1Quadrant([5, 7])
-    eftWedgeCollapseXi1_68 = eftfactory.createEftWedgeCollapseXi1Quadrant([6, 8])
-    # eftWedgeCollapseXi2_78 = eftfactory.createEftWedgeCollapseXi2Quadrant([7, 8])
-    eftWedgeCollapseXi3_78 = eftfactory.createEftWedgeCollapseXi3Quadrant([7, 8])
-    eftTetCollapseXi1Xi2_71 = eftfactory.createEftTetrahedronCollapseXi1Xi2Quadrant(7, 1)
-    eftTetCollapseXi1Xi2_82 = eftfactory.createEftTetrahedronCollapseXi1Xi2Quadrant(8, 2)
+    eftWedgeCollapseXi1_15 = eftfactory.getCachedEft("createEftWedgeCollapseXi1Quadrant", ([1, 5],))
+    eftWedgeCollapseXi1_26 = eftfactory.getCachedEft("createEftWedgeCollapseXi1Quadrant", ([2, 6],))
+    eftWedgeCollapseXi1_57 = eftfactory.getCachedEft("createEftWedgeCollapseXi1Quadrant", ([5, 7],))
+    eftWedgeCollapseXi1_68 = eftfactory.getCachedEft("createEftWedgeCollapseXi1Quadrant", ([6, 8],))
+    # eftWedgeCollapseXi2_78 = eftfactory.getCachedEft("createEftWedgeCollapseXi2Quadrant", ([7, 8],))
+    eftWedgeCollapseXi3_78 = eftfactory.getCachedEft("createEftWedgeCollapseXi3Quadrant", ([7, 8],))
+    eftTetCollapseXi1Xi2_71 = eftfactory.getCachedEft("createEftTetrahedronCollapseXi1Xi2Quadrant", (7, 1))
+    eftTetCollapseXi1Xi2_82 = eftfactory.getCachedEft("createEftTetrahedronCollapseXi1Xi2Quadrant", (8, 2))
 
     lowerLobeElementID = []
     upperLobeElementID = []
@@ -1563,6 +1562,7 @@ def createLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegul
                 lowerLobeElementID[e3][e2].append(None)
 
                 eft = eftRegular
+                eftRemaps = None
                 nodeIdentifiers = [
                     lowerNodeIds[e3][e2][e1], lowerNodeIds[e3][e2][e1 + 1], lowerNodeIds[e3][e2 + 1][e1],
                     lowerNodeIds[e3][e2 + 1][e1 + 1],
@@ -1587,27 +1587,33 @@ def createLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegul
                     eft = eftWedgeCollapseXi3_78
                 elif (e3 == (lElementsCount3 - 1)) and (e2 == (lElementsCount2 - 3)):
                     # Remapped cube element 1
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
-                    remapEftNodeValueLabel(eft, [7, 8], Node.VALUE_LABEL_D_DS2, [(Node.VALUE_LABEL_D_DS3, [1])])
-                    remapEftNodeValueLabel(eft, [7, 8], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS2, [])])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [7, 8], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS3, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [7, 8], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, [])]))
                 elif (e3 == (lElementsCount3 - 1)) and (e2 == (lElementsCount2 - 2)):
                     # Remapped cube element 2
                     nodeIdentifiers[2] = lowerNodeIds[e3 - 1][e2 + 1][e1]
                     nodeIdentifiers[3] = lowerNodeIds[e3 - 1][e2 + 1][e1 + 1]
                     nodeIdentifiers[6] = lowerNodeIds[e3 - 1][e2 + 2][e1]
                     nodeIdentifiers[7] = lowerNodeIds[e3 - 1][e2 + 2][e1 + 1]
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
-                    remapEftNodeValueLabel(eft, [5, 6], Node.VALUE_LABEL_D_DS2, [(Node.VALUE_LABEL_D_DS3, [1])])
-                    remapEftNodeValueLabel(eft, [5, 6], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS2, [])])
-                    remapEftNodeValueLabel(eft, [3, 4, 7, 8], Node.VALUE_LABEL_D_DS2,
-                                           [(Node.VALUE_LABEL_D_DS3, [1])])
-                    remapEftNodeValueLabel(eft, [3, 4, 7, 8], Node.VALUE_LABEL_D_DS3,
-                                           [(Node.VALUE_LABEL_D_DS2, [])])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [5, 6], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS3, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [5, 6], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, [])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4, 7, 8], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS3, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4, 7, 8], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, [])]))
                 elif None in nodeIdentifiers:
                     continue
 
+                if eftRemaps is not None:
+                    eft = eftfactory.getCachedEft("createEftBasic", (), eftRemaps)
                 if eft is eftRegular:
                     element = mesh.createElement(elementIdentifier, elementtemplateRegular)
                 else:
@@ -1637,6 +1643,7 @@ def createLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegul
                 is_mediastanum = False
 
                 eft = eftRegular
+                eftRemaps = None
                 nodeIdentifiers = [
                     upperNodeIds[e3][e2][e1], upperNodeIds[e3][e2][e1 + 1], upperNodeIds[e3][e2 + 1][e1],
                     upperNodeIds[e3][e2 + 1][e1 + 1],
@@ -1648,14 +1655,14 @@ def createLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegul
                     # Distal-front wedge elements
                     nodeIdentifiers.pop(6)
                     nodeIdentifiers.pop(2)
-                    eft = eftfactory.createEftBasic()
+                    eftRemaps = []
                     nodes = [3, 4, 7, 8]
                     collapseNodes = [3, 7]
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, collapseNodes, Node.VALUE_LABEL_D_DS2,
-                                           [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])])
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", collapseNodes, Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])]))
                     ln_map = [1, 2, 3, 3, 4, 5, 6, 6]
-                    remapEftLocalNodes(eft, 6, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 6, ln_map))
 
                 elif (e3 < (uElementsCount3 - 1)) and (e2 == (uElementsCount2 - 1)) and (
                         e1 == (uElementsCount1 - 1)):
@@ -1663,15 +1670,15 @@ def createLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegul
                     # Distal-back wedge elements
                     nodeIdentifiers.pop(7)
                     nodeIdentifiers.pop(3)
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
                     nodes = [3, 4, 7, 8]
                     collapseNodes = [4, 8]
-                    remapEftNodeValueLabel(eft, collapseNodes, Node.VALUE_LABEL_D_DS2,
-                                           [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])])
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
+                    eftRemaps.append(("remapEftNodeValueLabel", collapseNodes, Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
                     ln_map = [1, 2, 3, 3, 4, 5, 6, 6]
-                    remapEftLocalNodes(eft, 6, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 6, ln_map))
 
                 elif (e3 == (uElementsCount3 - 2)) and (e2 == 0) and (e1 == 0):
                     # Medial-front wedge elements
@@ -1717,19 +1724,21 @@ def createLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegul
                     nodeIdentifiers.pop(6)
                     nodeIdentifiers.pop(4)
                     nodeIdentifiers.pop(2)
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
                     nodes = [5, 6, 7, 8]
                     # remap parameters on xi3 = 1 before collapsing nodes
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS2, [])
-                    remapEftNodeValueLabel(eft, [7, 8], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS2, [1])])
-                    remapEftNodeValueLabel(eft, [5], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS1, [])])
-                    remapEftNodeValueLabel(eft, [3, 4], Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, [3], Node.VALUE_LABEL_D_DS2,
-                                           [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])])
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS2, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [7, 8], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [5], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS1, [])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4], Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])]))
                     ln_map = [1, 2, 3, 3, 4, 4, 4, 4]
-                    remapEftLocalNodes(eft, 4, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 4, ln_map))
 
                 elif (e3 == (uElementsCount3 - 1)) and (e2 == (uElementsCount2 - 1)) and (
                         e1 == (uElementsCount1 - 1)):
@@ -1739,35 +1748,40 @@ def createLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegul
                     nodeIdentifiers.pop(6)
                     nodeIdentifiers.pop(5)
                     nodeIdentifiers.pop(3)
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
                     nodes = [5, 6, 7, 8]
                     # remap parameters on xi3 = 1 before collapsing nodes
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS2, [])
-                    remapEftNodeValueLabel(eft, [7, 8], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS2, [1])])
-                    remapEftNodeValueLabel(eft, [6], Node.VALUE_LABEL_D_DS3, [(Node.VALUE_LABEL_D_DS1, [1])])
-                    remapEftNodeValueLabel(eft, [3, 4], Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, [4], Node.VALUE_LABEL_D_DS2,
-                                           [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])])
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS2, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [7, 8], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [6], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS1, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4], Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [4], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])]))
                     ln_map = [1, 2, 3, 3, 4, 4, 4, 4]
-                    remapEftLocalNodes(eft, 4, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 4, ln_map))
 
                 elif (e3 == (uElementsCount3 - 2)) and (e2 == (uElementsCount2 - 3)):
                     # Remapped cube element 1
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
-                    remapEftNodeValueLabel(eft, [3, 4], Node.VALUE_LABEL_D_DS2, [(Node.VALUE_LABEL_D_DS3, [1])])
-                    remapEftNodeValueLabel(eft, [3, 4], Node.VALUE_LABEL_D_DS3,
-                                           [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS3, [])])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4], Node.VALUE_LABEL_D_DS2,
+                                      [(Node.VALUE_LABEL_D_DS3, [1])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", [3, 4], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS3, [])]))
                 elif (e3 == (uElementsCount3 - 2)) and (e2 == (uElementsCount2 - 2)):
                     # Remapped cube element 2
-                    eft = eftfactory.createEftBasic()
-                    remapEftNodeValueLabel(eft, [1, 2], Node.VALUE_LABEL_D_DS3,
-                                           [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS3, [])])
+                    eftRemaps = []
+                    eftRemaps.append(("remapEftNodeValueLabel", [1, 2], Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS2, []), (Node.VALUE_LABEL_D_DS3, [])]))
                 elif None in nodeIdentifiers:
                     continue
 
+                if eftRemaps is not None:
+                    eft = eftfactory.getCachedEft("createEftBasic", (), eftRemaps)
                 if eft is eftRegular:
                     element = mesh.createElement(elementIdentifier, elementtemplateRegular)
                 else:
@@ -1904,6 +1918,7 @@ def createAccessorylobeLungElements(coordinates, eftfactory, eftRegular, element
         for e2 in range(elementsCount2):
             for e1 in range(elementsCount1):
                 eft = eftRegular
+                eftRemaps = None
                 nodeIdentifiers = [
                     NodeIds[e3][e2][e1], NodeIds[e3][e2][e1 + 1], NodeIds[e3][e2 + 1][e1],
                     NodeIds[e3][e2 + 1][e1 + 1],
@@ -1914,32 +1929,34 @@ def createAccessorylobeLungElements(coordinates, eftfactory, eftRegular, element
                     # wedge elements along crest
                     nodeIdentifiers.pop(6)
                     nodeIdentifiers.pop(4)
-                    eft = eftfactory.createEftBasic()
+                    eftRemaps = []
                     nodes = [5, 6, 7, 8]
                     collapseNodes = [5, 7]
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
-                    remapEftNodeValueLabel(eft, collapseNodes, Node.VALUE_LABEL_D_DS3,
-                                           [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS3, [])])
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
+                    eftRemaps.append(("remapEftNodeValueLabel", collapseNodes, Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS3, [])]))
 
                     ln_map = [1, 2, 3, 4, 5, 5, 6, 6]
-                    remapEftLocalNodes(eft, 6, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 6, ln_map))
 
                 elif (e1 == elementsCount1 - 1) and (e3 == (elementsCount3 - 1)):
                     nodeIdentifiers.pop(7)
                     nodeIdentifiers.pop(5)
-                    eft = eftfactory.createEftBasic()
-                    setEftScaleFactorIds(eft, [1], [])
+                    eftRemaps = []
+                    eftRemaps.append(("setEftScaleFactorIds", [1], []))
                     nodes = [5, 6, 7, 8]
                     collapseNodes = [6, 8]
-                    remapEftNodeValueLabel(eft, collapseNodes, Node.VALUE_LABEL_D_DS3,
-                                           [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS3, [])])
-                    remapEftNodeValueLabel(eft, nodes, Node.VALUE_LABEL_D_DS1, [])
+                    eftRemaps.append(("remapEftNodeValueLabel", collapseNodes, Node.VALUE_LABEL_D_DS3,
+                                      [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS3, [])]))
+                    eftRemaps.append(("remapEftNodeValueLabel", nodes, Node.VALUE_LABEL_D_DS1, []))
                     ln_map = [1, 2, 3, 4, 5, 5, 6, 6]
-                    remapEftLocalNodes(eft, 6, ln_map)
+                    eftRemaps.append(("remapEftLocalNodes", 6, ln_map))
 
                 elif None in nodeIdentifiers:
                     continue
 
+                if eftRemaps is not None:
+                    eft = eftfactory.getCachedEft("createEftBasic", (), eftRemaps)
                 if eft is eftRegular:
                     element = mesh.createElement(elementIdentifier, elementtemplateRegular)
                 else:
@@ -1,3 +1,4 @@
+from concurrent.futures import ProcessPoolExecutor
 import math
 import logging
 
@@ -11,8 +12,8 @@ from cmlibs.zinc.node import Node
 from cmlibs.zinc.result import RESULT_OK
 from scaffoldfitter.fitter import Fitter as GeometryFitter
 from scaffoldfitter.fitterstepfit import FitterStepFit
-from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, findOrCreateAnnotationGroupForTerm, \
-    findAnnotationGroupByName
+from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, AnnotationGroupList, \
+    createAnnotationMarkers, findOrCreateAnnotationGroupForTerm, findAnnotationGroupByName
 from scaffoldmaker.annotation.vagus_terms import get_vagus_term, get_vagus_marker_term, \
     get_left_vagus_marker_locations_list, get_right_vagus_marker_locations_list
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
@@ -20,12 +21,12 @@ from scaffoldmaker.utils.constructionobject import ConstructionObject
 from scaffoldmaker.utils.eft_utils import remapEftLocalNodes, remapEftNodeValueLabel, remapEftNodeValueLabelWithNodes, \
     setEftScaleFactorIds
 from scaffoldmaker.utils.interpolation import (
-    evaluateCoordinatesOnCurve, evaluateScalarOnCurve, getCubicHermiteBasis, getCubicHermiteBasisDerivatives,
-    getCubicHermiteArcLength, getCubicHermiteCurvature, getCubicHermiteCurvesLength,
+    CurveSpatialIndex, evaluateCoordinatesOnCurve, evaluateScalarOnCurve, getCubicHermiteBasis,
+    getCubicHermiteBasisDerivatives, getCubicHermiteArcLength, getCubicHermiteCurvature, getCubicHermiteCurvesLength,
     getCubicHermiteTrimmedCurvesLengths, getNearestLocationOnCurve, get_curve_from_points,
     interpolateCubicHermiteDerivative, sampleCubicHermiteCurves, sampleCubicHermiteCurvesSmooth,
     smoothCurveSideCrossDerivatives, track_curve_side_direction)
-from scaffoldmaker.utils.read_vagus_data import load_vagus_data
+from scaffoldmaker.utils.read_vagus_data import get_default_cache_directory, load_vagus_data
 from scaffoldmaker.utils.zinc_utils import (
     define_and_fit_field, find_or_create_field_zero_fibres, fit_hermite_curve, generate_curve_mesh, generate_datapoints,\
     generate_mesh_marker_points)
@@ -59,9 +60,12 @@ class MeshType_3d_nerve1(Scaffold_base):
             'Number of elements along the trunk': 50,
             'Trunk proportion': 1.0,
             'Trunk fit number of iterations': 5,
+            'Trunk pre-fit with Zinc': True,
             'Default anterior direction': [0.0, 1.0, 0.0],
             'Default trunk diameter': 3.0,
-            'Branch diameter trunk proportion': 0.5
+            'Branch diameter trunk proportion': 0.5,
+            'Number of branch fit processes': 1,
+            'Cache input data': True
         }
         return options
 
@@ -72,9 +76,12 @@ class MeshType_3d_nerve1(Scaffold_base):
             'Number of elements along the trunk',
             'Trunk proportion',
             'Trunk fit number of iterations',
+            'Trunk pre-fit with Zinc',
             'Default anterior direction',
             'Default trunk diameter',
-            'Branch diameter trunk proportion'
+            'Branch diameter trunk proportion',
+            'Number of branch fit processes',
+            'Cache input data'
         ]
 
     @classmethod
@@ -82,7 +89,8 @@ class MeshType_3d_nerve1(Scaffold_base):
         dependent_changes = False
         for key in [
             'Number of elements along the trunk',
-            'Number of elements along the trunk pre-fit'
+            'Number of elements along the trunk pre-fit',
+            'Number of branch fit processes'
         ]:
             if options[key] < 1:
                 options[key] = 1
@@ -129,9 +137,12 @@ class MeshType_3d_nerve1(Scaffold_base):
         trunk_elements_count = options['Number of elements along the trunk']
         trunk_proportion = options['Trunk proportion']
         trunk_fit_iterations = options['Trunk fit number of iterations']
+        trunk_prefit_use_zinc = options['Trunk pre-fit with Zinc']
         default_anterior_direction = options['Default anterior direction']
         default_trunk_diameter = options['Default trunk diameter']
         branch_diameter_trunk_proportion = options['Branch diameter trunk proportion']
+        branch_fit_processes_count = options['Number of branch fit processes']
+        cache_input_data = options['Cache input data']
 
         nerve_metadata = NerveMetadata("vagus nerve")
 
@@ -474,7 +485,8 @@ class MeshType_3d_nerve1(Scaffold_base):
         # Load Data
         # =========
 
-        vagus_data = load_vagus_data(region)
+        # parsed input data is cached in the user cache directory, see get_default_cache_directory()
+        vagus_data = load_vagus_data(region, get_default_cache_directory() if cache_input_data else None)
         invalid_data = not vagus_data
         if not invalid_data:
             marker_data = vagus_data.get_level_markers()
@@ -500,13 +512,14 @@ class MeshType_3d_nerve1(Scaffold_base):
         region1d = region if only_1d_trunk else region.createRegion()
         tx, td1, td2, td12, td3, td13 = generate_trunk_1d(
             vagus_data, trunk_proportion, trunk_elements_count_prefit, trunk_elements_count,
-            trunk_fit_iterations, default_anterior_direction, default_trunk_diameter, region1d, nerve_metadata)
+            trunk_fit_iterations, default_anterior_direction, default_trunk_diameter, region1d, nerve_metadata,
+            prefit_use_zinc=trunk_prefit_use_zinc)
         trunk_length = getCubicHermiteCurvesLength(tx, td1)
         trunk_mean_element_length = trunk_length / trunk_elements_count
 
         default_branch_diameter = branch_diameter_trunk_proportion * default_trunk_diameter
 
-        annotation_groups = []
+        annotation_groups = AnnotationGroupList()
         annotation_term_map = vagus_data.get_annotation_term_map()
         trunk_group_name = vagus_data.get_trunk_group_name()
         trunk_group = AnnotationGroup(region, (trunk_group_name, annotation_term_map[trunk_group_name]))
@@ -602,200 +615,233 @@ class MeshType_3d_nerve1(Scaffold_base):
             branch_start_coordinates, coordinates, trunk_mesh_group)
         find_trunk_location.setSearchMode(FieldFindMeshLocation.SEARCH_MODE_NEAREST)
 
-        # iterate over branches off trunk, and branches of branches
-        visited_branches_order = []
-        branch_root_parameters = {}
         branch_data = vagus_data.get_branch_data()
         branch_parent_map = vagus_data.get_branch_parent_map()
-        queue = [branch for branch in branch_parent_map.keys() if branch_parent_map[branch] == trunk_group_name]
-        while queue:
-            branch_name = queue.pop(0)
-            if branch_name in visited_branches_order:
-                logger.warning("already processed branch " + branch_name)
-                continue
-            visited_branches_order.append(branch_name)
-
-            branch_px = [branch_x[0] for branch_x in branch_data[branch_name]]
-            branch_parent_name = branch_parent_map[branch_name]
-            trunk_is_parent = branch_parent_name == trunk_group_name
-            # print(branch_name, '<--', branch_parent_name)
-
-            tx, td1, td2, td12, td3, td13, tnid = parent_parameters[branch_parent_name]
-
-            # get point in trunk volume closest to first point in branch data
-            # parent_group = trunk_group
-            parent_mesh_group = trunk_mesh_group
-            find_parent_location = find_trunk_location
-            if not trunk_is_parent:
-                parent_group = fieldmodule.findFieldByName(branch_parent_name).castGroup()
+        child_branches_map = {}  # map from parent name to list of child branch names in order
+        for branch_name, branch_parent_name in branch_parent_map.items():
+            child_branches_map.setdefault(branch_parent_name, []).append(branch_name)
+
+        # Fitting branch curves is the main cost, and depends only on the parent mesh to cut the branch start.
+        # Fits for all children of a parent are started together once the parent mesh is made, in worker processes
+        # if more than one branch fit process is requested, so siblings are fitted concurrently.
+        # Meshes are made from fits in the same order for any number of processes, giving identical output.
+        executor = ProcessPoolExecutor(branch_fit_processes_count) if (branch_fit_processes_count > 1) else None
+        try:
+            branch_fits = {}  # map from branch name to pending fit, or None if start not found in parent
+
+            def get_parent_mesh_group_and_find_location(parent_name):
+                """
+                :param parent_name: Name of trunk or branch.
+                :return: Parent 3-D mesh group, field finding nearest location of branch_start_coordinates in it.
+                """
+                if parent_name == trunk_group_name:
+                    return trunk_mesh_group, find_trunk_location
+                parent_group = fieldmodule.findFieldByName(parent_name).castGroup()
                 parent_mesh_group = parent_group.getMeshGroup(mesh3d)
                 find_parent_location = fieldmodule.createFieldFindMeshLocation(
                     branch_start_coordinates, coordinates, parent_mesh_group)
                 find_parent_location.setSearchMode(FieldFindMeshLocation.SEARCH_MODE_NEAREST)
-                del parent_group
-            fieldcache.clearLocation()
-            branch_start_coordinates.assignReal(fieldcache, branch_px[0])
-            parent_element, parent_xi = find_parent_location.evaluateMeshLocation(fieldcache, 3)
-            if not parent_element.isValid():
-                logger.error("Nerve: branch " + branch_name + " start point could not be found in parent nerve")
-                continue
-            # get radius at parent_location
-            fieldcache.setMeshLocation(parent_element, parent_xi)
-            _, d2 = coordinates.evaluateDerivative(derivative_xi2, fieldcache, 3)
-            _, d3 = coordinates.evaluateDerivative(derivative_xi3, fieldcache, 3)
-            parent_radius = 0.25 * (magnitude(d2) + magnitude(d3))
-            first_distance = distance(branch_px[1], branch_px[0])
-            xi = min(FIRST_SEGMENT_MAX_CUT_XI, PARENT_RADIUS_PROPORTION * parent_radius / first_distance)
-            new_start_x = add(mult(branch_px[0], 1.0 - xi), mult(branch_px[1], xi))
-
-            # cut the first part of the branch:
-            px = [new_start_x] + branch_px[1:]
-            ax, ad1 = get_curve_from_points(px, maximum_element_length=branch_max_element_length)
-            bx, bd1 = fit_hermite_curve(ax, ad1, px)
-            branch_length = getCubicHermiteCurvesLength(bx, bd1)
-            branch_elements_count = math.ceil(branch_length / branch_max_element_length)
-            # previously had minimum of 2 elements along branch as can't attach sub-branches from first element
-            # branch_elements_count = max(2, branch_elements_count)
-            cx, cd1 = sampleCubicHermiteCurves(bx, bd1, branch_elements_count)[0:2]
-
-            # find the parent location at the fitted branch start location
-            fieldcache.clearLocation()
-            branch_start_coordinates.assignReal(fieldcache, cx[0])
-            parent_element, parent_xi = find_parent_location.evaluateMeshLocation(fieldcache, 3)
-            if not parent_element.isValid():
-                logger.error("Nerve: branch " + branch_name + " fitted start point could not be found in parent nerve")
-                continue
-            parent_first_element = parent_mesh_group.createElementiterator().next()
-            parent_location = (parent_element.getIdentifier() - parent_first_element.getIdentifier(), parent_xi[0])
-            if (not trunk_is_parent) and (parent_location[0] == 0):
-                # can't have branch from the root element of a branch
-                if parent_mesh_group.getSize() == 1:
-                    logger.error("Nerve: can't make branch " + branch_name +
-                                 " off single element parent " + branch_parent_name)
+                return parent_mesh_group, find_parent_location
+
+            def start_child_branch_fits(parent_name):
+                """
+                Cut start of each child branch of parent by a proportion of parent radius, and start fitting its curve.
+                Parent mesh must be complete.
+                :param parent_name: Name of trunk or branch to start child branch fits for.
+                """
+                find_parent_location = get_parent_mesh_group_and_find_location(parent_name)[1]
+                for branch_name in child_branches_map.get(parent_name, []):
+                    if branch_name in branch_fits:
+                        continue
+                    # get point in parent volume closest to first point in branch data
+                    branch_px = [branch_x[0] for branch_x in branch_data[branch_name]]
+                    fieldcache.clearLocation()
+                    branch_start_coordinates.assignReal(fieldcache, branch_px[0])
+                    parent_element, parent_xi = find_parent_location.evaluateMeshLocation(fieldcache, 3)
+                    if not parent_element.isValid():
+                        branch_fits[branch_name] = None
+                        continue
+                    # get radius at parent_location
+                    fieldcache.setMeshLocation(parent_element, parent_xi)
+                    _, d2 = coordinates.evaluateDerivative(derivative_xi2, fieldcache, 3)
+                    _, d3 = coordinates.evaluateDerivative(derivative_xi3, fieldcache, 3)
+                    parent_radius = 0.25 * (magnitude(d2) + magnitude(d3))
+                    first_distance = distance(branch_px[1], branch_px[0])
+                    xi = min(FIRST_SEGMENT_MAX_CUT_XI, PARENT_RADIUS_PROPORTION * parent_radius / first_distance)
+                    new_start_x = add(mult(branch_px[0], 1.0 - xi), mult(branch_px[1], xi))
+                    # cut the first part of the branch:
+                    px = [new_start_x] + branch_px[1:]
+                    branch_fits[branch_name] = executor.submit(fit_branch_curve, px, branch_max_element_length) \
+                        if executor else px
+
+            # iterate over branches off trunk, and branches of branches
+            visited_branches_order = []
+            branch_root_parameters = {}
+            start_child_branch_fits(trunk_group_name)
+            queue = list(child_branches_map.get(trunk_group_name, []))
+            while queue:
+                branch_name = queue.pop(0)
+                if branch_name in visited_branches_order:
+                    logger.warning("already processed branch " + branch_name)
                     continue
-                parent_location = (1, 0.0)
-            cxd2 = 2.0 * (parent_xi[1] - 0.5)
-            cxd3 = 2.0 * (parent_xi[2] - 0.5)
-
-            # parent interpolation
-            pn1 = parent_location[0]
-            pn2 = pn1 + 1
-            pxi = parent_location[1]
-            fns = list(getCubicHermiteBasis(pxi))  # for x, d2, d3
-            dfns = list(getCubicHermiteBasisDerivatives(pxi))  # for d1
-            # first derivatives interpolated on parent:
-            pd1 = [dot(dfns, [tx[pn1][c], td1[pn1][c], tx[pn2][c], td1[pn2][c]]) for c in range(3)]
-            pd2 = [dot(fns, [td2[pn1][c], td12[pn1][c], td2[pn2][c], td12[pn2][c]]) for c in range(3)]
-            pd3 = [dot(fns, [td3[pn1][c], td13[pn1][c], td3[pn2][c], td13[pn2][c]]) for c in range(3)]
-            # first derivatives required on branch:
-            bd1 = cd1[0]
-            branch_root_diameter = \
-                branch_diameter_trunk_proportion * magnitude(pd2) if trunk_is_parent else default_branch_diameter
-            bd3 = set_magnitude(cross(pd1, bd1), branch_root_diameter)
-            # scale bd2 to fit expected aspect ratio for material coordinates, depending on angle
-            cos_angle = dot(normalize(pd1), normalize(bd1))
-            # cos2_angle = cos_angle * cos_angle
-            # sin2_angle = 1.0 - cos2_angle
-            angle = math.acos(cos_angle)
-            sin_angle = math.sin(angle)
-            m1 = cos_angle * branch_root_diameter  # at 0 radians
-            branch_material_diameter_proportion = branch_material_diameter * trunk_elements_count / trunk_proportion
-            m2 = sin_angle * magnitude(pd1) * branch_material_diameter_proportion  # at PI/2 radians
-            mag_bd2 = magnitude([m1, m2])
-            bd2 = set_magnitude(cross(bd3, bd1), mag_bd2)
-
-            basis_from = [pd1, pd2, pd3]
-            basis_to = [bd1, bd2, bd3]
-            coefs = matrix_mult(basis_to, matrix_inv(basis_from))
-
-            # branch annotation groups
-            branch_box_group = AnnotationGroup(region, (branch_name, annotation_term_map[branch_name]))
-            annotation_groups.append(branch_box_group)
-            branch_box_mesh_group = branch_box_group.getMeshGroup(mesh3d)
-            branch_box_face_mesh_group = branch_box_group.getMeshGroup(mesh2d)
-            branch_box_line_mesh_group = branch_box_group.getMeshGroup(mesh1d)
-
-            # get side derivatives, minimising rotation from trunk
-            # dir2 = normalize(bd2)
-            dir3 = normalize(bd3)
-            cd2 = [bd2]
-            cd3 = [bd3]
-            for e in range(len(cx) - 1):
-                dir1, dir2, dir3 = track_curve_side_direction(cx, cd1, dir3, (e, 0.0), (e, 1.0))
-                cd2.append(set_magnitude(dir2, default_branch_diameter))
-                cd3.append(set_magnitude(dir3, default_branch_diameter))
-            cd12, cd13 = smoothCurveSideCrossDerivatives(cx, cd1, [cd2, cd3])
-
-            # create branch elements and nodes past root
-            cnid = [None]  # no first node on branch
-            for e in range(len(cx) - 1):
-                n = e + 1
-                node = nodes.createNode(node_identifier, nodetemplate)
-                fieldcache.setNode(node)
-                coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, cx[n])
-                coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, 1, cd1[n])
-                coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS2, 1, cd2[n])
-                coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, cd12[n])
-                coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS3, 1, cd3[n])
-                coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D2_DS1DS3, 1, cd13[n])
-
-                if e == 0:
-                    # branch root 3D element
-                    nids = [tnid[pn1], tnid[pn2], node_identifier]
-                    scalefactors = [-1] + fns + dfns + [cxd2, cxd3] + coefs[0] + coefs[1] + coefs[2]
-                    element = mesh3d.createElement(element_identifier, elementtemplate_branch_root)
-                    element.setNodesByIdentifier(eft3dBR, nids)
-                    element.setScaleFactors(eft3dBR, scalefactors)
-                    # branch root 1D line
-                    scalefactors = fns + dfns + [cxd2, cxd3] + coefs[0]
-                    line = mesh1d.createElement(line_identifier, linetemplate_branch_root)
-                    line.setNodesByIdentifier(eft1dBR, nids)
-                    line.setScaleFactors(eft1dBR, scalefactors)
-                else:
-                    # branch regular 3D element
-                    nids = [node_identifier - 1, node_identifier]
-                    element = mesh3d.createElement(element_identifier, elementtemplate)
-                    element.setNodesByIdentifier(eft3d, nids)
-                    element.setScaleFactors(eft3d, [-1.0])
-                    # branch regular 1D line
-                    line = mesh1d.createElement(line_identifier, linetemplate)
-                    line.setNodesByIdentifier(eft1d, nids)
-                    line.setScaleFactors(eft1d, [-1.0])
-                branch_box_mesh_group.addElement(element)
-                centroid_mesh_group.addElement(line)
-                branch_box_line_mesh_group.addElement(line)
-                cnid.append(node_identifier)
-                element_identifier += 1
-                line_identifier += 1
-
-                # 2D epineurium
-                for f in range(4):
+                visited_branches_order.append(branch_name)
+
+                branch_parent_name = branch_parent_map[branch_name]
+                trunk_is_parent = branch_parent_name == trunk_group_name
+                # print(branch_name, '<--', branch_parent_name)
+
+                tx, td1, td2, td12, td3, td13, tnid = parent_parameters[branch_parent_name]
+
+                branch_fit = branch_fits.pop(branch_name)
+                if branch_fit is None:
+                    logger.error("Nerve: branch " + branch_name + " start point could not be found in parent nerve")
+                    continue
+                cx, cd1 = branch_fit.result() if executor else fit_branch_curve(branch_fit, branch_max_element_length)
+
+                # find the parent location at the fitted branch start location
+                parent_mesh_group, find_parent_location = get_parent_mesh_group_and_find_location(branch_parent_name)
+                fieldcache.clearLocation()
+                branch_start_coordinates.assignReal(fieldcache, cx[0])
+                parent_element, parent_xi = find_parent_location.evaluateMeshLocation(fieldcache, 3)
+                if not parent_element.isValid():
+                    logger.error("Nerve: branch " + branch_name +
+                                 " fitted start point could not be found in parent nerve")
+                    continue
+                parent_first_element = parent_mesh_group.createElementiterator().next()
+                parent_location = (parent_element.getIdentifier() - parent_first_element.getIdentifier(), parent_xi[0])
+                if (not trunk_is_parent) and (parent_location[0] == 0):
+                    # can't have branch from the root element of a branch
+                    if parent_mesh_group.getSize() == 1:
+                        logger.error("Nerve: can't make branch " + branch_name +
+                                     " off single element parent " + branch_parent_name)
+                        continue
+                    parent_location = (1, 0.0)
+                cxd2 = 2.0 * (parent_xi[1] - 0.5)
+                cxd3 = 2.0 * (parent_xi[2] - 0.5)
+
+                # parent interpolation
+                pn1 = parent_location[0]
+                pn2 = pn1 + 1
+                pxi = parent_location[1]
+                fns = list(getCubicHermiteBasis(pxi))  # for x, d2, d3
+                dfns = list(getCubicHermiteBasisDerivatives(pxi))  # for d1
+                # first derivatives interpolated on parent:
+                pd1 = [dot(dfns, [tx[pn1][c], td1[pn1][c], tx[pn2][c], td1[pn2][c]]) for c in range(3)]
+                pd2 = [dot(fns, [td2[pn1][c], td12[pn1][c], td2[pn2][c], td12[pn2][c]]) for c in range(3)]
+                pd3 = [dot(fns, [td3[pn1][c], td13[pn1][c], td3[pn2][c], td13[pn2][c]]) for c in range(3)]
+                # first derivatives required on branch:
+                bd1 = cd1[0]
+                branch_root_diameter = \
+                    branch_diameter_trunk_proportion * magnitude(pd2) if trunk_is_parent else default_branch_diameter
+                bd3 = set_magnitude(cross(pd1, bd1), branch_root_diameter)
+                # scale bd2 to fit expected aspect ratio for material coordinates, depending on angle
+                cos_angle = dot(normalize(pd1), normalize(bd1))
+                # cos2_angle = cos_angle * cos_angle
+                # sin2_angle = 1.0 - cos2_angle
+                angle = math.acos(cos_angle)
+                sin_angle = math.sin(angle)
+                m1 = cos_angle * branch_root_diameter  # at 0 radians
+                branch_material_diameter_proportion = branch_material_diameter * trunk_elements_count / trunk_proportion
+                m2 = sin_angle * magnitude(pd1) * branch_material_diameter_proportion  # at PI/2 radians
+                mag_bd2 = magnitude([m1, m2])
+                bd2 = set_magnitude(cross(bd3, bd1), mag_bd2)
+
+                basis_from = [pd1, pd2, pd3]
+                basis_to = [bd1, bd2, bd3]
+                coefs = matrix_mult(basis_to, matrix_inv(basis_from))
+
+                # branch annotation groups
+                branch_box_group = AnnotationGroup(region, (branch_name, annotation_term_map[branch_name]))
+                annotation_groups.append(branch_box_group)
+                branch_box_mesh_group = branch_box_group.getMeshGroup(mesh3d)
+                branch_box_face_mesh_group = branch_box_group.getMeshGroup(mesh2d)
+                branch_box_line_mesh_group = branch_box_group.getMeshGroup(mesh1d)
+
+                # get side derivatives, minimising rotation from trunk
+                # dir2 = normalize(bd2)
+                dir3 = normalize(bd3)
+                cd2 = [bd2]
+                cd3 = [bd3]
+                for e in range(len(cx) - 1):
+                    dir1, dir2, dir3 = track_curve_side_direction(cx, cd1, dir3, (e, 0.0), (e, 1.0))
+                    cd2.append(set_magnitude(dir2, default_branch_diameter))
+                    cd3.append(set_magnitude(dir3, default_branch_diameter))
+                cd12, cd13 = smoothCurveSideCrossDerivatives(cx, cd1, [cd2, cd3])
+
+                # create branch elements and nodes past root
+                cnid = [None]  # no first node on branch
+                for e in range(len(cx) - 1):
+                    n = e + 1
+                    node = nodes.createNode(node_identifier, nodetemplate)
+                    fieldcache.setNode(node)
+                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, cx[n])
+                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, 1, cd1[n])
+                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS2, 1, cd2[n])
+                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, cd12[n])
+                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS3, 1, cd3[n])
+                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D2_DS1DS3, 1, cd13[n])
+
                     if e == 0:
-                        # branch root 2D face
-                        facetemplate_branch_root, eft2dBR = facetemplate_and_eft_list_branch_root[f]
+                        # branch root 3D element
                         nids = [tnid[pn1], tnid[pn2], node_identifier]
-                        scalefactors = scalefactors2d + fns + dfns + [cxd2, cxd3] + coefs[0] + coefs[1] + coefs[2]
-                        face = mesh3d.createElement(face_identifier, facetemplate_branch_root)
-                        face.setNodesByIdentifier(eft2dBR, nids)
-                        face.setScaleFactors(eft2dBR, scalefactors)
+                        scalefactors = [-1] + fns + dfns + [cxd2, cxd3] + coefs[0] + coefs[1] + coefs[2]
+                        element = mesh3d.createElement(element_identifier, elementtemplate_branch_root)
+                        element.setNodesByIdentifier(eft3dBR, nids)
+                        element.setScaleFactors(eft3dBR, scalefactors)
+                        # branch root 1D line
+                        scalefactors = fns + dfns + [cxd2, cxd3] + coefs[0]
+                        line = mesh1d.createElement(line_identifier, linetemplate_branch_root)
+                        line.setNodesByIdentifier(eft1dBR, nids)
+                        line.setScaleFactors(eft1dBR, scalefactors)
                     else:
-                        # branch regular 2D face
-                        facetemplate, eft2d = facetemplate_and_eft_list[f]
+                        # branch regular 3D element
                         nids = [node_identifier - 1, node_identifier]
-                        face = mesh2d.createElement(face_identifier, facetemplate)
-                        face.setNodesByIdentifier(eft2d, nids)
-                        face.setScaleFactors(eft2d, scalefactors2d)
-                    epineurium_mesh_group.addElement(face)
-                    branch_box_face_mesh_group.addElement(face)
-                    face_identifier += 1
-
-                node_identifier += 1
-
-            # add branches of branches, storing parameters for embedding sub-branch root
-            child_branches = [branch for branch in branch_parent_map.keys() if branch_parent_map[branch] == branch_name]
-            if child_branches:
-                queue = child_branches + queue
-                parent_parameters[branch_name] = (cx, cd1, cd2, cd12, cd3, cd13, cnid)
+                        element = mesh3d.createElement(element_identifier, elementtemplate)
+                        element.setNodesByIdentifier(eft3d, nids)
+                        element.setScaleFactors(eft3d, [-1.0])
+                        # branch regular 1D line
+                        line = mesh1d.createElement(line_identifier, linetemplate)
+                        line.setNodesByIdentifier(eft1d, nids)
+                        line.setScaleFactors(eft1d, [-1.0])
+                    branch_box_mesh_group.addElement(element)
+                    centroid_mesh_group.addElement(line)
+                    branch_box_line_mesh_group.addElement(line)
+                    cnid.append(node_identifier)
+                    element_identifier += 1
+                    line_identifier += 1
+
+                    # 2D epineurium
+                    for f in range(4):
+                        if e == 0:
+                            # branch root 2D face
+                            facetemplate_branch_root, eft2dBR = facetemplate_and_eft_list_branch_root[f]
+                            nids = [tnid[pn1], tnid[pn2], node_identifier]
+                            scalefactors = scalefactors2d + fns + dfns + [cxd2, cxd3] + coefs[0] + coefs[1] + coefs[2]
+                            face = mesh3d.createElement(face_identifier, facetemplate_branch_root)
+                            face.setNodesByIdentifier(eft2dBR, nids)
+                            face.setScaleFactors(eft2dBR, scalefactors)
+                        else:
+                            # branch regular 2D face
+                            facetemplate, eft2d = facetemplate_and_eft_list[f]
+                            nids = [node_identifier - 1, node_identifier]
+                            face = mesh2d.createElement(face_identifier, facetemplate)
+                            face.setNodesByIdentifier(eft2d, nids)
+                            face.setScaleFactors(eft2d, scalefactors2d)
+                        epineurium_mesh_group.addElement(face)
+                        branch_box_face_mesh_group.addElement(face)
+                        face_identifier += 1
+
+                    node_identifier += 1
+
+                # add branches of branches, storing parameters for embedding sub-branch root
+                child_branches = child_branches_map.get(branch_name)
+                if child_branches:
+                    start_child_branch_fits(branch_name)
+                    queue = child_branches + queue
+                    parent_parameters[branch_name] = (cx, cd1, cd2, cd12, cd3, cd13, cnid)
+        finally:
+            if executor:
+                executor.shutdown()
 
         # =================================================
         # Add material coordinates and straight coordinates
@@ -969,15 +1015,19 @@ class MeshType_3d_nerve1(Scaffold_base):
         start_marker_node_identifier = 10001
         if node_identifier < start_marker_node_identifier:
             node_identifier = start_marker_node_identifier
+        marker_terms = []
+        marker_material_coordinates = []
         for marker_name, material_coordinate in ordered_marker_data:
             if material_coordinate > trunk_proportion:
                 break
-            annotation_group = findOrCreateAnnotationGroupForTerm(
-                annotation_groups, region, get_vagus_marker_term(marker_name), isMarker=True)
-            annotation_group.createMarkerNode(
-                node_identifier, materialCoordinatesField=vagus_coordinates,
-                materialCoordinates=[0.0, 0.0, material_coordinate])
-            node_identifier += 1
+            marker_terms.append(get_vagus_marker_term(marker_name))
+            marker_material_coordinates.append([0.0, 0.0, material_coordinate])
+        if marker_terms:
+            not_found_marker_names = createAnnotationMarkers(
+                annotation_groups, region, marker_terms, node_identifier, materialCoordinatesField=vagus_coordinates,
+                materialCoordinatesList=marker_material_coordinates)[1]
+            if not_found_marker_names:
+                logger.warning("Nerve: locations not found for markers: " + ", ".join(not_found_marker_names))
 
         # ==========================
         # Add combined branch groups
@@ -1072,8 +1122,26 @@ class MeshType_3d_nerve1(Scaffold_base):
             face = faceIterator.next()
 
 
+def fit_branch_curve(px, max_element_length):
+    """
+    Fit and resample 1-D curve to branch data points. Module function so it can be run in worker processes.
+    :param px: Branch data point coordinates, starting at cut branch start.
+    :param max_element_length: Maximum length of elements in fitted and resampled curve.
+    :return: cx, cd1 (lists of hermite coordinates and derivatives)
+    """
+    ax, ad1 = get_curve_from_points(px, maximum_element_length=max_element_length)
+    bx, bd1 = fit_hermite_curve(ax, ad1, px)
+    branch_length = getCubicHermiteCurvesLength(bx, bd1)
+    branch_elements_count = math.ceil(branch_length / max_element_length)
+    # previously had minimum of 2 elements along branch as can't attach sub-branches from first element
+    # branch_elements_count = max(2, branch_elements_count)
+    cx, cd1 = sampleCubicHermiteCurves(bx, bd1, branch_elements_count)[0:2]
+    return cx, cd1
+
+
 def generate_trunk_1d(vagus_data, trunk_proportion, trunk_elements_count_prefit, trunk_elements_count,
-                      trunk_fit_iterations, default_anterior_direction, default_trunk_diameter, region, nerve_metadata):
+                      trunk_fit_iterations, default_anterior_direction, default_trunk_diameter, region, nerve_metadata,
+                      prefit_use_zinc=True):
     """
     Build and fit a 1-D trunk curve to trunk data, calibrated to marker point positions.
     :param vagus_data: Vagus data extracted from input data region.
@@ -1086,6 +1154,7 @@ def generate_trunk_1d(vagus_data, trunk_proportion, trunk_elements_count_prefit,
     :param default_trunk_diameter: Diameter in final units to use if no radius parameters.
     :param region: Region to put the fitted 1-D geometry including marker points in.
     :param nerve_metadata: Construction object to put fitting quality metadata into.
+    :param prefit_use_zinc: Set to False to pre-fit with arrays instead of Zinc. See fit_hermite_curve.
     :return: tx, td1, td2, td12, td3, td13 (parameters for 1-D fitted trunk geometry, left and anterior side
     directions and rates of change w.r.t. d1).
     """
@@ -1102,7 +1171,7 @@ def generate_trunk_1d(vagus_data, trunk_proportion, trunk_elements_count_prefit,
     # # needs to be bigger if fewer elements:
     # if trunk_elements_count_prefit < 20:
     #     outlier_length += 0.075 * (20 - trunk_elements_count_prefit) / 19.0
-    cx, cd1 = fit_hermite_curve(bx, bd1, px)  # , outlier_length=outlier_length)
+    cx, cd1 = fit_hermite_curve(bx, bd1, px, use_zinc=prefit_use_zinc)  # , outlier_length=outlier_length)
     # resample to even size
     dx, dd1 = sampleCubicHermiteCurvesSmooth(cx, cd1, trunk_elements_count_prefit)[0:2]
     # generate_curve_mesh(region, dx, dd1, group_name=vagus_data.get_trunk_group_name())[0]
@@ -1370,6 +1439,7 @@ def generate_trunk_1d(vagus_data, trunk_proportion, trunk_elements_count_prefit,
         orientation_names = []  # list of orientation names
         orientation_locations = []  # list of curve location (element index, xi) for orientation points
         one_sqrt2 = 1.0 / math.sqrt(2.0)
+        trunk_curve_index = CurveSpatialIndex(tx, td1)
         # weights of d2, d3 to give anterior direction for a given orientation direction name
         orientation_anterior_weights = {
             "left": (-1.0, 0.0),
@@ -1389,7 +1459,7 @@ def generate_trunk_1d(vagus_data, trunk_proportion, trunk_elements_count_prefit,
                 continue
             wt2, wt3 = weights
             for data_x in x_list:
-                curve_location, x = getNearestLocationOnCurve(tx, td1, data_x)
+                curve_location, x = trunk_curve_index.getNearestLocation(data_x)
                 e1 = curve_location[0]
                 e2 = curve_location[0] + 1
                 xi = curve_location[1]
@@ -326,7 +326,7 @@ class MeshType_3d_sphereshell1(Scaffold_base):
                 for e1 in range(elementsCountAround):
                     va = e1
                     vb = (e1 + 1)%elementsCountAround
-                    eft1 = eftfactory.createEftShellPoleBottom(va*100, vb*100)
+                    eft1 = eftfactory.getCachedEft("createEftShellPoleBottom", (va*100, vb*100))
                     elementtemplate1.defineField(coordinates, -1, eft1)
                     element = mesh.createElement(elementIdentifier, elementtemplate1)
                     bni1 = no + 1
@@ -372,7 +372,7 @@ class MeshType_3d_sphereshell1(Scaffold_base):
                 for e1 in range(elementsCountAround):
                     va = e1
                     vb = (e1 + 1)%elementsCountAround
-                    eft1 = eftfactory.createEftShellPoleTop(va*100, vb*100)
+                    eft1 = eftfactory.getCachedEft("createEftShellPoleTop", (va*100, vb*100))
                     elementtemplate1.defineField(coordinates, -1, eft1)
                     element = mesh.createElement(elementIdentifier, elementtemplate1)
                     bni3 = no + now
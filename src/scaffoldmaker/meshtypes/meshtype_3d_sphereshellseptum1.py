@@ -118,9 +118,9 @@ class MeshType_3d_sphereshellseptum1(Scaffold_base):
 
         tricubichermite = eftfactory_tricubichermite(mesh, useCrossDerivatives)
         eft = tricubichermite.createEftBasic()
-        eftOuter = tricubichermite.createEftTubeSeptumOuter()
-        eftInner1 = tricubichermite.createEftTubeSeptumInner1()
-        eftInner2 = tricubichermite.createEftTubeSeptumInner2()
+        eftOuter = tricubichermite.getCachedEft("createEftTubeSeptumOuter")
+        eftInner1 = tricubichermite.getCachedEft("createEftTubeSeptumInner1")
+        eftInner2 = tricubichermite.getCachedEft("createEftTubeSeptumInner2")
 
         tricubicHermiteBasis = fm.createElementbasis(3, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
 
@@ -30,7 +30,6 @@ from scaffoldmaker.utils import interpolation as interp
 from scaffoldmaker.utils.annulusmesh import createAnnulusMesh3d
 from scaffoldmaker.utils.eftfactory_bicubichermitelinear import eftfactory_bicubichermitelinear
 from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
-from scaffoldmaker.utils.eft_utils import setEftScaleFactorIds, remapEftNodeValueLabel
 from scaffoldmaker.utils.geometry import sampleEllipsePoints
 from scaffoldmaker.utils.tracksurface import TrackSurface
 from scaffoldmaker.utils.zinc_utils import exnode_string_from_nodeset_field_parameters, \
@@ -2469,7 +2468,7 @@ def createStomachMesh3d(region, fm, coordinates, stomachTermsAlong, allAnnotatio
                 for e1 in range(elementsCountAroundDuod):
                     va = e1
                     vb = (e1 + 1) % elementsCountAroundDuod
-                    eft1 = eftfactory.createEftShellPoleBottom(va*100, vb*100)
+                    eft1 = eftfactory.getCachedEft("createEftShellPoleBottom", (va*100, vb*100))
                     elementtemplateX.defineField(coordinates, -1, eft1)
                     element = mesh.createElement(elementIdentifier, elementtemplateX)
                     bni1 = e3 + stomachStartNode
@@ -2540,56 +2539,56 @@ def createStomachMesh3d(region, fm, coordinates, stomachTermsAlong, allAnnotatio
                     if e2 == annulusFundusOpenRingIdx - 2:
                         if e1 == elementsAroundHalfDuod - 2:
                             scaleFactors = [-1.0]
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            setEftScaleFactorIds(eft1, [1], [])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [1])])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS2, [1])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("setEftScaleFactorIds", [1], []),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [1])]),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS2, [1])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print(elementIdentifier) # 145
 
                         elif e1 == elementsAroundHalfDuod - 1:
                             scaleFactors = [-1.0]
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            setEftScaleFactorIds(eft1, [1], [])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1])])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS2, [1])])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1])])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS2, [1])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("setEftScaleFactorIds", [1], []),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, [1])]),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS2, [1])]),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, [1])]),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS2, [1])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print('1', elementIdentifier) # 146
 
                         elif e1 == elementsAroundHalfDuod:
                             scaleFactors = [-1.0]
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            setEftScaleFactorIds(eft1, [1], [])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1])])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS2, [1])])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS2, [1])])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("setEftScaleFactorIds", [1], []),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, [1])]),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS2, [1])]),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS2, [1])]),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, [1])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print('2', elementIdentifier) #147
 
                         elif e1 == elementsAroundHalfDuod + 1:
                             scaleFactors = [-1.0]
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            setEftScaleFactorIds(eft1, [1], [])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS2, [1])])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("setEftScaleFactorIds", [1], []),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS2, [1])]),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print(elementIdentifier) #148
@@ -2597,32 +2596,32 @@ def createStomachMesh3d(region, fm, coordinates, stomachTermsAlong, allAnnotatio
                     if e2 == annulusFundusOpenRingIdx - 1:
                         if e1 == elementsAroundHalfDuod - 2:
                             scaleFactors = [-1.0]
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            setEftScaleFactorIds(eft1, [1], [])
-                            remapEftNodeValueLabel(eft1, [2, 6], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [1])])
-                            remapEftNodeValueLabel(eft1, [2, 6], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [])])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS2, [1])])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("setEftScaleFactorIds", [1], []),
+                                ("remapEftNodeValueLabel", [2, 6], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [1])]),
+                                ("remapEftNodeValueLabel", [2, 6], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [])]),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS2, [1])]),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print(elementIdentifier) # 165
 
                         elif e1 == elementsAroundHalfDuod - 1:
                             scaleFactors = [-1.0]
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            setEftScaleFactorIds(eft1, [1], [])
-                            remapEftNodeValueLabel(eft1, [1, 5], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1])])
-                            remapEftNodeValueLabel(eft1, [1, 5], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1])])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS2, [])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("setEftScaleFactorIds", [1], []),
+                                ("remapEftNodeValueLabel", [1, 5], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [1])]),
+                                ("remapEftNodeValueLabel", [1, 5], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, [1]), (Node.VALUE_LABEL_D_DS2, [])]),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [1])]),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS2, [])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print(elementIdentifier) # 166
@@ -2632,32 +2631,32 @@ def createStomachMesh3d(region, fm, coordinates, stomachTermsAlong, allAnnotatio
                             2.0 * (elementsAroundQuarterEso - 2):
                         if e1 == elementsAroundHalfDuod - 2:
                             scaleFactors = [-1.0]
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            setEftScaleFactorIds(eft1, [1], [])
-                            remapEftNodeValueLabel(eft1, [2, 6], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS2, [1])])
-                            remapEftNodeValueLabel(eft1, [2, 6], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [])])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS2, [1])])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("setEftScaleFactorIds", [1], []),
+                                ("remapEftNodeValueLabel", [2, 6], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS2, [1])]),
+                                ("remapEftNodeValueLabel", [2, 6], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [])]),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS2, [1])]),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print(elementIdentifier) # 183, 201
 
                         elif e1 == elementsAroundHalfDuod - 1:
                             scaleFactors = [-1.0]
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            setEftScaleFactorIds(eft1, [1], [])
-                            remapEftNodeValueLabel(eft1, [1, 5], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1])])
-                            remapEftNodeValueLabel(eft1, [1, 5], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS2, [])])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1])])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS2, [])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("setEftScaleFactorIds", [1], []),
+                                ("remapEftNodeValueLabel", [1, 5], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [1])]),
+                                ("remapEftNodeValueLabel", [1, 5], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS2, [])]),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [1])]),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS2, [])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print(elementIdentifier) # 184, 202
@@ -2665,32 +2664,32 @@ def createStomachMesh3d(region, fm, coordinates, stomachTermsAlong, allAnnotatio
                     if e2 == annulusBodyOpenRingIdx:
                         if e1 == elementsAroundHalfDuod - 2:
                             scaleFactors = [-1.0]
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            setEftScaleFactorIds(eft1, [1], [])
-                            remapEftNodeValueLabel(eft1, [2, 6], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS2, [1])])
-                            remapEftNodeValueLabel(eft1, [2, 6], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [])])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [1])])
-                            remapEftNodeValueLabel(eft1, [4, 8], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("setEftScaleFactorIds", [1], []),
+                                ("remapEftNodeValueLabel", [2, 6], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS2, [1])]),
+                                ("remapEftNodeValueLabel", [2, 6], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [])]),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [1])]),
+                                ("remapEftNodeValueLabel", [4, 8], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print(elementIdentifier) # 219
 
                         elif e1 == elementsAroundHalfDuod - 1:
                             scaleFactors = [-1.0]
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            setEftScaleFactorIds(eft1, [1], [])
-                            remapEftNodeValueLabel(eft1, [1, 5], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1])])
-                            remapEftNodeValueLabel(eft1, [1, 5], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS2, [])])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS2,
-                                                   [(Node.VALUE_LABEL_D_DS1, [1])])
-                            remapEftNodeValueLabel(eft1, [3, 7], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("setEftScaleFactorIds", [1], []),
+                                ("remapEftNodeValueLabel", [1, 5], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [1])]),
+                                ("remapEftNodeValueLabel", [1, 5], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS2, [])]),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS2,
+                                 [(Node.VALUE_LABEL_D_DS1, [1])]),
+                                ("remapEftNodeValueLabel", [3, 7], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print(elementIdentifier) # 220
@@ -2698,18 +2697,18 @@ def createStomachMesh3d(region, fm, coordinates, stomachTermsAlong, allAnnotatio
                     if e2 == annulusBodyOpenRingIdx + 1:
                         if e1 == elementsAroundHalfDuod - 2:
                             scaleFactors = [-1.0]
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            setEftScaleFactorIds(eft1, [1], [])
-                            remapEftNodeValueLabel(eft1, [2, 6], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [1])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("setEftScaleFactorIds", [1], []),
+                                ("remapEftNodeValueLabel", [2, 6], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [1])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print('1', elementIdentifier) #237
 
                         elif e1 == elementsAroundHalfDuod + 1:
-                            eft1 = eftfactory.createEftNoCrossDerivatives()
-                            remapEftNodeValueLabel(eft1, [1, 5], Node.VALUE_LABEL_D_DS1,
-                                                   [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])])
+                            eft1 = eftfactory.getCachedEft("createEftNoCrossDerivatives", (), [
+                                ("remapEftNodeValueLabel", [1, 5], Node.VALUE_LABEL_D_DS1,
+                                 [(Node.VALUE_LABEL_D_DS1, []), (Node.VALUE_LABEL_D_DS2, [])])])
                             elementtemplateX.defineField(coordinates, -1, eft1)
                             elementtemplate1 = elementtemplateX
                             # print(elementIdentifier) #240
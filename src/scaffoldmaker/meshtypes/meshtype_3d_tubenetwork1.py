@@ -1,6 +1,7 @@
 """
 Generates a 3-D Hermite bifurcating tube network (with optional solid core).
 """
+from cmlibs.utils.zinc.general import ChangeManager
 from scaffoldmaker.meshtypes.meshtype_1d_network_layout1 import MeshType_1d_network_layout1
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
 from scaffoldmaker.scaffoldpackage import ScaffoldPackage
@@ -202,23 +203,23 @@ class MeshType_3d_tubenetwork1(Scaffold_base):
         return dependentChanges
 
     @classmethod
-    def generateBaseMesh(cls, region, options):
+    def _createTubeNetworkMeshBuilder(cls, networkLayout, options, targetElementDensity=None,
+                                      annotationElementsCountsAlong=None):
         """
-        Generate the base tricubic hermite or bicubic hermite-linear mesh. See also generateMesh().
-        :param region: Zinc region to define model in. Must be empty.
+        Create tube network mesh builder for generated network layout and options.
+        :param networkLayout: Network layout ScaffoldPackage, already generated.
         :param options: Dict containing options. See getDefaultOptions().
-        :return: list of AnnotationGroup, None
+        :param targetElementDensity: Optional override for target element density along longest segment.
+        :param annotationElementsCountsAlong: Optional override for annotation numbers of elements along.
+        :return: TubeNetworkMeshBuilder
         """
-        layoutRegion = region.createRegion()
-        networkLayout = options["Network layout"]
-        networkLayout.generate(layoutRegion)  # ask scaffold to generate to get user-edited parameters
-        networkMesh = networkLayout.getConstructionObject()
-
-        tubeNetworkMeshBuilder = TubeNetworkMeshBuilder(
-            networkMesh,
-            targetElementDensityAlongLongestSegment=options["Target element density along longest segment"],
+        return TubeNetworkMeshBuilder(
+            networkLayout.getConstructionObject(),
+            targetElementDensityAlongLongestSegment=targetElementDensity if targetElementDensity else
+            options["Target element density along longest segment"],
             layoutAnnotationGroups=networkLayout.getAnnotationGroups(),
-            annotationElementsCountsAlong=options["Annotation numbers of elements along"],
+            annotationElementsCountsAlong=annotationElementsCountsAlong if annotationElementsCountsAlong else
+            options["Annotation numbers of elements along"],
             defaultElementsCountAround=options["Number of elements around"],
             annotationElementsCountsAround=options["Annotation numbers of elements around"],
             elementsCountThroughShell=options["Number of elements through shell"],
@@ -227,6 +228,21 @@ class MeshType_3d_tubenetwork1(Scaffold_base):
             defaultElementsCountCoreBoxMinor=options["Number of elements across core box minor"],
             annotationElementsCountsCoreBoxMinor=options["Annotation numbers of elements across core box minor"],
             useOuterTrimSurfaces=options["Use outer trim surfaces"])
+
+    @classmethod
+    def generateBaseMesh(cls, region, options):
+        """
+        Generate the base tricubic hermite or bicubic hermite-linear mesh. See also generateMesh().
+        :param region: Zinc region to define model in. Must be empty.
+        :param options: Dict containing options. See getDefaultOptions().
+        :return: list of AnnotationGroup, NetworkMeshBuildProfile if profiling is enabled otherwise None.
+        See NetworkMeshBuilder.setDefaultProfiling().
+        """
+        layoutRegion = region.createRegion()
+        networkLayout = options["Network layout"]
+        networkLayout.generate(layoutRegion)  # ask scaffold to generate to get user-edited parameters
+
+        tubeNetworkMeshBuilder = cls._createTubeNetworkMeshBuilder(networkLayout, options)
         tubeNetworkMeshBuilder.build()
         generateData = TubeNetworkMeshGenerateData(
             region, 3,
@@ -235,4 +251,48 @@ class MeshType_3d_tubenetwork1(Scaffold_base):
         tubeNetworkMeshBuilder.generateMesh(generateData)
         annotationGroups = generateData.getAnnotationGroups()
 
-        return annotationGroups, None
+        return annotationGroups, tubeNetworkMeshBuilder.getProfile()
+
+    @classmethod
+    def generateLevelsOfDetail(cls, regions, options, targetElementDensities):
+        """
+        Generate the tube network at several element densities along, each in its own region, in a single call.
+        Network layout, trim surfaces and junction topology are only determined once and shared by all levels.
+        Non-zero annotation numbers of elements along are scaled in proportion to each level's density relative to
+        the "Target element density along longest segment" option.
+        :param regions: List of Zinc regions to create meshes in, one per density. Each must be empty.
+        :param options: Dict containing options. See getDefaultOptions().
+        :param targetElementDensities: List of target element density along longest segment for each region.
+        :return: list over regions of list of AnnotationGroup
+        """
+        assert len(regions) == len(targetElementDensities)
+        layoutRegion = regions[0].createRegion()
+        networkLayout = options["Network layout"]
+        networkLayout.generate(layoutRegion)  # ask scaffold to generate to get user-edited parameters
+
+        baseDensity = options["Target element density along longest segment"]
+        tubeNetworkMeshBuilder = None
+        annotationGroupsList = []
+        for region, targetElementDensity in zip(regions, targetElementDensities):
+            annotationElementsCountsAlong = [
+                max(1, round(count * targetElementDensity / baseDensity)) if (count > 0) else 0
+                for count in options["Annotation numbers of elements along"]]
+            if tubeNetworkMeshBuilder:
+                tubeNetworkMeshBuilder.resample(targetElementDensity, annotationElementsCountsAlong)
+            else:
+                tubeNetworkMeshBuilder = cls._createTubeNetworkMeshBuilder(
+                    networkLayout, options, targetElementDensity, annotationElementsCountsAlong)
+                tubeNetworkMeshBuilder.build()
+            fieldmodule = region.getFieldmodule()
+            with ChangeManager(fieldmodule):
+                generateData = TubeNetworkMeshGenerateData(
+                    region, 3,
+                    isLinearThroughShell=options["Use linear through shell"],
+                    isShowTrimSurfaces=options["Show trim surfaces"])
+                tubeNetworkMeshBuilder.generateMesh(generateData)
+                annotationGroups = generateData.getAnnotationGroups()
+                fieldmodule.defineAllFaces()
+                for annotationGroup in annotationGroups:
+                    annotationGroup.addSubelements()
+            annotationGroupsList.append(annotationGroups)
+        return annotationGroupsList
@@ -104,9 +104,9 @@ class MeshType_3d_tubeseptum1(Scaffold_base):
 
         tricubichermite = eftfactory_tricubichermite(mesh, useCrossDerivatives)
         eft = tricubichermite.createEftBasic()
-        eftOuter = tricubichermite.createEftTubeSeptumOuter()
-        eftInner1 = tricubichermite.createEftTubeSeptumInner1()
-        eftInner2 = tricubichermite.createEftTubeSeptumInner2()
+        eftOuter = tricubichermite.getCachedEft("createEftTubeSeptumOuter")
+        eftInner1 = tricubichermite.getCachedEft("createEftTubeSeptumInner1")
+        eftInner2 = tricubichermite.getCachedEft("createEftTubeSeptumInner2")
 
         elementtemplate = mesh.createElementtemplate()
         elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
@@ -6,7 +6,7 @@ from cmlibs.utils.zinc.field import Field, find_or_create_field_coordinates
 from cmlibs.zinc.element import Element
 from cmlibs.zinc.node import Node
 from scaffoldmaker.annotation.annotationgroup import (
-    AnnotationGroup, findOrCreateAnnotationGroupForTerm, getAnnotationGroupForTerm)
+    AnnotationGroup, AnnotationGroupList, findOrCreateAnnotationGroupForTerm, getAnnotationGroupForTerm)
 from scaffoldmaker.annotation.body_terms import get_body_term
 from scaffoldmaker.meshtypes.meshtype_1d_network_layout1 import MeshType_1d_network_layout1
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
@@ -231,10 +231,10 @@ class MeshType_1d_human_body_network_layout1(MeshType_1d_network_layout1):
         leftLegGroup = AnnotationGroup(region, get_body_term("left lower limb"))
         rightLegGroup = AnnotationGroup(region, get_body_term("right lower limb "))
         footGroup = AnnotationGroup(region, get_body_term("foot"))
-        annotationGroups = [bodyGroup, headGroup, neckGroup,
-                            armGroup, armToHandGroup, leftArmGroup, rightArmGroup, handGroup,
-                            thoraxGroup, abdomenGroup,
-                            legGroup, legToFootGroup, leftLegGroup, rightLegGroup, footGroup]
+        annotationGroups = AnnotationGroupList([bodyGroup, headGroup, neckGroup,
+                                                armGroup, armToHandGroup, leftArmGroup, rightArmGroup, handGroup,
+                                                thoraxGroup, abdomenGroup,
+                                                legGroup, legToFootGroup, leftLegGroup, rightLegGroup, footGroup])
         bodyMeshGroup = bodyGroup.getMeshGroup(mesh)
         elementIdentifier = 1
         headElementsCount = 3
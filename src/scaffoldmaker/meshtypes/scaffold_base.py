@@ -2,11 +2,11 @@
 Scaffold abstract base class.
 Describes methods each scaffold must or may override.
 """
-import copy
-
 from cmlibs.utils.zinc.general import ChangeManager
 from cmlibs.utils.zinc.scene import scene_get_selection_group
 from cmlibs.zinc.field import Field
+from scaffoldmaker.annotation.annotationgroup import AnnotationGroupList, addAnnotationGroupsSubelements, \
+    getAnnotationGroupsMeshDimensions
 from scaffoldmaker.utils.derivativemoothing import DerivativeSmoothing
 from scaffoldmaker.utils.interpolation import DerivativeScalingMode
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
@@ -154,14 +154,17 @@ class Scaffold_base:
                 annotationGroups = meshrefinement.getAnnotationGroups()
             else:
                 annotationGroups, constructionObject = cls.generateBaseMesh(region, options)
+            # faces and lines need adding only for dimensions groups have elements in before faces are defined
+            meshDimensions = getAnnotationGroupsMeshDimensions(annotationGroups)
             fieldmodule.defineAllFaces()
-            oldAnnotationGroups = copy.copy(annotationGroups)
-            for annotationGroup in annotationGroups:
-                annotationGroup.addSubelements()
+            if not isinstance(annotationGroups, AnnotationGroupList):
+                # index groups by name for finding/creating face annotation groups
+                annotationGroups = AnnotationGroupList(annotationGroups)
+            oldAnnotationGroupIds = set(id(annotationGroup) for annotationGroup in annotationGroups)
+            addAnnotationGroupsSubelements(annotationGroups, meshDimensions)
             cls.defineFaceAnnotations(region, options, annotationGroups)
-            for annotationGroup in annotationGroups:
-                if annotationGroup not in oldAnnotationGroups:
-                    annotationGroup.addSubelements()
+            addAnnotationGroupsSubelements([annotationGroup for annotationGroup in annotationGroups
+                                            if id(annotationGroup) not in oldAnnotationGroupIds])
         return annotationGroups, constructionObject
 
     @classmethod
@@ -216,8 +219,9 @@ class Scaffold_base:
         groupName = selectionGroup.getName() if selectionGroup else None
         updateDirections = functionOptions['Update directions']
         scalingMode = DerivativeScalingMode.ARITHMETIC_MEAN if functionOptions['Scaling mode']['Arithmetic mean'] else DerivativeScalingMode.HARMONIC_MEAN
+        linearSolve = functionOptions.get('Linear solve', False)
         smoothing = DerivativeSmoothing(region, coordinates, groupName, scalingMode, editGroupName)
-        smoothing.smooth(updateDirections)
+        smoothing.smooth(updateDirections, linearSolve=linearSolve)
         del smoothing
         return False, True  # settings not changed, nodes changed
 
@@ -243,7 +247,8 @@ class Scaffold_base:
                     cls.printNodeFieldParameters(region, options, constructionObject, functionOptions, editGroupName)),
             ("Smooth derivatives...",
                 { 'Update directions': False,
-                  'Scaling mode': { 'Arithmetic mean': True, 'Harmonic mean': False } },
+                  'Scaling mode': { 'Arithmetic mean': True, 'Harmonic mean': False },
+                  'Linear solve': False },
                 lambda region, options, constructionObject, functionOptions, editGroupName:
                     cls.smoothDerivatives(region, options, constructionObject, functionOptions, editGroupName))
             ]
@@ -10,10 +10,28 @@ from cmlibs.maths.vectorops import euler_to_rotation_matrix, magnitude
 from cmlibs.utils.zinc.field import createFieldEulerAnglesRotationMatrix
 from cmlibs.utils.zinc.finiteelement import get_highest_dimension_mesh, get_maximum_node_identifier
 from cmlibs.utils.zinc.general import ChangeManager
+from cmlibs.zinc.context import Context
 from cmlibs.zinc.field import Field, FieldGroup
-from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, findAnnotationGroupByName, \
-    getAnnotationMarkerLocationField  # , getAnnotationMarkerNameField
+from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, AnnotationGroupList, \
+    getAnnotationMarkerLocationField, relocateAnnotationMarkers
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
+from scaffoldmaker.utils.meshedits import apply_compact_mesh_edits, is_compact_mesh_edits, \
+    make_compact_mesh_edits
+from scaffoldmaker.utils.zinc_utils import mesh_group_add_elements_in_identifier_ranges
+
+
+def _getHashableValue(value):
+    """
+    Get hashable form of a scaffold setting value, converting lists and dicts to tuples recursively.
+    Nested ScaffoldPackage and other hashable values are returned unchanged.
+    :param value: Setting value.
+    :return: Hashable value.
+    """
+    if isinstance(value, dict):
+        return tuple((key, _getHashableValue(value[key])) for key in sorted(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(_getHashableValue(item) for item in value)
+    return value
 
 
 class ScaffoldPackage:
@@ -26,7 +44,8 @@ class ScaffoldPackage:
         :param scaffoldType: A scaffold type derived from Scaffold_base.
         :param dct: Dictionary containing other scaffold settings. Key names and meanings:
             scaffoldSettings: The options dict for the scaffold, or None to generate defaults.
-            meshEdits: A Zinc model file as a string e.g. containing edited node parameters, or None.
+            meshEdits: A Zinc model file as a string e.g. containing edited node parameters, or changed node
+            parameters in the compact format from scaffoldmaker.utils.meshedits, or None.
         :param defaultParameterSetName: Parameter set name from scaffoldType to get defaults from.
         """
         if dct is None:
@@ -54,15 +73,16 @@ class ScaffoldPackage:
             else:
                 meshEdits = copy.deepcopy(meshEdits)
         self._meshEdits = meshEdits
+        self._meshEditsHash = None  # cached on demand as meshEdits may be large; reset by setMeshEdits()
         self._isGenerated = False  # set to True when generate() is called
         # annotation groups automatically created by scaffold script = set in generate()
-        self._autoAnnotationGroups = []
+        self._autoAnnotationGroups = AnnotationGroupList()
         # read user AnnotationGroups list in dict form:
         userAnnotationGroupsDict = dct.get('userAnnotationGroups')
         # serialised form of user annotation groups, read from serialisation before generate(), updated before writing
         self._userAnnotationGroupsDict = copy.deepcopy(userAnnotationGroupsDict) if userAnnotationGroupsDict else []
         # can only have the actual user annotation groups once generate() is called
-        self._userAnnotationGroups = []
+        self._userAnnotationGroups = AnnotationGroupList()
         # region is set in generate(); can only instantiate user AnnotationGroups then
         self._region = None
         # a scaffold/mesh type may optionally store an object used in its construction for
@@ -73,22 +93,79 @@ class ScaffoldPackage:
     def __eq__(self, other):
         """
         Need equality operator to determine if custom options are in use.
+        Cheapest comparisons are made first, and potentially large mesh edits are compared by cached hash
+        before content.
         """
+        if self is other:
+            return True
         if isinstance(other, ScaffoldPackage):
             return (self._scaffoldType == other._scaffoldType) \
-                and (self._scaffoldSettings == other._scaffoldSettings) \
                 and (self._rotation == other._rotation) \
                 and (self._scale == other._scale) \
                 and (self._translation == other._translation) \
-                and (self._meshEdits == other._meshEdits) \
-                and (self._userAnnotationGroupsDict == other._userAnnotationGroupsDict)
+                and self._isMeshEditsEqual(other) \
+                and (self._userAnnotationGroupsDict == other._userAnnotationGroupsDict) \
+                and (self._scaffoldSettings == other._scaffoldSettings)
         return NotImplemented
 
+    def __hash__(self):
+        """
+        Structural hash consistent with __eq__, for use as a cache key. Only the hash of the immutable mesh
+        edits is cached, since scaffold settings may be modified in place by clients.
+        """
+        return hash((
+            self._scaffoldType.getName(),
+            _getHashableValue(self._scaffoldSettings),
+            tuple(self._rotation),
+            tuple(self._scale),
+            tuple(self._translation),
+            self._getMeshEditsHash(),
+            _getHashableValue(self._userAnnotationGroupsDict)))
+
     def __deepcopy__(self, memo):
         """
         Deep copies object in deserialised, pre-generated form.
+        Avoids getting default options again, and shares the immutable mesh edits and their cached hash.
         """
-        return ScaffoldPackage(self._scaffoldType, self.toDict())
+        self.updateUserAnnotationGroups()
+        scaffoldPackage = ScaffoldPackage.__new__(ScaffoldPackage)
+        scaffoldPackage._scaffoldType = self._scaffoldType
+        scaffoldPackage._scaffoldSettings = copy.deepcopy(self._scaffoldSettings, memo)
+        scaffoldPackage._rotation = copy.deepcopy(self._rotation)
+        scaffoldPackage._scale = copy.deepcopy(self._scale)
+        scaffoldPackage._translation = copy.deepcopy(self._translation)
+        scaffoldPackage._meshEdits = self._meshEdits
+        scaffoldPackage._meshEditsHash = self._meshEditsHash
+        scaffoldPackage._isGenerated = False
+        scaffoldPackage._autoAnnotationGroups = AnnotationGroupList()
+        scaffoldPackage._userAnnotationGroupsDict = copy.deepcopy(self._userAnnotationGroupsDict)
+        scaffoldPackage._userAnnotationGroups = AnnotationGroupList()
+        scaffoldPackage._region = None
+        scaffoldPackage._constructionObject = None
+        scaffoldPackage._nextNodeIdentifier = 1
+        return scaffoldPackage
+
+    def _getMeshEditsHash(self):
+        """
+        :return: Hash of mesh edits, cached until they are changed. All empty mesh edits hash the same as None,
+        consistent with _isMeshEditsEqual().
+        """
+        if self._meshEditsHash is None:
+            self._meshEditsHash = hash(self._meshEdits if self._meshEdits else None)
+        return self._meshEditsHash
+
+    def _isMeshEditsEqual(self, other):
+        """
+        :param other: Another ScaffoldPackage.
+        :return: True if mesh edits are the same, comparing content only if cached hashes are equal.
+        """
+        if self._meshEdits is other._meshEdits:
+            return True
+        if (not self._meshEdits) or (not other._meshEdits):
+            return (not self._meshEdits) and (not other._meshEdits)
+        if self._getMeshEditsHash() != other._getMeshEditsHash():
+            return False
+        return self._meshEdits == other._meshEdits
 
     def toDict(self):
         """
@@ -132,6 +209,32 @@ class ScaffoldPackage:
 
     def setMeshEdits(self, meshEdits):
         self._meshEdits = meshEdits
+        self._meshEditsHash = None
+
+    def convertMeshEditsToCompact(self):
+        """
+        Convert Zinc EX format mesh edits to the compact format holding only node parameters changed from the
+        generated scaffold, which is smaller and faster to apply. Generates the scaffold with and without edits
+        in a private context to find the changes.
+        :return: True if mesh edits are now in compact format, False if there are none or if they can't be
+        represented as changes to node parameters, e.g. because they add nodes or fields.
+        """
+        if not self._meshEdits:
+            return False
+        if is_compact_mesh_edits(self._meshEdits):
+            return True
+        context = Context("ScaffoldPackage.convertMeshEditsToCompact")
+        baseRegion = context.getDefaultRegion()
+        baseScaffoldPackage = copy.deepcopy(self)
+        baseScaffoldPackage.setMeshEdits(None)
+        baseScaffoldPackage.generate(baseRegion, applyTransformation=False)
+        editedRegion = baseRegion.createChild("edited")
+        copy.deepcopy(self).generate(editedRegion, applyTransformation=False)
+        meshEdits = make_compact_mesh_edits(editedRegion, baseRegion)
+        if meshEdits is None:
+            return False
+        self.setMeshEdits(meshEdits)
+        return True
 
     def getScaffoldSettings(self):
         return self._scaffoldSettings
@@ -256,19 +359,27 @@ class ScaffoldPackage:
         """
         self._region = region
         with ChangeManager(region.getFieldmodule()):
-            self._autoAnnotationGroups, self._constructionObject = \
+            autoAnnotationGroups, self._constructionObject = \
                 self._scaffoldType.generateMesh(region, self._scaffoldSettings)
+            self._autoAnnotationGroups = AnnotationGroupList(autoAnnotationGroups)
             # need next node identifier for creating user-defined marker points
             nodes = region.getFieldmodule().findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
             self._nextNodeIdentifier = get_maximum_node_identifier(nodes) + 1
-            if self._meshEdits:
+            if is_compact_mesh_edits(self._meshEdits):
+                # apply changed node parameters in compact format
+                # Note: these are untransformed coordinates
+                if not apply_compact_mesh_edits(region, self._meshEdits):
+                    print("ScaffoldPackage.generate.  Some mesh edits could not be applied to",
+                          self._scaffoldType.getName())
+            elif self._meshEdits:
                 # apply mesh edits, a Zinc-readable model file containing node edits
                 # Note: these are untransformed coordinates
                 sir = region.createStreaminformationRegion()
                 srm = sir.createStreamresourceMemoryBuffer(self._meshEdits)
                 region.read(sir)
             # define user AnnotationGroups from serialised Dict
-            self._userAnnotationGroups = [ AnnotationGroup.fromDict(dct, self._region) for dct in self._userAnnotationGroupsDict ]
+            self._userAnnotationGroups = AnnotationGroupList(
+                AnnotationGroup.fromDict(dct, self._region) for dct in self._userAnnotationGroupsDict)
             self._isGenerated = True
             if applyTransformation:
                 fieldmodule = self._region.getFieldmodule()
@@ -293,72 +404,54 @@ class ScaffoldPackage:
         mesh = get_highest_dimension_mesh(fm)
         if not mesh:
             return
-        meshDimension = mesh.getDimension()
         nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
         with ChangeManager(fm):
             # put the elements in a group and use subelement handling to get nodes in use by it
             destroyGroup = fm.createFieldGroup()
             destroyGroup.setSubelementHandlingMode(FieldGroup.SUBELEMENT_HANDLING_MODE_FULL)
             destroyMesh = destroyGroup.createMeshGroup(mesh)
-            elementIter = mesh.createElementiterator()
-            element = elementIter.next()
-            while element.isValid():
-                identifier = element.getIdentifier()
-                for deleteElementRange in deleteElementRanges:
-                    if (identifier >= deleteElementRange[0]) and (identifier <= deleteElementRange[1]):
-                        destroyMesh.addElement(element)
-                element = elementIter.next()
-            del elementIter
+            mesh_group_add_elements_in_identifier_ranges(destroyMesh, deleteElementRanges)
             # print("Deleting", destroyMesh.getSize(), "element(s)")
             if destroyMesh.getSize() > 0:
-                fieldcache = fm.createFieldcache()
                 destroyNodes = destroyGroup.getNodesetGroup(nodes)
                 markerGroup = fm.findFieldByName("marker").castGroup()
                 if markerGroup.isValid():
                     markerNodes = markerGroup.getNodesetGroup(nodes)
                     markerLocation = getAnnotationMarkerLocationField(fm, mesh)
-
                     if markerNodes.isValid() and markerLocation.isValid():
-                        nodeIter = markerNodes.createNodeiterator()
-                        node = nodeIter.next()
-                        while node.isValid():
-                            fieldcache.setNode(node)
-                            element, xi = markerLocation.evaluateMeshLocation(fieldcache, meshDimension)
-                            if element.isValid() and destroyMesh.containsElement(element):
-                                # markerName = getAnnotationMarkerNameField(fm)
-                                # print("Destroy marker '" + markerName.evaluateString(fieldcache) + "' node", \
-                                #       node.getIdentifier(), "in destroyed element", element.getIdentifier(), "at", xi)
-                                # following is reversed if a new location is found from material coordinates below:
-                                destroyNodes.addNode(node)
-                            node = nodeIter.next()
-                        del nodeIter
-                        del fieldcache
+                        # add all marker nodes embedded in destroyed elements in one pass;
+                        # this is reversed below if a new location is found from material coordinates:
+                        inDestroyMesh = fm.createFieldEmbedded(destroyGroup, markerLocation)
+                        destroyNodes.addNodesConditional(fm.createFieldAnd(markerGroup, inDestroyMesh))
+                        del inDestroyMesh
 
                 # must destroy elements first as Zinc won't destroy nodes that are in use
                 mesh.destroyElementsConditional(destroyGroup)
-                annotationGroups = self._autoAnnotationGroups + self._userAnnotationGroups
 
                 # attempt to re-find locations of to-be-destroyed marker points with material coordinates:
-                for annotationGroup in annotationGroups:
-                    if annotationGroup.isMarker() and destroyNodes.containsNode(annotationGroup.getMarkerNode()):
+                destroyMarkerGroups = [annotationGroup for annotationGroup in
+                                       (self._autoAnnotationGroups + self._userAnnotationGroups)
+                                       if annotationGroup.isMarker() and
+                                       destroyNodes.containsNode(annotationGroup.getMarkerNode())]
+                relocateMarkerGroups = [annotationGroup for annotationGroup in destroyMarkerGroups
+                                        if annotationGroup.getMarkerMaterialCoordinates()[1]]
+                notFoundMarkerGroups = relocateAnnotationMarkers(relocateMarkerGroups)
+                for annotationGroup in destroyMarkerGroups:
+                    removeMarkerGroup = True
+                    if (annotationGroup in relocateMarkerGroups) and (annotationGroup not in notFoundMarkerGroups):
                         materialCoordinatesField, materialCoordinates = annotationGroup.getMarkerMaterialCoordinates()
-                        removeMarkerGroup = True
-                        if materialCoordinates:
-                            annotationGroup.setMarkerMaterialCoordinates(materialCoordinatesField, materialCoordinates)
-                            evaluatedMaterialCoordinates = \
-                                annotationGroup.evaluateMarkerMaterialCoordinatesFromElementXi(materialCoordinatesField)
-                            diff = [abs(evaluatedMaterialCoordinates[c] - materialCoordinates[c]) for c in range(3)]
-
-                            # threshold designed for material coordinates of nominally unit scale
-                            if magnitude(diff) < 1e-03:
-                                destroyNodes.removeNode(annotationGroup.getMarkerNode())
-                                removeMarkerGroup = False
-
-                        if removeMarkerGroup:
-                            if annotationGroup in self._autoAnnotationGroups:
-                                self._autoAnnotationGroups.remove(annotationGroup)
-                            else:
-                                self._userAnnotationGroups.remove(annotationGroup)
+                        evaluatedMaterialCoordinates = \
+                            annotationGroup.evaluateMarkerMaterialCoordinatesFromElementXi(materialCoordinatesField)
+                        diff = [abs(evaluatedMaterialCoordinates[c] - materialCoordinates[c]) for c in range(3)]
+                        # threshold designed for material coordinates of nominally unit scale
+                        if magnitude(diff) < 1e-03:
+                            destroyNodes.removeNode(annotationGroup.getMarkerNode())
+                            removeMarkerGroup = False
+                    if removeMarkerGroup:
+                        if annotationGroup in self._autoAnnotationGroups:
+                            self._autoAnnotationGroups.remove(annotationGroup)
+                        else:
+                            self._userAnnotationGroups.remove(annotationGroup)
 
                 nodes.destroyNodesConditional(destroyGroup)
                 # clean up group so no external code hears is notified of its existence
@@ -385,7 +478,10 @@ class ScaffoldPackage:
         Invalid until after call to generate().
         :return: Annotation group with the given name or None.
         """
-        return findAnnotationGroupByName(self._autoAnnotationGroups + self._userAnnotationGroups, name)
+        annotationGroup = self._autoAnnotationGroups.findByName(name)
+        if not annotationGroup:
+            annotationGroup = self._userAnnotationGroups.findByName(name)
+        return annotationGroup
 
     def createUserAnnotationGroup(self, term=None, isMarker=False):
         """
@@ -4,7 +4,8 @@ Specialisation of Network Mesh for building 3-D box meshes.
 from cmlibs.maths.vectorops import magnitude, mult
 from cmlibs.zinc.element import Element, Elementbasis
 from cmlibs.zinc.node import Node
-from scaffoldmaker.utils.eft_utils import remapEftLocalNodes, remapEftNodeValueLabelVersion, setEftScaleFactorIds
+from scaffoldmaker.utils.eft_utils import (
+    createElementfieldtemplate, remapEftLocalNodes, remapEftNodeValueLabelVersion, setEftScaleFactorIds)
 from scaffoldmaker.utils.interpolation import interpolateSampleCubicHermite, sampleCubicHermiteCurvesSmooth
 from scaffoldmaker.utils.networkmesh import NetworkMesh, NetworkMeshBuilder, NetworkMeshGenerateData, \
     NetworkMeshJunction, NetworkMeshSegment, pathValueLabels
@@ -48,7 +49,7 @@ class BoxNetworkMeshGenerateData(NetworkMeshGenerateData):
         elementtemplateEft = self._elementtemplatesEfts.get(startEndVersions)
         if elementtemplateEft:
             return elementtemplateEft
-        eft = self._mesh.createElementfieldtemplate(self._hermiteBilinearBasis)
+        eft = createElementfieldtemplate(self._mesh, self._hermiteBilinearBasis)
         setEftScaleFactorIds(eft, [1], [])
         ln = 1
         for n3 in range(2):
@@ -5,13 +5,15 @@ from __future__ import division
 
 import math
 
-from cmlibs.maths.vectorops import magnitude, set_magnitude
 from cmlibs.utils.zinc.field import findOrCreateFieldGroup
 from cmlibs.utils.zinc.general import ChangeManager
 from cmlibs.zinc.element import Element, Elementbasis
 from cmlibs.zinc.field import Field
-from scaffoldmaker.utils.interpolation import DerivativeScalingMode, getCubicHermiteArcLength, \
-    interpolateHermiteLagrangeDerivative, interpolateLagrangeHermiteDerivative
+from cmlibs.zinc.node import Node
+from scaffoldmaker.utils.interpolation import DerivativeScalingMode, gaussWt4, gaussXi4, getCubicHermiteArcLength
+import numpy
+from scipy.sparse import coo_matrix, csr_matrix, diags, identity, vstack
+from scipy.sparse.linalg import spsolve
 
 
 class EdgeCurve:
@@ -80,11 +82,102 @@ class EdgeCurve:
         return self._parameters[parameterIndex]
 
 
+class EdgeGraph:
+    """
+    Edge and derivative maps compiled over a mesh for smoothing a field, optionally limited to a selection group.
+    Registers a field module notifier which marks the graph as out of date when the element topology, element
+    fields, node identifiers or versions, or the selection group change, or the region is destroyed.
+    Zinc reports element field changes for both changed element field templates and changed node parameters, so
+    only node parameters set by smoothing with the graph leave it valid for reuse by repeated smoothing.
+    Does not hold the field module, so cached graphs do not keep their region alive.
+    """
+
+    def __init__(self, fieldmodule, mesh, nodes, field, selectionGroup):
+        """
+        :param fieldmodule: Owning field module of mesh, nodes and field. Only used to register notifier.
+        :param mesh: Mesh edges are compiled over.
+        :param nodes: Nodeset smoothed nodes are in.
+        :param field: Finite element field being smoothed.
+        :param selectionGroup: Optional group limiting smoothing to its nodes, or None.
+        """
+        self._mesh = mesh
+        self._nodes = nodes
+        self._field = field
+        self._selectionGroup = selectionGroup
+        # edges mapped from sorted start and end node identifiers
+        self.edgesMap = {}
+        # map global nodeid, derivative, version to list of EdgeCurve
+        self.derivativeMap = {}
+        # arrays describing edges and derivatives for smoothing, see DerivativeSmoothing._compileArrays()
+        self.arrays = None
+        self._valid = True
+        self._smoothingChanges = False
+        self._notifier = fieldmodule.createFieldmodulenotifier()
+        self._notifier.setCallback(self._fieldmoduleCallback)
+
+    def _fieldmoduleCallback(self, event):
+        """
+        Invalidate graph on changes to anything other than node parameters set by smoothing with it.
+        """
+        if event.getSummaryFieldChangeFlags() & Field.CHANGE_FLAG_FINAL:
+            self.invalidate()  # region destroyed
+            return
+        elementChangeFlags = event.getMeshchanges(self._mesh).getSummaryElementChangeFlags()
+        nodeChangeFlags = event.getNodesetchanges(self._nodes).getSummaryNodeChangeFlags()
+        if self._smoothingChanges:
+            # element field changes are expected from node parameters set by smoothing
+            elementChangeFlags &= ~Element.CHANGE_FLAG_FIELD
+        if (elementChangeFlags & (Element.CHANGE_FLAG_ADD | Element.CHANGE_FLAG_REMOVE |
+                                  Element.CHANGE_FLAG_IDENTIFIER | Element.CHANGE_FLAG_DEFINITION |
+                                  Element.CHANGE_FLAG_FIELD)) or \
+                (nodeChangeFlags & (Node.CHANGE_FLAG_ADD | Node.CHANGE_FLAG_REMOVE |
+                                    Node.CHANGE_FLAG_IDENTIFIER | Node.CHANGE_FLAG_DEFINITION)) or \
+                (event.getFieldChangeFlags(self._field) & Field.CHANGE_FLAG_DEFINITION) or \
+                (self._selectionGroup and event.getFieldChangeFlags(self._selectionGroup)):
+            self.invalidate()
+
+    def setSmoothingChanges(self, smoothingChanges):
+        """
+        Set while smoothing with this graph sets node parameters, so the element field changes they cause do not
+        invalidate it. Changes must be notified before this is cleared; if notification is delayed by an outer
+        change cache, the graph is conservatively invalidated.
+        :param smoothingChanges: True if following changes are node parameters set by smoothing, otherwise False.
+        """
+        self._smoothingChanges = smoothingChanges
+
+    def invalidate(self):
+        """
+        Mark graph as out of date, stop listening for changes and release mesh, nodes and fields.
+        """
+        if self._valid:
+            self._valid = False
+            self._notifier.clearCallback()
+            self._mesh = self._nodes = self._field = self._selectionGroup = None
+
+    def isValid(self):
+        return self._valid
+
+    def matches(self, mesh, field, selectionGroup):
+        """
+        :return: True if graph is valid and was compiled for the supplied mesh, field and selection group.
+        """
+        if not (self._valid and (mesh == self._mesh) and (field == self._field)):
+            return False
+        if (selectionGroup is None) or (self._selectionGroup is None):
+            return (selectionGroup is None) and (self._selectionGroup is None)
+        return selectionGroup == self._selectionGroup
+
+
 class DerivativeSmoothing:
     """
     Class for globally smoothing field derivatives.
     """
 
+    # most recently used edge graphs, reused by smoothing the same mesh, field and selection group.
+    # Graphs do not hold their field modules, and are released once invalid e.g. when their region is destroyed
+    _edgeGraphCache = []
+    _edgeGraphCacheSize = 4
+
     cubeEdgeLocalNodes = [
         [[1, 2], [3, 4], [5, 6], [7, 8]],
         [[1, 3], [2, 4], [5, 7], [6, 8]],
@@ -127,6 +220,8 @@ class DerivativeSmoothing:
         self._edgesMap = {}
         # map global nodeid, derivative, version to list of EdgeCurve
         self._derivativeMap = {}
+        self._arrays = None  # arrays describing edges and derivatives for smoothing, see _compileArrays()
+        self._edgeGraph = None
         if selectionGroupName:
             self._selectionGroup = self._fieldmodule.findFieldByName(selectionGroupName).castGroup()
             if not self._selectionGroup.isValid():
@@ -136,7 +231,61 @@ class DerivativeSmoothing:
             if (not self._selectionNodes.isValid()) or (self._selectionNodes.getSize() == 0):
                 print('DerivativeSmoothing: No nodes selected for smoothing')
                 return
-        self.addElementEdges()
+        self._edgeGraph = self._findEdgeGraph()
+        if self._edgeGraph:
+            self._edgesMap = self._edgeGraph.edgesMap
+            self._derivativeMap = self._edgeGraph.derivativeMap
+            self._arrays = self._edgeGraph.arrays
+        else:
+            self.addElementEdges()
+            self._edgeGraph = self._addEdgeGraph()
+
+    def _findEdgeGraph(self):
+        """
+        :return: Cached EdgeGraph for current mesh, field and selection group, or None if none or out of date.
+        """
+        cache = DerivativeSmoothing._edgeGraphCache
+        for edgeGraph in list(cache):
+            if not edgeGraph.isValid():
+                cache.remove(edgeGraph)
+            elif edgeGraph.matches(self._mesh, self._field, self._selectionGroup):
+                # move to most recently used
+                cache.remove(edgeGraph)
+                cache.append(edgeGraph)
+                return edgeGraph
+        return None
+
+    def _addEdgeGraph(self):
+        """
+        Cache edge and derivative maps for the current mesh, field and selection group in a new EdgeGraph,
+        evicting the least recently used if the cache is full.
+        :return: New EdgeGraph.
+        """
+        edgeGraph = EdgeGraph(self._fieldmodule, self._mesh, self._nodes, self._field, self._selectionGroup)
+        edgeGraph.edgesMap = self._edgesMap
+        edgeGraph.derivativeMap = self._derivativeMap
+        cache = DerivativeSmoothing._edgeGraphCache
+        cache[:] = [cachedEdgeGraph for cachedEdgeGraph in cache if cachedEdgeGraph.isValid()]
+        cache.append(edgeGraph)
+        while len(cache) > DerivativeSmoothing._edgeGraphCacheSize:
+            cache.pop(0).invalidate()
+        return edgeGraph
+
+    @classmethod
+    def clearEdgeGraphCache(cls):
+        """
+        Discard all cached edge graphs, releasing the meshes and fields they refer to.
+        """
+        for edgeGraph in cls._edgeGraphCache:
+            edgeGraph.invalidate()
+        cls._edgeGraphCache.clear()
+
+    def getEdgeGraph(self):
+        """
+        :return: EdgeGraph used by this smoothing, shared with other smoothing of the same mesh, field and
+        selection group while it is valid, or None if nothing to smooth.
+        """
+        return self._edgeGraph
 
     def addElementEdges(self):
         """
@@ -296,114 +445,473 @@ class DerivativeSmoothing:
                 else:
                     self._derivativeMap[derivativeKey] = [derivativeEdge]
 
-    def smooth(self, updateDirections=False, maxIterations=10, arcLengthTolerance=1.0E-6):
+    def _compileArrays(self):
         """
+        Compile edge and derivative maps into arrays for smoothing all edges and derivatives together.
+        Parameters are indexed by their order in self._arrays["parameterKeys"], each a tuple of
+        (node identifier, value label, version). Edge curve x1, d1, x2, d2 are rows [4 * edge index + 0..3] of sparse
+        matrix "edgeMatrix" multiplying the parameters array.
+        Boundary derivatives on a single edge are updated in sequence in the original map order; they are
+        split into waves which can be updated together since no derivative reads a parameter changed by an
+        earlier derivative in the same wave.
+        """
+        edges = list(self._edgesMap.values())
+        edgeIndexes = {}
+        parameterIndexes = {}
+        rows = []
+        columns = []
+        values = []
+        for e, edge in enumerate(edges):
+            edgeIndexes[edge] = e
+            for expressionIndex in range(4):
+                for term in edge.getExpression(expressionIndex):
+                    nodeIdentifier, valueLabel, version, scaleFactor = term
+                    parameterKey = (nodeIdentifier, valueLabel, version)
+                    parameterIndex = parameterIndexes.get(parameterKey)
+                    if parameterIndex is None:
+                        parameterIndex = parameterIndexes[parameterKey] = len(parameterIndexes)
+                    rows.append(4 * e + expressionIndex)
+                    columns.append(parameterIndex)
+                    values.append(scaleFactor)
+        parametersCount = len(parameterIndexes)
+        # duplicate entries are summed, as for multiple terms mapping the same parameter
+        edgeMatrix = csr_matrix((values, (rows, columns)), shape=(4 * len(edges), parametersCount))
+
+        # derivatives on more than one edge, entries for each derivative-edge pair:
+        interiorParameterIndexes = []
+        entryDerivativeIndexes = []
+        entryEdgeIndexes = []
+        entryScaleFactors = []
+        # derivatives on a single edge, in order:
+        boundaryDerivatives = []
+        for derivativeKey, derivativeEdges in self._derivativeMap.items():
+            parameterIndex = parameterIndexes[derivativeKey]
+            if len(derivativeEdges) > 1:
+                for edge, expressionIndex, totalScaleFactor in derivativeEdges:
+                    entryDerivativeIndexes.append(len(interiorParameterIndexes))
+                    entryEdgeIndexes.append(edgeIndexes[edge])
+                    entryScaleFactors.append(totalScaleFactor)
+                interiorParameterIndexes.append(parameterIndex)
+            else:
+                edge, expressionIndex, totalScaleFactor = derivativeEdges[0]
+                otherExpression = edge.getExpression(3 if (expressionIndex == 1) else 1)
+                bothEndsOnBoundary = False
+                if len(otherExpression) == 1:
+                    otherDerivativeEdges = self._derivativeMap.get(tuple(otherExpression[0][:3]))
+                    bothEndsOnBoundary = (otherDerivativeEdges is not None) and (len(otherDerivativeEdges) == 1)
+                boundaryDerivatives.append(
+                    (parameterIndex, edgeIndexes[edge], expressionIndex, totalScaleFactor, bothEndsOnBoundary))
+
+        # assign boundary derivatives to waves so none reads a parameter written earlier in its wave,
+        # and none writes a parameter read by an earlier derivative in a lower wave
+        lastWriteWave = {}
+        lastReadWave = {}
+        waveBoundaryDerivatives = []
+        for boundaryDerivative in boundaryDerivatives:
+            parameterIndex, e = boundaryDerivative[0:2]
+            readParameterIndexes = edgeMatrix.indices[edgeMatrix.indptr[4 * e]:edgeMatrix.indptr[4 * e + 4]]
+            wave = lastReadWave.get(parameterIndex, 0)
+            for readParameterIndex in readParameterIndexes:
+                writeWave = lastWriteWave.get(readParameterIndex)
+                if (writeWave is not None) and (writeWave >= wave):
+                    wave = writeWave + 1
+            lastWriteWave[parameterIndex] = wave
+            for readParameterIndex in readParameterIndexes:
+                if lastReadWave.get(readParameterIndex, -1) < wave:
+                    lastReadWave[readParameterIndex] = wave
+            if wave == len(waveBoundaryDerivatives):
+                waveBoundaryDerivatives.append([])
+            waveBoundaryDerivatives[wave].append(boundaryDerivative)
+        boundaryWaves = []
+        for waveDerivatives in waveBoundaryDerivatives:
+            waveParameterIndexes, waveEdgeIndexes, expressionIndexes, scaleFactors, bothEndsOnBoundary = \
+                [numpy.array(values) for values in zip(*waveDerivatives)]
+            edgeRows = (4 * waveEdgeIndexes[:, numpy.newaxis] + numpy.arange(4)).reshape(-1)
+            boundaryWaves.append({
+                "parameterIndexes": waveParameterIndexes,
+                "edgeMatrix": edgeMatrix[edgeRows],
+                "expressionIndexes": expressionIndexes,
+                "scaleFactors": scaleFactors,
+                "bothEndsOnBoundary": bothEndsOnBoundary})
+
+        boundaryArrays = [numpy.array(values) for values in zip(*boundaryDerivatives)] if boundaryDerivatives else \
+            [numpy.zeros(0, dtype=int), numpy.zeros(0, dtype=int), numpy.zeros(0, dtype=int), numpy.zeros(0),
+             numpy.zeros(0, dtype=bool)]
+        # map from parameter index to index of derivative in interior then boundary order, or -1 if not smoothed
+        derivativeParameterIndexes = numpy.concatenate(
+            (numpy.array(interiorParameterIndexes, dtype=int), boundaryArrays[0])).astype(int)
+        parameterDerivativeIndexes = numpy.full(parametersCount, -1, dtype=int)
+        parameterDerivativeIndexes[derivativeParameterIndexes] = numpy.arange(len(derivativeParameterIndexes))
+
+        self._arrays = {
+            "parameterKeys": list(parameterIndexes.keys()),
+            "edgesCount": len(edges),
+            "edgeMatrix": edgeMatrix,
+            "interiorParameterIndexes": numpy.array(interiorParameterIndexes, dtype=int),
+            "interiorEdgesCounts": numpy.bincount(entryDerivativeIndexes, minlength=len(interiorParameterIndexes)),
+            "entryDerivativeIndexes": numpy.array(entryDerivativeIndexes, dtype=int),
+            "entryEdgeIndexes": numpy.array(entryEdgeIndexes, dtype=int),
+            "entryScaleFactors": numpy.array(entryScaleFactors),
+            "boundaryWaves": boundaryWaves,
+            "boundaryEdgeIndexes": boundaryArrays[1],
+            "boundaryExpressionIndexes": boundaryArrays[2],
+            "boundaryScaleFactors": boundaryArrays[3],
+            "boundaryBothEndsOnBoundary": boundaryArrays[4],
+            "derivativeParameterIndexes": derivativeParameterIndexes,
+            "parameterDerivativeIndexes": parameterDerivativeIndexes
+        }
+
+    def _getParameters(self, fieldcache):
+        """
+        Get values of all parameters used by edges in a single pass over nodes.
+        :return: numpy array [parameter index][component]
+        """
+        componentsCount = self._field.getNumberOfComponents()
+        parameterKeys = self._arrays["parameterKeys"]
+        parameters = numpy.zeros((len(parameterKeys), componentsCount))
+        lastNodeIdentifier = None
+        for parameterIndex, parameterKey in enumerate(parameterKeys):
+            nodeIdentifier, valueLabel, version = parameterKey
+            if nodeIdentifier != lastNodeIdentifier:
+                fieldcache.setNode(self._nodes.findNodeByIdentifier(nodeIdentifier))
+                lastNodeIdentifier = nodeIdentifier
+            result, x = self._field.getNodeParameters(fieldcache, -1, valueLabel, version, componentsCount)
+            parameters[parameterIndex] = x
+        return parameters
+
+    def _setDerivativeParameters(self, fieldcache, parameters):
+        """
+        Set values of all smoothed derivatives in a single pass over nodes.
+        :param parameters: numpy array [parameter index][component]
+        """
+        parameterKeys = self._arrays["parameterKeys"]
+        lastNodeIdentifier = None
+        for parameterIndex in range(len(parameterKeys)):
+            parameterKey = parameterKeys[parameterIndex]
+            if parameterKey in self._derivativeMap:
+                nodeIdentifier, valueLabel, version = parameterKey
+                if nodeIdentifier != lastNodeIdentifier:
+                    fieldcache.setNode(self._nodes.findNodeByIdentifier(nodeIdentifier))
+                    lastNodeIdentifier = nodeIdentifier
+                self._field.setNodeParameters(fieldcache, -1, valueLabel, version, parameters[parameterIndex].tolist())
+
+    @staticmethod
+    def _getArcLengths(edgeParameters):
+        """
+        Get arc lengths of cubic Hermite curves using 4 point Gaussian quadrature, as for getCubicHermiteArcLength.
+        :param edgeParameters: numpy array [edge][x1, d1, x2, d2][component]
+        :return: numpy array of arc lengths [edge]
+        """
+        v1, d1, v2, d2 = edgeParameters[:, 0], edgeParameters[:, 1], edgeParameters[:, 2], edgeParameters[:, 3]
+        arcLengths = numpy.zeros(len(edgeParameters))
+        for xi, wt in zip(gaussXi4, gaussWt4):
+            xi2 = xi * xi
+            f1 = -6.0 * xi + 6.0 * xi2
+            f2 = 1.0 - 4.0 * xi + 3.0 * xi2
+            f3 = 6.0 * xi - 6.0 * xi2
+            f4 = -2.0 * xi + 3.0 * xi2
+            dm = f1 * v1 + f2 * d1 + f3 * v2 + f4 * d2
+            arcLengths += wt * numpy.sqrt(numpy.sum(dm * dm, axis=1))
+        return arcLengths
+
+    @staticmethod
+    def _setMagnitudes(vectors, magnitudes):
+        """
+        :param vectors: numpy array [vector][component]
+        :param magnitudes: numpy array [vector] of new magnitudes, can be negative to reverse vectors.
+        :return: vectors scaled to magnitudes. Zero vectors are unchanged.
+        """
+        oldMagnitudes = numpy.sqrt(numpy.sum(vectors * vectors, axis=1))
+        scales = numpy.divide(magnitudes, oldMagnitudes, out=numpy.zeros(len(vectors)), where=oldMagnitudes > 0.0)
+        return vectors * scales[:, numpy.newaxis]
+
+    def _printNegativeMagnitudes(self, parameterIndexes, magnitudes):
+        for parameterIndex, mag in zip(parameterIndexes, magnitudes):
+            if mag <= 0.0:
+                nodeIdentifier, nodeValueLabel, nodeVersion = self._arrays["parameterKeys"][parameterIndex]
+                print('Derivative smoothing: Node', nodeIdentifier, 'label', nodeValueLabel,
+                      'version', nodeVersion, 'has negative magnitude', mag)
+
+    def _smoothInteriorDerivatives(self, parameters, edgeParameters, arcLengths, updateDirections):
+        """
+        Set derivatives on more than one edge to mean of their edges' arc lengths, in place.
+        All edges use arc lengths calculated before any derivatives are changed.
+        :param parameters: numpy array [parameter index][component]. Modified.
+        :param edgeParameters: numpy array [edge][x1, d1, x2, d2][component]
+        :param arcLengths: numpy array of arc lengths [edge]
+        :param updateDirections: True to recalculate directions from mean edge directions.
+        """
+        arrays = self._arrays
+        interiorParameterIndexes = arrays["interiorParameterIndexes"]
+        if len(interiorParameterIndexes) == 0:
+            return
+        derivativeIndexes = arrays["entryDerivativeIndexes"]
+        edgeIndexes = arrays["entryEdgeIndexes"]
+        scaleFactors = arrays["entryScaleFactors"]
+        edgesCounts = arrays["interiorEdgesCounts"]
+        entryArcLengths = arcLengths[edgeIndexes]
+        derivativesCount = len(interiorParameterIndexes)
+        if updateDirections:
+            deltas = edgeParameters[edgeIndexes, 2] - edgeParameters[edgeIndexes, 0]
+            deltas[scaleFactors < 0.0] *= -1.0
+            x = numpy.zeros((derivativesCount, parameters.shape[1]))
+            numpy.add.at(x, derivativeIndexes, deltas / entryArcLengths[:, numpy.newaxis])
+        else:
+            x = parameters[interiorParameterIndexes]
+        absScaleFactors = numpy.fabs(scaleFactors)
+        if self._scalingMode == DerivativeScalingMode.ARITHMETIC_MEAN:
+            mags = numpy.bincount(derivativeIndexes, weights=entryArcLengths / absScaleFactors,
+                                  minlength=derivativesCount) / edgesCounts
+        else:  # self._scalingMode == DerivativeScalingMode.HARMONIC_MEAN
+            mags = edgesCounts / numpy.bincount(derivativeIndexes, weights=absScaleFactors / entryArcLengths,
+                                                minlength=derivativesCount)
+        self._printNegativeMagnitudes(interiorParameterIndexes, mags)
+        parameters[interiorParameterIndexes] = self._setMagnitudes(x, mags)
+
+    def _smoothBoundaryDerivatives(self, parameters, updateDirections):
+        """
+        Set derivatives on a single edge to fit the current other end of the edge, in place.
+        Waves of derivatives are updated in order, so later waves use parameters changed by earlier waves.
+        :param parameters: numpy array [parameter index][component]. Modified.
+        :param updateDirections: True to recalculate directions from quadratic fit to other end of edge.
+        """
+        componentsCount = parameters.shape[1]
+        for boundaryWave in self._arrays["boundaryWaves"]:
+            parameterIndexes = boundaryWave["parameterIndexes"]
+            expressionIndexes = boundaryWave["expressionIndexes"]
+            scaleFactors = boundaryWave["scaleFactors"]
+            bothEndsOnBoundary = boundaryWave["bothEndsOnBoundary"]
+            edgeParameters = (boundaryWave["edgeMatrix"] @ parameters).reshape(-1, 4, componentsCount)
+            arcLengths = self._getArcLengths(edgeParameters)
+            derivativesCount = len(parameterIndexes)
+            indexes = numpy.arange(derivativesCount)
+            isStart = expressionIndexes == 1
+            otherExpressionIndexes = numpy.where(isStart, 3, 1)
+            otherd = edgeParameters[indexes, otherExpressionIndexes]
+            if updateDirections:
+                thisx = edgeParameters[indexes, expressionIndexes - 1]
+                otherx = edgeParameters[indexes, otherExpressionIndexes - 1]
+                x = numpy.where(isStart[:, numpy.newaxis], otherx - thisx, thisx - otherx)
+                # quadratic Lagrange-Hermite or Hermite-Lagrange derivative at boundary end
+                x = numpy.where(bothEndsOnBoundary[:, numpy.newaxis], x, numpy.where(
+                    isStart[:, numpy.newaxis],
+                    thisx * -2.0 + otherx * 2.0 + otherd * -1.0,
+                    otherx * -2.0 + otherd * -1.0 + thisx * 2.0))
+                x /= scaleFactors[:, numpy.newaxis]
+            else:
+                x = parameters[parameterIndexes]
+            othermags = numpy.sqrt(numpy.sum(otherd * otherd, axis=1))
+            mags = numpy.where(bothEndsOnBoundary, arcLengths / scaleFactors,
+                               (2.0 * arcLengths - othermags) / numpy.fabs(scaleFactors))
+            self._printNegativeMagnitudes(parameterIndexes[~bothEndsOnBoundary], mags[~bothEndsOnBoundary])
+            parameters[parameterIndexes] = self._setMagnitudes(x, mags)
+
+    def _getArcLengthsAndGradients(self, edgeParameters):
+        """
+        Get arc lengths of edges and their gradients with respect to each of the 4 edge curve parameters.
+        :param edgeParameters: numpy array [edge][x1, d1, x2, d2][component]
+        :return: arcLengths[edge], gradients[edge][x1, d1, x2, d2][component]
+        """
+        v1, d1, v2, d2 = edgeParameters[:, 0], edgeParameters[:, 1], edgeParameters[:, 2], edgeParameters[:, 3]
+        arcLengths = numpy.zeros(len(edgeParameters))
+        gradients = numpy.zeros(edgeParameters.shape)
+        for xi, wt in zip(gaussXi4, gaussWt4):
+            xi2 = xi * xi
+            f = (-6.0 * xi + 6.0 * xi2, 1.0 - 4.0 * xi + 3.0 * xi2, 6.0 * xi - 6.0 * xi2, -2.0 * xi + 3.0 * xi2)
+            dm = f[0] * v1 + f[1] * d1 + f[2] * v2 + f[3] * d2
+            dmMagnitudes = numpy.sqrt(numpy.sum(dm * dm, axis=1))
+            arcLengths += wt * dmMagnitudes
+            dmUnit = numpy.divide(dm, dmMagnitudes[:, numpy.newaxis], out=numpy.zeros(dm.shape),
+                                  where=dmMagnitudes[:, numpy.newaxis] > 0.0)
+            for r in range(4):
+                gradients[:, r] += (wt * f[r]) * dmUnit
+        return arcLengths, gradients
+
+    def _solveMagnitudes(self, parameters, maxIterations, arcLengthTolerance):
+        """
+        Solve for derivative magnitudes satisfying the smoothing conditions over all edges at once, keeping
+        derivative directions fixed. The conditions are the fixed point of the iterations in smooth():
+        interior derivatives equal the mean of their edges' scaled arc lengths; boundary derivatives make the edge
+        arc length the mean of the derivatives at its ends, or equal to the arc length if both ends are on the
+        boundary. Dependence of arc lengths on magnitudes is linearised about the current solution, and the
+        resulting sparse linear system solved directly, repeating until arc lengths converge (Newton's method).
+        :param parameters: numpy array [parameter index][component]. Modified.
+        :param maxIterations: Maximum number of linear solves.
+        :param arcLengthTolerance: Ratio of change in arc length over arc length under which converged.
+        :return: Number of linear solves if converged, otherwise None.
+        """
+        arrays = self._arrays
+        edgeMatrix = arrays["edgeMatrix"].tocoo()
+        edgesCount = arrays["edgesCount"]
+        componentsCount = parameters.shape[1]
+        derivativeParameterIndexes = arrays["derivativeParameterIndexes"]
+        derivativesCount = len(derivativeParameterIndexes)
+        # restrict edge matrix to terms for derivatives being smoothed
+        termDerivativeIndexes = arrays["parameterDerivativeIndexes"][edgeMatrix.col]
+        termMask = termDerivativeIndexes >= 0
+        termRows = edgeMatrix.row[termMask]
+        termEdgeIndexes = termRows // 4
+        termDerivativeIndexes = termDerivativeIndexes[termMask]
+        termScaleFactors = edgeMatrix.data[termMask]
+
+        # matrices giving conditions for derivative magnitudes as combinations of edge arc lengths
+        interiorDerivativesCount = len(arrays["interiorParameterIndexes"])
+        derivativeIndexes = arrays["entryDerivativeIndexes"]
+        entryEdgeIndexes = arrays["entryEdgeIndexes"]
+        absScaleFactors = numpy.fabs(arrays["entryScaleFactors"])
+        edgesCounts = arrays["interiorEdgesCounts"]
+        boundaryEdgeIndexes = arrays["boundaryEdgeIndexes"]
+        boundaryDerivativesCount = len(boundaryEdgeIndexes)
+        boundaryAbsScaleFactors = numpy.fabs(arrays["boundaryScaleFactors"])
+        bothEndsOnBoundary = arrays["boundaryBothEndsOnBoundary"]
+        otherRows = 4 * boundaryEdgeIndexes + numpy.where(arrays["boundaryExpressionIndexes"] == 1, 3, 1)
+        if self._scalingMode == DerivativeScalingMode.ARITHMETIC_MEAN:
+            interiorMatrix = csr_matrix(
+                (1.0 / (edgesCounts[derivativeIndexes] * absScaleFactors), (derivativeIndexes, entryEdgeIndexes)),
+                shape=(interiorDerivativesCount, edgesCount))
+        else:  # self._scalingMode == DerivativeScalingMode.HARMONIC_MEAN
+            interiorMatrix = csr_matrix(
+                (absScaleFactors, (derivativeIndexes, entryEdgeIndexes)), shape=(interiorDerivativesCount, edgesCount))
+        boundaryMatrix = csr_matrix(
+            (numpy.where(bothEndsOnBoundary, 1.0, 2.0) / boundaryAbsScaleFactors,
+             (numpy.arange(boundaryDerivativesCount), boundaryEdgeIndexes)),
+            shape=(boundaryDerivativesCount, edgesCount))
+        otherScales = diags(numpy.where(bothEndsOnBoundary, 0.0, 1.0) / boundaryAbsScaleFactors)
+        derivativesIdentity = identity(derivativesCount, format="csr")
+
+        derivatives = parameters[derivativeParameterIndexes]
+        magnitudes = numpy.sqrt(numpy.sum(derivatives * derivatives, axis=1))
+        directions = numpy.divide(derivatives, magnitudes[:, numpy.newaxis], out=numpy.zeros(derivatives.shape),
+                                  where=magnitudes[:, numpy.newaxis] > 0.0)
+
+        def evaluate(magnitudes):
+            """
+            :return: Residuals of conditions, arc lengths, edge parameters for magnitudes with fixed directions.
+            """
+            parameters[derivativeParameterIndexes] = directions * magnitudes[:, numpy.newaxis]
+            edgeParameters = (arrays["edgeMatrix"] @ parameters).reshape(-1, 4, componentsCount)
+            arcLengths, gradients = self._getArcLengthsAndGradients(edgeParameters)
+            if self._scalingMode == DerivativeScalingMode.ARITHMETIC_MEAN:
+                interiorTargets = interiorMatrix @ arcLengths
+            else:
+                interiorTargets = edgesCounts / (interiorMatrix @ (1.0 / arcLengths))
+            otherMagnitudes = numpy.sqrt(numpy.sum(
+                edgeParameters.reshape(-1, componentsCount)[otherRows] ** 2, axis=1))
+            boundaryTargets = boundaryMatrix @ arcLengths - otherScales @ otherMagnitudes
+            residuals = magnitudes - numpy.concatenate((interiorTargets, boundaryTargets))
+            return residuals, arcLengths, edgeParameters, gradients
+
+        residuals, arcLengths, edgeParameters, gradients = evaluate(magnitudes)
+        for solveIter in range(1, maxIterations + 1):
+            # derivatives of arc lengths and other end derivative magnitudes w.r.t. derivative magnitudes
+            termDirectionDots = numpy.sum(directions[termDerivativeIndexes] * gradients.reshape(
+                -1, componentsCount)[termRows], axis=1)
+            arcLengthJacobian = coo_matrix(
+                (termScaleFactors * termDirectionDots, (termEdgeIndexes, termDerivativeIndexes)),
+                shape=(edgesCount, derivativesCount)).tocsr()
+            rowParameters = edgeParameters.reshape(-1, componentsCount)[termRows]
+            rowMagnitudes = numpy.sqrt(numpy.sum(rowParameters * rowParameters, axis=1))
+            rowDirectionDots = numpy.divide(
+                numpy.sum(rowParameters * directions[termDerivativeIndexes], axis=1), rowMagnitudes,
+                out=numpy.zeros(len(rowMagnitudes)), where=rowMagnitudes > 0.0)
+            rowMagnitudeJacobian = coo_matrix(
+                (termScaleFactors * rowDirectionDots, (termRows, termDerivativeIndexes)),
+                shape=(4 * edgesCount, derivativesCount)).tocsr()
+            if self._scalingMode == DerivativeScalingMode.ARITHMETIC_MEAN:
+                interiorJacobian = interiorMatrix @ arcLengthJacobian
+            else:
+                sums = interiorMatrix @ (1.0 / arcLengths)
+                interiorJacobian = diags(edgesCounts / (sums * sums)) @ interiorMatrix @ \
+                    diags(1.0 / (arcLengths * arcLengths)) @ arcLengthJacobian
+            boundaryJacobian = boundaryMatrix @ arcLengthJacobian - otherScales @ rowMagnitudeJacobian[otherRows]
+            jacobian = derivativesIdentity - vstack((interiorJacobian, boundaryJacobian), format="csr")
+            deltaMagnitudes = spsolve(jacobian.tocsc(), -residuals)
+            if not numpy.all(numpy.isfinite(deltaMagnitudes)):
+                print('Derivative smoothing: Linear solve failed')
+                evaluate(magnitudes)
+                return None
+            # halve step until magnitudes stay positive
+            for halving in range(10):
+                newMagnitudes = magnitudes + deltaMagnitudes
+                if numpy.all(newMagnitudes[magnitudes > 0.0] > 0.0):
+                    break
+                deltaMagnitudes *= 0.5
+            lastArcLengths = arcLengths
+            magnitudes = newMagnitudes
+            residuals, arcLengths, edgeParameters, gradients = evaluate(magnitudes)
+            if not numpy.any(numpy.fabs(arcLengths - lastArcLengths) / arcLengths > arcLengthTolerance):
+                return solveIter
+        return None
+
+    def smooth(self, updateDirections=False, maxIterations=10, arcLengthTolerance=1.0E-6, linearSolve=False):
+        """
+        Smooth derivatives so their magnitudes match the arc lengths of the element edges they are on.
+        Parameters are read once from the field into arrays, iterated on together, then written back.
         :param updateDirections: Set to True if directions are to be recalculated.
         :param maxIterations: Maximum iterations before stopping if not converging.
         :param arcLengthTolerance: Ratio of difference in arc length from last iteration
         divided by current arc length under which convergence is achieved. Required to
         be met by every element edge.
+        :param linearSolve: Set to True to first solve for all derivative magnitudes together with a sparse linear
+        system, which converges on poorly scaled meshes where iterations alone do not. Iterations then refine
+        the solution, including updating directions if requested. Directions are first updated by one iteration.
         """
         if not self._derivativeMap:
             return  # no nodes being smoothed
-        componentsCount = self._field.getNumberOfComponents()
+        if not self._arrays:
+            self._compileArrays()
+            if self._edgeGraph:
+                self._edgeGraph.arrays = self._arrays
+        if self._edgeGraph:
+            self._edgeGraph.setSmoothingChanges(True)
+        try:
+            self._smoothParameters(updateDirections, maxIterations, arcLengthTolerance, linearSolve)
+        finally:
+            if self._edgeGraph:
+                self._edgeGraph.setSmoothingChanges(False)
+
+    def _smoothParameters(self, updateDirections, maxIterations, arcLengthTolerance, linearSolve):
+        """
+        Smooth derivative parameters and write them to the field. See smooth() for parameter descriptions.
+        """
+        arrays = self._arrays
+        edgeMatrix = arrays["edgeMatrix"]
         with ChangeManager(self._fieldmodule):
             fieldcache = self._fieldmodule.createFieldcache()
-            for smoothIter in range(maxIterations + 1):
-                converged = True
-                for edge in self._edgesMap.values():
-                    lastArcLength = edge.getLastArcLength()
-                    arcLength = edge.evaluateArcLength(self._nodes, self._field, fieldcache)
-                    edge.updateLastArcLength()
-                    if (math.fabs(arcLength - lastArcLength)/arcLength) > arcLengthTolerance:
-                        converged = False
+            parameters = self._getParameters(fieldcache)
+            componentsCount = parameters.shape[1]
+            solved = False
+            iterate = True
+            if linearSolve:
+                if updateDirections:
+                    edgeParameters = (edgeMatrix @ parameters).reshape(-1, 4, componentsCount)
+                    arcLengths = self._getArcLengths(edgeParameters)
+                    self._smoothInteriorDerivatives(parameters, edgeParameters, arcLengths, updateDirections)
+                    self._smoothBoundaryDerivatives(parameters, updateDirections)
+                solveIterations = self._solveMagnitudes(parameters, maxIterations, arcLengthTolerance)
+                solved = True
+                if solveIterations:
+                    print('Derivative smoothing: Linear solve converged after', solveIterations, 'solves.')
+                    # only need to iterate to refine directions
+                    iterate = updateDirections
+                else:
+                    print('Derivative smoothing: Linear solve did not converge. Iterating.')
+            lastArcLengths = numpy.zeros(arrays["edgesCount"])
+            for smoothIter in range(maxIterations + 1 if iterate else 0):
+                edgeParameters = (edgeMatrix @ parameters).reshape(-1, 4, componentsCount)
+                arcLengths = self._getArcLengths(edgeParameters)
+                converged = not numpy.any(numpy.fabs(arcLengths - lastArcLengths) / arcLengths > arcLengthTolerance)
+                lastArcLengths = arcLengths
                 if converged:
                     print('Derivative smoothing: Converged after', smoothIter, 'iterations.')
                     break
                 elif smoothIter == maxIterations:
                     print('Derivative smoothing: Stopping after', maxIterations, 'iterations without converging.')
                     break
-                for derivativeKey, derivativeEdges in self._derivativeMap.items():
-                    edgeCount = len(derivativeEdges)
-                    if edgeCount > 1:
-                        nodeIdentifier, nodeValueLabel, nodeVersion = derivativeKey
-                        fieldcache.setNode(self._nodes.findNodeByIdentifier(nodeIdentifier))
-                        if updateDirections:
-                            x = [0.0 for _ in range(componentsCount)]
-                        else:
-                            result, x = self._field.getNodeParameters(
-                                fieldcache, -1, nodeValueLabel, nodeVersion, componentsCount)
-                        mag = 0.0
-                        for derivativeEdge in derivativeEdges:
-                            edge, expressionIndex, totalScaleFactor = derivativeEdge
-                            arcLength = edge.getArcLength()
-                            if updateDirections:
-                                delta = edge.getDelta()
-                                if totalScaleFactor < 0.0:
-                                    delta = [-d for d in delta]
-                                for c in range(componentsCount):
-                                    x[c] += delta[c] / arcLength
-                            if self._scalingMode == DerivativeScalingMode.ARITHMETIC_MEAN:
-                                mag += arcLength / math.fabs(totalScaleFactor)
-                            else:  # self._scalingMode == DerivativeScalingMode.HARMONIC_MEAN
-                                mag += math.fabs(totalScaleFactor) / arcLength
-                        if self._scalingMode == DerivativeScalingMode.ARITHMETIC_MEAN:
-                            mag /= edgeCount
-                        else:  # self._scalingMode == DerivativeScalingMode.HARMONIC_MEAN
-                            mag = edgeCount / mag
-                        if mag <= 0.0:
-                            print('Node', nodeIdentifier, 'value', nodeValueLabel, 'version', nodeVersion,
-                                  'has negative mag', mag)
-                        x = set_magnitude(x, mag)
-                        self._field.setNodeParameters(fieldcache, -1, nodeValueLabel, nodeVersion, x)
-                for derivativeKey, derivativeEdges in self._derivativeMap.items():
-                    edgeCount = len(derivativeEdges)
-                    if edgeCount == 1:
-                        # boundary smoothing over single edge
-                        nodeIdentifier, nodeValueLabel, nodeVersion = derivativeKey
-                        edge, expressionIndex, totalScaleFactor = derivativeEdges[0]
-                        # re-evaluate arc length so parameters are up-to-date for other end
-                        arcLength = edge.evaluateArcLength(self._nodes, self._field, fieldcache)
-                        # since changed by evaluateArcLength:
-                        fieldcache.setNode(self._nodes.findNodeByIdentifier(nodeIdentifier))
-                        otherExpressionIndex = 3 if (expressionIndex == 1) else 1
-                        otherd = edge.getParameter(otherExpressionIndex)
-                        bothEndsOnBoundary = False
-                        otherExpression = edge.getExpression(otherExpressionIndex)
-                        if len(otherExpression) == 1:
-                            otherNodeIdentifier, otherValueLabel, otherNodeVersion, otherTotalScaleFactor = \
-                                otherExpression[0]
-                            otherDerivativeKey = (otherNodeIdentifier, otherValueLabel, otherNodeVersion)
-                            otherDerivativeEdges = self._derivativeMap.get(otherDerivativeKey)
-                            bothEndsOnBoundary = \
-                                (otherDerivativeEdges is not None) and (len(otherDerivativeEdges) == 1)
-                        if updateDirections:
-                            thisx = edge.getParameter(expressionIndex - 1)
-                            otherx = edge.getParameter(otherExpressionIndex - 1)
-                            if bothEndsOnBoundary:
-                                if expressionIndex == 1:
-                                    x = [(otherx[c] - thisx[c]) for c in range(componentsCount)]
-                                else:
-                                    x = [(thisx[c] - otherx[c]) for c in range(componentsCount)]
-                            else:
-                                if expressionIndex == 1:
-                                    x = interpolateLagrangeHermiteDerivative(thisx, otherx, otherd, 0.0)
-                                else:
-                                    x = interpolateHermiteLagrangeDerivative(otherx, otherd, thisx, 1.0)
-                            x = [d / totalScaleFactor for d in x]
-                        else:
-                            result, x = self._field.getNodeParameters(
-                                fieldcache, -1, nodeValueLabel, nodeVersion, componentsCount)
-                        if bothEndsOnBoundary:
-                            mag = arcLength / totalScaleFactor
-                        else:
-                            othermag = magnitude(otherd)
-                            mag = (2.0*arcLength - othermag) / math.fabs(totalScaleFactor)
-                            if mag <= 0.0:
-                                print('Derivative smoothing: Node', nodeIdentifier, 'label', nodeValueLabel,
-                                      'version', nodeVersion, 'has negative magnitude', mag)
-                        x = set_magnitude(x, mag)
-                        self._field.setNodeParameters(fieldcache, -1, nodeValueLabel, nodeVersion, x)
+                self._smoothInteriorDerivatives(parameters, edgeParameters, arcLengths, updateDirections)
+                self._smoothBoundaryDerivatives(parameters, updateDirections)
+            if solved or (iterate and (smoothIter > 0)):
+                self._setDerivativeParameters(fieldcache, parameters)
             # record modified nodes while ChangeManager is in effect
             if self._editNodesetGroup:
                 for derivativeKey in self._derivativeMap:
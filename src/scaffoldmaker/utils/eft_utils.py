@@ -9,6 +9,65 @@ from scaffoldmaker.utils.interpolation import (
     computeCubicHermiteEndDerivative, interpolateHermiteLagrangeDerivative, interpolateLagrangeHermiteDerivative)
 import copy
 import math
+import numpy
+
+
+_elementfieldtemplateCreationsCount = 0  # incremented by createElementfieldtemplate() for profiling
+
+
+def createElementfieldtemplate(mesh, elementbasis):
+    """
+    Create element field template on mesh, counting creations for profiling generation.
+    :param mesh: Zinc Mesh to create template for.
+    :param elementbasis: Zinc Elementbasis to create template with.
+    :return: New Zinc Elementfieldtemplate.
+    """
+    global _elementfieldtemplateCreationsCount
+    _elementfieldtemplateCreationsCount += 1
+    return mesh.createElementfieldtemplate(elementbasis)
+
+
+def getElementfieldtemplateCreationsCount():
+    """
+    Get total number of element field templates made with createElementfieldtemplate() since start of session.
+    Take difference between calls to get number made by intervening code.
+    """
+    return _elementfieldtemplateCreationsCount
+
+
+def _getHashableArguments(arguments):
+    """
+    Convert lists in arguments to tuples, recursively.
+    """
+    if isinstance(arguments, (list, tuple, range)):
+        return tuple(_getHashableArguments(argument) for argument in arguments)
+    return arguments
+
+
+def getCachedEft(eftCache, eftfactory, createMethodName, createArguments=(), remaps=()):
+    """
+    Get element field template made by an eftfactory method with arguments, followed by any remap operations
+    described as data, reusing an identical template made previously on the same factory.
+    Templates returned from the cache must not be modified by the caller.
+    :param eftCache: The factory's dict mapping keys of method name, arguments and remaps to templates.
+    :param eftfactory: Factory object e.g. eftfactory_tricubichermite, whose mesh and settings are fixed.
+    :param createMethodName: Name of factory method creating the template e.g. "createEftShellPoleBottom".
+    :param createArguments: Sequence of arguments to pass to the create method.
+    :param remaps: Sequence of remap operations to apply after creation, each a tuple of the name of a function
+    in this module taking eft as its first argument, followed by its other arguments, e.g.
+    ("remapEftNodeValueLabel", [1, 3], Node.VALUE_LABEL_D_DS1, [(Node.VALUE_LABEL_D_DS1, [1])]).
+    :return: Validated Zinc Elementfieldtemplate.
+    """
+    key = (createMethodName, _getHashableArguments(createArguments), _getHashableArguments(remaps))
+    eft = eftCache.get(key)
+    if eft is None:
+        eft = getattr(eftfactory, createMethodName)(*createArguments)
+        for remap in remaps:
+            _eftRemapFunctions[remap[0]](eft, *remap[1:])
+        if remaps:
+            assert eft.validate(), "getCachedEft:  Failed to validate eft for " + createMethodName + " with remaps"
+        eftCache[key] = eft
+    return eft
 
 
 def getEftTermScaling(eft, functionIndex, termIndex):
@@ -422,7 +481,7 @@ def determineTricubicHermiteEft(mesh, nodeParameters, nodeDerivativeFixedWeights
     tricubicHermiteBasis = fieldmodule.createElementbasis(
         3, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE_SERENDIPITY if serendipity
         else Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
-    eft = mesh.createElementfieldtemplate(tricubicHermiteBasis)
+    eft = createElementfieldtemplate(mesh, tricubicHermiteBasis)
     scalefactors = None
     derivativeLabels = [Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D_DS3]
     crossDerivativeLabels = [Node.VALUE_LABEL_D2_DS1DS2, Node.VALUE_LABEL_D2_DS1DS3,
@@ -503,8 +562,12 @@ class HermiteNodeLayout:
     """
     From the allowable derivative directions expressed as weighted sums, determines all
     possible permutations of them giving a right-handed corner without other directions inside them.
+    Permutations are determined once per process for each distinct list of directions.
     """
 
+    # map from directions as tuple of tuples to permutations list, shared by all instances
+    _permutationsCache = {}
+
     def __init__(self, directions, baseNodeLayout=None, limitDirections=None):
         """
         Construct a new node layout from either directions, or baseNodeLayout with limitDirections.
@@ -523,7 +586,18 @@ class HermiteNodeLayout:
         self._limitDirections = limitDirections if limitDirections else []
         self._cubicDimensions = len(self._directions[0])
         assert self._cubicDimensions in (2, 3)
-        self._permutations = baseNodeLayout.getPermutations() if baseNodeLayout else self._determinePermutations()
+        if baseNodeLayout:
+            self._permutations = baseNodeLayout.getPermutations()
+        else:
+            directionsKey = tuple(tuple(direction) for direction in self._directions)
+            self._permutations = HermiteNodeLayout._permutationsCache.get(directionsKey)
+            if self._permutations is None:
+                self._permutations = self._determinePermutations()
+                HermiteNodeLayout._permutationsCache[directionsKey] = self._permutations
+        # map from limitDirections as tuples to limited node layouts, for getLimitedNodeLayout()
+        self._limitedNodeLayouts = {}
+        # map from local node index to permutation arrays, for getDerivativeWeightsList()
+        self._localNodePermutationArrays = {}
 
     def _determinePermutations(self):
         """
@@ -584,15 +658,28 @@ class HermiteNodeLayout:
     def getPermutations(self):
         return self._permutations
 
-    def getDerivativeWeightsList(self, nodeDeltas, nodeDerivatives, localNodeIndex):
+    def getLimitedNodeLayout(self, limitDirections):
         """
-        Get derivative weights for permutation making nodeDerivatives closest to nodeDeltas.
-        :param nodeDeltas: List of 3 delta side coordinates to match.
-        :param nodeDerivatives: List of [d1, d2, d3] parameters from node. d3 is None if linear through wall or 2-D.
-        :param localNodeIndex: Local node index from 0 to 7 in Zinc order, which flips allowable directions.
-        :return: List of weights for d1, d2, d3 to give d/dxi1, d/dxi2, d/dxi3.
+        Get variant of this node layout limiting some directions, reusing one made earlier with the same limits.
+        :param limitDirections: List over element directions of lists of allowable weights for that direction,
+        or None to not filter. See __init__().
+        :return: HermiteNodeLayout, or self if limitDirections is None or empty.
+        """
+        if not limitDirections:
+            return self
+        limitKey = tuple(tuple(tuple(weights) for weights in directionLimits) if directionLimits else None
+                         for directionLimits in limitDirections)
+        nodeLayout = self._limitedNodeLayouts.get(limitKey)
+        if not nodeLayout:
+            nodeLayout = HermiteNodeLayout(None, self, limitDirections)
+            self._limitedNodeLayouts[limitKey] = nodeLayout
+        return nodeLayout
+
+    def _getLocalNodeFlipsSwizzle(self, localNodeIndex):
+        """
+        :param localNodeIndex: Local node index from 0 to 7 in Zinc order.
+        :return: flips list over element directions, swizzleIndexes.
         """
-        derivativesPerNode = self._cubicDimensions
         if self._cubicDimensions == 2:
             flips = [localNodeIndex in [1, 3, 5, 7], localNodeIndex in [2, 3, 6, 7]]
             # need to swizzle indexes if odd number of flips, to keep right-handed layout
@@ -605,11 +692,19 @@ class HermiteNodeLayout:
             flipCount = sum(1 for flip in flips if flip)
             swizzle = (flipCount % 2) == 1
             swizzleIndexes = [0, 2, 1] if swizzle else [0, 1, 2]
+        return flips, swizzleIndexes
 
-        # modify deltas to point inward towards opposite node
-        inwardNodeDeltas = [[-d for d in nodeDeltas[i]] if flips[i] else nodeDeltas[i] for i in swizzleIndexes]
-        derivativeWeightsList = None
-        greatestSimilarity = -1.0
+    def _getLocalNodePermutationArrays(self, localNodeIndex):
+        """
+        Get permutations allowed by limitDirections at local node, and their weights as an array. Cached.
+        :param localNodeIndex: Local node index from 0 to 7 in Zinc order, which flips allowable directions.
+        :return: list of permutations, numpy array of weights with shape (permutations, derivatives, derivatives).
+        """
+        permutationArrays = self._localNodePermutationArrays.get(localNodeIndex)
+        if permutationArrays:
+            return permutationArrays
+        flips, swizzleIndexes = self._getLocalNodeFlipsSwizzle(localNodeIndex)
+        permutations = []
         for permutation in self._permutations:
             # skip permutations using directions not in any supplied limitDirections
             skipPermutation = False
@@ -626,28 +721,57 @@ class HermiteNodeLayout:
                         skipPermutation = True
                         break
                 limitIndex += 1
-            if skipPermutation:
-                continue
-            similarity = 0.0
-            for d in range(derivativesPerNode):
-                weights = permutation[d]
-                derivative = [0.0, 0.0, 0.0]
-                for i in range(derivativesPerNode):
-                    if weights[i]:
-                        weight = weights[i]
-                        nodeDerivative = nodeDerivatives[i]
-                        for c in range(3):
-                            derivative[c] += weight * nodeDerivative[c]
-                delta = inwardNodeDeltas[d]
-                magDelta = magnitude(delta)
-                magDerivative = magnitude(derivative)
-                if magDerivative > 0.0:
-                    cosineSimilarity = dot(derivative, delta) / (magDerivative * magDelta)
-                    # magnitudeSimilarity = math.exp(-math.fabs((magDerivative - magDelta) / magDelta))
-                    similarity += cosineSimilarity  # * magnitudeSimilarity
-            if similarity > greatestSimilarity:
-                greatestSimilarity = similarity
-                derivativeWeightsList = permutation
+            if not skipPermutation:
+                permutations.append(permutation)
+        weightsArray = numpy.array(permutations, dtype=float).reshape(
+            (len(permutations), self._cubicDimensions, self._cubicDimensions))
+        permutationArrays = (permutations, weightsArray)
+        self._localNodePermutationArrays[localNodeIndex] = permutationArrays
+        return permutationArrays
+
+    def getDerivativeWeightsList(self, nodeDeltas, nodeDerivatives, localNodeIndex):
+        """
+        Get derivative weights for permutation making nodeDerivatives closest to nodeDeltas.
+        Scores all permutations together as array operations, summing terms in the same order as the scalar
+        calculation so the chosen permutation is identical.
+        :param nodeDeltas: List of 3 delta side coordinates to match.
+        :param nodeDerivatives: List of [d1, d2, d3] parameters from node. d3 is None if linear through wall or 2-D.
+        :param localNodeIndex: Local node index from 0 to 7 in Zinc order, which flips allowable directions.
+        :return: List of weights for d1, d2, d3 to give d/dxi1, d/dxi2, d/dxi3.
+        """
+        derivativesPerNode = self._cubicDimensions
+        flips, swizzleIndexes = self._getLocalNodeFlipsSwizzle(localNodeIndex)
+        permutations, weights = self._getLocalNodePermutationArrays(localNodeIndex)
+        derivativeWeightsList = None
+        if permutations:
+            # modify deltas to point inward towards opposite node
+            inwardNodeDeltas = numpy.array(
+                [[-d for d in nodeDeltas[i]] if flips[i] else nodeDeltas[i] for i in swizzleIndexes], dtype=float)
+            # derivatives[p, d, c] = sum over i of weights[p, d, i] * nodeDerivatives[i][c]
+            derivatives = None
+            for i in range(derivativesPerNode):
+                nodeDerivative = numpy.array(nodeDerivatives[i] if nodeDerivatives[i] is not None else [0.0, 0.0, 0.0],
+                                             dtype=float)
+                term = weights[:, :, i:i + 1] * nodeDerivative
+                derivatives = term if derivatives is None else derivatives + term
+            magDerivatives = numpy.sqrt(
+                derivatives[:, :, 0] * derivatives[:, :, 0] + derivatives[:, :, 1] * derivatives[:, :, 1] +
+                derivatives[:, :, 2] * derivatives[:, :, 2])
+            magDeltas = numpy.sqrt(
+                inwardNodeDeltas[:, 0] * inwardNodeDeltas[:, 0] + inwardNodeDeltas[:, 1] * inwardNodeDeltas[:, 1] +
+                inwardNodeDeltas[:, 2] * inwardNodeDeltas[:, 2])
+            dots = (derivatives[:, :, 0] * inwardNodeDeltas[:, 0] + derivatives[:, :, 1] * inwardNodeDeltas[:, 1] +
+                    derivatives[:, :, 2] * inwardNodeDeltas[:, 2])
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                cosineSimilarities = numpy.where(magDerivatives > 0.0, dots / (magDerivatives * magDeltas), 0.0)
+            similarities = cosineSimilarities[:, 0]
+            for d in range(1, derivativesPerNode):
+                similarities = similarities + cosineSimilarities[:, d]
+            similarities[numpy.isnan(similarities)] = -numpy.inf
+            # first permutation with the greatest similarity exceeding -1.0
+            p = int(numpy.argmax(similarities))
+            if similarities[p] > -1.0:
+                derivativeWeightsList = permutations[p]
         finalWeightsList = [
             [-w for w in derivativeWeightsList[swizzleIndexes[i]]] if flips[i]
             else derivativeWeightsList[swizzleIndexes[i]] for i in range(derivativesPerNode)
@@ -736,7 +860,6 @@ class HermiteNodeLayoutManager:
     def getNodeLayoutRegularPermuted(self, d3Defined, limitDirections=None):
         """
         Get node layout for permutations of +/- d1, d2, d3, optionally limiting some directions.
-        Note that variants using limitDirections are not currently stored so client should hold them if reusing.
         :param d3Defined: Set to True to use tricubic variant with d3 defined, otherwise bicubic is used.
         :param limitDirections: Optional list over element directions of lists of allowable weights for that
         direction, or None to not filter. Default None for whole list does not filter any directions.
@@ -745,9 +868,7 @@ class HermiteNodeLayoutManager:
         :return: HermiteNodeLayout.
         """
         nodeLayout = self._nodeLayoutRegularPermuted_d3Defined if d3Defined else self._nodeLayoutRegularPermuted
-        if limitDirections:
-            nodeLayout = HermiteNodeLayout(None, nodeLayout, limitDirections)
-        return nodeLayout
+        return nodeLayout.getLimitedNodeLayout(limitDirections)
 
     def getNodeLayout5Way12(self, d3Defined, limitDirections=None):
         """
@@ -760,9 +881,7 @@ class HermiteNodeLayoutManager:
         :return: HermiteNodeLayout.
         """
         nodeLayout = self._nodeLayout5Way12_d3Defined if d3Defined else self._nodeLayout5Way12
-        if limitDirections:
-            nodeLayout = HermiteNodeLayout(None, nodeLayout, limitDirections)
-        return nodeLayout
+        return nodeLayout.getLimitedNodeLayout(limitDirections)
 
     def getNodeLayout6Way12(self, d3Defined, limitDirections=None):
         """
@@ -775,9 +894,7 @@ class HermiteNodeLayoutManager:
         :return: HermiteNodeLayout.
         """
         nodeLayout = self._nodeLayout6Way12_d3Defined if d3Defined else self._nodeLayout6Way12
-        if limitDirections:
-            nodeLayout = HermiteNodeLayout(None, nodeLayout, limitDirections)
-        return nodeLayout
+        return nodeLayout.getLimitedNodeLayout(limitDirections)
 
     def getNodeLayout8Way12(self, d3Defined):
         """
@@ -969,6 +1086,57 @@ def determineCubicHermiteSerendipityEft(mesh, nodeParameters, nodeLayouts):
     :return: eft, scale factors list [-1.0] or None. Returned eft can be further modified.
     """
     meshDimension = mesh.getDimension()
+    d3Defined = (meshDimension == 3) and (nodeParameters[0][3] is not None)
+    nodeDerivativeWeightsList = determineCubicHermiteSerendipityDerivativeWeights(
+        meshDimension, nodeParameters, nodeLayouts)
+    return createCubicHermiteSerendipityEft(mesh, d3Defined, nodeDerivativeWeightsList)
+
+
+def determineCubicHermiteSerendipityEfts(mesh, nodeParametersList, nodeLayoutsList):
+    """
+    Determine bicubic or tricubic Hermite serendipity element field templates for many elements
+    as for determineCubicHermiteSerendipityEft, creating only one template for each distinct set
+    of derivative weights found. Use for meshes with many elements sharing few node layouts.
+    :param mesh: A Zinc mesh of dimension 2 or 3.
+    :param nodeParametersList: List over elements of nodeParameters as for
+    determineCubicHermiteSerendipityEft.
+    :param nodeLayoutsList: List over elements of nodeLayouts as for
+    determineCubicHermiteSerendipityEft.
+    :return: List over elements of (eft, scale factors list [-1.0] or None). Efts are shared by
+    elements with the same derivative weights so must not be modified.
+    """
+    assert len(nodeParametersList) == len(nodeLayoutsList)
+    meshDimension = mesh.getDimension()
+    eftsScalefactors = []
+    eftCache = {}
+    for nodeParameters, nodeLayouts in zip(nodeParametersList, nodeLayoutsList):
+        d3Defined = (meshDimension == 3) and (nodeParameters[0][3] is not None)
+        nodeDerivativeWeightsList = determineCubicHermiteSerendipityDerivativeWeights(
+            meshDimension, nodeParameters, nodeLayouts)
+        key = (d3Defined, _getHashableArguments(nodeDerivativeWeightsList))
+        eftScalefactors = eftCache.get(key)
+        if not eftScalefactors:
+            eftScalefactors = createCubicHermiteSerendipityEft(mesh, d3Defined, nodeDerivativeWeightsList)
+            eftCache[key] = eftScalefactors
+        eftsScalefactors.append(eftScalefactors)
+    return eftsScalefactors
+
+
+def determineCubicHermiteSerendipityDerivativeWeights(meshDimension, nodeParameters, nodeLayouts):
+    """
+    Determine weights of node derivatives giving each element derivative at the corners of a
+    square or cube, by matching deltas between corners with node derivatives.
+    Nodes are matched in order from default then simplest to most complex node layout, with each
+    node's choice updating the deltas used to match later nodes.
+    :param meshDimension: 2 or 3.
+    :param nodeParameters: List over 4 (2-D) or 8 (3-D) local nodes in Zinc ordering of
+    4 parameter vectors x, d1, d2, d3 each with 3 components. d3 is not used in 2-D, and in
+    3-d if d3 is omitted the basis is linear in that direction.
+    :param nodeLayouts: List over 4 or 8 local nodes of HermiteNodeLayout objects, or None for
+    the standard, regular layout.
+    :return: List over 4 or 8 local nodes of derivative weights lists from
+    HermiteNodeLayout.getDerivativeWeightsList, or None for nodes with standard layout.
+    """
     nodesCount = len(nodeParameters)
     assert ((meshDimension == 2) and (nodesCount == 4)) or ((meshDimension == 3) and (nodesCount == 8))
     assert len(nodeParameters[0]) == 4
@@ -1002,15 +1170,7 @@ def determineCubicHermiteSerendipityEft(mesh, nodeParameters, nodeLayouts):
             [delta78, delta57, delta37],
             [delta78, delta68, delta48]
         ]
-    fieldmodule = mesh.getFieldmodule()
-    elementbasis = fieldmodule.createElementbasis(meshDimension, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE_SERENDIPITY)
-    if (meshDimension == 3) and not d3Defined:
-        elementbasis.setFunctionType(3, Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE)
-    eft = mesh.createElementfieldtemplate(elementbasis)
-    scalefactors = None
-    derivativeLabels = [Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D_DS3]
     derivativesPerNode = 3 if d3Defined else 2
-    functionsPerNode = 1 + derivativesPerNode
     # order local nodes from default then simplest to most complex node layout
     nodeOrder = []
     for n in range(nodesCount):
@@ -1027,8 +1187,8 @@ def determineCubicHermiteSerendipityEft(mesh, nodeParameters, nodeLayouts):
                 lowestComplexity = complexity
                 next_n = n
         nodeOrder.append(next_n)
+    nodeDerivativeWeightsList = [None] * nodesCount
     for n in nodeOrder:
-        ln = n + 1
         nodeLayout = nodeLayouts[n]
         nodeDerivatives = [
             nodeParameters[n][1],
@@ -1036,24 +1196,14 @@ def determineCubicHermiteSerendipityEft(mesh, nodeParameters, nodeLayouts):
             nodeParameters[n][3] if d3Defined else None]
         derivativeWeightsList =\
             nodeLayout.getDerivativeWeightsList(deltas[n], nodeDerivatives, n) if nodeLayout else None
+        nodeDerivativeWeightsList[n] = derivativeWeightsList
         for ed in range(derivativesPerNode):
             if nodeLayout:
                 derivativeWeights = derivativeWeightsList[ed]
-                functionNumber = n * functionsPerNode + ed + 2
-                termsCount = sum(1 for wt in derivativeWeights if wt != 0.0)
-                eft.setFunctionNumberOfTerms(functionNumber, termsCount)
-                term = 0
                 elementDerivative = [0.0, 0.0, 0.0]
                 for i in range(derivativesPerNode):
                     weight = derivativeWeights[i]
                     if weight:
-                        term += 1
-                        eft.setTermNodeParameter(functionNumber, term, ln, derivativeLabels[i], 1)
-                        if weight < 0.0:
-                            if not scalefactors:
-                                setEftScaleFactorIds(eft, [1], [])
-                                scalefactors = [-1.0]
-                            eft.setTermScaling(functionNumber, term, [1])
                         for c in range(3):
                             elementDerivative[c] += weight * nodeDerivatives[i][c]
             else:
@@ -1074,6 +1224,50 @@ def determineCubicHermiteSerendipityEft(mesh, nodeParameters, nodeLayouts):
                     interpolateLagrangeHermiteDerivative(nodeParameters[on][0], nodeParameters[n][0], elementDerivative, 0.0))
                 deltas[on][ed] = otherElementDerivative
 
+    return nodeDerivativeWeightsList
+
+
+def createCubicHermiteSerendipityEft(mesh, d3Defined, nodeDerivativeWeightsList):
+    """
+    Create bicubic or tricubic Hermite serendipity element field template using derivative weights
+    at each local node.
+    :param mesh: A Zinc mesh of dimension 2 or 3.
+    :param d3Defined: For 3-D mesh, True if cubic in third direction, False if linear.
+    :param nodeDerivativeWeightsList: List over 4 (2-D) or 8 (3-D) local nodes of derivative weights
+    lists as returned by determineCubicHermiteSerendipityDerivativeWeights, or None for nodes with
+    standard layout.
+    :return: eft, scale factors list [-1.0] or None.
+    """
+    meshDimension = mesh.getDimension()
+    fieldmodule = mesh.getFieldmodule()
+    elementbasis = fieldmodule.createElementbasis(meshDimension, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE_SERENDIPITY)
+    if (meshDimension == 3) and not d3Defined:
+        elementbasis.setFunctionType(3, Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE)
+    eft = createElementfieldtemplate(mesh, elementbasis)
+    scalefactors = None
+    derivativeLabels = [Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D_DS3]
+    derivativesPerNode = 3 if d3Defined else 2
+    functionsPerNode = 1 + derivativesPerNode
+    for n, derivativeWeightsList in enumerate(nodeDerivativeWeightsList):
+        if not derivativeWeightsList:
+            continue
+        ln = n + 1
+        for ed in range(derivativesPerNode):
+            derivativeWeights = derivativeWeightsList[ed]
+            functionNumber = n * functionsPerNode + ed + 2
+            termsCount = sum(1 for wt in derivativeWeights if wt != 0.0)
+            eft.setFunctionNumberOfTerms(functionNumber, termsCount)
+            term = 0
+            for i in range(derivativesPerNode):
+                weight = derivativeWeights[i]
+                if weight:
+                    term += 1
+                    eft.setTermNodeParameter(functionNumber, term, ln, derivativeLabels[i], 1)
+                    if weight < 0.0:
+                        if not scalefactors:
+                            setEftScaleFactorIds(eft, [1], [])
+                            scalefactors = [-1.0]
+                        eft.setTermScaling(functionNumber, term, [1])
     return eft, scalefactors
 
 
@@ -1152,3 +1346,10 @@ def addTricubicHermiteSerendipityEftParameterScaling(eft, scalefactors, nodePara
         return eft, newScalefactors, addScalefactors
     remapEftNodeValueLabelsVersion(eft, localNodeIndexes, [valueLabel], version)
     return eft, scalefactors, addScalefactors
+
+
+# functions modifying element field templates which can be described as data for getCachedEft()
+_eftRemapFunctions = {function.__name__: function for function in (
+    addEftNodeScaleFactorIds, addScaleEftNodesValueLabel, mapEftFunction1Node1Term, mapEftFunction1Node2Terms,
+    remapEftLocalNodes, remapEftNodeValueLabel, remapEftNodeValueLabelsVersion, remapEftNodeValueLabelVersion,
+    remapEftNodeValueLabelWithNodes, scaleEftNodeValueLabels, setEftScaleFactorIds)}
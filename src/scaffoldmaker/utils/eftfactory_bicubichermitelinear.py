@@ -3,7 +3,8 @@ Definitions of standard element field templates using bicubic Hermite x linear L
 """
 from cmlibs.zinc.element import Elementbasis
 from cmlibs.zinc.node import Node
-from scaffoldmaker.utils.eft_utils import remapEftLocalNodes, remapEftNodeValueLabel, setEftScaleFactorIds
+from scaffoldmaker.utils.eft_utils import createElementfieldtemplate, getCachedEft, remapEftLocalNodes, \
+    remapEftNodeValueLabel, setEftScaleFactorIds
 
 
 class eftfactory_bicubichermitelinear:
@@ -35,6 +36,7 @@ class eftfactory_bicubichermitelinear:
         self._fieldmodule = mesh.getFieldmodule()
         self._basis = self._fieldmodule.createElementbasis(3, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
         self._basis.setFunctionType(linearAxis, Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE)
+        self._eftCache = {}  # map from method name, arguments and remaps to template, for getCachedEft()
 
     def _remapDefaultNodeDerivatives(self, eft):
         """
@@ -53,6 +55,14 @@ class eftfactory_bicubichermitelinear:
     def getElementbasis(self):
         return self._basis
 
+    def getCachedEft(self, createMethodName, createArguments=(), remaps=()):
+        """
+        Get element field template from the named create method with arguments, followed by any remaps described
+        as data, reusing an identical template made earlier by this factory. See eft_utils.getCachedEft().
+        :return: Element field template, which must not be modified.
+        """
+        return getCachedEft(self._eftCache, self, createMethodName, createArguments, remaps)
+
     def createEftBasic(self):
         """
         Create the basic biicubic Hermite x linear Lagrange element template with 1:1 mappings to
@@ -61,7 +71,7 @@ class eftfactory_bicubichermitelinear:
         """
         if not self._useCrossDerivatives:
             return self.createEftNoCrossDerivatives()
-        eft = self._mesh.createElementfieldtemplate(self._basis)
+        eft = createElementfieldtemplate(self._mesh, self._basis)
         self._remapDefaultNodeDerivatives(eft)
         assert eft.validate(), 'eftfactory_bicubichermitelinear.createEftBasic:  Failed to validate eft'
         return eft
@@ -72,7 +82,7 @@ class eftfactory_bicubichermitelinear:
         node derivatives ds1 & ds2, without cross derivatives.
         :return: Element field template
         """
-        eft = self._mesh.createElementfieldtemplate(self._basis)
+        eft = createElementfieldtemplate(self._mesh, self._basis)
         for n in range(8):
             eft.setFunctionNumberOfTerms(n*4 + 4, 0)
         self._remapDefaultNodeDerivatives(eft)
@@ -94,7 +104,7 @@ class eftfactory_bicubichermitelinear:
         :return: Element field template
         """
         # start with full bicubic hermite linear to remap D2_DS1DS2 at pole
-        eft = self._mesh.createElementfieldtemplate(self._basis)
+        eft = createElementfieldtemplate(self._mesh, self._basis)
         if not self._useCrossDerivatives:
             for n in [ 2, 3, 6, 7 ]:
                 eft.setFunctionNumberOfTerms(n*4 + 4, 0)
@@ -142,7 +152,7 @@ class eftfactory_bicubichermitelinear:
         :return: Element field template
         """
         # start with full bicubic hermite linear to remap D2_DS1DS2 at pole
-        eft = self._mesh.createElementfieldtemplate(self._basis)
+        eft = createElementfieldtemplate(self._mesh, self._basis)
         if not self._useCrossDerivatives:
             for n in [ 0, 1, 4, 5 ]:
                 eft.setFunctionNumberOfTerms(n*4 + 4, 0)
@@ -405,7 +415,7 @@ class eftfactory_bicubichermitelinear:
         :return: Element field template
         """
         # start with full bicubic hermite linear
-        eft = self._mesh.createElementfieldtemplate(self._basis)
+        eft = createElementfieldtemplate(self._mesh, self._basis)
 
         for n in [ 2, 3, 6, 7 ]:
             eft.setFunctionNumberOfTerms(n * 4 + 4, 0)
@@ -461,7 +471,7 @@ class eftfactory_bicubichermitelinear:
         :return: Element field template
         """
         # start with full bicubic hermite linear
-        eft = self._mesh.createElementfieldtemplate(self._basis)
+        eft = createElementfieldtemplate(self._mesh, self._basis)
         for n in [ 2, 3, 6, 7 ]:
             eft.setFunctionNumberOfTerms(n * 4 + 4, 0)
 
@@ -515,7 +525,7 @@ class eftfactory_bicubichermitelinear:
         :return: Element field template
         """
         # start with full bicubic hermite linear
-        eft = self._mesh.createElementfieldtemplate(self._basis)
+        eft = createElementfieldtemplate(self._mesh, self._basis)
         for n in [ 2, 3, 6, 7 ]:
             eft.setFunctionNumberOfTerms(n * 4 + 4, 0)
 
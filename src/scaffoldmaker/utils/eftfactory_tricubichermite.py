@@ -9,7 +9,8 @@ from cmlibs.utils.zinc.finiteelement import getElementNodeIdentifiers
 from cmlibs.zinc.element import Element, Elementbasis, Elementfieldtemplate
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
-from scaffoldmaker.utils.eft_utils import mapEftFunction1Node1Term, remapEftLocalNodes, remapEftNodeValueLabel, scaleEftNodeValueLabels, setEftScaleFactorIds
+from scaffoldmaker.utils.eft_utils import createElementfieldtemplate, getCachedEft, mapEftFunction1Node1Term, \
+    remapEftLocalNodes, remapEftNodeValueLabel, scaleEftNodeValueLabels, setEftScaleFactorIds
 
 
 class eftfactory_tricubichermite:
@@ -27,10 +28,19 @@ class eftfactory_tricubichermite:
         self._useCrossDerivatives = useCrossDerivatives
         self._fieldmodule = mesh.getFieldmodule()
         self._tricubicHermiteBasis = self._fieldmodule.createElementbasis(3, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
+        self._eftCache = {}  # map from method name, arguments and remaps to template, for getCachedEft()
 
     def getElementbasis(self):
         return self._tricubicHermiteBasis
 
+    def getCachedEft(self, createMethodName, createArguments=(), remaps=()):
+        '''
+        Get element field template from the named create method with arguments, followed by any remaps described
+        as data, reusing an identical template made earlier by this factory. See eft_utils.getCachedEft().
+        :return: Element field template, which must not be modified.
+        '''
+        return getCachedEft(self._eftCache, self, createMethodName, createArguments, remaps)
+
     def createEftBasic(self):
         '''
         Create the basic tricubic hermite element field template with 1:1 mappings to
@@ -39,7 +49,7 @@ class eftfactory_tricubichermite:
         '''
         if not self._useCrossDerivatives:
             return self.createEftNoCrossDerivatives()
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         assert eft.validate(), 'eftfactory_tricubichermite.createEftBasic:  Failed to validate eft'
         return eft
 
@@ -49,7 +59,7 @@ class eftfactory_tricubichermite:
         node derivatives, without cross derivatives.
         :return: Element field template
         '''
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         for n in range(8):
             eft.setFunctionNumberOfTerms(n*8 + 4, 0)
             eft.setFunctionNumberOfTerms(n*8 + 6, 0)
@@ -118,7 +128,7 @@ class eftfactory_tricubichermite:
         :return: Element field template
         '''
         # start with full tricubic to remap D2_DS1DS2 at pole
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         if not self._useCrossDerivatives:
             for n in [ 2, 3, 6, 7 ]:
                 eft.setFunctionNumberOfTerms(n*8 + 4, 0)
@@ -177,7 +187,7 @@ class eftfactory_tricubichermite:
         :return: Element field template
         '''
         # start with full tricubic to remap D2_DS1DS2 at pole
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         if not self._useCrossDerivatives:
             for n in [ 0, 1, 4, 5 ]:
                 eft.setFunctionNumberOfTerms(n*8 + 4, 0)
@@ -236,7 +246,7 @@ class eftfactory_tricubichermite:
         :return: Element field template
         '''
         # start with full tricubic
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         if not self._useCrossDerivatives:
             for n in [ 4, 5, 6, 7 ]:
                 eft.setFunctionNumberOfTerms(n*8 + 4, 0)
@@ -299,7 +309,7 @@ class eftfactory_tricubichermite:
         :return: Element field template
         '''
         # start with full tricubic
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         for n in [ 2, 3, 6, 7 ]:
             eft.setFunctionNumberOfTerms(n*8 + 4, 0)
             if n > 3:
@@ -378,7 +388,7 @@ class eftfactory_tricubichermite:
         :return: Element field template
         '''
         # start with full tricubic
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         for n in [ 0, 1, 4, 5 ]:
             eft.setFunctionNumberOfTerms(n*8 + 4, 0)
             if n > 1:
@@ -454,7 +464,7 @@ class eftfactory_tricubichermite:
         :return: Element field template
         '''
         # start with full tricubic
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
 
         for n in [ 2, 3, 6, 7 ]:
             eft.setFunctionNumberOfTerms(n * 8 + 4, 0)
@@ -530,7 +540,7 @@ class eftfactory_tricubichermite:
         :return: Element field template
         '''
         # start with full tricubic
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         for n in [ 2, 3, 6, 7 ]:
             eft.setFunctionNumberOfTerms(n * 8 + 4, 0)
             eft.setFunctionNumberOfTerms(n * 8 + 6, 0)
@@ -608,7 +618,7 @@ class eftfactory_tricubichermite:
         :return: Element field template
         '''
         # start with full tricubic
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         for n in [ 2, 3, 6, 7 ]:
             eft.setFunctionNumberOfTerms(n*8 + 4, 0)
             eft.setFunctionNumberOfTerms(n*8 + 6, 0)
@@ -672,7 +682,7 @@ class eftfactory_tricubichermite:
         :return: Element field template
         '''
         # start with full tricubic
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         for n in [ 0, 1, 4, 5 ]:
             eft.setFunctionNumberOfTerms(n*8 + 4, 0)
             eft.setFunctionNumberOfTerms(n*8 + 6, 0)
@@ -733,7 +743,7 @@ class eftfactory_tricubichermite:
         :return: Element field template
         '''
         # start with full tricubic
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         for n in [ 2, 3, 6, 7 ]:
             eft.setFunctionNumberOfTerms(n * 8 + 4, 0)
             eft.setFunctionNumberOfTerms(n * 8 + 6, 0)
@@ -1169,7 +1179,7 @@ class eftfactory_tricubichermite:
         Cross derivatives are not used on the general mapped nodes.
         :return: Element field template
         '''
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         # general linear map at 4 nodes for one derivative
         eft.setNumberOfLocalScaleFactors(8)
         for s in range(8):
@@ -1204,7 +1214,7 @@ class eftfactory_tricubichermite:
         Cross derivatives are not used on the general mapped nodes.
         :return: Element field template
         '''
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         # negate dxi1 plus general linear map at 4 nodes for one derivative
         eft.setNumberOfLocalScaleFactors(10)
         # GRC: allow scale factor identifier for global -1.0 to be prescribed
@@ -1256,7 +1266,7 @@ class eftfactory_tricubichermite:
         Cross derivatives are not used on the general mapped nodes.
         :return: Element field template
         '''
-        eft = self._mesh.createElementfieldtemplate(self._tricubicHermiteBasis)
+        eft = createElementfieldtemplate(self._mesh, self._tricubicHermiteBasis)
         # negate dxi1 plus general linear map at 4 nodes for one derivative
         eft.setNumberOfLocalScaleFactors(10)
         # GRC: allow scale factor identifier for global -1.0 to be prescribed
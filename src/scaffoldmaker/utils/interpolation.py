@@ -5,10 +5,13 @@ from cmlibs.maths.vectorops import (
     add, axis_angle_to_rotation_matrix, cross, distance, div, dot, euler_to_rotation_matrix, matrix_inv, magnitude,
     matrix_vector_mult, mult, normalize, sub, set_magnitude)
 from scipy.optimize import minimize
+from scipy.sparse import coo_matrix
+from scipy.sparse.linalg import spsolve
 import copy
 from collections.abc import Sequence
 from enum import Enum
 import math
+import numpy
 
 
 gaussXi3 = ( (-math.sqrt(0.6)+1.0)/2.0, 0.5, (+math.sqrt(0.6)+1.0)/2.0 )
@@ -1155,65 +1158,57 @@ def sampleParameterAlongLine(lengthList, paramList, elementsCountOut):
     """
     assert len(lengthList) == len(paramList), 'sampleParameterAlongLine.  Mismatched number of lengths and parameters'
     nodesCount = len(lengthList)
-
-    md1 = []
-    sP = []
-    sdP = []
+    lengths = numpy.array(lengthList, dtype=float)
+    params = numpy.array(paramList, dtype=float)
 
     # Find smoothed parameter derivatives
-    # Middle
-    for n in range(1, nodesCount - 1):
-        # get mean of directions from point n to points (n - 1) and (n + 1)
-        nm = n - 1
-        np = n + 1
-        dirm = paramList[n ] - paramList[nm]
-        dirp = paramList[np] - paramList[n ]
-        # mean weighted by fraction towards that end, equivalent to harmonic mean
-        arcLengthm = lengthList[n ] - lengthList[nm]
-        arcLengthn = lengthList[np] - lengthList[n ]
-        arcLengthmp = arcLengthm + arcLengthn
-        wm = arcLengthn/arcLengthmp
-        wp = arcLengthm/arcLengthmp
-        md1.append(wm*dirm + wp*dirp)
+    # Middle: mean of directions from point n to points (n - 1) and (n + 1)
+    dirs = params[1:] - params[:-1]
+    arcLengths = lengths[1:] - lengths[:-1]
+    # mean weighted by fraction towards that end, equivalent to harmonic mean
+    arcLengthsmp = arcLengths[:-1] + arcLengths[1:]
+    wm = arcLengths[1:] / arcLengthsmp
+    wp = arcLengths[:-1] / arcLengthsmp
+    md1 = (wm * dirs[:-1] + wp * dirs[1:]).tolist()
 
     # Start
     md1Start = interpolateLagrangeHermiteDerivative([paramList[0]], [paramList[1]], [md1[0]], 0.0)
 
     # End
     md1End = interpolateHermiteLagrangeDerivative([paramList[-2]], [md1[-1]], [paramList[-1]], 1.0)
-    md1All = md1Start + md1 + md1End
+    md1All = numpy.array(md1Start + md1 + md1End)
 
     # Sample into equally spaced elements along line
-    distance = 0.0
-    e = 0
     totalLength = lengthList[-1]
     lengthPerElementOut = totalLength / elementsCountOut
-    dLength = []
-
-    for n in range(1, nodesCount):
-        dLength.append(lengthList[n] - lengthList[n-1])
-    dLength.append(dLength[-1])
-
-    for eOut in range(elementsCountOut):
-        while e < nodesCount - 1:
-            if distance < lengthList[e + 1]:
-                partDistance = distance - lengthList[e]
-                xi = partDistance/(lengthList[e+1] - lengthList[e])
-                p = interpolateCubicHermite([paramList[e]], [md1All[e]], [paramList[e+1]], [md1All[e+1]], xi)[0]
-                dpdxi = interpolateCubicHermiteDerivative([paramList[e]], [md1All[e]], [paramList[e+1]], [md1All[e+1]], xi)[0]
-                dxdxi = interpolateCubicHermiteDerivative([lengthList[e]], [dLength[e]], [lengthList[e+1]], [dLength[e+1]], xi)[0]
-                dpdx = dpdxi*1.0/dxdxi
-                dp = dpdx*lengthPerElementOut
-                sP.append(p)
-                sdP.append(dp)
-                break
-            e += 1
-        distance += lengthPerElementOut
+    dLength = numpy.append(arcLengths, arcLengths[-1])
+    distances = numpy.cumsum(numpy.append(0.0, numpy.full(elementsCountOut - 1, lengthPerElementOut)))
+    # element containing each distance, skipping distances beyond the end
+    e = numpy.searchsorted(lengths[1:], distances, side='right')
+    e = e[e < (nodesCount - 1)]
+    distances = distances[:len(e)]
+    xi = (distances - lengths[e]) / (lengths[e + 1] - lengths[e])
+    xi2 = xi * xi
+    xi3 = xi2 * xi
+    f1 = 1.0 - 3.0 * xi2 + 2.0 * xi3
+    f2 = xi - 2.0 * xi2 + xi3
+    f3 = 3.0 * xi2 - 2.0 * xi3
+    f4 = -xi2 + xi3
+    df1 = -6.0 * xi + 6.0 * xi2
+    df2 = 1.0 - 4.0 * xi + 3.0 * xi2
+    df3 = 6.0 * xi - 6.0 * xi2
+    df4 = -2.0 * xi + 3.0 * xi2
+    p = f1 * params[e] + f2 * md1All[e] + f3 * params[e + 1] + f4 * md1All[e + 1]
+    dpdxi = df1 * params[e] + df2 * md1All[e] + df3 * params[e + 1] + df4 * md1All[e + 1]
+    dxdxi = df1 * lengths[e] + df2 * dLength[e] + df3 * lengths[e + 1] + df4 * dLength[e + 1]
+    dpdx = dpdxi * 1.0 / dxdxi
+    sP = p.tolist()
+    sdP = (dpdx * lengthPerElementOut).tolist()
 
     # Last node
     sP.append(paramList[-1])
-    dpdx = md1All[-1] * 1.0/dLength[-1]
-    sdP.append(dpdx*lengthPerElementOut)
+    dpdx = md1All[-1] * 1.0 / dLength[-1]
+    sdP.append(float(dpdx * lengthPerElementOut))
 
     return sP, sdP
 
@@ -1400,7 +1395,179 @@ def getNearestParameterLocationOnCurve(nx, targetx, loop=False):
     return (nearest_e, xi), nearest_distance
 
 
-def getNearestLocationOnCurve(nx, nd1, targetx, loop=False, startLocation=None, instrument=False):
+class CurveSpatialIndex:
+    """
+    Bounding volume hierarchy over the elements of a piecewise cubic Hermite curve, for answering
+    many nearest location queries against the same curve in logarithmic time per query.
+    Each element is bounded by the box around its Bezier control points, which contains the
+    element's curve segment and both its end nodes.
+    Queries give identical results to the equivalent functions without the index.
+    """
+
+    _leafElementsCount = 4  # maximum number of elements in leaf boxes
+
+    def __init__(self, nx, nd1, loop=False):
+        """
+        :param nx: Coordinates along curve. Must not be modified while index is in use.
+        :param nd1: Derivatives along curve. Must not be modified while index is in use.
+        :param loop: True if curve loops back to first point, False if not.
+        """
+        self._nx = nx
+        self._nd1 = nd1
+        self._loop = loop
+        self._nodesCount = len(nx)
+        assert self._nodesCount > 1
+        self._elementsCount = self._nodesCount if loop else self._nodesCount - 1
+        self._xRange = getCoordinatesRange(nx)
+        componentsCount = len(nx[0])
+        elementBoxes = []
+        for e in range(self._elementsCount):
+            np = (e + 1) % self._nodesCount
+            controlPoints = [
+                nx[e],
+                [nx[e][c] + nd1[e][c] / 3.0 for c in range(componentsCount)],
+                [nx[np][c] - nd1[np][c] / 3.0 for c in range(componentsCount)],
+                nx[np]]
+            elementBoxes.append(([min(x[c] for x in controlPoints) for c in range(componentsCount)],
+                                 [max(x[c] for x in controlPoints) for c in range(componentsCount)]))
+        # tree boxes as lists of: box minimum, box maximum, start element, limit element, children box indexes
+        self._boxMin = []
+        self._boxMax = []
+        self._boxElementRanges = []
+        self._boxChildren = []
+        self._addBox(elementBoxes, 0, self._elementsCount)
+
+    def _addBox(self, elementBoxes, elementStart, elementLimit):
+        """
+        Recursively add box containing elements in range and its child boxes.
+        :return: Index of added box.
+        """
+        boxIndex = len(self._boxMin)
+        componentsCount = len(elementBoxes[0][0])
+        self._boxMin.append([min(elementBoxes[e][0][c] for e in range(elementStart, elementLimit))
+                             for c in range(componentsCount)])
+        self._boxMax.append([max(elementBoxes[e][1][c] for e in range(elementStart, elementLimit))
+                             for c in range(componentsCount)])
+        self._boxElementRanges.append((elementStart, elementLimit))
+        self._boxChildren.append(None)
+        if (elementLimit - elementStart) > self._leafElementsCount:
+            elementMid = (elementStart + elementLimit) // 2
+            self._boxChildren[boxIndex] = (
+                self._addBox(elementBoxes, elementStart, elementMid),
+                self._addBox(elementBoxes, elementMid, elementLimit))
+        return boxIndex
+
+    def _getBoxDistance(self, boxIndex, targetx):
+        """
+        :return: Lower bound on distance from targetx to anything in box, 0.0 if inside it.
+        """
+        boxMin = self._boxMin[boxIndex]
+        boxMax = self._boxMax[boxIndex]
+        sumSquares = 0.0
+        for c in range(len(targetx)):
+            if targetx[c] < boxMin[c]:
+                gap = boxMin[c] - targetx[c]
+            elif targetx[c] > boxMax[c]:
+                gap = targetx[c] - boxMax[c]
+            else:
+                continue
+            sumSquares += gap * gap
+        return math.sqrt(sumSquares)
+
+    def getCurve(self):
+        """
+        :return: nx, nd1, loop
+        """
+        return self._nx, self._nd1, self._loop
+
+    def getCoordinatesRange(self):
+        """
+        :return: Cached minimum and maximum node coordinates as from getCoordinatesRange.
+        """
+        return self._xRange
+
+    def getNearestParameterLocation(self, targetx):
+        """
+        Get location of curve parameter nearest to targetx, as for getNearestParameterLocationOnCurve.
+        :param targetx: Coordinates of point to find nearest to.
+        :return: nearest parameter location tuple (element index, xi), nearest distance.
+        """
+        nearestDistance = None
+        nearestNode = None
+        boxStack = [0]
+        while boxStack:
+            boxIndex = boxStack.pop()
+            # skip boxes further away than nearest, but not equal as lowest node index is used if equidistant
+            if (nearestDistance is not None) and (self._getBoxDistance(boxIndex, targetx) > nearestDistance):
+                continue
+            children = self._boxChildren[boxIndex]
+            if children:
+                # visit nearer child first by pushing it last
+                if self._getBoxDistance(children[0], targetx) <= self._getBoxDistance(children[1], targetx):
+                    boxStack += [children[1], children[0]]
+                else:
+                    boxStack += [children[0], children[1]]
+                continue
+            elementStart, elementLimit = self._boxElementRanges[boxIndex]
+            for e in range(elementStart, elementLimit):
+                for n in (e, (e + 1) % self._nodesCount):
+                    distance = magnitude(sub(self._nx[n], targetx))
+                    if (nearestDistance is None) or (distance < nearestDistance) or \
+                            ((distance == nearestDistance) and (n < nearestNode)):
+                        nearestDistance = distance
+                        nearestNode = n
+        nearestElement = nearestNode
+        xi = 0.0
+        if not self._loop and (nearestNode == (self._nodesCount - 1)):
+            nearestElement -= 1
+            xi = 1.0
+        return (nearestElement, xi), nearestDistance
+
+    def getNearestLocation(self, targetx, startLocation=None):
+        """
+        Get location on curve which is closest to target coordinates, as for getNearestLocationOnCurve.
+        :param targetx: Coordinates to get nearest point on curve to.
+        :param startLocation: Optional initial location (element index, xi) to search from.
+        If not supplied, uses element location at the nearest node coordinates.
+        :return: nearest location tuple (element index, xi), nearest x.
+        """
+        return getNearestLocationOnCurve(self._nx, self._nd1, targetx, self._loop, startLocation, curveIndex=self)
+
+    def getNearestLocations(self, targetxList, startLocations=None):
+        """
+        Get locations on curve which are closest to each of a list of target coordinates.
+        :param targetxList: List of coordinates to get nearest points on curve to.
+        :param startLocations: Optional list of initial locations to search from for each target, or None.
+        :return: list of (nearest location tuple (element index, xi), nearest x) for each target.
+        """
+        if startLocations is None:
+            startLocations = [None] * len(targetxList)
+        return [self.getNearestLocation(targetx, startLocation)
+                for targetx, startLocation in zip(targetxList, startLocations)]
+
+    def getNearestLocationToCurve(self, otherCurveIndex, startLocation=None):
+        """
+        Get the closest locations on this and other curve, as for getNearestLocationBetweenCurves.
+        :param otherCurveIndex: CurveSpatialIndex for other curve.
+        :param startLocation: Optional initial location (element index, xi) on this curve to search from.
+        :return: Nearest/intersection location (element index, xi), other curve location (element index, xi),
+        isIntersection (True/False).
+        """
+        ox, od1, oLoop = otherCurveIndex.getCurve()
+        return getNearestLocationBetweenCurves(self._nx, self._nd1, ox, od1, self._loop, oLoop, startLocation,
+                                               curveIndex=self, otherCurveIndex=otherCurveIndex)
+
+    def getNearestLocationsToCurves(self, otherCurveIndexes):
+        """
+        Get the closest locations on this curve and each of a list of other curves.
+        :param otherCurveIndexes: List of CurveSpatialIndex for other curves.
+        :return: list of results of getNearestLocationToCurve for each other curve.
+        """
+        return [self.getNearestLocationToCurve(otherCurveIndex) for otherCurveIndex in otherCurveIndexes]
+
+
+def getNearestLocationOnCurve(nx, nd1, targetx, loop=False, startLocation=None, instrument=False,
+                              curveIndex=None):
     """
     Get location on a piecewise Hermite curve which is closest to target coordinates.
     Can be a local minimum depending on start location.
@@ -1411,17 +1578,20 @@ def getNearestLocationOnCurve(nx, nd1, targetx, loop=False, startLocation=None,
     :param startLocation: Optional initial location (element index, xi) to search from.
     If not supplied, uses element location at the nearest node coordinates.
     :param instrument: Set to True to print debug messages.
+    :param curveIndex: Optional CurveSpatialIndex for nx, nd1, loop to speed up finding start location.
     :return: nearest location tuple (element index, xi), nearest x.
     """
     if instrument:
         print("getNearestLocationOnCurve targetx", targetx)
-    location = copy.copy(startLocation) if startLocation else getNearestParameterLocationOnCurve(nx, targetx, loop)[0]
+    location = copy.copy(startLocation) if startLocation else \
+        curveIndex.getNearestParameterLocation(targetx)[0] if curveIndex else \
+        getNearestParameterLocationOnCurve(nx, targetx, loop)[0]
     nodesCount = len(nx)
     assert nodesCount > 1
     elementsCount = nodesCount if loop else nodesCount - 1
     MAX_MAG_DXI = 0.5  # target/maximum magnitude of xi increment
     XI_TOL = 1.0E-7
-    xMin, xMax = getCoordinatesRange(nx)
+    xMin, xMax = curveIndex.getCoordinatesRange() if curveIndex else getCoordinatesRange(nx)
     xRange = [xMax[c] - xMin[c] for c in range(len(xMin))]
     MIN_CURVATURE = 0.1 / max(xRange)  # minimum to consider
     MAX_CURVATURE_FACTOR = 100.0
@@ -1490,7 +1660,8 @@ def getNearestLocationOnCurve(nx, nd1, targetx, loop=False, startLocation=None,
     return location, x
 
 
-def getNearestLocationBetweenCurves(nx, nd1, ox, od1, nLoop=False, oLoop=False, startLocation=None, instrument=False):
+def getNearestLocationBetweenCurves(nx, nd1, ox, od1, nLoop=False, oLoop=False, startLocation=None, instrument=False,
+                                    curveIndex=None, otherCurveIndex=None):
     """
     Get the closest locations on two piecewise Hermite curves. Can be a local minimum depending on start location.
     :param nx: Coordinates along curve.
@@ -1502,6 +1673,8 @@ def getNearestLocationBetweenCurves(nx, nd1, ox, od1, nLoop=False, oLoop=False,
     :param startLocation: Optional initial location (element index, xi) to search from.
     If not supplied, uses element location at the nearest parameter location to any parameter location on other curve.
     :param instrument: Set to True to print debug messages.
+    :param curveIndex: Optional CurveSpatialIndex for nx, nd1, nLoop to speed up finding start location.
+    :param otherCurveIndex: Optional CurveSpatialIndex for ox, od1, oLoop to speed up finding start location.
     :return: Nearest/intersection location (element index, xi), other curve location (element index, xi),
     isIntersection (True/False).
     """
@@ -1517,16 +1690,18 @@ def getNearestLocationBetweenCurves(nx, nd1, ox, od1, nLoop=False, oLoop=False,
     if not location:
         nearestDistance = None
         for targetx in ox:
-            tmpLocation, tmpDistance = getNearestParameterLocationOnCurve(nx, targetx, nLoop)
+            tmpLocation, tmpDistance = curveIndex.getNearestParameterLocation(targetx) if curveIndex else \
+                getNearestParameterLocationOnCurve(nx, targetx, nLoop)
             if (nearestDistance is None) or (tmpDistance < nearestDistance):
                 nearestDistance = tmpDistance
                 location = tmpLocation
     targetx = evaluateCoordinatesOnCurve(nx, nd1, location, nLoop)
-    otherLocation = getNearestParameterLocationOnCurve(ox, targetx, oLoop)[0]
+    otherLocation = otherCurveIndex.getNearestParameterLocation(targetx)[0] if otherCurveIndex else \
+        getNearestParameterLocationOnCurve(ox, targetx, oLoop)[0]
     MAX_MAG_DXI = 0.5  # target/maximum magnitude of xi increment
     XI_TOL = 1.0E-7
     # get max range for tolerances
-    xMin, xMax = getCoordinatesRange(nx)
+    xMin, xMax = curveIndex.getCoordinatesRange() if curveIndex else getCoordinatesRange(nx)
     xRange = [xMax[c] - xMin[c] for c in range(len(xMin))]
     MAX_SLOPE_FACTOR = 1000.0
     x_tol = 1.0E-6 * max(xRange)
@@ -1534,7 +1709,7 @@ def getNearestLocationBetweenCurves(nx, nd1, ox, od1, nLoop=False, oLoop=False,
     last_dxi = None
     for it in range(100):
         x, d = evaluateCoordinatesOnCurve(nx, nd1, location, nLoop, derivative=True)
-        otherLocation = getNearestLocationOnCurve(ox, od1, x, oLoop, otherLocation)[0]
+        otherLocation = getNearestLocationOnCurve(ox, od1, x, oLoop, otherLocation, curveIndex=otherCurveIndex)[0]
         onOtherBoundary = not oLoop and isLocationOnCurveBoundary(otherLocation, oeCount)
         other_x = evaluateCoordinatesOnCurve(ox, od1, otherLocation, oLoop)
         r = sub(other_x, x)
@@ -1669,62 +1844,55 @@ def get_curve_from_points(px, maximum_element_length=None, number_of_elements=No
     assert maximum_element_length or number_of_elements
     assert (((maximum_element_length is None) or (maximum_element_length > 0.0)) or
             ((number_of_elements is None) or (number_of_elements > 0)))
-    # get lengths from distances between consecutive points
-    total_length = 0.0
-    lengths = []
-    for i in range(points_count - 1):
-        length = magnitude(sub(px[i + 1], px[i]))
-        lengths.append(length)
-        total_length += length
+    x = numpy.array(px, dtype=float)
+    components_count = x.shape[1]
+    # get lengths from distances between consecutive points, and cumulative lengths to each point
+    dx = x[1:] - x[:-1]
+    sum_squares = dx[:, 0] * dx[:, 0]
+    for c in range(1, components_count):
+        sum_squares = sum_squares + dx[:, c] * dx[:, c]
+    lengths = numpy.sqrt(sum_squares)
+    sum_lengths = numpy.append(0.0, numpy.cumsum(lengths))
+    total_length = float(sum_lengths[-1])
     assert total_length > 0.0
     elements_count = number_of_elements if number_of_elements else math.ceil(total_length / maximum_element_length)
     if elements_count < 2:
         elements_count = 2  # start with 2 so at least one internal sample to get a better initial shape
     # get half range of lengths to average coordinates over
     delta_length = total_length / (4.0 * elements_count)
-    nx = [copy.copy(px[0])]
-    components_count = len(px[0])
-    zero = [0.0] * components_count
-    nd1 = [zero]
-    i = 0
-    sum_length = 0.0
-    for n in range(1, elements_count):
-        middle_length = total_length * (n / elements_count)
-        start_length = middle_length - delta_length
-        end_length = middle_length + delta_length
-        while sum_length < start_length:
-            sum_length += lengths[i]
-            i += 1
+    # integrals of coordinates over whole linear segments
+    segment_x = (x[:-1] + x[1:]) * (0.5 * lengths)[:, numpy.newaxis]
+    middle_lengths = total_length * (numpy.arange(1, elements_count) / elements_count)
+    start_lengths = middle_lengths - delta_length
+    end_lengths = middle_lengths + delta_length
+    # i is index of first point at or after start, j is index of segment containing end
+    i_list = numpy.searchsorted(sum_lengths, start_lengths, side='left').tolist()
+    j_list = (numpy.searchsorted(sum_lengths, end_lengths, side='left') - 1).tolist()
+    mx = []
+    for i, j, start_length, middle_length, end_length in zip(
+            i_list, j_list, start_lengths.tolist(), middle_lengths.tolist(), end_lengths.tolist()):
+        sum_length = sum_lengths[i]
         if end_length < sum_length:
             # simple interpolation within one linear segment
             wt0 = (sum_length - middle_length) / lengths[i - 1]
             wt1 = 1.0 - wt0
-            x = add(mult(px[i - 1], wt0), mult(px[i], wt1))
-        else:
-            # weighted sum over several linear segments including part start and part end lengths
-            part_length = sum_length - start_length
-            wt0 = part_length * 0.5 * part_length / lengths[i - 1]
-            wt1 = part_length - wt0
-            sum_x = add(mult(px[i - 1], wt0), mult(px[i], wt1))
-            while True:
-                sum_length += lengths[i]
-                i += 1
-                segment_length = lengths[i - 1]
-                if sum_length < end_length:
-                    wtx = mult(add(px[i - 1], px[i]), 0.5 * segment_length)
-                    sum_x = add(sum_x, wtx)
-                else:
-                    part_length = end_length - (sum_length - segment_length)
-                    wt1 = part_length * 0.5 * part_length / segment_length
-                    wt0 = part_length - wt1
-                    wtx = add(mult(px[i - 1], wt0), mult(px[i], wt1))
-                    sum_x = add(sum_x, wtx)
-                    break
-            x = div(sum_x, 2.0 * delta_length)
-        nx.append(x)
-        nd1.append(zero)
-    nx.append(copy.copy(px[-1]))
-    nd1.append(zero)
+            mx.append(x[i - 1] * wt0 + x[i] * wt1)
+            continue
+        # weighted sum over several linear segments including part start and part end lengths,
+        # accumulated in order from the start
+        j = max(j, i)
+        part_length = sum_length - start_length
+        wt0 = part_length * 0.5 * part_length / lengths[i - 1]
+        wt1 = part_length - wt0
+        segment_length = lengths[j]
+        part_length = end_length - (sum_lengths[j + 1] - segment_length)
+        end_wt1 = part_length * 0.5 * part_length / segment_length
+        end_wt0 = part_length - end_wt1
+        terms = numpy.vstack((x[i - 1] * wt0 + x[i] * wt1, segment_x[i:j], x[j] * end_wt0 + x[j + 1] * end_wt1))
+        mx.append(numpy.add.accumulate(terms, axis=0)[-1] / (2.0 * delta_length))
+    zero = [0.0] * components_count
+    nx = [copy.copy(px[0])] + [mean_x.tolist() for mean_x in mx] + [copy.copy(px[-1])]
+    nd1 = [zero] * (elements_count + 1)
     # smooth with harmonic mean, get the length and resample to the desired number of even-sized elements
     nd1 = smoothCubicHermiteDerivativesLine(nx, nd1, magnitudeScalingMode=DerivativeScalingMode.HARMONIC_MEAN)
     curve_length = getCubicHermiteCurvesLength(nx, nd1)
@@ -1733,6 +1901,177 @@ def get_curve_from_points(px, maximum_element_length=None, number_of_elements=No
     return cx, cd1
 
 
+def _get_cubic_hermite_basis_arrays(xi):
+    """
+    :param xi: numpy array of element xi values.
+    :return: numpy arrays shaped (len(xi), 4) of cubic Hermite basis function values, first derivatives and second
+    derivatives for x1, d1, x2, d2 at each xi.
+    """
+    xi2 = xi * xi
+    xi3 = xi2 * xi
+    f = numpy.stack((1.0 - 3.0 * xi2 + 2.0 * xi3, xi - 2.0 * xi2 + xi3, 3.0 * xi2 - 2.0 * xi3, -xi2 + xi3), axis=1)
+    df = numpy.stack((-6.0 * xi + 6.0 * xi2, 1.0 - 4.0 * xi + 3.0 * xi2, 6.0 * xi - 6.0 * xi2, -2.0 * xi + 3.0 * xi2),
+                     axis=1)
+    d2f = numpy.stack((-6.0 + 12.0 * xi, -4.0 + 6.0 * xi, 6.0 - 12.0 * xi, -2.0 + 6.0 * xi), axis=1)
+    return f, df, d2f
+
+
+def _get_nearest_curve_locations_arrays(element_parameters, data_x, samples_count=8, chunk_size=1000):
+    """
+    Get nearest locations on a non-looped cubic Hermite curve to many data points at once.
+    Starts from the nearest of evenly spaced samples in each element and converges with Newton iterations,
+    moving into neighbouring elements where the nearest point is past an element end.
+    :param element_parameters: numpy array shaped (elements_count, 4, components_count) of x1, d1, x2, d2.
+    :param data_x: numpy array of data point coordinates, shaped (points_count, components_count).
+    :param samples_count: Number of samples in each element to get starting locations from.
+    :param chunk_size: Number of data points to find nearest samples for at once, to limit memory use.
+    :return: element indexes, xi (numpy arrays of size points_count).
+    """
+    elements_count = element_parameters.shape[0]
+    sample_xi = numpy.arange(samples_count + 1) / samples_count
+    sample_f = _get_cubic_hermite_basis_arrays(sample_xi)[0]
+    sample_x = numpy.einsum("sb,ebc->esc", sample_f, element_parameters).reshape(-1, element_parameters.shape[2])
+    nearest_samples = numpy.empty(len(data_x), dtype=int)
+    for start in range(0, len(data_x), chunk_size):
+        chunk_x = data_x[start:start + chunk_size]
+        distances = numpy.sum(chunk_x * chunk_x, axis=1)[:, numpy.newaxis] - \
+            2.0 * (chunk_x @ sample_x.T) + numpy.sum(sample_x * sample_x, axis=1)
+        nearest_samples[start:start + chunk_size] = numpy.argmin(distances, axis=1)
+    element_indexes = nearest_samples // (samples_count + 1)
+    xi = sample_xi[nearest_samples % (samples_count + 1)]
+    for iteration in range(20):
+        f, df, d2f = _get_cubic_hermite_basis_arrays(xi)
+        parameters = element_parameters[element_indexes]
+        delta = numpy.einsum("pb,pbc->pc", f, parameters) - data_x
+        d1 = numpy.einsum("pb,pbc->pc", df, parameters)
+        d2 = numpy.einsum("pb,pbc->pc", d2f, parameters)
+        gradient = numpy.sum(delta * d1, axis=1)
+        hessian = numpy.sum(d1 * d1, axis=1) + numpy.sum(delta * d2, axis=1)
+        d1_sq = numpy.sum(d1 * d1, axis=1)
+        # Newton increment where the hessian is positive, otherwise a gradient descent increment
+        dxi = -gradient / numpy.where(hessian > 0.0, hessian, d1_sq)
+        new_xi = numpy.clip(xi + numpy.clip(dxi, -0.5, 0.5), 0.0, 1.0)
+        # move into next/previous element if nearest point is past element end
+        next_element = (new_xi == 1.0) & (gradient < 0.0) & (element_indexes < (elements_count - 1))
+        previous_element = (new_xi == 0.0) & (gradient > 0.0) & (element_indexes > 0)
+        new_xi[next_element] = 0.0
+        new_xi[previous_element] = 1.0
+        element_indexes = element_indexes + next_element - previous_element
+        converged = numpy.all(numpy.abs(new_xi - xi) < 1.0E-12) and not numpy.any(next_element | previous_element)
+        xi = new_xi
+        if converged:
+            break
+    return element_indexes, xi
+
+
+def fit_hermite_curve_to_points(bx, bd1, px, curvature_penalty, data_proportion=1.0, outlier_length=0.0,
+                                sliding_factor=0.1):
+    """
+    Fit 1-D multi-element hermite curve to list of data point coordinates by linear least squares on arrays,
+    without Zinc. Minimises the same objective as the scaffoldfitter fit in zinc_utils.fit_hermite_curve:
+    squared distances from data to their projections on the curve, with tangential components scaled by the sliding
+    factor except for data beyond the start of the curve, plus the curvature penalty times the integral of the
+    squared second derivative of coordinates w.r.t. arc length of the initial curve.
+    Data is projected onto the initial curve for the first fit; if an outlier length is set, data is projected
+    again onto the fitted curve, outliers are removed and the fit is repeated.
+    :param bx: Initial/before curve coordinates, close to data. Also reference coordinates for curvature penalty.
+    :param bd1: Initial/before curve derivatives, close to data.
+    :param px: List of data points [x, y, z] or [x, y] if 2-D to fit to.
+    :param curvature_penalty: Penalty factor for curvature.
+    :param data_proportion: Proportion of data points to use, evenly spread through the list, up to 1.0.
+    :param outlier_length: Absolute outlier length for data if positive, or relative outlier length if negative e.g.
+    -0.1 removes data points with projections lengths within 10% of largest projection length. Not used in the first
+    fit iteration. Ignored if zero.
+    :param sliding_factor: Factor >= 0.0 multiplying data weight in the tangential direction.
+    :return: cx, cd1 (lists of hermite coordinates and derivatives)
+    """
+    nodes_count = len(bx)
+    elements_count = nodes_count - 1
+    components_count = len(bx[0])
+    parameters_count = 2 * nodes_count * components_count
+    # select data points as for scaffoldfitter data proportion
+    selected_px = []
+    data_proportion_counter = 0.5
+    for x in px:
+        data_proportion_counter += data_proportion
+        if data_proportion_counter >= 1.0:
+            data_proportion_counter -= 1.0
+            selected_px.append(x)
+    data_x = numpy.array(selected_px, dtype=float)
+
+    # indexes of element x1, d1, x2, d2 parameters for each component, shaped (elements_count, 4, components_count)
+    element_parameter_indexes = (
+        (2 * numpy.arange(elements_count)[:, numpy.newaxis] + numpy.arange(4))[:, :, numpy.newaxis] *
+        components_count + numpy.arange(components_count))
+    identity = numpy.identity(components_count)
+
+    def assemble(element_indexes, basis, weights):
+        """
+        :param element_indexes: Element index of each term, shape (T,).
+        :param basis: Basis values for element parameters of each term, shape (T, 4).
+        :param weights: Weight matrices for components of each term, shape (T, components_count, components_count).
+        :return: Sparse matrix sum of outer products of basis and weights over terms.
+        """
+        values = (basis[:, :, numpy.newaxis, numpy.newaxis, numpy.newaxis] *
+                  basis[:, numpy.newaxis, numpy.newaxis, :, numpy.newaxis] *
+                  weights[:, numpy.newaxis, :, numpy.newaxis, :])
+        indexes = element_parameter_indexes[element_indexes]
+        rows = numpy.broadcast_to(indexes[:, :, :, numpy.newaxis, numpy.newaxis], values.shape)
+        columns = numpy.broadcast_to(indexes[:, numpy.newaxis, numpy.newaxis, :, :], values.shape)
+        return coo_matrix((values.ravel(), (rows.ravel(), columns.ravel())),
+                          shape=(parameters_count, parameters_count)).tocsr()
+
+    # curvature penalty integrated with 3 Gauss points over initial curve, using the second derivative w.r.t. arc
+    # length at each point as a linear function of the element parameters
+    gauss_xi = numpy.tile(numpy.array(gaussXi3), elements_count)
+    gauss_element_indexes = numpy.repeat(numpy.arange(elements_count), 3)
+    f, df, d2f = _get_cubic_hermite_basis_arrays(gauss_xi)
+    reference_parameters = numpy.stack((numpy.array(bx[:-1]), numpy.array(bd1[:-1]),
+                                        numpy.array(bx[1:]), numpy.array(bd1[1:])), axis=1)[gauss_element_indexes]
+    reference_d1 = numpy.sum(df[:, :, numpy.newaxis] * reference_parameters, axis=1)
+    reference_d2 = numpy.sum(d2f[:, :, numpy.newaxis] * reference_parameters, axis=1)
+    reference_dsq = numpy.sum(reference_d1 * reference_d1, axis=1)
+    reference_ds = numpy.sqrt(reference_dsq)
+    curvature_basis = ((d2f - df * (numpy.sum(reference_d1 * reference_d2, axis=1) / reference_dsq)[:, numpy.newaxis])
+                       / reference_dsq[:, numpy.newaxis])
+    curvature_weights = (curvature_penalty * numpy.tile(numpy.array(gaussWt3), elements_count) * reference_ds)
+    curvature_matrix = assemble(gauss_element_indexes, curvature_basis,
+                                curvature_weights[:, numpy.newaxis, numpy.newaxis] * identity)
+
+    cx = bx
+    cd1 = bd1
+    for fit_index in range(2 if (outlier_length != 0.0) else 1):
+        element_parameters = numpy.stack((numpy.array(cx[:-1]), numpy.array(cd1[:-1]),
+                                          numpy.array(cx[1:]), numpy.array(cd1[1:])), axis=1)
+        element_indexes, xi = _get_nearest_curve_locations_arrays(element_parameters, data_x)
+        f, df = _get_cubic_hermite_basis_arrays(xi)[:2]
+        parameters = element_parameters[element_indexes]
+        delta = numpy.sum(f[:, :, numpy.newaxis] * parameters, axis=1) - data_x
+        tangents = numpy.sum(df[:, :, numpy.newaxis] * parameters, axis=1)
+        tangents /= numpy.linalg.norm(tangents, axis=1)[:, numpy.newaxis]
+        projection_lengths = numpy.linalg.norm(delta, axis=1)
+        active = numpy.ones(len(selected_px), dtype=bool)
+        if fit_index > 0:
+            if outlier_length > 0.0:
+                active = projection_lengths <= outlier_length
+            else:
+                active = projection_lengths <= (1.0 + outlier_length) * numpy.max(projection_lengths)
+        # full data weight in tangential direction to stretch curve to data beyond its start
+        tangential_weights = numpy.where(
+            numpy.sum(delta * tangents, axis=1) > 0.01 * projection_lengths, 1.0, sliding_factor)[active]
+        data_weights = identity - (1.0 - tangential_weights)[:, numpy.newaxis, numpy.newaxis] * \
+            (tangents[active][:, :, numpy.newaxis] * tangents[active][:, numpy.newaxis, :])
+        matrix = curvature_matrix + assemble(element_indexes[active], f[active], data_weights)
+        rhs_values = (f[active][:, :, numpy.newaxis] *
+                      numpy.sum(data_weights * data_x[active][:, numpy.newaxis, :], axis=2)[:, numpy.newaxis, :])
+        rhs = numpy.bincount(element_parameter_indexes[element_indexes[active]].ravel(), weights=rhs_values.ravel(),
+                             minlength=parameters_count)
+        solution = spsolve(matrix.tocsc(), rhs).reshape((nodes_count, 2, components_count))
+        cx = solution[:, 0].tolist()
+        cd1 = solution[:, 1].tolist()
+    return cx, cd1
+
+
 def track_curve_side_direction(cx, cd1, start_direction, start_location, end_location, forward=True):
     """
     Track side direction from start to end location on curve assuming no twisting.
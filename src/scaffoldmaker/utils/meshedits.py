@@ -0,0 +1,210 @@
+"""
+Compact binary format for scaffold mesh edits, storing only changed node parameters.
+"""
+import base64
+import struct
+import zlib
+
+from cmlibs.utils.zinc.general import ChangeManager
+from cmlibs.zinc.field import Field
+from cmlibs.zinc.node import Node
+from cmlibs.zinc.result import RESULT_OK
+import numpy
+
+
+# prefix identifying compact mesh edits, followed by base64 encoded, zlib compressed binary data
+compact_mesh_edits_prefix = b"ScaffoldMeshEdits:compact1:"
+
+node_value_labels = [
+    Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D2_DS1DS2,
+    Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3, Node.VALUE_LABEL_D2_DS2DS3, Node.VALUE_LABEL_D3_DS1DS2DS3]
+
+
+def is_compact_mesh_edits(mesh_edits):
+    """
+    :param mesh_edits: Mesh edits as bytes or str, or None.
+    :return: True if mesh_edits are in compact format, otherwise False e.g. for Zinc EX format.
+    """
+    if not mesh_edits:
+        return False
+    if isinstance(mesh_edits, str):
+        return mesh_edits.startswith(compact_mesh_edits_prefix.decode("utf-8"))
+    return mesh_edits.startswith(compact_mesh_edits_prefix)
+
+
+def encode_compact_mesh_edits(field_parameters):
+    """
+    Encode node parameter edits in compact format. For each field, records are sorted by node identifier,
+    value label and version, and node identifiers are stored as deltas from the previous record.
+    Values are stored exactly as 64-bit floats.
+    :param field_parameters: dict field name -> list of (node identifier, value label, version, values list),
+    with all values lists for a field having the same number of components.
+    :return: Compact mesh edits as bytes.
+    """
+    data = [struct.pack("<I", len(field_parameters))]
+    for field_name, parameters in field_parameters.items():
+        parameters = sorted(parameters, key=lambda parameter: parameter[:3])
+        records_count = len(parameters)
+        components_count = len(parameters[0][3]) if parameters else 0
+        name = field_name.encode("utf-8")
+        data.append(struct.pack("<H", len(name)))
+        data.append(name)
+        data.append(struct.pack("<BI", components_count, records_count))
+        node_identifiers = numpy.array([parameter[0] for parameter in parameters], dtype=numpy.int64)
+        node_identifier_deltas = numpy.diff(node_identifiers, prepend=0).astype("<u4")
+        data.append(node_identifier_deltas.tobytes())
+        data.append(numpy.array([parameter[1] for parameter in parameters], dtype="<u1").tobytes())
+        data.append(numpy.array([parameter[2] for parameter in parameters], dtype="<u2").tobytes())
+        data.append(numpy.array([parameter[3] for parameter in parameters], dtype="<f8").tobytes())
+    return compact_mesh_edits_prefix + base64.b64encode(zlib.compress(b"".join(data)))
+
+
+def decode_compact_mesh_edits(mesh_edits):
+    """
+    Decode node parameter edits from compact format.
+    :param mesh_edits: Compact mesh edits as bytes or str.
+    :return: dict field name -> (node identifiers, value labels, versions, values) numpy arrays, with values
+    array shaped (records count, components count).
+    """
+    if isinstance(mesh_edits, str):
+        mesh_edits = mesh_edits.encode("utf-8")
+    assert is_compact_mesh_edits(mesh_edits), "decode_compact_mesh_edits.  Not compact mesh edits"
+    data = zlib.decompress(base64.b64decode(mesh_edits[len(compact_mesh_edits_prefix):]))
+    offset = 0
+    fields_count = struct.unpack_from("<I", data, offset)[0]
+    offset += 4
+    field_parameters = {}
+    for f in range(fields_count):
+        name_length = struct.unpack_from("<H", data, offset)[0]
+        offset += 2
+        field_name = data[offset:offset + name_length].decode("utf-8")
+        offset += name_length
+        components_count, records_count = struct.unpack_from("<BI", data, offset)
+        offset += 5
+        node_identifier_deltas = numpy.frombuffer(data, dtype="<u4", count=records_count, offset=offset)
+        offset += 4 * records_count
+        value_labels = numpy.frombuffer(data, dtype="<u1", count=records_count, offset=offset)
+        offset += records_count
+        versions = numpy.frombuffer(data, dtype="<u2", count=records_count, offset=offset)
+        offset += 2 * records_count
+        values = numpy.frombuffer(data, dtype="<f8", count=records_count * components_count, offset=offset)
+        offset += 8 * records_count * components_count
+        field_parameters[field_name] = (
+            numpy.cumsum(node_identifier_deltas, dtype=numpy.int64), value_labels, versions,
+            values.reshape((records_count, components_count)))
+    return field_parameters
+
+
+def apply_compact_mesh_edits(region, mesh_edits):
+    """
+    Set node parameters from compact mesh edits, visiting each edited node once.
+    Nodes, fields and parameter versions must already exist in region.
+    :param region: Zinc region to modify.
+    :param mesh_edits: Compact mesh edits as bytes or str.
+    :return: True if all parameters were set, False if any were not found.
+    """
+    fieldmodule = region.getFieldmodule()
+    nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+    all_set = True
+    with ChangeManager(fieldmodule):
+        fieldcache = fieldmodule.createFieldcache()
+        for field_name, (node_identifiers, value_labels, versions, values) in \
+                decode_compact_mesh_edits(mesh_edits).items():
+            field = fieldmodule.findFieldByName(field_name).castFiniteElement()
+            if not field.isValid():
+                print("apply_compact_mesh_edits.  Missing field", field_name)
+                all_set = False
+                continue
+            last_node_identifier = None
+            node = None
+            for node_identifier, value_label, version, node_values in zip(
+                    node_identifiers.tolist(), value_labels.tolist(), versions.tolist(), values.tolist()):
+                if node_identifier != last_node_identifier:
+                    node = nodes.findNodeByIdentifier(node_identifier)
+                    fieldcache.setNode(node)
+                    last_node_identifier = node_identifier
+                if not (node.isValid() and (RESULT_OK == field.setNodeParameters(
+                        fieldcache, -1, value_label, version, node_values))):
+                    all_set = False
+    return all_set
+
+
+def _get_node_field_parameters(field, fieldcache, components_count):
+    """
+    Get all parameters of field at node in fieldcache.
+    :return: dict (value label, version) -> values list.
+    """
+    parameters = {}
+    for value_label in node_value_labels:
+        version = 1
+        while True:
+            result, values = field.getNodeParameters(fieldcache, -1, value_label, version, components_count)
+            if result != RESULT_OK:
+                break
+            parameters[(value_label, version)] = values if isinstance(values, list) else [values]
+            version += 1
+    return parameters
+
+
+def make_compact_mesh_edits(region, base_region=None, field_names=None, nodeset_group=None):
+    """
+    Make compact mesh edits holding node parameters in region which differ from those in base_region.
+    :param region: Zinc region containing edited model.
+    :param base_region: Optional Zinc region containing the unedited model, usually the generated scaffold.
+    If None, all parameters of the nodes are stored.
+    :param field_names: Names of node fields to store edits for, or None for all finite element fields in region.
+    :param nodeset_group: Optional group of nodes to store edits for, otherwise all nodes in region.
+    :return: Compact mesh edits as bytes, or None if edits can't be represented as changes to parameters of
+    base_region, e.g. edits add nodes, fields or parameter versions.
+    """
+    fieldmodule = region.getFieldmodule()
+    nodes = nodeset_group if nodeset_group else fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+    if field_names is None:
+        field_names = []
+        fielditerator = fieldmodule.createFielditerator()
+        field = fielditerator.next()
+        while field.isValid():
+            if field.castFiniteElement().isValid():
+                field_names.append(field.getName())
+            field = fielditerator.next()
+    base_fieldmodule = base_region.getFieldmodule() if base_region else None
+    base_nodes = base_fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES) if base_region else None
+    fieldcache = fieldmodule.createFieldcache()
+    base_fieldcache = base_fieldmodule.createFieldcache() if base_region else None
+    field_parameters = {}
+    for field_name in field_names:
+        field = fieldmodule.findFieldByName(field_name).castFiniteElement()
+        assert field.isValid(), "make_compact_mesh_edits.  Invalid field " + field_name
+        components_count = field.getNumberOfComponents()
+        base_field = None
+        if base_region:
+            base_field = base_fieldmodule.findFieldByName(field_name).castFiniteElement()
+        parameters = []
+        nodeiterator = nodes.createNodeiterator()
+        node = nodeiterator.next()
+        while node.isValid():
+            fieldcache.setNode(node)
+            node_parameters = _get_node_field_parameters(field, fieldcache, components_count)
+            if node_parameters:
+                node_identifier = node.getIdentifier()
+                base_node_parameters = None
+                if base_region:
+                    if not base_field.isValid():
+                        return None
+                    base_node = base_nodes.findNodeByIdentifier(node_identifier)
+                    if not base_node.isValid():
+                        return None
+                    base_fieldcache.setNode(base_node)
+                    base_node_parameters = _get_node_field_parameters(base_field, base_fieldcache, components_count)
+                for key, values in node_parameters.items():
+                    if base_node_parameters is not None:
+                        base_values = base_node_parameters.get(key)
+                        if base_values is None:
+                            return None
+                        if base_values == values:
+                            continue
+                    parameters.append((node_identifier, key[0], key[1], values))
+            node = nodeiterator.next()
+        if parameters:
+            field_parameters[field_name] = parameters
+    return encode_compact_mesh_edits(field_parameters)
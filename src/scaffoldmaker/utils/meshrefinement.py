@@ -8,7 +8,7 @@ from cmlibs.zinc.element import Element, Elementbasis
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 from cmlibs.zinc.result import RESULT_OK
-from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, findAnnotationGroupByName
+from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, AnnotationGroupList, findAnnotationGroupByName
 from scaffoldmaker.utils.octree import Octree
 
 import copy
@@ -77,7 +77,7 @@ class MeshRefinement:
         self._elementIdentifier = 1
         # prepare annotation group map
         self._sourceAnnotationGroups = sourceAnnotationGroups
-        self._annotationGroups = []
+        self._annotationGroups = AnnotationGroupList()
         self._sourceAndTargetMeshGroups = []
         for sourceAnnotationGroup in sourceAnnotationGroups:
             targetAnnotationGroup = AnnotationGroup(
@@ -0,0 +1,158 @@
+"""
+Graph utilities for ordering nerve trunk data and connecting branches, with cost linear in graph size.
+"""
+from collections import deque
+import math
+import re
+
+from cmlibs.maths.vectorops import distance
+
+
+def build_undirected_graph(node_ids, edges):
+    """
+    Build undirected graph from nodes and edges between them.
+    :param node_ids: Iterable of node identifiers. Repeated identifiers are allowed.
+    :param edges: Iterable of (node_id_1, node_id_2) pairs. Edges to nodes not in node_ids are ignored.
+    :return: dict node_id -> list of connected node_ids, in order of edges.
+    """
+    graph = {node_id: [] for node_id in node_ids}
+    for node_id_1, node_id_2 in edges:
+        if (node_id_1 in graph) and (node_id_2 in graph):
+            graph[node_id_1].append(node_id_2)
+            graph[node_id_2].append(node_id_1)
+    return graph
+
+
+def bfs_to_furthest(graph, start, excluded_node_ids=()):
+    """
+    Breadth first search from start to the furthest node reachable without passing through excluded nodes.
+    :param graph: dict node_id -> list of connected node_ids.
+    :param start: Node identifier to start search from.
+    :param excluded_node_ids: Node identifiers not to visit. Pass a set for constant time lookup, otherwise a set
+    is made from it on each call.
+    return: Path as list of node identifiers from start to the furthest node, which is the last visited.
+    """
+    excluded = excluded_node_ids if isinstance(excluded_node_ids, (set, frozenset, dict)) \
+        else set(excluded_node_ids)
+    # parent of each discovered node, doubling as set of visited and queued nodes
+    parent = {start: None}
+    queue = deque([start])
+    last = start
+    while queue:
+        current = queue.popleft()
+        last = current
+        for neighbor in graph[current]:
+            if (neighbor not in parent) and (neighbor not in excluded):
+                parent[neighbor] = current
+                queue.append(neighbor)
+
+    # Trace path from furthest node back to start
+    path = []
+    while last is not None:
+        path.append(last)
+        last = parent[last]
+    return list(reversed(path))
+
+
+def get_graph_path_through_ends(graph, node_coordinates):
+    """
+    Get a single path through all nodes of graph which is a set of possibly disconnected paths.
+    Starts at whichever of the two most distant end nodes is first in graph, follows the graph from each end to
+    its furthest node, then jumps to the closest remaining end node and repeats until no end nodes remain.
+    :param graph: dict node_id -> list of connected node_ids. End nodes have at most one connected node.
+    :param node_coordinates: dict node_id -> coordinates.
+    :return: list of node identifiers along path, or empty list if graph has no end nodes.
+    """
+    end_node_ids = [node_id for node_id, neighbors in graph.items() if len(neighbors) <= 1]
+    if not end_node_ids:
+        return []
+
+    # choose start, not necessarily first in end nodes
+    furthest_distance = 0
+    furthest_index_1 = furthest_index_2 = 0
+    for index_1, node_id_1 in enumerate(end_node_ids):
+        for index_2 in range(index_1, len(end_node_ids)):
+            node_id_2 = end_node_ids[index_2]
+            dist = distance(node_coordinates[node_id_1], node_coordinates[node_id_2])
+            if dist > furthest_distance:
+                furthest_distance = dist
+                furthest_index_1 = index_1
+                furthest_index_2 = index_2
+    start_index = min(furthest_index_1, furthest_index_2)
+    start = end_node_ids[start_index]
+
+    path_ids = []
+    path_id_set = set()
+    # BFS from first to next end node, all connected in one long path
+    while end_node_ids:
+        end_node_ids.pop(start_index)
+        if start not in path_id_set:
+            local_path_ids = bfs_to_furthest(graph, start, path_id_set)
+            path_ids.extend(local_path_ids)
+            path_id_set.update(local_path_ids)
+
+        # find next closest end node
+        closest_distance = math.inf
+        last_node_id_in_path = path_ids[-1]
+        for index, node_id in enumerate(end_node_ids):
+            dist = distance(node_coordinates[node_id], node_coordinates[last_node_id_in_path])
+            if dist < closest_distance:
+                closest_distance = dist
+                start = node_id
+                start_index = index
+    return path_ids
+
+
+def get_branch_parent_map(branch_node_ids_map, trunk_node_ids, trunk_name):
+    """
+    Find the parent trunk or branch each branch connects to, through its first node being on the trunk, or
+    else on another branch which does not start with the same node.
+    :param branch_node_ids_map: dict branch name -> list of node identifiers in branch, first being the start.
+    :param trunk_node_ids: Iterable of trunk node identifiers.
+    :param trunk_name: Name of trunk, used as parent if first branch node is on the trunk or no parent is found.
+    :return: dict branch name -> parent name, in order of branch_node_ids_map.
+    """
+    trunk_node_id_set = set(trunk_node_ids)
+    # map from node identifier to names of branches containing it, in order of branch_node_ids_map
+    node_branch_names = {}
+    for branch_name, branch_node_ids in branch_node_ids_map.items():
+        for node_id in branch_node_ids:
+            branch_names = node_branch_names.setdefault(node_id, [])
+            if (not branch_names) or (branch_names[-1] != branch_name):
+                branch_names.append(branch_name)
+
+    branch_parent_map = {}
+    for branch_name, branch_node_ids in branch_node_ids_map.items():
+        branch_first_node_id = branch_node_ids[0]
+        # assume trunk is a parent by default, if no other is found
+        parent_name = trunk_name
+        if branch_first_node_id not in trunk_node_id_set:
+            for parent_branch_name in node_branch_names[branch_first_node_id]:
+                if (parent_branch_name != branch_name) and \
+                        (branch_node_ids_map[parent_branch_name][0] != branch_first_node_id):
+                    parent_name = parent_branch_name
+                    break
+        branch_parent_map[branch_name] = parent_name
+    return branch_parent_map
+
+
+def group_common_branches(branch_names):
+    """
+    Groups branches with the same annotations and destinations, only different by A, B, C variant character.
+    :param branch_names: List with supplied branch names.
+    :return branch_common_map: Dictionary mapping common branch name to list of branches with common names.
+    Only contains entries for branches with variant names.
+    """
+
+    branch_common_map = {}
+    for branch_name in branch_names:
+        # remove single letters like A, B, C, etc. surrounded by whitespace
+        common_key = re.sub(r'\b[A-Z]\b\s?', '', branch_name).strip()
+        if common_key != branch_name:
+            # branch variant was found
+            variant_branch_list = branch_common_map.get(common_key)
+            if variant_branch_list:
+                variant_branch_list.append(branch_name)
+            else:
+                branch_common_map[common_key] = [branch_name]
+    return branch_common_map
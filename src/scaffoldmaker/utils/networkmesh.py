@@ -3,18 +3,23 @@ Utility class for defining network meshes from 1-D connectivity and lateral axes
 """
 
 from cmlibs.utils.zinc.field import find_or_create_field_coordinates
+from cmlibs.utils.zinc.general import ChangeManager
 from cmlibs.zinc.element import Element, Elementbasis
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 from cmlibs.maths.vectorops import cross, magnitude, mult, normalize, rejection, sub
-from scaffoldmaker.annotation.annotationgroup import AnnotationGroup
+from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, AnnotationGroupList
 from scaffoldmaker.utils.constructionobject import ConstructionObject
+from scaffoldmaker.utils.eft_utils import createElementfieldtemplate, getElementfieldtemplateCreationsCount
 from scaffoldmaker.utils.interpolation import (
     gaussWt4, gaussXi4, getCubicHermiteCurvesLength, interpolateCubicHermiteDerivative)
 from scaffoldmaker.utils.tracksurface import TrackSurface
 from abc import ABC, abstractmethod
+from collections import deque
+import json
 import math
 import sys
+import time
 
 
 pathValueLabels = [
@@ -176,11 +181,37 @@ class NetworkSegment:
         """
         index = self._networkNodes.index(splitNetworkNode, 1, -1)  # throws exception if not an interior node
         splitNetworkNode.setInteriorSegment(None)
-        nextSegment = NetworkSegment(self._networkNodes[index:], self._nodeVersions[index:])
+        nextSegment = NetworkSegment(self._networkNodes[index:], self._nodeVersions[index:], self._isPatch)
         self._networkNodes = self._networkNodes[:index + 1]
         self._nodeVersions = self._nodeVersions[:index + 1]
+        self._elementIdentifiers = self._elementIdentifiers[:index]
         return nextSegment
 
+    def splitAtNodes(self, splitNetworkNodes):
+        """
+        Split segment at all of splitNetworkNodes which are interior to it in a single pass, finishing this segment at
+        the first split node and returning remainders as new NetworkSegments.
+        Equivalent to calling split() for each node, but linear in the number of nodes in the segment.
+        :param splitNetworkNodes: Set of NetworkNodes to split segment at. Nodes not interior to segment are ignored.
+        :return: List of new segments after splits, in order along segment.
+        """
+        indexes = [index for index in range(1, len(self._networkNodes) - 1)
+                   if self._networkNodes[index] in splitNetworkNodes]
+        if not indexes:
+            return []
+        nextSegments = []
+        for i in range(len(indexes)):
+            startIndex = indexes[i]
+            limitIndex = (indexes[i + 1] + 1) if ((i + 1) < len(indexes)) else len(self._networkNodes)
+            self._networkNodes[startIndex].setInteriorSegment(None)
+            nextSegments.append(NetworkSegment(self._networkNodes[startIndex:limitIndex],
+                                               self._nodeVersions[startIndex:limitIndex], self._isPatch))
+        index = indexes[0]
+        self._networkNodes = self._networkNodes[:index + 1]
+        self._nodeVersions = self._nodeVersions[:index + 1]
+        self._elementIdentifiers = self._elementIdentifiers[:index]
+        return nextSegments
+
 
 class NetworkMesh(ConstructionObject):
     """
@@ -214,6 +245,10 @@ class NetworkMesh(ConstructionObject):
         """
         self._networkNodes = {}
         self._networkSegments = []
+        sequenceSegments = []  # segments in order created from sequences, before splitting
+        # splitting segments at interior nodes referenced by later sequences is deferred until all sequences are read
+        # so each segment is split in one pass. Split segments follow the segment they are split from.
+        segmentSplitNodes = {}  # map from sequence NetworkSegment to set of NetworkNodes to split it at
         sequenceStrings = structureString.split(",")
         for sequenceString in sequenceStrings:
             # check if segment is a patch
@@ -250,9 +285,13 @@ class NetworkMesh(ConstructionObject):
                 if networkNode:
                     interiorSegment = networkNode.getInteriorSegment()
                     if interiorSegment:
-                        nextSegment = interiorSegment.split(networkNode)
-                        index = self._networkSegments.index(interiorSegment) + 1
-                        self._networkSegments.insert(index, nextSegment)
+                        # node is no longer interior to any segment once it is a split point
+                        networkNode.setInteriorSegment(None)
+                        splitNodes = segmentSplitNodes.get(interiorSegment)
+                        if splitNodes:
+                            splitNodes.add(networkNode)
+                        else:
+                            segmentSplitNodes[interiorSegment] = {networkNode}
                 else:
                     networkNode = NetworkNode(nodeIdentifier)
                     self._networkNodes[nodeIdentifier] = networkNode
@@ -261,10 +300,16 @@ class NetworkMesh(ConstructionObject):
                 sequenceVersions.append(nodeVersion)
                 if (len(sequenceNodes) > 1) and (existingNetworkNode or (nodeIdentifier == nodeIdentifiers[-1])):
                     networkSegment = NetworkSegment(sequenceNodes, sequenceVersions, isPatch)
-                    self._networkSegments.append(networkSegment)
+                    sequenceSegments.append(networkSegment)
                     sequenceNodes = sequenceNodes[-1:]
                     sequenceVersions = sequenceVersions[-1:]
 
+        for networkSegment in sequenceSegments:
+            self._networkSegments.append(networkSegment)
+            splitNodes = segmentSplitNodes.get(networkSegment)
+            if splitNodes:
+                self._networkSegments += networkSegment.splitAtNodes(splitNodes)
+
         # warn about nodes without all versions in use
         for networkNode in self._networkNodes.values():
             networkNode.checkVersions()
@@ -276,22 +321,8 @@ class NetworkMesh(ConstructionObject):
             segmentNodes[-1].addInSegment(networkSegment)
 
         # assign integer posX coordinates
-        for _ in range(len(self._networkSegments)):  # limit total iterations so no endless loop
-            changeCount = 0
-            for networkSegment in self._networkSegments:
-                segmentNodes = networkSegment.getNetworkNodes()
-                posX = segmentNodes[0].getPosX()
-                if posX is None:
-                    posX = 0
-                for node in segmentNodes:
-                    existingPosX = node.getPosX()
-                    if (existingPosX is None) or ((existingPosX < posX) and (
-                            (node != segmentNodes[-1]) or not networkSegment.isCyclic())):
-                        node.setPosX(posX)
-                        changeCount += 1
-                    posX += 1
-            if changeCount == 0:
-                break
+        if not self._assignPosXTopological():
+            self._assignPosXIterative()
 
         maxPosX = -1
         for node in self._networkNodes.values():
@@ -314,6 +345,70 @@ class NetworkMesh(ConstructionObject):
                 x = [xx, rangeY * (-0.5 + iy / rangeY) if (countY > 1) else 0.0, 0.0]
                 nodes[iy].setX(x)
 
+    def _assignPosXTopological(self):
+        """
+        Assign integer posX to all nodes in linear time by visiting nodes in topological order.
+        Each node gets the greatest posX of the start node of any segment it is in plus its index in that segment,
+        or 0 if only at the start of segments. This is the same result _assignPosXIterative() converges to.
+        Requires in/out segments to have been set up for nodes.
+        :return: True if posX assigned, False if network is cyclic so not assigned.
+        """
+        # count of segments in which node is after the start, i.e. its dependencies
+        dependencyCounts = {networkNode: 0 for networkNode in self._networkNodes.values()}
+        for networkSegment in self._networkSegments:
+            for networkNode in networkSegment.getNetworkNodes()[1:]:
+                dependencyCounts[networkNode] += 1
+        posXMap = {}
+        queue = deque()
+        for networkNode, dependencyCount in dependencyCounts.items():
+            if dependencyCount == 0:
+                posXMap[networkNode] = 0
+                queue.append(networkNode)
+        visitedCount = 0
+        while queue:
+            startNode = queue.popleft()
+            visitedCount += 1
+            startPosX = posXMap[startNode]
+            for networkSegment in startNode.getOutSegments():
+                segmentNodes = networkSegment.getNetworkNodes()
+                for n in range(1, len(segmentNodes)):
+                    networkNode = segmentNodes[n]
+                    posX = startPosX + n
+                    existingPosX = posXMap.get(networkNode)
+                    if (existingPosX is None) or (existingPosX < posX):
+                        posXMap[networkNode] = posX
+                    dependencyCount = dependencyCounts[networkNode] - 1
+                    dependencyCounts[networkNode] = dependencyCount
+                    if dependencyCount == 0:
+                        queue.append(networkNode)
+        if visitedCount < len(dependencyCounts):
+            return False
+        for networkNode, posX in posXMap.items():
+            networkNode.setPosX(posX)
+        return True
+
+    def _assignPosXIterative(self):
+        """
+        Assign integer posX to all nodes by iterating over segments, with limited iterations so it always
+        terminates for cyclic networks.
+        """
+        for _ in range(len(self._networkSegments)):  # limit total iterations so no endless loop
+            changeCount = 0
+            for networkSegment in self._networkSegments:
+                segmentNodes = networkSegment.getNetworkNodes()
+                posX = segmentNodes[0].getPosX()
+                if posX is None:
+                    posX = 0
+                for node in segmentNodes:
+                    existingPosX = node.getPosX()
+                    if (existingPosX is None) or ((existingPosX < posX) and (
+                            (node != segmentNodes[-1]) or not networkSegment.isCyclic())):
+                        node.setPosX(posX)
+                        changeCount += 1
+                    posX += 1
+            if changeCount == 0:
+                break
+
     def getNetworkNodes(self):
         """
         :return: dict mapping node identifier to NetworkNode
@@ -332,103 +427,122 @@ class NetworkMesh(ConstructionObject):
         """
         return self._region
 
-    def create1DLayoutMesh(self, region):
+    def _getLayoutNodeParameters(self):
         """
-        Expects region Fieldmodule ChangeManager to be in effect.
-        :param region: Zinc region to create network layout in.
+        Precompute default layout coordinates and derivatives for all nodes in a single pass over segments.
+        Derivative d1 for each version is the centred or one-sided difference of layout coordinates with the previous
+        and next nodes using that version, d3 is out of the layout plane and d2 is normal to these.
+        :return: list over nodes in creation order of (nodeIdentifier, versionsCount, x, versionDerivatives) where
+        versionDerivatives is a list over versions of [d1, d2, d3], or None if there is no data to define it.
         """
-        self._region = region
-        fieldmodule = region.getFieldmodule()
-        coordinates = find_or_create_field_coordinates(fieldmodule)
-
-        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-        nodetemplates = [None]
-        fieldcache = fieldmodule.createFieldcache()
-        derivativeValueLabels = [
-            Node.VALUE_LABEL_D_DS1,
-            Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D2_DS1DS2,
-            Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3]
-        nodetemplate = None
+        interiorNeighbours = {}  # map from interior NetworkNode to (previous, next) NetworkNode in its segment
+        inNeighbours = {}  # map from (end NetworkNode, version) to previous NetworkNode in first in-segment
+        outNeighbours = {}  # map from (start NetworkNode, version) to next NetworkNode in first out-segment
+        for networkSegment in self._networkSegments:
+            segmentNodes = networkSegment.getNetworkNodes()
+            segmentNodeVersions = networkSegment.getNodeVersions()
+            for n in range(1, len(segmentNodes) - 1):
+                networkNode = segmentNodes[n]
+                if (networkNode.getInteriorSegment() is networkSegment) and (networkNode not in interiorNeighbours):
+                    interiorNeighbours[networkNode] = (segmentNodes[n - 1], segmentNodes[n + 1])
+            inNeighbours.setdefault((segmentNodes[-1], segmentNodeVersions[-1]), segmentNodes[-2])
+            outNeighbours.setdefault((segmentNodes[0], segmentNodeVersions[0]), segmentNodes[1])
+
+        d3 = [0.0, 0.0, 0.1]
+        nodeParameters = []
         for nodeIdentifier, networkNode in self._networkNodes.items():
             versionsCount = networkNode.getVersionsCount()
-            # print("Node", nodeIdentifier, "versions", versionsCount)
-            if versionsCount < len(nodetemplates):
-                nodetemplate = nodetemplates[versionsCount]
-            else:
-                for v in range(len(nodetemplates), versionsCount + 1):
-                    nodetemplate = nodes.createNodetemplate()
-                    nodetemplate.defineField(coordinates)
-                    for valueLabel in derivativeValueLabels:
-                        nodetemplate.setValueNumberOfVersions(coordinates, -1, valueLabel, v)
-                    nodetemplates.append(nodetemplate)
-            node = nodes.createNode(networkNode.getNodeIdentifier(), nodetemplate)
-            fieldcache.setNode(node)
-            coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, networkNode.getX())
-            d1 = []
+            x = networkNode.getX()
+            versionDerivatives = []
             for nodeVersion in range(1, versionsCount + 1):
-                interiorSegment = networkNode.getInteriorSegment()
-                if interiorSegment:
-                    segmentNodes = interiorSegment.getNetworkNodes()
-                    index = segmentNodes.index(networkNode)
-                    prevNetworkNode = segmentNodes[index - 1]
-                    nextNetworkNode = segmentNodes[index + 1]
+                neighbours = interiorNeighbours.get(networkNode)
+                if neighbours:
+                    prevNetworkNode, nextNetworkNode = neighbours
                 else:
-                    prevNetworkNode = None
-                    for inNetworkSegment in networkNode.getInSegments():
-                        if inNetworkSegment.getNodeVersions()[-1] == nodeVersion:
-                            prevNetworkNode = inNetworkSegment.getNetworkNodes()[-2]
-                            break
-                    nextNetworkNode = None
-                    for outNetworkSegment in networkNode.getOutSegments():
-                        if outNetworkSegment.getNodeVersions()[0] == nodeVersion:
-                            nextNetworkNode = outNetworkSegment.getNetworkNodes()[1]
-                            break
+                    prevNetworkNode = inNeighbours.get((networkNode, nodeVersion))
+                    nextNetworkNode = outNeighbours.get((networkNode, nodeVersion))
                 if prevNetworkNode or nextNetworkNode:
                     if prevNetworkNode and nextNetworkNode:
                         d1 = mult(sub(nextNetworkNode.getX(), prevNetworkNode.getX()), 0.5)
                     elif prevNetworkNode:
-                        d1 = sub(networkNode.getX(), prevNetworkNode.getX())
+                        d1 = sub(x, prevNetworkNode.getX())
                     else:
-                        d1 = sub(nextNetworkNode.getX(), networkNode.getX())
-                    d3 = [0.0, 0.0, 0.1]
+                        d1 = sub(nextNetworkNode.getX(), x)
                     d2 = cross(d3, normalize(d1))
-                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, nodeVersion, d1)
-                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS2, nodeVersion, d2)
-                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS3, nodeVersion, d3)
+                    versionDerivatives.append([d1, d2, d3])
                 else:
                     print("Warning: No data to define derivative version", nodeVersion, "at node", nodeIdentifier, ".",
                           file=sys.stderr)
+                    versionDerivatives.append(None)
+            nodeParameters.append((nodeIdentifier, versionsCount, x, versionDerivatives))
+        return nodeParameters
 
-        mesh = fieldmodule.findMeshByDimension(1)
-        elementIdentifier = 1
-        elementtemplates = {}  # dict (startVersion, endVersion) -> Elementtemplate
-        for networkSegment in self._networkSegments:
-            segmentNodes = networkSegment.getNetworkNodes()
-            segmentNodeVersions = networkSegment.getNodeVersions()
-            segmentElementCount = len(segmentNodes) - 1
-            for e in range(segmentElementCount):
-                startVersion = segmentNodeVersions[e]
-                endVersion = segmentNodeVersions[e + 1]
-                # print("Element", nextElementIdentifier, "versions", (startVersion, endVersion))
-                elementtemplate_eft = elementtemplates.get((startVersion, endVersion))
-                if elementtemplate_eft:
-                    elementtemplate, eft = elementtemplate_eft
-                else:
-                    elementtemplate = mesh.createElementtemplate()
-                    elementtemplate.setElementShapeType(Element.SHAPE_TYPE_LINE)
-                    elementbasis = fieldmodule.createElementbasis(1, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
-                    eft = mesh.createElementfieldtemplate(elementbasis)
-                    if startVersion != 1:
-                        eft.setTermNodeParameter(2, 1, 1, Node.VALUE_LABEL_D_DS1, startVersion)
-                    if endVersion != 1:
-                        eft.setTermNodeParameter(4, 1, 2, Node.VALUE_LABEL_D_DS1, endVersion)
-                    elementtemplate.defineField(coordinates, -1, eft)
-                    elementtemplates[(startVersion, endVersion)] = elementtemplate, eft
-                element = mesh.createElement(elementIdentifier, elementtemplate)
-                element.setNodesByIdentifier(
-                    eft, [segmentNodes[e].getNodeIdentifier(), segmentNodes[e + 1].getNodeIdentifier()])
-                networkSegment.setElementIdentifier(e, elementIdentifier)
-                elementIdentifier += 1
+    def create1DLayoutMesh(self, region):
+        """
+        Create nodes and elements for the network layout in region.
+        All node parameters are precomputed then nodes and elements are created in a single change cache block,
+        reusing node templates per number of versions and element templates per start/end version.
+        :param region: Zinc region to create network layout in.
+        """
+        self._region = region
+        fieldmodule = region.getFieldmodule()
+        nodeParameters = self._getLayoutNodeParameters()
+        with ChangeManager(fieldmodule):
+            coordinates = find_or_create_field_coordinates(fieldmodule)
+
+            nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+            nodetemplates = {}  # dict versionsCount -> Nodetemplate
+            fieldcache = fieldmodule.createFieldcache()
+            derivativeValueLabels = [
+                Node.VALUE_LABEL_D_DS1,
+                Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D2_DS1DS2,
+                Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3]
+            for nodeIdentifier, versionsCount, x, versionDerivatives in nodeParameters:
+                nodetemplate = nodetemplates.get(versionsCount)
+                if not nodetemplate:
+                    nodetemplate = nodes.createNodetemplate()
+                    nodetemplate.defineField(coordinates)
+                    for valueLabel in derivativeValueLabels:
+                        nodetemplate.setValueNumberOfVersions(coordinates, -1, valueLabel, versionsCount)
+                    nodetemplates[versionsCount] = nodetemplate
+                node = nodes.createNode(nodeIdentifier, nodetemplate)
+                fieldcache.setNode(node)
+                coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, x)
+                for nodeVersion, derivatives in enumerate(versionDerivatives, start=1):
+                    if derivatives:
+                        for valueLabel, value in zip(
+                                (Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D_DS3), derivatives):
+                            coordinates.setNodeParameters(fieldcache, -1, valueLabel, nodeVersion, value)
+
+            mesh = fieldmodule.findMeshByDimension(1)
+            elementIdentifier = 1
+            elementtemplates = {}  # dict (startVersion, endVersion) -> Elementtemplate
+            for networkSegment in self._networkSegments:
+                segmentNodes = networkSegment.getNetworkNodes()
+                segmentNodeVersions = networkSegment.getNodeVersions()
+                segmentElementCount = len(segmentNodes) - 1
+                for e in range(segmentElementCount):
+                    startVersion = segmentNodeVersions[e]
+                    endVersion = segmentNodeVersions[e + 1]
+                    elementtemplate_eft = elementtemplates.get((startVersion, endVersion))
+                    if elementtemplate_eft:
+                        elementtemplate, eft = elementtemplate_eft
+                    else:
+                        elementtemplate = mesh.createElementtemplate()
+                        elementtemplate.setElementShapeType(Element.SHAPE_TYPE_LINE)
+                        elementbasis = fieldmodule.createElementbasis(1, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
+                        eft = createElementfieldtemplate(mesh, elementbasis)
+                        if startVersion != 1:
+                            eft.setTermNodeParameter(2, 1, 1, Node.VALUE_LABEL_D_DS1, startVersion)
+                        if endVersion != 1:
+                            eft.setTermNodeParameter(4, 1, 2, Node.VALUE_LABEL_D_DS1, endVersion)
+                        elementtemplate.defineField(coordinates, -1, eft)
+                        elementtemplates[(startVersion, endVersion)] = elementtemplate, eft
+                    element = mesh.createElement(elementIdentifier, elementtemplate)
+                    element.setNodesByIdentifier(
+                        eft, [segmentNodes[e].getNodeIdentifier(), segmentNodes[e + 1].getNodeIdentifier()])
+                    networkSegment.setElementIdentifier(e, elementIdentifier)
+                    elementIdentifier += 1
 
 
 class NetworkMeshGenerateData:
@@ -448,7 +562,7 @@ class NetworkMeshGenerateData:
         self._coordinates = find_or_create_field_coordinates(self._fieldmodule, coordinateFieldName)
         self._nodeIdentifier = startNodeIdentifier
         self._elementIdentifier = startElementIdentifier
-        self._annotationGroups = []  # list of AnnotationGroup to return for mesh's scaffold
+        self._annotationGroups = AnnotationGroupList()  # list of AnnotationGroup to return for mesh's scaffold
         self._annotationGroupMap = {}  # map from annotation term (name, ontId) to AnnotationGroup in output region
 
     def getCoordinates(self):
@@ -727,11 +841,104 @@ class NetworkMeshJunction(ABC):
         pass
 
 
+class NetworkMeshBuildProfile(ConstructionObject):
+    """
+    Records costs of creating, sampling and generating each segment and junction of a network mesh, for finding
+    which parts of slow networks cost the most. Enable with NetworkMeshBuilder.setProfile().
+    """
+
+    # names of recorded quantities, in order of table columns:
+    quantityNames = ["create time", "sample time", "generate time", "nodes", "elements",
+                     "track surface iterations", "element field templates"]
+
+    def __init__(self):
+        self._records = {}  # map from segment or junction object to record dict, in order added
+
+    def addItem(self, item, name):
+        """
+        Add segment or junction to profile, if not already added.
+        :param item: NetworkMeshSegment or NetworkMeshJunction-derived object.
+        :param name: Name to show for item, e.g. "segment 1-2-3".
+        """
+        if item not in self._records:
+            record = {"name": name}
+            for quantityName in self.quantityNames:
+                record[quantityName] = 0.0 if quantityName.endswith("time") else 0
+            self._records[item] = record
+
+    def start(self, generateData: NetworkMeshGenerateData=None):
+        """
+        Get counters before doing work on an item.
+        :param generateData: NetworkMeshGenerateData if generating mesh, otherwise None.
+        :return: State to pass to end().
+        """
+        nodeIdentifier, elementIdentifier = generateData.getNodeElementIdentifiers() if generateData else (0, 0)
+        return (time.perf_counter(), TrackSurface.getIterationsCount(), getElementfieldtemplateCreationsCount(),
+                nodeIdentifier, elementIdentifier)
+
+    def end(self, item, phase, state, generateData: NetworkMeshGenerateData=None):
+        """
+        Add costs of work done on item since start().
+        :param item: Segment or junction object, added with addItem() to give it a name.
+        :param phase: "create", "sample" or "generate".
+        :param state: Value returned by start().
+        :param generateData: NetworkMeshGenerateData if generating mesh, otherwise None.
+        """
+        startTime, startIterationsCount, startEftsCount, startNodeIdentifier, startElementIdentifier = state
+        self.addItem(item, type(item).__name__ + " " + str(len(self._records) + 1))
+        record = self._records[item]
+        record[phase + " time"] += time.perf_counter() - startTime
+        record["track surface iterations"] += TrackSurface.getIterationsCount() - startIterationsCount
+        record["element field templates"] += getElementfieldtemplateCreationsCount() - startEftsCount
+        if generateData:
+            nodeIdentifier, elementIdentifier = generateData.getNodeElementIdentifiers()
+            record["nodes"] += nodeIdentifier - startNodeIdentifier
+            record["elements"] += elementIdentifier - startElementIdentifier
+
+    def getRecords(self):
+        """
+        :return: List of record dicts for each segment and junction in order added, each with "name" and
+        values for all quantityNames.
+        """
+        return list(self._records.values())
+
+    def getTable(self):
+        """
+        :return: String table of profile records, one per line, with quantities in columns and a totals row.
+        """
+        records = self.getRecords()
+        nameWidth = max([len(record["name"]) for record in records] + [5])
+        widths = [max(len(quantityName), 10) for quantityName in self.quantityNames]
+        lines = ["  ".join(["name".ljust(nameWidth)] + [quantityName.rjust(width) for quantityName, width in
+                                                         zip(self.quantityNames, widths)])]
+        totals = {"name": "total"}
+        for quantityName in self.quantityNames:
+            totals[quantityName] = sum(record[quantityName] for record in records)
+        for record in records + [totals]:
+            values = []
+            for quantityName, width in zip(self.quantityNames, widths):
+                value = record[quantityName]
+                values.append(("%.6f" % value if isinstance(value, float) else str(value)).rjust(width))
+            lines.append("  ".join([record["name"].ljust(nameWidth)] + values))
+        return "\n".join(lines)
+
+    def getJSON(self):
+        """
+        :return: JSON string of profile records.
+        """
+        return json.dumps(self.getRecords(), indent=2)
+
+    def getMetadata(self):
+        return {"network mesh build profile": self.getRecords()}
+
+
 class NetworkMeshBuilder(ABC):
     """
     Abstract base class for building meshes from a NetworkMesh network layout.
     """
 
+    _defaultProfiling = False  # set with setDefaultProfiling()
+
     def __init__(self, networkMesh: NetworkMesh, targetElementDensityAlongLongestSegment: float,
                  layoutAnnotationGroups, annotationElementsCountsAlong=[]):
         """
@@ -758,6 +965,29 @@ class NetworkMeshBuilder(ABC):
         self._longestSegmentLength = 0.0
         self._targetElementLength = 1.0
         self._junctions = {}  # map from NetworkNode to NetworkMeshJunction-derived object
+        self._profile = NetworkMeshBuildProfile() if NetworkMeshBuilder._defaultProfiling else None
+
+    @classmethod
+    def setDefaultProfiling(cls, profiling):
+        """
+        Set whether subsequently constructed builders record a NetworkMeshBuildProfile, so profiles are made when
+        builders are used within scaffold scripts.
+        :param profiling: True to profile, False to not profile.
+        """
+        NetworkMeshBuilder._defaultProfiling = profiling
+
+    def setProfile(self, profile: NetworkMeshBuildProfile):
+        """
+        Set profile to record costs of building and generating segments and junctions with, or None to not profile.
+        Must be set before build() to record all costs.
+        """
+        self._profile = profile
+
+    def getProfile(self):
+        """
+        :return: NetworkMeshBuildProfile or None if not profiling.
+        """
+        return self._profile
 
     @abstractmethod
     def createSegment(self, networkSegment):
@@ -775,9 +1005,16 @@ class NetworkMeshBuilder(ABC):
         """
         self._segments = {}
         self._longestSegmentLength = 0.0
+        profile = self._profile
         for networkSegment in self._networkMesh.getNetworkSegments():
+            if profile:
+                state = profile.start()
             # derived class makes the segment of its required type
             self._segments[networkSegment] = segment = self.createSegment(networkSegment)
+            if profile:
+                profile.addItem(segment, "segment " + "-".join(
+                    str(nodeIdentifier) for nodeIdentifier in networkSegment.getNodeIdentifiers()))
+                profile.end(segment, "create", state)
             segmentLength = segment.getSampleLength()
             if segmentLength > self._longestSegmentLength:
                 self._longestSegmentLength = segmentLength
@@ -812,10 +1049,15 @@ class NetworkMeshBuilder(ABC):
                 segmentNode = segmentNodes[nodeIndex]
                 junction = self._junctions.get(segmentNode)
                 if not junction:
+                    if self._profile:
+                        state = self._profile.start()
                     inSegments = [self._segments[networkSegment] for networkSegment in segmentNode.getInSegments()]
                     outSegments = [self._segments[networkSegment] for networkSegment in segmentNode.getOutSegments()]
                     junction = self.createJunction(inSegments, outSegments)
                     self._junctions[segmentNode] = junction
+                    if self._profile:
+                        self._profile.addItem(junction, "junction " + str(segmentNode.getNodeIdentifier()))
+                        self._profile.end(junction, "create", state)
                 segmentJunctions.append(junction)
             segment.setJunctions(segmentJunctions)
 
@@ -837,7 +1079,11 @@ class NetworkMeshBuilder(ABC):
                         break
                 i += 1
             segment = self._segments[networkSegment]
+            if self._profile:
+                state = self._profile.start()
             segment.sample(fixedElementsCountAlong, self._targetElementLength)
+            if self._profile:
+                self._profile.end(segment, "sample", state)
 
     def _sampleJunctions(self):
         """
@@ -850,7 +1096,11 @@ class NetworkMeshBuilder(ABC):
             segment = self._segments[networkSegment]
             for junction in segment.getJunctions():
                 if junction not in sampledJunctions:
+                    if self._profile:
+                        state = self._profile.start()
                     junction.sample(self._targetElementLength)
+                    if self._profile:
+                        self._profile.end(junction, "sample", state)
                     sampledJunctions.add(junction)
 
     def build(self):
@@ -862,6 +1112,26 @@ class NetworkMeshBuilder(ABC):
         self._sampleSegments()
         self._sampleJunctions()
 
+    def resample(self, targetElementDensityAlongLongestSegment: float, annotationElementsCountsAlong=None):
+        """
+        Resample coordinates in segments and junctions with a new element density along, reusing the segments,
+        junctions and their topology analysis from build(). Use to generate the same network at several levels of
+        detail: call generateMesh() with new generate data after each resample.
+        Must have called self.build() first.
+        :param targetElementDensityAlongLongestSegment: Real value which longest segment path in network is divided
+        by to get target element length.
+        :param annotationElementsCountsAlong: Optional replacement list of fixed numbers of elements along segments in
+        layout annotation groups, or None to keep the current list. See constructor.
+        """
+        assert self._segments, "NetworkMeshBuilder.resample:  Must call build() first"
+        self._targetElementDensityAlongLongestSegment = targetElementDensityAlongLongestSegment
+        if annotationElementsCountsAlong is not None:
+            self._annotationElementsCountsAlong = annotationElementsCountsAlong
+        if self._longestSegmentLength > 0.0:
+            self._targetElementLength = self._longestSegmentLength / self._targetElementDensityAlongLongestSegment
+        self._sampleSegments()
+        self._sampleJunctions()
+
     def generateMesh(self, generateData: NetworkMeshGenerateData):
         """
         Generate mesh from segments and junctions, in order of segments.
@@ -874,11 +1144,24 @@ class NetworkMeshBuilder(ABC):
             segment = self._segments[networkSegment]
             junctions = segment.getJunctions()
             if junctions[0] not in generatedJunctions:
-                junctions[0].generateMesh(generateData)
+                self._generateItemMesh(junctions[0], generateData)
                 generatedJunctions.add(junctions[0])
             if networkSegment.isPatch():
                 continue  # so as not to make patch mesh twice
-            segment.generateMesh(generateData)
+            self._generateItemMesh(segment, generateData)
             if junctions[1] not in generatedJunctions:
-                junctions[1].generateMesh(generateData)
+                self._generateItemMesh(junctions[1], generateData)
                 generatedJunctions.add(junctions[1])
+
+    def _generateItemMesh(self, item, generateData: NetworkMeshGenerateData):
+        """
+        Generate mesh for segment or junction, recording costs if profiling.
+        :param item: NetworkMeshSegment or NetworkMeshJunction-derived object.
+        :param generateData: NetworkMeshGenerateData-derived object.
+        """
+        if self._profile:
+            state = self._profile.start(generateData)
+            item.generateMesh(generateData)
+            self._profile.end(item, "generate", state, generateData)
+        else:
+            item.generateMesh(generateData)
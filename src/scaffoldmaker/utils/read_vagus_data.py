@@ -1,17 +1,21 @@
-import re
-import math
+import hashlib
+import json
+import os
 import logging
+import sys
 import tempfile
 
 from cmlibs.maths.vectorops import distance
 from cmlibs.utils.zinc.field import get_group_list
 from cmlibs.utils.zinc.finiteelement import get_element_node_identifiers
-from cmlibs.utils.zinc.group import groups_have_same_local_contents
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
+import numpy
 
 from scaffoldmaker.annotation.vagus_terms import (
     get_vagus_term, marker_name_in_terms, get_left_vagus_marker_locations_list, get_right_vagus_marker_locations_list)
+from scaffoldmaker.utils.nerve_graph import (
+    build_undirected_graph, get_branch_parent_map, get_graph_path_through_ends, group_common_branches)
 from scaffoldmaker.utils.zinc_utils import get_nodeset_field_parameters
 
 
@@ -23,9 +27,30 @@ class VagusInputData:
     Categorising and storing input data from data region for vagus box scaffold
     """
 
-    def __init__(self, data_region):
+    # version of parsed data in cache files; increment when parsed data changes
+    _cache_version = 2
+    # names of attributes holding parsed data, saved in cache files
+    _cache_attribute_names = [
+        "_annotation_term_map",
+        "_branch_coordinates_data",
+        "_branch_parent_map",
+        "_branch_common_group_map",
+        "_branch_radius_data",
+        "_level_markers",
+        "_orientation_data",
+        "_segments_trunk_coordinates",
+        "_side_label",
+        "_trunk_group_name",
+        "_trunk_coordinates",
+        "_trunk_radius"
+    ]
+
+    def __init__(self, data_region, cache_directory=None):
         """
         :param data_region Zinc data region with input data
+        :param cache_directory: Optional path to directory to save parsed data in, in a JSON cache file keyed by
+        the hash of the data file. If a cache file for the same data exists, parsed data is read from it instead.
+        Created if it does not exist. See get_default_cache_directory().
         """
 
         self._trunk_keywords = ['cervical vagus nerve', 'thoracic vagus nerve',
@@ -43,11 +68,73 @@ class VagusInputData:
         self._datafile_path = None
         self._level_markers = {}
         self._orientation_data = {}
+        self._segments_trunk_coordinates = {}
         self._side_label = ""
         self._trunk_group_name = None
         self._trunk_coordinates = []
         self._trunk_radius = []
 
+        # write all data in a file for geometry fitter
+        sir = data_region.createStreaminformationRegion()
+        srm = sir.createStreamresourceMemory()
+        data_region.write(sir)
+        buffer = srm.getBuffer()[1]
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            temp_file.write(buffer)
+            self._datafile_path = temp_file.name
+
+        cache_path = None
+        if cache_directory:
+            cache_path = os.path.join(
+                cache_directory, "vagus_input_data_" + hashlib.sha256(buffer).hexdigest() + ".json")
+            if self._read_cache(cache_path):
+                return
+        self._read_data_region(data_region)
+        if cache_path:
+            self._write_cache(cache_path)
+
+    def _read_cache(self, cache_path):
+        """
+        Read parsed data from cache file, if it exists and is the current version.
+        Cache files only contain JSON data so reading them cannot execute code.
+        :param cache_path: Path to cache file.
+        :return: True if parsed data was read, otherwise False.
+        """
+        try:
+            with open(cache_path, "r", encoding="utf-8") as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            return False
+        if not (isinstance(cache, dict) and (cache.get("version") == self._cache_version) and
+                all((attribute_name in cache) for attribute_name in self._cache_attribute_names)):
+            return False
+        for attribute_name in self._cache_attribute_names:
+            setattr(self, attribute_name, cache[attribute_name])
+        return True
+
+    def _write_cache(self, cache_path):
+        """
+        Write parsed data to cache file. Failure to write is logged but otherwise ignored.
+        :param cache_path: Path to cache file.
+        """
+        cache = {"version": self._cache_version}
+        for attribute_name in self._cache_attribute_names:
+            cache[attribute_name] = getattr(self, attribute_name)
+        try:
+            cache_directory = os.path.dirname(cache_path)
+            os.makedirs(cache_directory, exist_ok=True)
+            # write to temporary file and rename so other processes never read a partial cache file
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=cache_directory, delete=False) as temp_file:
+                json.dump(cache, temp_file)
+            os.replace(temp_file.name, cache_path)
+        except OSError as error:
+            logger.warning("Failed to write vagus input data cache file " + cache_path + ": " + str(error))
+
+    def _read_data_region(self, data_region):
+        """
+        Parse input data from data region.
+        :param data_region Zinc data region with input data
+        """
         fm = data_region.getFieldmodule()
         fc = fm.createFieldcache()
 
@@ -68,16 +155,16 @@ class VagusInputData:
                 term_annotation_names.append(group_name)
             else:
                 annotation_names.append(group_name)
+        # match annotation groups to the first term group with the same contents by hashing contents
+        contents_term_map = {}
+        for term_annotation in term_annotation_names:
+            term_group = fm.findFieldByName(term_annotation).castGroup()
+            contents_term_map.setdefault(get_group_local_contents_key(term_group), term_annotation)
         for annotation_name in annotation_names:
             annotation_group = fm.findFieldByName(annotation_name).castGroup()
-            for term_annotation in term_annotation_names:
-                term_group = fm.findFieldByName(term_annotation).castGroup()
-                if groups_have_same_local_contents(annotation_group, term_group):
-                    self._annotation_term_map[annotation_name] = term_annotation
-                    break
-            else:
-                # no matching term is found for annotation group
-                self._annotation_term_map[annotation_name] = ""
+            # empty string if no matching term is found for annotation group
+            self._annotation_term_map[annotation_name] = \
+                contents_term_map.get(get_group_local_contents_key(annotation_group), "")
 
         found_trunk_group_names = []
         branch_group_names = []
@@ -129,17 +216,17 @@ class VagusInputData:
 
         # build list of trunk centroid data associated with segment groups ending in .exf
         # exported by segmentation stitcher, but not from connections which have .exf twice
-        # get map from segment group_name to (nodeset_group, [])
+        # get map from segment group_name to (set of node identifiers, [])
         # where [] = coordinates list to be filled from trunk groups' coordinates
-        self._segment_groups_info = {}
+        segment_groups_info = {}
         for group in group_list:
             group_name = group.getName()
             if (group_name[-4:] == '.exf') and (1 == group_name.count('.exf')):
-                self._segment_groups_info[group_name] = (group.getNodesetGroup(nodes), [])
+                segment_groups_info[group_name] = (set(get_nodeset_group_identifiers(group, nodes).tolist()), [])
 
+        trunk_nodes = []
         if self._trunk_group_name:
             trunk_group_count = 0
-            trunk_nodes = []
             trunk_coordinates = []
             trunk_radius = []
             trunk_elements = []
@@ -169,63 +256,19 @@ class VagusInputData:
                 trunk_group_count += 1
 
             # fill segment groups with coordinates of trunk nodes contained in them
-            if self._segment_groups_info:
+            if segment_groups_info:
                 for n, node_identifier in enumerate(trunk_nodes):
-                    node = nodes.findNodeByIdentifier(node_identifier)
-                    for segment_nodeset_group, segment_points_list in self._segment_groups_info.values():
-                        if segment_nodeset_group.containsNode(node):
+                    for segment_node_identifiers, segment_points_list in segment_groups_info.values():
+                        if node_identifier in segment_node_identifiers:
                             segment_points_list.append(trunk_coordinates[n][0])
 
             # order trunk coordinates top to bottom in case trunk elements are available
+            trunk_path_ids = []
             if len(trunk_elements) > 0:
                 # build trunk graph
                 nid_coords = {node_id: n_coord[0] for node_id, n_coord in zip(trunk_nodes, trunk_coordinates)}
-                trunk_graph = {node_id: [] for node_id in nid_coords}
-                for element in trunk_elements:
-                    local_node_1, local_node_2 = element['nodes']
-                    if local_node_1 in trunk_nodes and local_node_2 in trunk_nodes:
-                        trunk_graph[local_node_1].append(local_node_2)
-                        trunk_graph[local_node_2].append(local_node_1)
-                # add any isolated nodes
-                for node in trunk_nodes:
-                    if node not in trunk_graph.keys():
-                        trunk_graph[node] = []
-                unconnected_nodes = []
-                for el in trunk_graph.keys():
-                    if len(trunk_graph[el]) <= 1:
-                        unconnected_nodes.append(el)
-
-                # choose start, not necessarily first in unconnected nodes
-                furthest_distance = 0
-                for index_1, node_id_1 in enumerate(unconnected_nodes):
-                    for index_2 in range(index_1, len(unconnected_nodes)):
-                        node_id_2 = unconnected_nodes[index_2]
-                        dist = distance(nid_coords[node_id_1], nid_coords[node_id_2])
-                        if dist > furthest_distance:
-                            furthest_distance = dist
-                            furthest_index_1 = index_1
-                            furthest_index_2 = index_2
-
-                start_index = furthest_index_1 if furthest_index_1 < furthest_index_2 else furthest_index_2
-                start = unconnected_nodes[start_index]
-
-                trunk_path_ids = []
-                # BFS from first to next unconnected, all connected in one long path
-                while len(unconnected_nodes) > 0:
-                    unconnected_nodes.pop(start_index)
-                    if start not in trunk_path_ids:
-                        local_trunk_path_ids = bfs_to_furthest(trunk_graph, start, trunk_path_ids)
-                        trunk_path_ids.extend(local_trunk_path_ids)
-
-                    # find next closest unconnected node
-                    closest_distance = math.inf
-                    last_node_id_in_path = trunk_path_ids[-1]
-                    for index, node_id in enumerate(unconnected_nodes):
-                        dist = distance(nid_coords[node_id], nid_coords[last_node_id_in_path])
-                        if dist < closest_distance:
-                            closest_distance = dist
-                            start = node_id
-                            start_index = index
+                trunk_graph = build_undirected_graph(nid_coords, [element['nodes'] for element in trunk_elements])
+                trunk_path_ids = get_graph_path_through_ends(trunk_graph, nid_coords)
 
                 # get one of the top markers to check if trunk path needs to be reversed
                 if self._side_label == 'left':
@@ -237,28 +280,27 @@ class VagusInputData:
                     if marker_name in self._level_markers.keys():
                         top_marker = self._level_markers[marker_name]
                         break
-                start_dist = distance(nid_coords[trunk_path_ids[0]], top_marker)
-                end_dist = distance(nid_coords[trunk_path_ids[-1]], top_marker)
-                if trunk_path_ids and end_dist < start_dist:
-                    trunk_path_ids.reverse()
-
-                ordered_trunk_coordinates = []
-                for trunk_path_id in trunk_path_ids:
-                    index = trunk_nodes.index(trunk_path_id)
-                    ordered_trunk_coordinates.append(trunk_coordinates[index])
-
-            if len(trunk_elements) > 0 and trunk_path_ids:
-                self._trunk_coordinates = ordered_trunk_coordinates[:]
+                if trunk_path_ids:
+                    start_dist = distance(nid_coords[trunk_path_ids[0]], top_marker)
+                    end_dist = distance(nid_coords[trunk_path_ids[-1]], top_marker)
+                    if end_dist < start_dist:
+                        trunk_path_ids.reverse()
+
+            # map from trunk node identifier to index of its first entry in trunk_nodes
+            trunk_node_indexes = {}
+            for index, node_identifier in enumerate(trunk_nodes):
+                trunk_node_indexes.setdefault(node_identifier, index)
+
+            if trunk_path_ids:
+                self._trunk_coordinates = [trunk_coordinates[trunk_node_indexes[trunk_path_id]]
+                                           for trunk_path_id in trunk_path_ids]
             else:
                 self._trunk_coordinates = trunk_coordinates[:]
 
             if radius.isValid() and not all(value == 0.0 for value in trunk_radius):
-                if len(trunk_elements) > 0 and trunk_path_ids:
-                    ordered_trunk_radius = []
-                    for trunk_path_id in trunk_path_ids:
-                        index = trunk_nodes.index(trunk_path_id)
-                        ordered_trunk_radius.append(trunk_radius[index])
-                    self._trunk_radius = ordered_trunk_radius[:]
+                if trunk_path_ids:
+                    self._trunk_radius = [trunk_radius[trunk_node_indexes[trunk_path_id]]
+                                          for trunk_path_id in trunk_path_ids]
                 else:
                     self._trunk_radius = trunk_radius[:]
 
@@ -285,39 +327,15 @@ class VagusInputData:
                     self._branch_radius_data[branch_name] = branch_radius
 
         # find parent branch where it connects to
-        for branch_name, branch_nodes in branch_nodes_data.items():
-            # assumes trunk and branch node identifiers are strictly increasing.
-            branch_first_node = branch_nodes[0]
-
-            #  first check if trunk is a parent by searching for a common node
-            parent_name = ''
-            if branch_first_node in trunk_nodes:
-                parent_name = self._trunk_group_name
-            else:
-                # check other branches if a common node exists
-                for parent_branch_name, parent_branch_nodes in branch_nodes_data.items():
-                    if parent_branch_name != branch_name:
-                        parent_first_node = parent_branch_nodes[0]
-                        if branch_first_node != parent_first_node and branch_first_node in parent_branch_nodes:
-                            parent_name = parent_branch_name
-                            break
-            if parent_name == '':
-                # assume trunk is a parent by default, if no other is found
-                parent_name = self._trunk_group_name
-            self._branch_parent_map[branch_name] = parent_name
-            # print(branch_name, ' -> ', parent_name)
+        # assumes trunk and branch node identifiers are strictly increasing.
+        self._branch_parent_map = get_branch_parent_map(branch_nodes_data, trunk_nodes, self._trunk_group_name)
 
         # group common branches by names
         branch_common_map = group_common_branches(branch_group_names)
         self._branch_common_group_map = branch_common_map
 
-        # write all data in a file for geometry fitter
-        sir = data_region.createStreaminformationRegion()
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            datafile_path = temp_file.name
-            srf = sir.createStreamresourceFile(datafile_path)
-            data_region.write(sir)
-        self._datafile_path = datafile_path
+        for segment_name, segment_info in segment_groups_info.items():
+            self._segments_trunk_coordinates[segment_name] = segment_info[1]  # only the coordinates
 
     def get_level_markers(self):
         """
@@ -417,36 +435,77 @@ class VagusInputData:
         multiple times as for connection groups.
         :return: dict segment_name -> list of coordinates
         """
-        segments_trunk_coordinates = {}
-        for segment_name, rhs in self._segment_groups_info.items():
-            segments_trunk_coordinates[segment_name] = rhs[1]  # only the coordinates
-        return segments_trunk_coordinates
+        return self._segments_trunk_coordinates
 
-def group_common_branches(branch_names):
+
+def get_nodeset_group_identifiers(group, nodeset):
     """
-    Groups branches with the same annotations and destinations, only different by A, B, C variant character.
-    :param branch_names: List with supplied branch names.
-    :return branch_common_map: Dictionary mapping common branch name to list of branches with common names.
-    Only contains entries for branches with variant names.
+    Get identifiers of nodes in group's nodeset group for nodeset.
+    :param group: Zinc group.
+    :param nodeset: Zinc nodeset to get nodeset group for.
+    :return: numpy int64 array of node identifiers in increasing order; empty if no nodeset group.
     """
-
-    branch_common_map = {}
-    for branch_name in branch_names:
-        # remove single letters like A, B, C, etc. surrounded by whitespace
-        common_key = re.sub(r'\b[A-Z]\b\s?', '', branch_name).strip()
-        if common_key != branch_name:
-            # branch variant was found
-            variant_branch_list = branch_common_map.get(common_key)
-            if variant_branch_list:
-                variant_branch_list.append(branch_name)
-            else:
-                branch_common_map[common_key] = [branch_name]
-    return branch_common_map
-
-
-def load_vagus_data(region):
+    nodeset_group = group.getNodesetGroup(nodeset)
+    if not (nodeset_group.isValid() and nodeset_group.getSize()):
+        return numpy.zeros(0, dtype=numpy.int64)
+    identifiers = []
+    nodeiterator = nodeset_group.createNodeiterator()
+    node = nodeiterator.next()
+    while node.isValid():
+        identifiers.append(node.getIdentifier())
+        node = nodeiterator.next()
+    return numpy.array(identifiers, dtype=numpy.int64)
+
+
+def get_group_local_contents_key(group):
+    """
+    Get hashable key for the contents of group in its local region, for finding groups with the same contents with
+    a dict in constant time, in place of comparing pairs of groups with groups_have_same_local_contents.
+    Empty and non-existent mesh/nodeset groups give the same key.
+    :param group: Zinc group.
+    :return: Tuple of bytes containing identifiers of elements in 3, 2 and 1-D meshes, nodes and datapoints in group.
+    """
+    fieldmodule = group.getFieldmodule()
+    key = []
+    for dimension in range(3, 0, -1):
+        mesh_group = group.getMeshGroup(fieldmodule.findMeshByDimension(dimension))
+        identifiers = []
+        if mesh_group.isValid() and mesh_group.getSize():
+            elementiterator = mesh_group.createElementiterator()
+            element = elementiterator.next()
+            while element.isValid():
+                identifiers.append(element.getIdentifier())
+                element = elementiterator.next()
+        key.append(numpy.array(identifiers, dtype=numpy.int64).tobytes())
+    for field_domain_type in (Field.DOMAIN_TYPE_NODES, Field.DOMAIN_TYPE_DATAPOINTS):
+        key.append(get_nodeset_group_identifiers(
+            group, fieldmodule.findNodesetByFieldDomainType(field_domain_type)).tobytes())
+    return tuple(key)
+
+
+def get_default_cache_directory():
+    """
+    Get the default directory for caching parsed vagus input data. This is the SCAFFOLDMAKER_CACHE_DIR environment
+    variable if set, otherwise a scaffoldmaker folder in the user cache directory: %LOCALAPPDATA% on Windows,
+    ~/Library/Caches on macOS, or $XDG_CACHE_HOME or ~/.cache on other platforms.
+    :return: Path to cache directory.
+    """
+    cache_directory = os.environ.get("SCAFFOLDMAKER_CACHE_DIR")
+    if cache_directory:
+        return cache_directory
+    if sys.platform == "win32":
+        user_cache_directory = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        user_cache_directory = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        user_cache_directory = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(user_cache_directory, "scaffoldmaker", "vagus")
+
+
+def load_vagus_data(region, cache_directory=None):
     """
     :param region: Zinc region for model definition.
+    :param cache_directory: Optional path to directory to cache parsed data in. See VagusInputData.
     return: Provided the input file is supplied, it returns a data region with input data, otherwise None.
     """
     data_region = region.getParent().findChildByName('data')
@@ -454,36 +513,6 @@ def load_vagus_data(region):
         logger.warning("Missing input data.")
         return None
 
-    vagus_data = VagusInputData(data_region)
+    vagus_data = VagusInputData(data_region, cache_directory)
     return vagus_data
 
-
-def bfs_to_furthest(graph, start, trunk_path_ids):
-    """
-    :param graph:
-    :param start:
-    :param trunk_path_ids:
-    return: Returns the furthest node and the path to it using BFS.
-    """
-
-    visited = set()
-    parent = {start: None}
-    queue = [start]
-    last = start
-
-    while queue:
-        current = queue.pop(0)
-        visited.add(current)
-        last = current
-        for neighbor in graph[current]:
-            if neighbor not in visited and neighbor not in trunk_path_ids and neighbor not in queue:
-                parent[neighbor] = current
-                queue.append(neighbor)
-
-    # Trace path from furthest node back to start
-    path = []
-    while last is not None:
-        path.append(last)
-        last = parent[last]
-    return list(reversed(path))
-
@@ -51,6 +51,8 @@ class TrackSurface:
     square elements with bicubic Hermite interpolation but zero cross derivatives.
     """
 
+    _iterationsCount = 0  # total iterations of all nearest position and intersection solves, for profiling
+
     def __init__(self, elementsCount1, elementsCount2, nx, nd1, nd2, nd12=None, loop1=False):
         """
         Creates a TrackSurface with a lattice of elementsCount1*elementsCount2
@@ -84,6 +86,14 @@ class TrackSurface:
                     self._xMax[c] = s
         self._xRange = [self._xMax[c] - self._xMin[c] for c in range(3)]
 
+    @classmethod
+    def getIterationsCount(cls):
+        """
+        Get total number of iterations taken by all TrackSurface nearest position and intersection point searches
+        since start of session. Take difference between calls to get cost of intervening code.
+        """
+        return TrackSurface._iterationsCount
+
     def getElementsCount1(self):
         return self._elementsCount1
 
@@ -562,6 +572,7 @@ class TrackSurface:
         # XI_TOL = 1.0E-6
         # lowDxiCount = 0
         for it in range(100):
+            TrackSurface._iterationsCount += 1
             coords, n1, n, onBoundary, otherPosition, otherCoords, onOtherBoundary, r, rNormal, rTangent = \
                 self._getIntersectionDelta(position, otherTrackSurface, otherPosition, stickyBoundaryCount)
             if onBoundary:
@@ -998,6 +1009,7 @@ class TrackSurface:
         mag_adxi = 0
         MAX_ITERS = 100
         for it in range(MAX_ITERS):
+            TrackSurface._iterationsCount += 1
             x, d1, d2 = self.evaluateCoordinates(position, derivatives=True)
             onBoundary = self.positionOnBoundary(position)
             r = sub(targetx, x)
@@ -1131,6 +1143,7 @@ class TrackSurface:
         lastOnBoundary = False
         last_dxi = None
         for it in range(100):
+            TrackSurface._iterationsCount += 1
             x, d = evaluateCoordinatesOnCurve(cx, cd1, curveLocation, loop, derivative=True)
             surfacePosition = self.findNearestPosition(x, surfacePosition, instrument=False)  # instrument=instrument
             onOtherBoundary = self.positionOnBoundary(surfacePosition)
@@ -15,7 +15,6 @@ from scaffoldmaker.annotation.annotationgroup import mergeAnnotationGroups
 from scaffoldmaker.utils import interpolation as interp
 from scaffoldmaker.utils.eftfactory_bicubichermitelinear import eftfactory_bicubichermitelinear
 from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
-from scaffoldmaker.utils.eft_utils import remapEftNodeValueLabelsVersion
 from scaffoldmaker.utils.geometry import createCirclePoints
 
 
@@ -761,7 +760,7 @@ def createNodesAndElements(region,
             for e1 in range(elementsCountAround):
                 va = e1
                 vb = (e1 + 1) % elementsCountAround
-                eftApex = eftfactory.createEftShellPoleBottom(va * 100, vb * 100)
+                eftApex = eftfactory.getCachedEft("createEftShellPoleBottom", (va * 100, vb * 100))
                 elementtemplateApex.defineField(coordinates, -1, eftApex)
                 element = mesh.createElement(elementIdentifier, elementtemplateApex)
                 bni1 = e3 + 1 + startNode - 1
@@ -773,16 +772,17 @@ def createNodesAndElements(region,
                 if xOrgan:
                     vao = e1
                     vbo = (e1 + 1) % elementsCountAround
-                    eftApexOrgan = eftfactory.createEftShellPoleBottom(vao * 100, vbo * 100)
+                    eftApexOrgan = eftfactory.getCachedEft("createEftShellPoleBottom", (vao * 100, vbo * 100))
                     organElementtemplateApex.defineField(organCoordinates, -1, eftApexOrgan)
                     element.merge(organElementtemplateApex)
                     element.setNodesByIdentifier(eftApexOrgan, nodeIdentifiers)
                 if xFlat:
                     vaf = e1 + elementsCountAround
                     vbf = vaf + 1
-                    eftApexFlat = eftfactory.createEftShellPoleBottom(vaf * 100, vbf * 100)
-                    if e1 >= (elementsCountAround // 2):
-                        remapEftNodeValueLabelsVersion(eftApexFlat, [1, 4], [Node.VALUE_LABEL_D_DS1], 2)
+                    remapsFlat = [("remapEftNodeValueLabelsVersion", [1, 4], [Node.VALUE_LABEL_D_DS1], 2)] \
+                        if (e1 >= (elementsCountAround // 2)) else []
+                    eftApexFlat = eftfactory.getCachedEft(
+                        "createEftShellPoleBottom", (vaf * 100, vbf * 100), remapsFlat)
                     flatElementtemplateApex1.defineField(flatCoordinates, -1, eftApexFlat)
                     element.merge(flatElementtemplateApex1)
                     element.setNodesByIdentifier(eftApexFlat, nodeIdentifiers)
@@ -800,8 +800,9 @@ def createNodesAndElements(region,
                     result = element.setScaleFactors(eftApexFlat, scalefactorsFlat)
                     if onOpening:
                         lnRemapV2 = [3, 6]
-                        eftApexOpen = eftApexFlat
-                        remapEftNodeValueLabelsVersion(eftApexOpen, lnRemapV2, allValueLabels, 2)
+                        eftApexOpen = eftfactory.getCachedEft(
+                            "createEftShellPoleBottom", (vaf * 100, vbf * 100),
+                            remapsFlat + [("remapEftNodeValueLabelsVersion", lnRemapV2, allValueLabels, 2)])
                         flatElementtemplateApex2.defineField(flatCoordinates, -1, eftApexOpen)
                         element.merge(flatElementtemplateApex2)
                         element.setNodesByIdentifier(eftApexOpen, nodeIdentifiers)
@@ -5,10 +5,11 @@ from cmlibs.maths.vectorops import add, cross, dot, magnitude, mult, normalize,
 from cmlibs.zinc.element import Element, Elementbasis
 from cmlibs.zinc.node import Node
 from scaffoldmaker.utils.eft_utils import (
-    addTricubicHermiteSerendipityEftParameterScaling, determineCubicHermiteSerendipityEft, HermiteNodeLayoutManager)
+    addTricubicHermiteSerendipityEftParameterScaling, createElementfieldtemplate, determineCubicHermiteSerendipityEft,
+    HermiteNodeLayoutManager)
 from scaffoldmaker.utils.interpolation import (
     computeCubicHermiteDerivativeScaling, computeCubicHermiteEndDerivative, computeCubicHermiteStartDerivative,
-    DerivativeScalingMode, evaluateCoordinatesOnCurve, getCubicHermiteTrimmedCurvesLengths, getNearestLocationOnCurve,
+    CurveSpatialIndex, DerivativeScalingMode, evaluateCoordinatesOnCurve, getCubicHermiteTrimmedCurvesLengths,
     interpolateCubicHermite, interpolateCubicHermiteDerivative,
     interpolateHermiteLagrangeDerivative, interpolateLagrangeHermiteDerivative,
     interpolateSampleCubicHermite, sampleCubicHermiteCurves,
@@ -19,7 +20,11 @@ from scaffoldmaker.utils.networkmesh import NetworkMesh, NetworkMeshBuilder, Net
 from scaffoldmaker.utils.tracksurface import TrackSurface
 from scaffoldmaker.utils.zinc_utils import get_nodeset_path_ordered_field_parameters
 import copy
+import hashlib
 import math
+import os
+import pickle
+import tempfile
 
 
 class TubeNetworkMeshGenerateData(NetworkMeshGenerateData):
@@ -55,7 +60,7 @@ class TubeNetworkMeshGenerateData(NetworkMeshGenerateData):
             meshDimension, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE_SERENDIPITY)
         if (meshDimension == 3) and isLinearThroughShell:
             self._elementbasis.setFunctionType(3, Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE)
-        self._standardEft = self._mesh.createElementfieldtemplate(self._elementbasis)
+        self._standardEft = createElementfieldtemplate(self._mesh, self._elementbasis)
         self._standardElementtemplate.defineField(self._coordinates, -1, self._standardEft)
 
         d3Defined = (meshDimension == 3) and not isLinearThroughShell
@@ -96,7 +101,7 @@ class TubeNetworkMeshGenerateData(NetworkMeshGenerateData):
         """
         Create a new standard element field template for modifying.
         """
-        return self._mesh.createElementfieldtemplate(self._elementbasis)
+        return createElementfieldtemplate(self._mesh, self._elementbasis)
 
     def getNodeLayout5Way(self):
         return self._nodeLayout5Way
@@ -250,11 +255,101 @@ class TubeNetworkMeshGenerateData(NetworkMeshGenerateData):
         return eft, scalefactors
 
 
+class TubeSegmentSampleCache:
+    """
+    Cache of raw and sampled tube coordinates for TubeNetworkMeshSegment, stored under a hash of all the inputs they
+    are calculated from so they can be reused by tube networks built from the same layout segments.
+    Held in memory, and optionally saved to files in a directory so they persist between sessions.
+    Any object with the same getKey, get and set methods can be used in its place.
+    """
+
+    _cacheVersion = 1  # increment when cached data or the calculations producing it change
+
+
+    def __init__(self, directory=None):
+        """
+        :param directory: Optional path of directory to save cached coordinates in. Created if it does not exist.
+        """
+        self._directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._entries = {}
+        self._hitsCount = 0
+        self._missesCount = 0
+
+    @staticmethod
+    def getKey(*inputs):
+        """
+        Get key for cached data calculated from inputs.
+        :param inputs: Any number of strings, numbers and nested lists/tuples of them. Floats must be exact.
+        :return: Hexadecimal hash string, including the cache version.
+        """
+        return hashlib.sha256(repr((TubeSegmentSampleCache._cacheVersion,) + inputs).encode()).hexdigest()
+
+    def _getFileName(self, key):
+        return os.path.join(self._directory, key + ".pkl")
+
+    def get(self, key):
+        """
+        :param key: Key returned by getKey().
+        :return: Copy of data stored with key, or None if not cached. Unreadable files are treated as not cached.
+        """
+        data = self._entries.get(key)
+        if (data is None) and self._directory:
+            fileName = self._getFileName(key)
+            if os.path.isfile(fileName):
+                try:
+                    with open(fileName, "rb") as f:
+                        data = self._entries[key] = pickle.load(f)
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    data = None
+        if data is None:
+            self._missesCount += 1
+            return None
+        self._hitsCount += 1
+        # copy as clients may modify the returned coordinates
+        return copy.deepcopy(data)
+
+    def set(self, key, data):
+        """
+        Store a copy of data with key, also in a file if there is a cache directory.
+        Failure to write the file is ignored as it only means the data is not cached between sessions.
+        :param key: Key returned by getKey().
+        :param data: Coordinates to cache.
+        """
+        data = self._entries[key] = copy.deepcopy(data)
+        if self._directory:
+            tmpFileName = None
+            try:
+                with tempfile.NamedTemporaryFile(dir=self._directory, suffix=".tmp", delete=False) as f:
+                    tmpFileName = f.name
+                    pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+                os.replace(tmpFileName, self._getFileName(key))
+            except OSError:
+                if tmpFileName and os.path.exists(tmpFileName):
+                    try:
+                        os.remove(tmpFileName)
+                    except OSError:
+                        pass
+
+    def clear(self):
+        """
+        Clear cached data held in memory. Files in the cache directory are not removed.
+        """
+        self._entries = {}
+
+    def getHitsCount(self):
+        return self._hitsCount
+
+    def getMissesCount(self):
+        return self._missesCount
+
+
 class TubeNetworkMeshSegment(NetworkMeshSegment):
 
     def __init__(self, networkSegment, pathParametersList, elementsCountAround, elementsCountThroughShell,
                  isCore=False, elementsCountCoreBoxMinor: int=2, elementsCountTransition: int=1,
-                 coreBoundaryScalingMode: int=1):
+                 coreBoundaryScalingMode: int=1, sampleCache: TubeSegmentSampleCache=None):
         """
         :param networkSegment: NetworkSegment this is built from.
         :param pathParametersList: [pathParameters] if 2-D or [outerPathParameters, innerPathParameters] if 3-D
@@ -264,6 +359,8 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         :param elementsCountCoreBoxMinor: Number of elements across core box minor axis.
         :param elementsCountTransition: Number of elements across transition zone between core box elements and
         shell elements.
+        :param sampleCache: Optional TubeSegmentSampleCache to get raw and sampled tube coordinates from, if
+        calculated earlier from the same inputs, and to add them to otherwise.
         """
         super(TubeNetworkMeshSegment, self).__init__(networkSegment, pathParametersList)
         self._isCore = isCore
@@ -273,13 +370,22 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         self._elementsCountTransition = elementsCountTransition
         self._coreBoundaryScalingMode = coreBoundaryScalingMode
         self._networkSegment = networkSegment
+        self._sampleCache = sampleCache
 
         assert elementsCountThroughShell > 0
         self._elementsCountThroughShell = elementsCountThroughShell
         self._rawTubeCoordinatesList = []
         self._rawTrackSurfaceList = []
         for pathParameters in pathParametersList:
-            px, pd1, pd2, pd12 = getPathRawTubeCoordinates(pathParameters, self._elementsCountAround)
+            rawTubeCoordinates = None
+            if sampleCache:
+                key = sampleCache.getKey("raw", pathParameters, self._elementsCountAround)
+                rawTubeCoordinates = sampleCache.get(key)
+            if not rawTubeCoordinates:
+                rawTubeCoordinates = getPathRawTubeCoordinates(pathParameters, self._elementsCountAround)
+                if sampleCache:
+                    sampleCache.set(key, rawTubeCoordinates)
+            px, pd1, pd2, pd12 = rawTubeCoordinates
             self._rawTubeCoordinatesList.append((px, pd1, pd2, pd12))
             nx, nd1, nd2, nd12 = [], [], [], []
             for i in range(len(px)):
@@ -290,6 +396,7 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
             self._rawTrackSurfaceList.append(TrackSurface(len(px[0]), len(px) - 1, nx, nd1, nd2, nd12, loop1=True))
         # list[pathsCount][4] of sx, sd1, sd2, sd12; all [nAlong][nAround]:
         self._sampledTubeCoordinates = [[[], [], [], []] for p in range(self._pathsCount)]
+        self._trimLengths = None  # cached (startLengths, endLengths) from trim surfaces, see _getTrimLengths()
         self._rimCoordinates = None  # these are just shell coordinates; with core there may also be transition coords
         self._rimNodeIds = None
         self._rimElementIds = None  # [e2][e3][e1]
@@ -331,31 +438,19 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
     def getRawTrackSurface(self, pathIndex=0):
         return self._rawTrackSurfaceList[pathIndex]
 
-    def _sampleTubeCoordinates(self, fixedElementsCountAlong, targetElementLength, transitionFactor=3.0):
+    def _getTrimLengths(self):
         """
-        Generate sampled outer, inner tube coordinates optionally trimmed to start/end surfaces.
-        Element sizes are constant size at the max length, but compressed if trimmed.
-        Lateral cross sections in untrimmed areas are in d2-d3 plane of the network layout,
-        hence elements are generally bigger on the outside and smaller on the inside of curves.
-        Algorithm uses a finite transition region at trimmed ends based on the trim range, so trimming is local.
-        :param fixedElementsCountAlong: Number of elements in resampled coordinates, or None to use targetElementLength.
-        :param targetElementLength: Target element length or None to use fixedElementsCountAlong.
-        Length is determined from mean trimmed length, subject to a minimum for the configuration.
-        :param transitionFactor: Factor > 1.0 multiplying range of trimmed lengths at each end to complete
-        local element size transition over.
+        Get lengths along segment at which each longitudinal line around the raw outer, inner tubes intersects the
+        start and end trim surfaces. These depend only on the raw tube coordinates and trim surfaces so are
+        calculated on first use and reused when the segment is resampled.
+        :return: startLengths[pathsCount * elementsCountAround], endLengths[pathsCount * elementsCountAround]
         """
+        if self._trimLengths:
+            return self._trimLengths
         lx, ld = self._lengthParameters
-        # print("lx", lx, "ld", ld)
         rawNodesCountAlong = len(self._rawTubeCoordinatesList[0][0])
-        rawElementsCountAlong = rawNodesCountAlong - 1
-
-        # work out trim lengths of outer, inner tubes
-        startCurveLocations = []
         startLengths = []
-        sumStartLengths = 0.0
-        endCurveLocations = []
         endLengths = []
-        sumEndLengths = 0.0
         for p in range(self._pathsCount):
             px, pd1, pd2, pd12 = self._rawTubeCoordinatesList[p]
             startTrimSurface = self._junctions[0].getTrimSurfaces(self)[p]
@@ -364,35 +459,57 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
             for q in range(self._elementsCountAround):
                 cx = [px[p][q] for p in range(rawNodesCountAlong)]
                 cd2 = [pd2[p][q] for p in range(rawNodesCountAlong)]
-                startCurveLocation = (0, 0.0)
                 startLength = 0.0
                 if startTrimSurface:
                     surfacePosition, curveLocation, intersects = startTrimSurface.findNearestPositionOnCurve(cx, cd2)
                     if intersects:
-                        startCurveLocation = curveLocation
-                        startLength = evaluateCoordinatesOnCurve(lx, ld, startCurveLocation)[0]
-                startCurveLocations.append(startCurveLocation)
+                        startLength = evaluateCoordinatesOnCurve(lx, ld, curveLocation)[0]
                 startLengths.append(startLength)
-                sumStartLengths += startLength
-                endCurveLocation = (rawElementsCountAlong, 1.0)
                 endLength = lx[-1][0]
                 if endTrimSurface:
                     surfacePosition, curveLocation, intersects = endTrimSurface.findNearestPositionOnCurve(cx, cd2)
                     if intersects:
-                        endCurveLocation = curveLocation
-                        endLength = evaluateCoordinatesOnCurve(lx, ld, endCurveLocation)[0]
-                endCurveLocations.append(endCurveLocation)
+                        endLength = evaluateCoordinatesOnCurve(lx, ld, curveLocation)[0]
                 endLengths.append(endLength)
-                sumEndLengths += endLength
+        self._trimLengths = startLengths, endLengths
+        return self._trimLengths
+
+    def _sampleTubeCoordinates(self, fixedElementsCountAlong, targetElementLength, transitionFactor=3.0):
+        """
+        Generate sampled outer, inner tube coordinates optionally trimmed to start/end surfaces.
+        Element sizes are constant size at the max length, but compressed if trimmed.
+        Lateral cross sections in untrimmed areas are in d2-d3 plane of the network layout,
+        hence elements are generally bigger on the outside and smaller on the inside of curves.
+        Algorithm uses a finite transition region at trimmed ends based on the trim range, so trimming is local.
+        :param fixedElementsCountAlong: Number of elements in resampled coordinates, or None to use targetElementLength.
+        :param targetElementLength: Target element length or None to use fixedElementsCountAlong.
+        Length is determined from mean trimmed length, subject to a minimum for the configuration.
+        :param transitionFactor: Factor > 1.0 multiplying range of trimmed lengths at each end to complete
+        local element size transition over.
+        """
+        startLengths, endLengths = self._getTrimLengths()
+        # minimum number applies to fixedElementsCountAlong and targetElementLength
+        minimumElementsCountAlong = 2 if (self._isLoop or ((self._junctions[0].getSegmentsCount() > 2) and
+                                                           (self._junctions[1].getSegmentsCount() > 2))) else 1
+        if self._sampleCache:
+            # trim surfaces only affect sampling through trim lengths and whether they exist
+            key = self._sampleCache.getKey(
+                "sampled", self._pathParametersList, self._elementsCountAround, fixedElementsCountAlong,
+                targetElementLength, transitionFactor, minimumElementsCountAlong, startLengths, endLengths,
+                [[bool(trimSurface) for trimSurface in junction.getTrimSurfaces(self)]
+                 for junction in self._junctions])
+            sampledTubeCoordinates = self._sampleCache.get(key)
+            if sampledTubeCoordinates:
+                self._sampledTubeCoordinates = sampledTubeCoordinates
+                return
+        # clear any coordinates from previous sampling
+        self._sampledTubeCoordinates = [[[], [], [], []] for p in range(self._pathsCount)]
 
         minStartLength = min(startLengths)
         maxStartLength = max(startLengths)
         minEndLength = min(endLengths)
         maxEndLength = max(endLengths)
         maxLength = maxEndLength - minStartLength
-        # minimum number applies to fixedElementsCountAlong and targetElementLength
-        minimumElementsCountAlong = 2 if (self._isLoop or ((self._junctions[0].getSegmentsCount() > 2) and
-                                                           (self._junctions[1].getSegmentsCount() > 2))) else 1
         # small fudge factor on targetElementLength so whole numbers chosen on centroid don't go one higher:
         elementsCountAlong = max(minimumElementsCountAlong, fixedElementsCountAlong if fixedElementsCountAlong else
             math.ceil(maxLength * 0.9999 / targetElementLength))
@@ -431,12 +548,15 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                     # print("    p", p, "q", q, "dEnd", dEnd[p][q])
 
         tubeGenerator = TubeEllipseGenerator()
+        lx, ld = self._lengthParameters
+        # print("lx", lx, "ld", ld)
+        lCurveIndex = CurveSpatialIndex(lx, ld)
 
         for n in range(elementsCountAlong + 1):
 
             # get point parameters at mean sampling points
             lm = minStartLength + n * maxElementLength
-            curveLocation = getNearestLocationOnCurve(lx, ld, [lm])[0]
+            curveLocation = lCurveIndex.getNearestLocation([lm])[0]
 
             for p in range(self._pathsCount):
                 cx, cd1, cd2, cd12, cd3, cd13 = self._pathParametersList[p]
@@ -461,7 +581,7 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                             v1, d1, v2, d2 = [endTransitionStartLength], [endTransitionSize], [le], [dEnd[p][q]]
                         lt = interpolateCubicHermite(v1, d1, v2, d2, xi)[0]
                         ltd = interpolateCubicHermiteDerivative(v1, d1, v2, d2, xi)[0]
-                        qCurveLocation = getNearestLocationOnCurve(lx, ld, [lt])[0]
+                        qCurveLocation = lCurveIndex.getNearestLocation([lt])[0]
                         px, pd1 = evaluateCoordinatesOnCurve(cx, cd1, qCurveLocation, derivative=True)
                         pd2, pd12 = evaluateCoordinatesOnCurve(cd2, cd12, qCurveLocation, derivative=True)
                         pd3, pd13 = evaluateCoordinatesOnCurve(cd3, cd13, qCurveLocation, derivative=True)
@@ -482,6 +602,9 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                 for lst, ev in zip(self._sampledTubeCoordinates[p], (ex, ed1, ed2, ed12)):
                     lst.append(ev)
 
+        if self._sampleCache:
+            self._sampleCache.set(key, self._sampledTubeCoordinates)
+
         # smooth d2, d12
 
     def sample(self, fixedElementsCountAlong, targetElementLength):
@@ -2671,6 +2794,9 @@ class TubeNetworkMeshJunction(NetworkMeshJunction):
         # list[segment number][node index across major axis][node index across minor axis] to boxIndex
         self._triplePointLocationsList = []
         # list[[node Id, location], ...] used to match ETFs at triple points
+        # numbers of rim and box indexes, set when junction topology is determined on first sample
+        self._rimIndexesCount = None
+        self._boxIndexesCount = None
 
     def _calculateTrimSurfaces(self):
         """
@@ -3564,28 +3690,36 @@ class TubeNetworkMeshJunction(NetworkMeshJunction):
                 self._segments[1], -1 if self._segmentsIn[1] else 0)
             return
 
-        aroundCounts = [segment.getElementsCountAround() for segment in self._segments]
-        coreBoxMajorCounts = [segment.getElementsCountCoreBoxMajor() for segment in self._segments]
+        if self._rimIndexesCount is None:
+            # junction topology is independent of elements count along so is only determined on first sample
+            aroundCounts = [segment.getElementsCountAround() for segment in self._segments]
+            coreBoxMajorCounts = [segment.getElementsCountCoreBoxMajor() for segment in self._segments]
 
-        # determine junction sequence
-        self._determineJunctionSequence()
+            # determine junction sequence
+            self._determineJunctionSequence()
 
-        if self._segmentsCount == 3:
-            rimIndexesCount, boxIndexesCount = self._sampleBifurcation(aroundCounts, coreBoxMajorCounts)
+            if self._segmentsCount == 3:
+                rimIndexesCount, boxIndexesCount = self._sampleBifurcation(aroundCounts, coreBoxMajorCounts)
 
-        elif self._segmentsCount == 4:
-            rimIndexesCount, boxIndexesCount = self._sampleTrifurcation(aroundCounts, coreBoxMajorCounts)
+            elif self._segmentsCount == 4:
+                rimIndexesCount, boxIndexesCount = self._sampleTrifurcation(aroundCounts, coreBoxMajorCounts)
 
-        else:
-            print("Tube network mesh not implemented for", self._segmentsCount, "segments at junction")
-            return
+            else:
+                print("Tube network mesh not implemented for", self._segmentsCount, "segments at junction")
+                rimIndexesCount, boxIndexesCount = 0, 0
+
+            if rimIndexesCount:
+                # optimise rim indexes
+                self._optimiseRimIndexes(aroundCounts, rimIndexesCount, boxIndexesCount)
+
+            self._rimIndexesCount = rimIndexesCount
+            self._boxIndexesCount = boxIndexesCount
 
+        rimIndexesCount = self._rimIndexesCount
+        boxIndexesCount = self._boxIndexesCount
         if not rimIndexesCount:
             return
 
-        # optimise rim indexes
-        self._optimiseRimIndexes(aroundCounts, rimIndexesCount, boxIndexesCount)
-
         # sample rim coordinates
         elementsCountTransition = self._segments[0].getElementsCountTransition()
         nodesCountRim = self._segments[0].getNodesCountRim()
@@ -3907,6 +4041,7 @@ class TubeNetworkMeshJunction(NetworkMeshJunction):
         nodesCountRim = self._segments[0].getNodesCountRim()
         if self._rimCoordinates:
             self._rimNodeIds = [[None] * rimIndexesCount for _ in range(nodesCountRim)]
+        self._triplePointLocationsList = []
 
         if self._boxCoordinates:
             coreBoxMinorNodesCount = self._segments[0].getCoreBoxMinorNodesCount()
@@ -3989,13 +4124,15 @@ class TubeNetworkMeshBuilder(NetworkMeshBuilder):
     Builds contiguous tube network meshes with smooth element size transitions at junctions, optionally with solid core.
     """
 
+    _defaultSampleCache = None  # used by builders constructed without a sampleCache, see setDefaultSampleCache()
+
     def __init__(self, networkMesh: NetworkMesh, targetElementDensityAlongLongestSegment: float,
                  layoutAnnotationGroups: list=[], annotationElementsCountsAlong: list=[],
                  defaultElementsCountAround: int=8, annotationElementsCountsAround: list=[],
                  elementsCountThroughShell: int=1, isCore=False, elementsCountTransition: int=1,
                  defaultElementsCountCoreBoxMinor: int=2, annotationElementsCountsCoreBoxMinor: list=[],
                  defaultCoreBoundaryScalingMode=1, annotationCoreBoundaryScalingMode=[],
-                 useOuterTrimSurfaces=True):
+                 useOuterTrimSurfaces=True, sampleCache: TubeSegmentSampleCache=None):
         """
         Builds contiguous tube network meshes with smooth element size transitions at junctions, optionally with solid
         core.
@@ -4025,6 +4162,8 @@ class TubeNetworkMeshBuilder(NetworkMeshBuilder):
         or 0 to use default.
         :param useOuterTrimSurfaces: Set to False to use separate trim surfaces on inner and outer tubes. Ignored if
         no inner path.
+        :param sampleCache: Optional TubeSegmentSampleCache for reusing raw and sampled segment tube coordinates.
+        If None, uses the default sample cache, if any.
         """
         super(TubeNetworkMeshBuilder, self).__init__(
             networkMesh, targetElementDensityAlongLongestSegment, layoutAnnotationGroups, annotationElementsCountsAlong)
@@ -4042,6 +4181,20 @@ class TubeNetworkMeshBuilder(NetworkMeshBuilder):
         if not self._layoutInnerCoordinates.isValid():
             self._layoutInnerCoordinates = None
         self._useOuterTrimSurfaces = useOuterTrimSurfaces if self._layoutInnerCoordinates else False
+        self._sampleCache = sampleCache if sampleCache else TubeNetworkMeshBuilder._defaultSampleCache
+
+    @classmethod
+    def setDefaultSampleCache(cls, sampleCache: TubeSegmentSampleCache):
+        """
+        Set sample cache used by all subsequently constructed tube network mesh builders not given their own, so
+        repeated generation of scaffolds sharing layout segments reuses sampled tube coordinates.
+        :param sampleCache: TubeSegmentSampleCache or None to not cache.
+        """
+        TubeNetworkMeshBuilder._defaultSampleCache = sampleCache
+
+    @classmethod
+    def getDefaultSampleCache(cls):
+        return TubeNetworkMeshBuilder._defaultSampleCache
 
     def createSegment(self, networkSegment):
         pathParametersList = [get_nodeset_path_ordered_field_parameters(
@@ -4088,7 +4241,7 @@ class TubeNetworkMeshBuilder(NetworkMeshBuilder):
                 i += 1
         return TubeNetworkMeshSegment(networkSegment, pathParametersList, elementsCountAround,
                                       self._elementsCountThroughShell, self._isCore, elementsCountCoreBoxMinor,
-                                      self._elementsCountTransition, coreBoundaryScalingMode)
+                                      self._elementsCountTransition, coreBoundaryScalingMode, self._sampleCache)
 
     def createJunction(self, inSegments, outSegments):
         """
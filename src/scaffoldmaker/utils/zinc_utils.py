@@ -1,6 +1,7 @@
 """
 Utility functions for easing use of Zinc API.
 """
+from bisect import bisect_right
 from cmlibs.maths.vectorops import add, cross, div, magnitude, mult, normalize, rejection, set_magnitude, sub
 from cmlibs.utils.zinc.field import (
     find_or_create_field_coordinates, find_or_create_field_finite_element, find_or_create_field_group,
@@ -134,6 +135,58 @@ def mesh_destroy_elements_and_nodes_by_identifiers(mesh, element_identifiers):
     return
 
 
+def merge_identifier_ranges(identifier_ranges):
+    """
+    Get sorted, non-overlapping ranges covering the same identifiers as the supplied ranges.
+    Overlapping and adjacent ranges are merged.
+    :param identifier_ranges: List of [first, last] inclusive identifier ranges in any order. Ranges with
+    last < first are empty and ignored.
+    :return: List of [first, last] ranges sorted by first identifier.
+    """
+    merged_ranges = []
+    for first, last in sorted(
+            identifier_range for identifier_range in identifier_ranges if identifier_range[0] <= identifier_range[1]):
+        if merged_ranges and (first <= (merged_ranges[-1][1] + 1)):
+            if last > merged_ranges[-1][1]:
+                merged_ranges[-1][1] = last
+        else:
+            merged_ranges.append([first, last])
+    return merged_ranges
+
+
+def mesh_group_add_elements_in_identifier_ranges(mesh_group, identifier_ranges):
+    """
+    Add elements with identifiers in any of the ranges to the mesh group.
+    Cost is the lesser of finding each identifier in the ranges, or visiting every element in the master mesh
+    once with a bisection search of the merged ranges.
+    :param mesh_group: Zinc MeshGroup to add elements to.
+    :param identifier_ranges: List of [first, last] inclusive element identifier ranges.
+    """
+    merged_ranges = merge_identifier_ranges(identifier_ranges)
+    if not merged_ranges:
+        return
+    mesh = mesh_group.getMasterMesh()
+    fieldmodule = mesh.getFieldmodule()
+    with ChangeManager(fieldmodule):
+        identifiers_count = sum((last - first + 1) for first, last in merged_ranges)
+        if identifiers_count <= mesh.getSize():
+            for first, last in merged_ranges:
+                for identifier in range(first, last + 1):
+                    element = mesh.findElementByIdentifier(identifier)
+                    if element.isValid():
+                        mesh_group.addElement(element)
+            return
+        range_firsts = [first for first, last in merged_ranges]
+        elementiterator = mesh.createElementiterator()
+        element = elementiterator.next()
+        while element.isValid():
+            identifier = element.getIdentifier()
+            index = bisect_right(range_firsts, identifier) - 1
+            if (index >= 0) and (identifier <= merged_ranges[index][1]):
+                mesh_group.addElement(element)
+            element = elementiterator.next()
+
+
 def get_mesh_first_element_with_node(mesh, field, node):
     """
     Assumes all components of field have the same Elementfieldtemplate.
@@ -924,10 +977,29 @@ def find_or_create_field_zero_fibres(fieldmodule, name="zero fibres", managed=Tr
     return zero_fibres
 
 
-def fit_hermite_curve(bx, bd1, px, outlier_length=0.0, region=None, group_name=None):
+def _get_hermite_curve_fit_settings(bx, bd1, points_count):
+    """
+    Get data proportion and curvature penalty for fitting hermite curve to data points.
+    :param bx: Initial/before curve coordinates.
+    :param bd1: Initial/before curve derivatives.
+    :param points_count: Number of data points.
+    :return: data_proportion, curvature_penalty
+    """
+    # aim for no more than 25 points per element:
+    points_per_element = 25
+    elements_count = len(bx) - 1
+    curve_length = interp.getCubicHermiteCurvesLength(bx, bd1)
+    data_proportion = min(1.0, points_per_element * elements_count / points_count)
+    # calibrated by scaling the model: a power of 3 relationship
+    curvature_penalty = ((points_count * data_proportion) / (points_per_element * elements_count) *
+                         1.0E-6 * (curve_length ** 3))
+    return data_proportion, curvature_penalty
+
+
+def fit_hermite_curve(bx, bd1, px, outlier_length=0.0, region=None, group_name=None, use_zinc=True):
     """
     Fit 1-D multi-element hermite curve to list of data point coordinates.
-    Uses scaffoldfitter/Zinc to perform fit.
+    Uses scaffoldfitter/Zinc to perform fit, or optionally an equivalent linear least squares fit on arrays.
     :param bx: Initial/before curve coordinates, close to data.
     :param bd1: Initial/before curve derivatives, close to data.
     :param px: List of data points [x, y, z] or [x, y] if 2-D to fit to.
@@ -935,27 +1007,56 @@ def fit_hermite_curve(bx, bd1, px, outlier_length=0.0, region=None, group_name=N
     -0.1 removes data points with projections lengths within 10% of largest projection length. Not used in the first
     fit iteration. Ignored if zero.
     :param region: Optional Zinc Region to perform fit in, so available for re-use after call.
-    Region is expected to be empty.
+    Region is expected to be empty. Not used if use_zinc is False.
     :param group_name: Optional name of group to put fit elements and data in, or None to use default "curve".
+    :param use_zinc: Set to False to fit with interpolation.fit_hermite_curve_to_points, avoiding Zinc setup costs.
+    Results are close to but not identical to the Zinc fit, due to differences in data projections and solution.
     :return: cx, cd1 (lists of hermite coordinates and derivatives)
     """
-    points_count = len(px)
-    elements_count = len(bx) - 1
-    components_count = len(bx[0])
-    curve_length = interp.getCubicHermiteCurvesLength(bx, bd1)
-    curve_group_name = group_name if group_name else "curve"
+    if not use_zinc:
+        data_proportion, curvature_penalty = _get_hermite_curve_fit_settings(bx, bd1, len(px))
+        return interp.fit_hermite_curve_to_points(bx, bd1, px, curvature_penalty, data_proportion, outlier_length)
+    return fit_hermite_curves([(bx, bd1, px)], outlier_length, region,
+                              [group_name if group_name else "curve"])[0]
+
+
+def fit_hermite_curves(curves, outlier_length=0.0, region=None, group_names=None):
+    """
+    Fit many independent 1-D multi-element hermite curves to their own lists of data point coordinates
+    together in one fit, sharing one Zinc region and fitter setup.
+    Data for each curve is put in a separate group so it only projects onto that curve, and data proportion
+    and curvature penalty are set for each curve as for a separate fit with fit_hermite_curve.
+    Uses scaffoldfitter/Zinc to perform fit.
+    :param curves: List of (bx, bd1, px) for each curve, with initial/before curve coordinates and derivatives
+    close to data, and list of data point coordinates to fit to. All must have the same number of components.
+    :param outlier_length: Absolute outlier length for data if positive, or relative outlier length if negative e.g.
+    -0.1 removes data points with projections lengths within 10% of largest projection length in each curve's data.
+    Not used in the first fit iteration. Ignored if zero.
+    :param region: Optional Zinc Region to perform fit in, so available for re-use after call.
+    Region is expected to be empty.
+    :param group_names: Optional list of unique names of groups to put each curve's elements and data in,
+    or None to use default names "curve 1", "curve 2" etc.
+    :return: list of cx, cd1 (lists of hermite coordinates and derivatives) for each curve.
+    """
+    curves_count = len(curves)
+    if group_names:
+        assert len(group_names) == curves_count
+    else:
+        group_names = ["curve " + str(c + 1) for c in range(curves_count)]
+    components_count = len(curves[0][0][0])
 
     if region:
         fit_region = region
     else:
         # perform the fit in a Zinc Region in a private Context
-        context = Context("fit_hermite_curve")
+        context = Context("fit_hermite_curves")
         fit_region = context.getDefaultRegion()
     fieldmodule = fit_region.getFieldmodule()
     with ChangeManager(fieldmodule):
         coordinates = find_or_create_field_coordinates(fieldmodule)
-        generate_curve_mesh(fit_region, bx, bd1, group_name=curve_group_name)
-        generate_datapoints(fit_region, px, group_name=curve_group_name)
+        for (bx, bd1, px), curve_group_name in zip(curves, group_names):
+            generate_curve_mesh(fit_region, bx, bd1, group_name=curve_group_name)
+            generate_datapoints(fit_region, px, group_name=curve_group_name)
         # need a zero fibre field to apply strain/curvature penalties on 1-D model
         zero_fibres = find_or_create_field_zero_fibres(fieldmodule)
 
@@ -966,19 +1067,20 @@ def fit_hermite_curve(bx, bd1, px, outlier_length=0.0, region=None, group_name=N
     fitter.defineCommonMeshFields()
     fitter.setDataCoordinatesField(coordinates)
     fitter.defineDataProjectionFields()
-    # aim for no more than 25 points per element:
-    points_per_element = 25
-    data_proportion = min(1.0, points_per_element * elements_count / points_count)
-    if data_proportion < 1.0:
-        fitter.getInitialFitterStepConfig().setGroupDataProportion(None, data_proportion)
+    curvature_penalties = []
+    for (bx, bd1, px), curve_group_name in zip(curves, group_names):
+        # set for all groups if only one curve, otherwise for curve's group
+        set_group_name = None if (curves_count == 1) else curve_group_name
+        data_proportion, curvature_penalty = _get_hermite_curve_fit_settings(bx, bd1, len(px))
+        if data_proportion < 1.0:
+            fitter.getInitialFitterStepConfig().setGroupDataProportion(set_group_name, data_proportion)
+        curvature_penalties.append((set_group_name, curvature_penalty))
     fitter.initializeFit()
 
-    # calibrated by scaling the model: a power of 3 relationship
-    curvature_penalty = ((points_count * data_proportion) / (points_per_element * elements_count) *
-                         1.0E-6 * (curve_length ** 3))
     fit1 = FitterStepFit()
     fitter.addFitterStep(fit1)
-    fit1.setGroupCurvaturePenalty(None, [curvature_penalty])
+    for set_group_name, curvature_penalty in curvature_penalties:
+        fit1.setGroupCurvaturePenalty(set_group_name, [curvature_penalty])
     fit1.run()
     del fit1
 
@@ -998,21 +1100,25 @@ def fit_hermite_curve(bx, bd1, px, outlier_length=0.0, region=None, group_name=N
     del fitter
 
     # extract fitted curve parameters from nodes
-    cx = []
-    cd1 = []
+    curves_parameters = []
     fieldcache = fieldmodule.createFieldcache()
     nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-    nodeiterator = nodes.createNodeiterator()
-    node = nodeiterator.next()
-    while node.isValid():
-        fieldcache.setNode(node)
-        result, x = coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, components_count)
-        result, d1 = coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, 1, components_count)
-        cx.append(x)
-        cd1.append(d1)
+    for curve_group_name in group_names:
+        cx = []
+        cd1 = []
+        nodeset_group = fieldmodule.findFieldByName(curve_group_name).castGroup().getNodesetGroup(nodes)
+        nodeiterator = nodeset_group.createNodeiterator()
         node = nodeiterator.next()
+        while node.isValid():
+            fieldcache.setNode(node)
+            result, x = coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, components_count)
+            result, d1 = coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, 1, components_count)
+            cx.append(x)
+            cd1.append(d1)
+            node = nodeiterator.next()
+        curves_parameters.append((cx, cd1))
 
-    return cx, cd1
+    return curves_parameters
 
 
 def define_and_fit_field(region, coordinate_field_name, data_coordinate_field_name, fit_field_name,
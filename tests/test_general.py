@@ -1,3 +1,7 @@
+import contextlib
+import copy
+import io
+import json
 import math
 import unittest
 
@@ -11,23 +15,41 @@ from cmlibs.zinc.context import Context
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 from cmlibs.zinc.result import RESULT_OK
-from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, getAnnotationMarkerNameField
+from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, AnnotationGroupList, \
+    addAnnotationGroupsSubelements, createAnnotationMarkers, findAnnotationGroupByName, findOrCreateAnnotationGroupForTerm, \
+    getAnnotationGroupsMeshDimensions, getAnnotationMarkerNameField, mergeAnnotationGroups, \
+    relocateAnnotationMarkers
+from scaffoldmaker.annotation.heart_terms import get_heart_term, heart_terms
+from scaffoldmaker.annotation.terms_registry import find_term_all_organs, register_terms, unregister_terms, \
+    validate_terms
 from scaffoldmaker.meshtypes.meshtype_1d_network_layout1 import MeshType_1d_network_layout1
 from scaffoldmaker.meshtypes.meshtype_3d_box1 import MeshType_3d_box1
 from scaffoldmaker.meshtypes.meshtype_3d_brainstem import MeshType_3d_brainstem1
+from scaffoldmaker.meshtypes.meshtype_3d_esophagus1 import MeshType_3d_esophagus1
 from scaffoldmaker.meshtypes.meshtype_3d_heartatria1 import MeshType_3d_heartatria1
+from scaffoldmaker.meshtypes.meshtype_3d_heartventricles1 import MeshType_3d_heartventricles1
 from scaffoldmaker.meshtypes.meshtype_3d_stomach1 import MeshType_3d_stomach1
 from scaffoldmaker.scaffoldpackage import ScaffoldPackage
-from scaffoldmaker.scaffolds import Scaffolds
-from scaffoldmaker.utils.eft_utils import determineTricubicHermiteEft
+from scaffoldmaker.scaffolds import Scaffolds, Scaffolds_decodeJSON, Scaffolds_JSONEncoder
+from scaffoldmaker.utils.derivativemoothing import DerivativeSmoothing
+from scaffoldmaker.utils.eft_utils import determineCubicHermiteSerendipityDerivativeWeights, \
+    determineCubicHermiteSerendipityEft, determineCubicHermiteSerendipityEfts, determineTricubicHermiteEft, \
+    getElementfieldtemplateCreationsCount, HermiteNodeLayoutManager
+from scaffoldmaker.utils.eftfactory_bicubichermitelinear import eftfactory_bicubichermitelinear
+from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
 from scaffoldmaker.utils.geometry import getEllipsoidPlaneA, getEllipsoidPolarCoordinatesFromPosition, \
     getEllipsoidPolarCoordinatesTangents
-from scaffoldmaker.utils.interpolation import computeCubicHermiteSideCrossDerivatives, evaluateCoordinatesOnCurve, \
-    getCubicHermiteCurvesLength, getNearestLocationBetweenCurves, getNearestLocationOnCurve, interpolateCubicHermite
+from scaffoldmaker.utils.interpolation import computeCubicHermiteSideCrossDerivatives, CurveSpatialIndex, \
+    DerivativeScalingMode, evaluateCoordinatesOnCurve, fit_hermite_curve_to_points, get_curve_from_points, \
+    getCubicHermiteArcLength, getCubicHermiteCurvesLength, getNearestLocationBetweenCurves, getNearestLocationOnCurve, \
+    interpolateCubicHermite, sampleParameterAlongLine
+from scaffoldmaker.utils.meshedits import apply_compact_mesh_edits, decode_compact_mesh_edits, \
+    is_compact_mesh_edits, make_compact_mesh_edits
 from scaffoldmaker.utils.tracksurface import TrackSurface, TrackSurfacePosition
 from scaffoldmaker.utils.tubenetworkmesh import (
     TubeNetworkMeshSegment, getPathRawTubeCoordinates, resampleTubeCoordinates)
-from scaffoldmaker.utils.zinc_utils import generate_curve_mesh, get_nodeset_path_ordered_field_parameters
+from scaffoldmaker.utils.zinc_utils import fit_hermite_curve, fit_hermite_curves, generate_curve_mesh, \
+    get_nodeset_field_parameters, get_nodeset_path_ordered_field_parameters, merge_identifier_ranges
 
 from testutils import assertAlmostEqualList
 
@@ -106,6 +128,106 @@ class GeneralScaffoldTestCase(unittest.TestCase):
             self, d3, [2.499999998128999e-01, -4.330127019169794e-01,  0.000000000000000e+00], delta=TOL)
         self.assertAlmostEqual(newScale[2], magnitude(d3), delta=TOL)
 
+    def test_scaffold_package_equality(self):
+        """
+        Test equality, hashing and deep copy of scaffold packages with nested scaffold packages and mesh edits.
+        """
+        scaffoldPackage = ScaffoldPackage(MeshType_3d_heartatria1)
+        meshEdits = b"! edits"
+        scaffoldPackage.setMeshEdits(meshEdits)
+        scaffoldPackage2 = copy.deepcopy(scaffoldPackage)
+        self.assertIsNot(scaffoldPackage, scaffoldPackage2)
+        self.assertIs(meshEdits, scaffoldPackage2.getMeshEdits())
+        self.assertEqual(scaffoldPackage, scaffoldPackage2)
+        self.assertEqual(hash(scaffoldPackage), hash(scaffoldPackage2))
+        self.assertEqual(scaffoldPackage, ScaffoldPackage(MeshType_3d_heartatria1, scaffoldPackage.toDict()))
+        lpvOstium = scaffoldPackage.getScaffoldSettings()['Left pulmonary vein ostium']
+        lpvOstium2 = scaffoldPackage2.getScaffoldSettings()['Left pulmonary vein ostium']
+        self.assertIsNot(lpvOstium, lpvOstium2)
+        self.assertEqual(lpvOstium, lpvOstium2)
+
+        # nested settings changed in place
+        lpvOstium2.getScaffoldSettings()['Number of vessels'] = 1
+        self.assertNotEqual(scaffoldPackage, scaffoldPackage2)
+        self.assertNotEqual(hash(scaffoldPackage), hash(scaffoldPackage2))
+        lpvOstium2.getScaffoldSettings()['Number of vessels'] = lpvOstium.getScaffoldSettings()['Number of vessels']
+        self.assertEqual(scaffoldPackage, scaffoldPackage2)
+
+        # mesh edits with equal content but different objects, then different content
+        scaffoldPackage2.setMeshEdits(bytes("! edits", "utf-8"))
+        self.assertIsNot(meshEdits, scaffoldPackage2.getMeshEdits())
+        self.assertEqual(scaffoldPackage, scaffoldPackage2)
+        self.assertEqual(hash(scaffoldPackage), hash(scaffoldPackage2))
+        scaffoldPackage2.setMeshEdits(b"! other edits")
+        self.assertNotEqual(scaffoldPackage, scaffoldPackage2)
+        scaffoldPackage2.setMeshEdits(None)
+        self.assertNotEqual(scaffoldPackage, scaffoldPackage2)
+        scaffoldPackage.setMeshEdits(None)
+        self.assertEqual(scaffoldPackage, scaffoldPackage2)
+        self.assertEqual(hash(scaffoldPackage), hash(scaffoldPackage2))
+        # empty mesh edits are equal to none
+        boxPackage = ScaffoldPackage(MeshType_3d_box1)
+        boxPackage2 = ScaffoldPackage(MeshType_3d_box1, {'meshEdits': ''})
+        self.assertEqual(boxPackage, boxPackage2)
+        self.assertEqual(hash(boxPackage), hash(boxPackage2))
+        self.assertTrue(scaffoldPackage2.setRotation([10.0, 0.0, 0.0]))
+        self.assertNotEqual(scaffoldPackage, scaffoldPackage2)
+
+        # usable as a cache key
+        cache = {scaffoldPackage: "first"}
+        self.assertEqual("first", cache.get(copy.deepcopy(scaffoldPackage)))
+        self.assertIsNone(cache.get(scaffoldPackage2))
+
+    def test_compact_mesh_edits(self):
+        """
+        Test converting EX format mesh edits to compact format, and serialising and applying them.
+        """
+        scaffoldPackage = MeshType_3d_esophagus1.getDefaultOptions("Default")["Network layout"]
+        exMeshEdits = scaffoldPackage.getMeshEdits()
+        self.assertFalse(is_compact_mesh_edits(exMeshEdits))
+        exContext = Context("EX")
+        exRegion = exContext.getDefaultRegion()
+        copy.deepcopy(scaffoldPackage).generate(exRegion, applyTransformation=False)
+
+        self.assertTrue(scaffoldPackage.convertMeshEditsToCompact())
+        compactMeshEdits = scaffoldPackage.getMeshEdits()
+        self.assertTrue(is_compact_mesh_edits(compactMeshEdits))
+        self.assertLess(len(compactMeshEdits), len(exMeshEdits))
+        fieldParameters = decode_compact_mesh_edits(compactMeshEdits)
+        self.assertEqual(["coordinates"], list(fieldParameters.keys()))
+        nodeIdentifiers, valueLabels, versions, values = fieldParameters["coordinates"]
+        self.assertEqual(30, len(nodeIdentifiers))
+        self.assertEqual([1, 1, 1, 1, 1, 1, 2], nodeIdentifiers[:7].tolist())
+        self.assertEqual([Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1], valueLabels[:2].tolist())
+        self.assertEqual([1, 1], versions[:2].tolist())
+        assertAlmostEqualList(self, values[0].tolist(), [0.394, -100.872, 1402.818], delta=1.0E-12)
+
+        # serialise to JSON and read back
+        settings = {"Network layout": scaffoldPackage}
+        jsonString = json.dumps(settings, cls=Scaffolds_JSONEncoder)
+        scaffoldPackage2 = json.loads(jsonString, object_hook=Scaffolds_decodeJSON)["Network layout"]
+        self.assertEqual(scaffoldPackage, scaffoldPackage2)
+        compactContext = Context("Compact")
+        compactRegion = compactContext.getDefaultRegion()
+        scaffoldPackage2.generate(compactRegion, applyTransformation=False)
+        for region in (exRegion, compactRegion):
+            fieldmodule = region.getFieldmodule()
+            nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+            coordinates = fieldmodule.findFieldByName("coordinates")
+            valueLabels, nodeFieldParameters = get_nodeset_field_parameters(nodes, coordinates)
+            if region is exRegion:
+                exNodeFieldParameters = nodeFieldParameters
+            else:
+                self.assertEqual(exNodeFieldParameters, nodeFieldParameters)
+
+        # without a base region all parameters of the nodes are stored, and missing nodes are reported
+        meshEdits = make_compact_mesh_edits(compactRegion, field_names=["coordinates"])
+        self.assertEqual(5 * 6, len(decode_compact_mesh_edits(meshEdits)["coordinates"][0]))
+        self.assertTrue(apply_compact_mesh_edits(compactRegion, meshEdits))
+        emptyRegion = compactRegion.createChild("empty")
+        find_or_create_field_coordinates(emptyRegion.getFieldmodule())
+        self.assertFalse(apply_compact_mesh_edits(emptyRegion, meshEdits))
+
     def test_user_annotation_groups(self):
         """
         Test user annotation group on heartatria1 scaffold with scaffold package.
@@ -168,8 +290,11 @@ class GeneralScaffoldTestCase(unittest.TestCase):
         self.assertTrue(annotationGroup1.setId('FRED:1'))
         self.assertEqual('fred', annotationGroup1.getName())
         self.assertEqual('FRED:1', annotationGroup1.getId())
+        self.assertIs(annotationGroup1, scaffoldPackage.findAnnotationGroupByName('fred'))
+        self.assertIsNone(scaffoldPackage.findAnnotationGroupByName('group1'))
 
         self.assertTrue(scaffoldPackage.deleteAnnotationGroup(annotationGroup3))
+        self.assertIsNone(scaffoldPackage.findAnnotationGroupByName('group2'))
         annotationGroups = scaffoldPackage.getAnnotationGroups()
         self.assertEqual(35, len(annotationGroups))
 
@@ -209,6 +334,200 @@ class GeneralScaffoldTestCase(unittest.TestCase):
         identifier_ranges_string = identifier_ranges_to_string(nodeset_group_to_identifier_ranges(nodesetGroup2))
         self.assertEqual('1,3-5,7', identifier_ranges_string)
 
+    def test_annotation_group_list(self):
+        """
+        Test indexed lookup of annotation groups by name and id stays consistent with list contents.
+        """
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        annotationGroups = AnnotationGroupList()
+        for i in range(100):
+            findOrCreateAnnotationGroupForTerm(annotationGroups, region, ("group" + str(i), "GRP:" + str(i)))
+        self.assertEqual(100, len(annotationGroups))
+        group5 = annotationGroups[5]
+        self.assertIs(group5, findOrCreateAnnotationGroupForTerm(annotationGroups, region, ("group5", "GRP:5")))
+        self.assertEqual(100, len(annotationGroups))
+        self.assertIs(group5, findAnnotationGroupByName(annotationGroups, "group5"))
+        self.assertIs(group5, annotationGroups.findById("GRP:5"))
+        self.assertIsNone(annotationGroups.findByName("group100"))
+
+        # index follows renaming and removal
+        self.assertTrue(group5.setName("renamed"))
+        self.assertTrue(group5.setId("REN:1"))
+        self.assertIsNone(annotationGroups.findByName("group5"))
+        self.assertIsNone(annotationGroups.findById("GRP:5"))
+        self.assertIs(group5, annotationGroups.findByName("renamed"))
+        self.assertIs(group5, annotationGroups.findById("REN:1"))
+        annotationGroups.remove(group5)
+        self.assertIsNone(annotationGroups.findByName("renamed"))
+        del annotationGroups[0:10]
+        self.assertEqual(89, len(annotationGroups))
+        self.assertIsNone(annotationGroups.findByName("group9"))
+        self.assertIs(annotationGroups[0], annotationGroups.findByName("group11"))
+
+        # membership is tested by identity in constant time, including for groups with the same name
+        self.assertNotIn(group5, annotationGroups)
+        self.assertIn(annotationGroups[0], annotationGroups)
+        sameNameGroup = AnnotationGroup(region.createChild("child"), ("group11", "GRP:11"))
+        self.assertNotIn(sameNameGroup, annotationGroups)
+        annotationGroups.append(sameNameGroup)
+        self.assertIn(sameNameGroup, annotationGroups)
+        self.assertIs(annotationGroups[0], annotationGroups.findByName("group11"))
+        annotationGroups.remove(sameNameGroup)
+        self.assertNotIn(sameNameGroup, annotationGroups)
+        self.assertEqual(89, len(annotationGroups))
+
+        # concatenation and merging return indexed lists without duplicates
+        otherGroups = [AnnotationGroup(region, ("other", "OTH:1")), annotationGroups[0]]
+        allGroups = annotationGroups + otherGroups
+        self.assertTrue(isinstance(allGroups, AnnotationGroupList))
+        self.assertEqual(91, len(allGroups))
+        self.assertIs(otherGroups[0], allGroups.findByName("other"))
+        self.assertIsNone(annotationGroups.findByName("other"))
+        mergedGroups = mergeAnnotationGroups(annotationGroups, otherGroups)
+        self.assertTrue(isinstance(mergedGroups, AnnotationGroupList))
+        self.assertEqual(90, len(mergedGroups))
+        self.assertEqual(list(annotationGroups) + otherGroups[:1], mergedGroups)
+
+    def test_add_annotation_groups_subelements(self):
+        """
+        Test bulk addition of subelements to annotation groups matches adding them group by group.
+        """
+        context = Context("Test")
+        sizes = []
+        for bulk in (False, True):
+            region = context.getDefaultRegion().createChild("bulk" if bulk else "single")
+            options = MeshType_3d_box1.getDefaultOptions()
+            options["Number of elements 1"] = 3
+            options["Number of elements 2"] = 2
+            MeshType_3d_box1.generateBaseMesh(region, options)
+            fieldmodule = region.getFieldmodule()
+            mesh3d = fieldmodule.findMeshByDimension(3)
+            annotationGroups = []
+            for name, elementIdentifiers in (("left", [1, 4]), ("middle", [2, 5]), ("all", range(1, 7)), ("empty", [])):
+                annotationGroup = AnnotationGroup(region, (name, ""))
+                meshGroup = annotationGroup.getMeshGroup(mesh3d)
+                for elementIdentifier in elementIdentifiers:
+                    meshGroup.addElement(mesh3d.findElementByIdentifier(elementIdentifier))
+                annotationGroups.append(annotationGroup)
+            for m in range(2):
+                markerGroup = AnnotationGroup(region, ("marker " + str(m), ""), isMarker=True)
+                markerGroup.createMarkerNode(100 + m, element=mesh3d.findElementByIdentifier(m + 1),
+                                             xi=[0.5, 0.5, 0.5])
+                annotationGroups.append(markerGroup)
+            meshDimensions = getAnnotationGroupsMeshDimensions(annotationGroups)
+            self.assertEqual([3], meshDimensions["left"])
+            self.assertEqual([], meshDimensions["empty"])
+            fieldmodule.defineAllFaces()
+            if bulk:
+                addAnnotationGroupsSubelements(annotationGroups, meshDimensions)
+            else:
+                for annotationGroup in annotationGroups:
+                    annotationGroup.addSubelements()
+            nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+            sizes.append([[annotationGroup.getMeshGroup(fieldmodule.findMeshByDimension(dimension)).getSize()
+                           for dimension in range(1, 4)] + [annotationGroup.getNodesetGroup(nodes).getSize()]
+                          for annotationGroup in annotationGroups])
+        self.assertEqual([[20, 11, 2, 12], [20, 11, 2, 12], [46, 29, 6, 24], [0, 0, 0, 0], [0, 0, 0, 2], [0, 0, 0, 2]],
+                         sizes[0])
+        self.assertEqual(sizes[0], sizes[1])
+
+    def test_terms_registry(self):
+        """
+        Test indexed lookup of annotation terms matches a linear search, and validation of terms across organs.
+        """
+        for term in heart_terms:
+            for identifier in term:
+                for expectedTerm in heart_terms:
+                    if identifier in expectedTerm:
+                        break
+                self.assertEqual((expectedTerm[0], expectedTerm[1]), get_heart_term(identifier))
+        self.assertRaises(NameError, lambda: get_heart_term("not a heart term"))
+
+        self.assertEqual([("heart", ("heart", "UBERON:0000948"))], find_term_all_organs("FMA:7088"))
+        self.assertEqual([], find_term_all_organs("not a term"))
+        conflicts = validate_terms()
+        register_terms("test", [("heart", "TEST:1"), ("left ventricle", "UBERON:0002084")])
+        try:
+            self.assertEqual([("heart", ("heart", "UBERON:0000948")), ("test", ("heart", "TEST:1"))],
+                             find_term_all_organs("heart"))
+            newConflicts = [conflict for conflict in validate_terms() if conflict not in conflicts]
+            self.assertEqual([
+                "Name 'heart' has different ids: heart 'UBERON:0000948', test 'TEST:1'",
+                "Id 'UBERON:0002084' has different names: heart 'heart left ventricle', test 'left ventricle'"],
+                newConflicts)
+        finally:
+            unregister_terms("test")
+        self.assertEqual(conflicts, validate_terms())
+
+    def test_create_annotation_markers(self):
+        """
+        Test creating many markers together from material coordinates or element:xi, and relocating them.
+        """
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        options = MeshType_3d_box1.getDefaultOptions()
+        options["Number of elements 1"] = 2
+        options["Number of elements 2"] = 2
+        options["Number of elements 3"] = 2
+        MeshType_3d_box1.generateBaseMesh(region, options)
+        fieldmodule = region.getFieldmodule()
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        mesh3d = fieldmodule.findMeshByDimension(3)
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        annotationGroups = AnnotationGroupList()
+        existingGroup = findOrCreateAnnotationGroupForTerm(annotationGroups, region, ("marker 2", "MRK:2"))
+        terms = [("marker 1", "MRK:1"), ("marker 2", "MRK:2"), ("marker 3", "MRK:3")]
+        materialCoordinatesList = [[0.25, 0.25, 0.25], [0.75, 0.25, 0.9], [2.0, 0.75, 0.25]]
+        markerGroups, notFoundNames = createAnnotationMarkers(
+            annotationGroups, region, terms, 100, materialCoordinatesField=coordinates,
+            materialCoordinatesList=materialCoordinatesList)
+        self.assertEqual([], notFoundNames)
+        self.assertEqual(3, len(annotationGroups))
+        self.assertIs(existingGroup, markerGroups[1])
+        expectedLocations = [(1, [0.5, 0.5, 0.5]), (6, [0.5, 0.5, 0.8]), (4, [1.0, 0.5, 0.5])]
+        for m, markerGroup in enumerate(markerGroups):
+            self.assertTrue(markerGroup.isMarker())
+            self.assertEqual(100 + m, markerGroup.getMarkerNode().getIdentifier())
+            element, xi = markerGroup.getMarkerLocation()
+            self.assertEqual(expectedLocations[m][0], element.getIdentifier())
+            assertAlmostEqualList(self, xi, expectedLocations[m][1], delta=1.0E-6)
+            materialCoordinatesField, materialCoordinates = markerGroup.getMarkerMaterialCoordinates()
+            self.assertEqual(coordinates, materialCoordinatesField)
+            assertAlmostEqualList(self, materialCoordinates, materialCoordinatesList[m], delta=1.0E-12)
+        fieldcache = fieldmodule.createFieldcache()
+        markerName = getAnnotationMarkerNameField(fieldmodule)
+        fieldcache.setNode(nodes.findNodeByIdentifier(101))
+        self.assertEqual("marker 2", markerName.evaluateString(fieldcache))
+
+        # relocate after moving elements
+        mesh3d.destroyElement(mesh3d.findElementByIdentifier(1))
+        self.assertEqual([], relocateAnnotationMarkers(markerGroups))
+        element, xi = markerGroups[0].getMarkerLocation()
+        self.assertEqual(2, element.getIdentifier())
+        assertAlmostEqualList(self, xi, [0.0, 0.5, 0.5], delta=1.0E-6)
+
+        # element:xi locations, and markers not found for field not defined on mesh
+        elementMarkerGroups, notFoundNames = createAnnotationMarkers(
+            annotationGroups, region, [("marker 4", ""), ("marker 5", "")], 100,
+            elements=[mesh3d.findElementByIdentifier(3), mesh3d.findElementByIdentifier(4)],
+            xiList=[[0.1, 0.2, 0.3], [1.0, 1.0, 1.0]])
+        self.assertEqual(["marker 4", "marker 5"], [markerGroup.getName() for markerGroup in annotationGroups[3:]])
+        self.assertEqual([103, 104], [markerGroup.getMarkerNode().getIdentifier()
+                                      for markerGroup in elementMarkerGroups])
+        element, xi = elementMarkerGroups[0].getMarkerLocation()
+        self.assertEqual(3, element.getIdentifier())
+        assertAlmostEqualList(self, xi, [0.1, 0.2, 0.3], delta=1.0E-12)
+        undefinedCoordinates = find_or_create_field_coordinates(fieldmodule, "undefined coordinates")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            markerGroups, notFoundNames = createAnnotationMarkers(
+                annotationGroups, region, [("marker 6", "")], 1, materialCoordinatesField=undefinedCoordinates,
+                materialCoordinatesList=[[0.5, 0.5, 0.5]])
+        self.assertEqual(["marker 6"], notFoundNames)
+        self.assertEqual("", output.getvalue())  # caller reports markers not found
+        self.assertEqual(28, markerGroups[0].getMarkerNode().getIdentifier())
+
     def test_user_marker_points(self):
         """
         Test user marker point on brainstem1 scaffold which defined "brainstem coordinates".
@@ -303,6 +622,11 @@ class GeneralScaffoldTestCase(unittest.TestCase):
         brainstemCoordinatesFieldOut, brainstemCoordinatesValueOut = fredGroup.getMarkerMaterialCoordinates()
         self.assertEqual(brainstemCoordinatesFieldOut, brainstemCoordinatesField)
         assertAlmostEqualList(self, [0.5, 0.5, 4], brainstemCoordinatesValueOut, delta=TOL)
+        # marker groups can be given the same name, and are both still user groups
+        self.assertTrue(fredGroup.setName('bob'))
+        self.assertTrue(scaffoldPackage.isUserAnnotationGroup(bobGroup))
+        self.assertTrue(scaffoldPackage.isUserAnnotationGroup(fredGroup))
+        self.assertTrue(fredGroup.setName('fred'))
         elementOut, xiOut = fredGroup.getMarkerLocation()
         self.assertEqual(105, elementOut.getIdentifier())
         assertAlmostEqualList(self, [0.3452673123795837, 1.0, 0.6634646029995092], xiOut, delta=TOL)
@@ -480,6 +804,36 @@ class GeneralScaffoldTestCase(unittest.TestCase):
         node = nodes.findNodeByIdentifier(fredNodeIdentifier)
         self.assertTrue(node.isValid())
 
+    def test_deletion_element_ranges(self):
+        """
+        Test deletion of overlapping, out-of-mesh and reversed element ranges.
+        """
+        self.assertEqual([[1, 5], [7, 7]], merge_identifier_ranges([[7, 7], [1, 3], [4, 5], [2, 2]]))
+        # reversed ranges are empty and ignored
+        self.assertEqual([[400, 496], [2000, 5000]], merge_identifier_ranges([[400, 496], [2000, 5000], [420, 313]]))
+        self.assertEqual([], merge_identifier_ranges([[5, 4]]))
+
+        scaffoldPackage = ScaffoldPackage(MeshType_3d_box1, {
+            'scaffoldSettings': {
+                'Number of elements 1': 4,
+                'Number of elements 2': 3,
+                'Number of elements 3': 2
+            }
+        })
+        # overlapping ranges, a range beyond the mesh, and reversed ranges
+        # ranges spanning fewer identifiers than elements are found by identifier, more by visiting all elements
+        for deleteElementRanges, expectedRemainingRanges in (
+                ([[3, 5], [4, 6], [20, 30], [10, 8]], [[1, 2], [7, 19]]),
+                ([[3, 5], [4, 6], [20, 3000], [10, 8]], [[1, 2], [7, 19]]),
+                ([[24, 1]], [[1, 24]])):
+            context = Context("Test")
+            region = context.getDefaultRegion()
+            scaffoldPackage.generate(region)
+            mesh3d = region.getFieldmodule().findMeshByDimension(3)
+            self.assertEqual(24, mesh3d.getSize())
+            scaffoldPackage.deleteElementsInRanges(region, deleteElementRanges)
+            self.assertEqual(expectedRemainingRanges, mesh_group_to_identifier_ranges(mesh3d))
+
     def test_utils_ellipsoid(self):
         """
         Test ellipsoid functions converting between coordinates.
@@ -739,6 +1093,123 @@ class GeneralScaffoldTestCase(unittest.TestCase):
         #     fieldcache.setNode(node)
         #     pointCoordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, px[n])
 
+    def test_curve_from_points(self):
+        """
+        Test getting curve from points and sampling parameters along a line.
+        """
+        # unevenly spaced points along a straight line
+        px = [[0.0, 0.0, 0.0]]
+        for i in range(1, 100):
+            s = 0.1 * i + 0.03 * (i % 3)
+            px.append([s, 2.0 * s, 0.0])
+        px.append([10.0, 20.0, 0.0])
+        cx, cd1 = get_curve_from_points(px, number_of_elements=4)
+        self.assertEqual(5, len(cx))
+        for n in range(5):
+            assertAlmostEqualList(self, [2.5 * n, 5.0 * n, 0.0], cx[n], delta=1.0E-6)
+            assertAlmostEqualList(self, [2.5, 5.0, 0.0], cd1[n], delta=1.0E-6)
+        cx, cd1 = get_curve_from_points(px, maximum_element_length=8.0)
+        self.assertEqual(4, len(cx))
+        assertAlmostEqualList(self, [10.0 / 3.0, 20.0 / 3.0, 0.0], cx[1], delta=1.0E-6)
+
+        # parameter linear in length
+        lengths = [0.0, 1.0, 2.0, 3.0, 4.0]
+        params = [2.0 * length + 1.0 for length in lengths]
+        sP, sdP = sampleParameterAlongLine(lengths, params, 8)
+        self.assertEqual(9, len(sP))
+        for n in range(9):
+            self.assertAlmostEqual(1.0 + n, sP[n], delta=1.0E-12)
+            self.assertAlmostEqual(1.0, sdP[n], delta=1.0E-12)
+
+    def test_fit_hermite_curves(self):
+        """
+        Test fitting several curves together gives the same result as fitting them separately.
+        """
+        curves = []
+        for k in range(3):
+            px = []
+            for i in range(40):
+                t = 0.1 * i
+                px.append([t, math.sin(t + k) + 0.01 * (i % 3), float(k)])
+            bx = [px[0], px[20], px[-1]]
+            bd1 = [[2.0, 0.0, 0.0]] * 3
+            curves.append((bx, bd1, px))
+        for outlier_length in (0.0, -0.1):
+            curves_parameters = fit_hermite_curves(curves, outlier_length=outlier_length)
+            self.assertEqual(3, len(curves_parameters))
+            for (bx, bd1, px), (cx, cd1) in zip(curves, curves_parameters):
+                self.assertEqual(3, len(cx))
+                self.assertEqual(fit_hermite_curve(bx, bd1, px, outlier_length=outlier_length), (cx, cd1))
+        # fitted curves pass close to data
+        cx, cd1 = curves_parameters[1]
+        x = evaluateCoordinatesOnCurve(cx, cd1, (1, 0.5))
+        self.assertAlmostEqual(math.sin(x[0] + 1.0), x[1], delta=0.02)
+        self.assertAlmostEqual(1.0, x[2], delta=1.0E-12)
+
+    def test_fit_hermite_curve_to_points(self):
+        """
+        Test fitting curve with arrays gives results close to fitting with Zinc.
+        """
+        px = []
+        for i in range(80):
+            t = 0.05 * i
+            px.append([t, math.sin(t) + 0.01 * ((i * 7) % 5 - 2), 0.2 * t + 0.01 * (i % 3)])
+        # initial curve ends are not on data, whose projections onto them are sensitive to rounding errors
+        bx = [[-0.02, 0.1, 0.0], [2.0, 1.0, 0.4], [3.98, -0.7, 0.8]]
+        bd1 = [[2.0, 0.0, 0.4]] * 3
+        for outlier_length in (0.0, -0.5):
+            zinc_cx, zinc_cd1 = fit_hermite_curve(bx, bd1, px, outlier_length=outlier_length)
+            cx, cd1 = fit_hermite_curve(bx, bd1, px, outlier_length=outlier_length, use_zinc=False)
+            for x, zinc_x in zip(cx + cd1, zinc_cx + zinc_cd1):
+                assertAlmostEqualList(self, zinc_x, x, delta=1.0E-4)
+        # 2-D array fit with explicit settings, using half the data
+        cx, cd1 = fit_hermite_curve_to_points([x[:2] for x in bx], [d1[:2] for d1 in bd1], [x[:2] for x in px],
+                                              1.0E-4, data_proportion=0.5)
+        self.assertEqual(3, len(cx))
+        self.assertEqual(2, len(cd1[0]))
+        x = evaluateCoordinatesOnCurve(cx, cd1, (0, 0.5))
+        self.assertAlmostEqual(math.sin(x[0]), x[1], delta=0.02)
+
+    def test_curve_spatial_index(self):
+        """
+        Test nearest location queries using curve spatial index match those without it.
+        """
+        helix_x = []
+        helix_d1 = []
+        for n in range(101):
+            angle = 0.2 * n
+            helix_x.append([math.cos(angle), math.sin(angle), 0.05 * n])
+            helix_d1.append([-0.2 * math.sin(angle), 0.2 * math.cos(angle), 0.05])
+        loop1_x = [[0.1, 0.5, 0.5], [0.9, 0.5, 0.5]]
+        loop1_d1 = [[0.0, -1.5, 0.0], [0.0, 1.5, 0.0]]
+        line1_x = [[0.0, 0.0, 0.5 * n] for n in range(11)]
+        line1_d1 = [[0.0, 0.0, 0.5]] * 11
+        helix_index = CurveSpatialIndex(helix_x, helix_d1)
+        loop1_index = CurveSpatialIndex(loop1_x, loop1_d1, loop=True)
+        line1_index = CurveSpatialIndex(line1_x, line1_d1)
+        x_min, x_max = helix_index.getCoordinatesRange()
+        assertAlmostEqualList(self, [-1.0, -1.0, 0.0], x_min, delta=0.001)
+        assertAlmostEqualList(self, [1.0, 1.0, 5.0], x_max, delta=0.001)
+
+        targets_x = [[1.5 * math.cos(0.37 * t), 1.5 * math.sin(0.37 * t), 0.1 * t - 0.5] for t in range(60)]
+        # include target equidistant from nodes 0 and 1, for which node 0 is used
+        targets_x.append([0.5 * (helix_x[0][c] + helix_x[1][c]) for c in range(3)])
+        locations = helix_index.getNearestLocations(targets_x)
+        self.assertEqual(len(targets_x), len(locations))
+        for target_x, location in zip(targets_x, locations):
+            self.assertEqual(getNearestLocationOnCurve(helix_x, helix_d1, target_x), location)
+        location, distance = helix_index.getNearestParameterLocation(targets_x[-1])
+        self.assertEqual((0, 0.0), location)
+        self.assertAlmostEqual(magnitude(sub(helix_x[1], targets_x[-1])), distance, delta=1.0E-12)
+        self.assertEqual(((99, 1.0), 0.0), helix_index.getNearestParameterLocation(helix_x[-1]))
+        self.assertEqual(getNearestLocationOnCurve(loop1_x, loop1_d1, [0.1, 0.2, 0.7], loop=True),
+                         loop1_index.getNearestLocation([0.1, 0.2, 0.7]))
+
+        results = line1_index.getNearestLocationsToCurves([helix_index, loop1_index])
+        self.assertEqual(getNearestLocationBetweenCurves(line1_x, line1_d1, helix_x, helix_d1), results[0])
+        self.assertEqual(getNearestLocationBetweenCurves(line1_x, line1_d1, loop1_x, loop1_d1, oLoop=True), results[1])
+        self.assertFalse(results[0][2])
+
     def test_curve_track_surface_nearest_intersection(self):
         """
         Test finding nearest/intersection points on a curve and a track surface.
@@ -1806,6 +2277,170 @@ class GeneralScaffoldTestCase(unittest.TestCase):
         #     curveCoordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS2, 1, pd2[n])
         #     curveNodesetGroup.addNode(node)
 
+    def test_derivative_smoothing(self):
+        """
+        Test global smoothing of derivatives on box mesh with disturbed derivative magnitudes, and on a curve.
+        """
+        options = MeshType_3d_box1.getDefaultOptions()
+        options["Number of elements 1"] = 3
+        options["Number of elements 2"] = 2
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        MeshType_3d_box1.generateBaseMesh(region, options)
+        fieldmodule = region.getFieldmodule()
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        self.assertEqual(24, nodes.getSize())
+        fieldcache = fieldmodule.createFieldcache()
+        derivativeLabels = [Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D_DS3]
+        expectedDerivatives = [[1.0 / 3.0, 0.0, 0.0], [0.0, 0.5, 0.0], [0.0, 0.0, 1.0]]
+        for scalingMode in (DerivativeScalingMode.ARITHMETIC_MEAN, DerivativeScalingMode.HARMONIC_MEAN):
+            for nodeIdentifier in range(1, 25):
+                fieldcache.setNode(nodes.findNodeByIdentifier(nodeIdentifier))
+                for derivativeLabel, expectedDerivative in zip(derivativeLabels, expectedDerivatives):
+                    coordinates.setNodeParameters(fieldcache, -1, derivativeLabel, 1,
+                                                  mult(expectedDerivative, 0.6 + 0.1 * (nodeIdentifier % 7)))
+            smoothing = DerivativeSmoothing(region, coordinates, scalingMode=scalingMode)
+            smoothing.smooth()
+            for nodeIdentifier in range(1, 25):
+                fieldcache.setNode(nodes.findNodeByIdentifier(nodeIdentifier))
+                for derivativeLabel, expectedDerivative in zip(derivativeLabels, expectedDerivatives):
+                    result, d = coordinates.getNodeParameters(fieldcache, -1, derivativeLabel, 1, 3)
+                    self.assertEqual(RESULT_OK, result)
+                    assertAlmostEqualList(self, d, expectedDerivative, 1.0E-12)
+
+        # quarter circle curve with uneven derivatives
+        region = context.getDefaultRegion().createChild("curve")
+        pointsCount = 6
+        nx = []
+        nd1 = []
+        for n in range(pointsCount):
+            angle = 0.5 * math.pi * n / (pointsCount - 1)
+            nx.append([math.cos(angle), math.sin(angle), 0.0])
+            nd1.append(mult([-math.sin(angle), math.cos(angle), 0.0], 0.2 + 0.1 * (n % 3)))
+        generate_curve_mesh(region, nx, nd1)
+        fieldmodule = region.getFieldmodule()
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        smoothing = DerivativeSmoothing(region, coordinates)
+        smoothing.smooth(updateDirections=True)
+        fieldcache = fieldmodule.createFieldcache()
+        sx = []
+        sd1 = []
+        for n in range(pointsCount):
+            fieldcache.setNode(nodes.findNodeByIdentifier(n + 1))
+            sx.append(coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, 3)[1])
+            sd1.append(coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, 1, 3)[1])
+        arcLengths = [getCubicHermiteArcLength(sx[n], sd1[n], sx[n + 1], sd1[n + 1]) for n in range(pointsCount - 1)]
+        for n in range(1, pointsCount - 1):
+            self.assertAlmostEqual(magnitude(sd1[n]), 0.5 * (arcLengths[n - 1] + arcLengths[n]), delta=1.0E-6)
+        for n in range(pointsCount - 1):
+            self.assertAlmostEqual(arcLengths[n], 0.1 * math.pi, delta=1.0E-4)
+
+        # same curve with badly scaled derivatives, solving for magnitudes with a sparse linear system
+        for scalingMode in (DerivativeScalingMode.ARITHMETIC_MEAN, DerivativeScalingMode.HARMONIC_MEAN):
+            region = context.getDefaultRegion().createChild("curve" + str(scalingMode))
+            generate_curve_mesh(region, nx, [mult(nd1[n], 10.0 ** (n % 3 - 1)) for n in range(pointsCount)])
+            fieldmodule = region.getFieldmodule()
+            coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+            nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+            smoothing = DerivativeSmoothing(region, coordinates, scalingMode=scalingMode)
+            smoothing.smooth(maxIterations=10, arcLengthTolerance=1.0E-10, linearSolve=True)
+            fieldcache = fieldmodule.createFieldcache()
+            sd1 = []
+            for n in range(pointsCount):
+                fieldcache.setNode(nodes.findNodeByIdentifier(n + 1))
+                sd1.append(coordinates.getNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, 1, 3)[1])
+            arcLengths = [getCubicHermiteArcLength(nx[n], sd1[n], nx[n + 1], sd1[n + 1])
+                          for n in range(pointsCount - 1)]
+            for n in range(1, pointsCount - 1):
+                expectedMagnitude = 0.5 * (arcLengths[n - 1] + arcLengths[n]) if \
+                    (scalingMode == DerivativeScalingMode.ARITHMETIC_MEAN) else \
+                    2.0 / (1.0 / arcLengths[n - 1] + 1.0 / arcLengths[n])
+                self.assertAlmostEqual(magnitude(sd1[n]), expectedMagnitude, delta=1.0E-10)
+            self.assertAlmostEqual(magnitude(sd1[0]), 2.0 * arcLengths[0] - magnitude(sd1[1]), delta=1.0E-10)
+            self.assertAlmostEqual(magnitude(sd1[-1]), 2.0 * arcLengths[-1] - magnitude(sd1[-2]), delta=1.0E-10)
+
+    def test_derivative_smoothing_edge_graph_cache(self):
+        """
+        Test edge graph is reused by repeated smoothing, and is rebuilt after changes to topology or groups.
+        """
+        DerivativeSmoothing.clearEdgeGraphCache()
+        options = MeshType_3d_box1.getDefaultOptions()
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        MeshType_3d_box1.generateBaseMesh(region, options)
+        fieldmodule = region.getFieldmodule()
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        mesh = fieldmodule.findMeshByDimension(3)
+
+        smoothing = DerivativeSmoothing(region, coordinates)
+        edgeGraph = smoothing.getEdgeGraph()
+        self.assertEqual(12, len(edgeGraph.edgesMap))
+        smoothing.smooth(updateDirections=True)
+        # node parameter changes from smoothing do not invalidate graph
+        self.assertTrue(edgeGraph.isValid())
+        smoothing = DerivativeSmoothing(region, coordinates, scalingMode=DerivativeScalingMode.HARMONIC_MEAN)
+        self.assertIs(edgeGraph, smoothing.getEdgeGraph())
+        self.assertIsNotNone(edgeGraph.arrays)
+
+        # selection group has its own graph, invalidated by changing group membership
+        group = fieldmodule.createFieldGroup()
+        group.setName("selection")
+        nodesetGroup = group.getOrCreateNodesetGroup(nodes)
+        nodesetGroup.addNode(nodes.findNodeByIdentifier(1))
+        smoothing = DerivativeSmoothing(region, coordinates, selectionGroupName="selection")
+        groupEdgeGraph = smoothing.getEdgeGraph()
+        self.assertIsNot(edgeGraph, groupEdgeGraph)
+        self.assertEqual(3, len(groupEdgeGraph.edgesMap))
+        self.assertTrue(edgeGraph.isValid())
+        nodesetGroup.addNode(nodes.findNodeByIdentifier(2))
+        self.assertFalse(groupEdgeGraph.isValid())
+        self.assertTrue(edgeGraph.isValid())
+        smoothing = DerivativeSmoothing(region, coordinates, selectionGroupName="selection")
+        self.assertEqual(5, len(smoothing.getEdgeGraph().edgesMap))
+
+        # changing element nodes invalidates graph
+        element = mesh.findElementByIdentifier(1)
+        eft = element.getElementfieldtemplate(coordinates, -1)
+        nodeIdentifiers = [element.getNode(eft, n).getIdentifier() for n in range(1, 9)]
+        self.assertEqual(RESULT_OK, element.setNodesByIdentifier(eft, list(reversed(nodeIdentifiers))))
+        self.assertFalse(edgeGraph.isValid())
+        smoothing = DerivativeSmoothing(region, coordinates)
+        edgeGraph = smoothing.getEdgeGraph()
+        self.assertTrue(edgeGraph.isValid())
+        # as does changing node identifiers
+        nodes.findNodeByIdentifier(8).setIdentifier(9)
+        self.assertFalse(edgeGraph.isValid())
+        smoothing = DerivativeSmoothing(region, coordinates)
+        edgeGraph = smoothing.getEdgeGraph()
+        self.assertIn((7, 9), edgeGraph.edgesMap)
+        # node parameter changes not made by smoothing may be element field template changes, so invalidate graph
+        fieldcache = fieldmodule.createFieldcache()
+        fieldcache.setNode(nodes.findNodeByIdentifier(1))
+        self.assertEqual(RESULT_OK, coordinates.setNodeParameters(
+            fieldcache, -1, Node.VALUE_LABEL_D_DS1, 1, [1.5, 0.0, 0.0]))
+        self.assertFalse(edgeGraph.isValid())
+        smoothing = DerivativeSmoothing(region, coordinates)
+        self.assertTrue(smoothing.getEdgeGraph().isValid())
+        DerivativeSmoothing.clearEdgeGraphCache()
+        self.assertFalse(smoothing.getEdgeGraph().isValid())
+
+        # cached graph does not keep its region alive, and is invalidated when region is destroyed
+        childRegion = region.createChild("child")
+        MeshType_3d_box1.generateBaseMesh(childRegion, options)
+        childCoordinates = childRegion.getFieldmodule().findFieldByName("coordinates")
+        smoothing = DerivativeSmoothing(childRegion, childCoordinates)
+        edgeGraph = smoothing.getEdgeGraph()
+        self.assertTrue(edgeGraph.isValid())
+        del smoothing
+        del childCoordinates
+        region.removeChild(childRegion)
+        del childRegion
+        self.assertFalse(edgeGraph.isValid())
+        DerivativeSmoothing.clearEdgeGraphCache()
+
     def test_smooth_side_cross_derivatives(self):
         """
         Test algorithm for smoothing side cross derivatives used in network layout.
@@ -1856,6 +2491,120 @@ class GeneralScaffoldTestCase(unittest.TestCase):
             self.assertAlmostEqual(targetLength, actualLength, delta=LENGTH_TOL)
             # print("xi", xi, "length", actualLength, "angle", actualAngle, targetAngle)
 
+    def test_eftfactory_cached_eft(self):
+        """
+        Test reuse of element field templates made by eftfactory methods with the same arguments and remaps.
+        """
+        context = Context("test_eftfactory_cached_eft")
+        region = context.getDefaultRegion()
+        fieldmodule = region.getFieldmodule()
+        mesh3d = fieldmodule.findMeshByDimension(3)
+        tricubichermite = eftfactory_tricubichermite(mesh3d, False)
+        bicubichermitelinear = eftfactory_bicubichermitelinear(mesh3d, False)
+        startCreationsCount = getElementfieldtemplateCreationsCount()
+        eft1 = tricubichermite.getCachedEft("createEftShellPoleBottom", (0, 100))
+        self.assertTrue(eft1.validate())
+        self.assertIs(eft1, tricubichermite.getCachedEft("createEftShellPoleBottom", [0, 100]))
+        self.assertIsNot(eft1, tricubichermite.getCachedEft("createEftShellPoleBottom", (100, 200)))
+        remaps = [("setEftScaleFactorIds", [1], []),
+                  ("remapEftNodeValueLabel", [5, 7], Node.VALUE_LABEL_D_DS1, [(Node.VALUE_LABEL_D_DS1, [1])])]
+        eft2 = tricubichermite.getCachedEft("createEftNoCrossDerivatives", (), remaps)
+        self.assertEqual(1, eft2.getNumberOfLocalScaleFactors())
+        self.assertIs(eft2, tricubichermite.getCachedEft(
+            "createEftNoCrossDerivatives", [], [("setEftScaleFactorIds", (1,), ()),
+                                                ("remapEftNodeValueLabel", (5, 7), Node.VALUE_LABEL_D_DS1,
+                                                 ((Node.VALUE_LABEL_D_DS1, (1,)),))]))
+        self.assertIsNot(eft2, tricubichermite.getCachedEft("createEftNoCrossDerivatives"))
+        eft3 = bicubichermitelinear.getCachedEft("createEftShellPoleBottom", (0, 100))
+        self.assertIsNot(eft1, eft3)
+        self.assertIs(eft3, bicubichermitelinear.getCachedEft("createEftShellPoleBottom", (0, 100)))
+        self.assertEqual(5, getElementfieldtemplateCreationsCount() - startCreationsCount)
+
+        # test a real generator reuses templates for elements with the same remaps
+        region = context.createRegion()
+        startCreationsCount = getElementfieldtemplateCreationsCount()
+        MeshType_3d_heartventricles1.generateBaseMesh(region, MeshType_3d_heartventricles1.getDefaultOptions())
+        mesh3d = region.getFieldmodule().findMeshByDimension(3)
+        self.assertEqual(103, mesh3d.getSize())
+        # was 69 templates when every remapped element made its own
+        self.assertEqual(31, getElementfieldtemplateCreationsCount() - startCreationsCount)
+
+    def test_hermite_node_layout_cache(self):
+        """
+        Test permutations of hermite node layouts are shared, and limited variants are reused.
+        """
+        nodeLayoutManager1 = HermiteNodeLayoutManager()
+        nodeLayoutManager2 = HermiteNodeLayoutManager()
+        nodeLayout1 = nodeLayoutManager1.getNodeLayout6Way12(True)
+        nodeLayout2 = nodeLayoutManager2.getNodeLayout6Way12(True)
+        self.assertIsNot(nodeLayout1, nodeLayout2)
+        self.assertIs(nodeLayout1.getPermutations(), nodeLayout2.getPermutations())
+        self.assertEqual(36, nodeLayout1.getComplexity())
+        self.assertIs(nodeLayout1, nodeLayoutManager1.getNodeLayout6Way12(True, None))
+        limitDirections = [None, [[0.0, 1.0, 0.0], [0.0, -1.0, 0.0]], None]
+        limitedNodeLayout = nodeLayoutManager1.getNodeLayout6Way12(True, limitDirections)
+        self.assertIsNot(nodeLayout1, limitedNodeLayout)
+        self.assertIs(nodeLayout1.getPermutations(), limitedNodeLayout.getPermutations())
+        self.assertIs(limitedNodeLayout, nodeLayoutManager1.getNodeLayout6Way12(
+            True, [None, ((0.0, 1.0, 0.0), (0.0, -1.0, 0.0)), None]))
+        self.assertIsNot(limitedNodeLayout, nodeLayoutManager1.getNodeLayout6Way12(
+            True, [None, [[0.0, 1.0, 0.0]], None]))
+        # limits are applied as before
+        nodeDeltas = [[0.0, 1.0, 0.0], [-1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]
+        nodeDerivatives = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+        self.assertEqual([[0.0, 1.0, 0.0], [-1.0, 0.0, 0.0], [0.0, 0.0, 1.0]],
+                         nodeLayout1.getDerivativeWeightsList(nodeDeltas, nodeDerivatives, 0))
+        self.assertEqual([[1.0, 1.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]],
+                         limitedNodeLayout.getDerivativeWeightsList(nodeDeltas, nodeDerivatives, 0))
+
+    def test_determine_cubic_hermite_serendipity_efts(self):
+        """
+        Test batch determination of hermite serendipity efts shares templates with the same derivative weights.
+        """
+        context = Context("test_determine_cubic_hermite_serendipity_efts")
+        region = context.getDefaultRegion()
+        fieldmodule = region.getFieldmodule()
+        mesh3d = fieldmodule.findMeshByDimension(3)
+        nodeLayoutManager = HermiteNodeLayoutManager()
+        nodeLayout6Way = nodeLayoutManager.getNodeLayout6Way12(True)
+        regularNodeParameters = []
+        for n in range(8):
+            x = [float(n & 1), float((n >> 1) & 1), float((n >> 2) & 1)]
+            regularNodeParameters.append([x, [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+        # first node has derivatives swapped and reversed
+        rotatedNodeParameters = copy.deepcopy(regularNodeParameters)
+        rotatedNodeParameters[0][1:3] = [[0.0, 1.0, 0.0], [-1.0, 0.0, 0.0]]
+        regularNodeLayouts = [None] * 8
+        rotatedNodeLayouts = [nodeLayout6Way] + [None] * 7
+        self.assertEqual([None] * 8, determineCubicHermiteSerendipityDerivativeWeights(
+            3, regularNodeParameters, regularNodeLayouts))
+        rotatedWeights = determineCubicHermiteSerendipityDerivativeWeights(3, rotatedNodeParameters, rotatedNodeLayouts)
+        self.assertEqual([[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]], rotatedWeights[0])
+        self.assertEqual([None] * 7, rotatedWeights[1:])
+
+        oldCreationsCount = getElementfieldtemplateCreationsCount()
+        nodeParametersList = [regularNodeParameters, rotatedNodeParameters] * 3
+        nodeLayoutsList = [regularNodeLayouts, rotatedNodeLayouts] * 3
+        eftsScalefactors = determineCubicHermiteSerendipityEfts(mesh3d, nodeParametersList, nodeLayoutsList)
+        self.assertEqual(2, getElementfieldtemplateCreationsCount() - oldCreationsCount)
+        self.assertEqual(6, len(eftsScalefactors))
+        for e in range(2, 6):
+            self.assertIs(eftsScalefactors[e % 2][0], eftsScalefactors[e][0])
+        self.assertIsNot(eftsScalefactors[0][0], eftsScalefactors[1][0])
+        self.assertIsNone(eftsScalefactors[0][1])
+        self.assertEqual([-1.0], eftsScalefactors[1][1])
+        # templates match those determined individually
+        eft, scalefactors = determineCubicHermiteSerendipityEft(mesh3d, rotatedNodeParameters, rotatedNodeLayouts)
+        self.assertEqual(scalefactors, eftsScalefactors[1][1])
+        for functionNumber in range(1, 33):
+            termsCount = eft.getFunctionNumberOfTerms(functionNumber)
+            self.assertEqual(termsCount, eftsScalefactors[1][0].getFunctionNumberOfTerms(functionNumber))
+            for term in range(1, termsCount + 1):
+                self.assertEqual(eft.getTermNodeValueLabel(functionNumber, term),
+                                 eftsScalefactors[1][0].getTermNodeValueLabel(functionNumber, term))
+                self.assertEqual(eft.getTermScaling(functionNumber, term, 1),
+                                 eftsScalefactors[1][0].getTermScaling(functionNumber, term, 1))
+
     def test_determineHermiteSerendipityEft(self):
         """
         Test algorithm for determining hermite serendipity eft from node derivative directions.
@@ -1,4 +1,9 @@
+import copy
+import json
 import math
+import os
+import tempfile
+import time
 import unittest
 
 from cmlibs.maths.vectorops import magnitude
@@ -17,7 +22,10 @@ from scaffoldmaker.meshtypes.meshtype_2d_tubenetwork1 import MeshType_2d_tubenet
 from scaffoldmaker.meshtypes.meshtype_3d_boxnetwork1 import MeshType_3d_boxnetwork1
 from scaffoldmaker.meshtypes.meshtype_3d_tubenetwork1 import MeshType_3d_tubenetwork1
 from scaffoldmaker.scaffoldpackage import ScaffoldPackage
-from scaffoldmaker.utils.zinc_utils import get_nodeset_path_ordered_field_parameters
+from scaffoldmaker.utils.eft_utils import getElementfieldtemplateCreationsCount
+from scaffoldmaker.utils.networkmesh import NetworkMesh, NetworkMeshBuilder, NetworkMeshBuildProfile
+from scaffoldmaker.utils.tubenetworkmesh import TubeNetworkMeshBuilder, TubeSegmentSampleCache
+from scaffoldmaker.utils.zinc_utils import get_nodeset_field_parameters, get_nodeset_path_ordered_field_parameters
 
 from testutils import assertAlmostEqualList
 
@@ -81,6 +89,102 @@ class NetworkScaffoldTestCase(unittest.TestCase):
         assertAlmostEqualList(self, nd1[0], expected_nd, 1.0E-6)
         assertAlmostEqualList(self, nd1[1], expected_nd, 1.0E-6)
 
+    def test_network_mesh_build_split(self):
+        """
+        Test building network mesh with segments split by later sequences through interior nodes.
+        """
+        networkMesh = NetworkMesh("1-2-4-5-6,3-4.2-7,5-8")
+        networkSegments = networkMesh.getNetworkSegments()
+        self.assertEqual([[1, 2, 4], [4, 5], [5, 6], [3, 4], [4, 7], [5, 8]],
+                         [networkSegment.getNodeIdentifiers() for networkSegment in networkSegments])
+        self.assertEqual([[1, 1, 1], [1, 1], [1, 1], [1, 2], [2, 1], [1, 1]],
+                         [networkSegment.getNodeVersions() for networkSegment in networkSegments])
+        for networkSegment in networkSegments:
+            self.assertEqual(len(networkSegment.getNodeIdentifiers()) - 1,
+                             len(networkSegment.getElementIdentifiers()))
+        networkNodes = networkMesh._networkNodes
+        self.assertEqual([0, 1, 0, 2, 3, 4, 3, 4], [networkNodes[i].getPosX() for i in range(1, 9)])
+        self.assertEqual(networkSegments[0], networkNodes[2].getInteriorSegment())
+        self.assertIsNone(networkNodes[4].getInteriorSegment())
+        self.assertIsNone(networkNodes[5].getInteriorSegment())
+
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        networkMesh.create1DLayoutMesh(region)
+        fieldmodule = region.getFieldmodule()
+        self.assertEqual(7, fieldmodule.findMeshByDimension(1).getSize())
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        self.assertEqual(8, nodes.getSize())
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        fieldcache = fieldmodule.createFieldcache()
+        fieldcache.setNode(nodes.findNodeByIdentifier(4))
+        expectedParameters = [
+            (Node.VALUE_LABEL_VALUE, 1, [2.0, 0.0, 0.0]),
+            (Node.VALUE_LABEL_D_DS1, 1, [1.0, -0.25, 0.0]),
+            (Node.VALUE_LABEL_D_DS1, 2, [1.5, 0.0, 0.0]),
+            (Node.VALUE_LABEL_D_DS2, 2, [0.0, 0.1, 0.0]),
+            (Node.VALUE_LABEL_D_DS3, 2, [0.0, 0.0, 0.1])]
+        for valueLabel, version, expectedValue in expectedParameters:
+            result, value = coordinates.getNodeParameters(fieldcache, -1, valueLabel, version, 3)
+            self.assertEqual(RESULT_OK, result)
+            assertAlmostEqualList(self, value, expectedValue, 1.0E-12)
+
+    def _checkNetworkMeshBuildTrunkBranches(self, nodesCount):
+        """
+        Check building network mesh for a synthetic layout with about nodesCount nodes: a long trunk with short
+        branches from every 5th node, which splits the trunk into many segments.
+        :param nodesCount: Approximate number of nodes in layout.
+        :return: Time in seconds to build NetworkMesh.
+        """
+        trunkNodesCount = nodesCount // 2
+        branchNodesCount = 5
+        sequences = ["-".join(str(i) for i in range(1, trunkNodesCount + 1))]
+        branchStartNodeIdentifiers = list(range(2, trunkNodesCount, branchNodesCount))
+        nodeIdentifier = trunkNodesCount + 1
+        for branchStartNodeIdentifier in branchStartNodeIdentifiers:
+            sequences.append("-".join(str(i) for i in ([branchStartNodeIdentifier] + list(
+                range(nodeIdentifier, nodeIdentifier + branchNodesCount)))))
+            nodeIdentifier += branchNodesCount
+        startTime = time.perf_counter()
+        networkMesh = NetworkMesh(",".join(sequences))
+        buildTime = time.perf_counter() - startTime
+
+        networkSegments = networkMesh.getNetworkSegments()
+        branchesCount = len(branchStartNodeIdentifiers)
+        self.assertEqual(2 * branchesCount + 1, len(networkSegments))
+        # split trunk segments come first in order along trunk, then branches
+        trunkNodeIdentifiers = [1]
+        for networkSegment in networkSegments[:branchesCount + 1]:
+            segmentNodeIdentifiers = networkSegment.getNodeIdentifiers()
+            self.assertEqual(trunkNodeIdentifiers[-1], segmentNodeIdentifiers[0])
+            trunkNodeIdentifiers += segmentNodeIdentifiers[1:]
+        self.assertEqual(list(range(1, trunkNodesCount + 1)), trunkNodeIdentifiers)
+        self.assertEqual(branchStartNodeIdentifiers,
+                         [networkSegment.getNodeIdentifiers()[0]
+                          for networkSegment in networkSegments[branchesCount + 1:]])
+        # posX is one more than the previous node along the trunk and branches
+        for networkSegment in networkSegments:
+            networkNodes = networkSegment.getNetworkNodes()
+            startPosX = networkNodes[0].getPosX()
+            self.assertEqual(list(range(startPosX, startPosX + len(networkNodes))),
+                             [networkNode.getPosX() for networkNode in networkNodes])
+        return buildTime
+
+    def test_network_mesh_build_trunk_branches(self):
+        """
+        Test building network mesh for a trunk with many short branches splitting it into segments.
+        """
+        self._checkNetworkMeshBuildTrunkBranches(200)
+
+    @unittest.skipUnless(os.environ.get("SCAFFOLDMAKER_BENCHMARK"), "set SCAFFOLDMAKER_BENCHMARK to run benchmarks")
+    def test_network_mesh_build_large(self):
+        """
+        Benchmark building network meshes for synthetic layouts with 10^4 and 10^5 nodes, which must take time
+        roughly linear in the number of nodes.
+        """
+        buildTimes = [self._checkNetworkMeshBuildTrunkBranches(nodesCount) for nodesCount in (10000, 100000)]
+        self.assertLess(buildTimes[1], 30.0 * buildTimes[0] + 1.0)
+
     def test_2d_tube_network_bifurcation(self):
         """
         Test 2D tube bifurcation is generated correctly.
@@ -469,6 +573,159 @@ class NetworkScaffoldTestCase(unittest.TestCase):
             self.assertAlmostEqual(volume, 0.09883609668362349, delta=X_TOL)
             self.assertAlmostEqual(surfaceArea, 2.0226236083210507, delta=X_TOL)
 
+    def test_3d_tube_network_bifurcation_core_levels_of_detail(self):
+        """
+        Test bifurcation 3-D tube network with solid core generated at several element densities in one call
+        matches independently generated meshes.
+        """
+        scaffoldPackage = ScaffoldPackage(MeshType_3d_tubenetwork1, defaultParameterSetName="Bifurcation")
+        settings = scaffoldPackage.getScaffoldSettings()
+        settings["Core"] = True
+        self.assertEqual(4.0, settings["Target element density along longest segment"])
+
+        context = Context("Test")
+        rootRegion = context.getDefaultRegion()
+        regions = [rootRegion.createChild("coarse"), rootRegion.createChild("fine")]
+        densities = [2.0, 4.0]
+        annotationGroupsList = MeshType_3d_tubenetwork1.generateLevelsOfDetail(regions, settings, densities)
+        self.assertEqual(2, len(annotationGroupsList))
+
+        X_TOL = 1.0E-6
+        expectedElementsCounts = [(8 * 2 * 3) * 2 + (4 * 2 * 3), (8 * 4 * 3) * 2 + (4 * 4 * 3)]
+        expectedNodesCounts = [(8 * 2 * 3 + 3 * 3 + 2) * 2 + (9 * 2 * 3 + 3 * 4),
+                               (8 * 4 * 3 + 3 * 3 + 2) * 2 + (9 * 4 * 3 + 3 * 4)]
+        expectedVolumes = [0.10070473749773746, 0.09883609668362349]
+        for region, annotationGroups, density, expectedElementsCount, expectedNodesCount, expectedVolume in zip(
+                regions, annotationGroupsList, densities, expectedElementsCounts, expectedNodesCounts,
+                expectedVolumes):
+            fieldmodule = region.getFieldmodule()
+            mesh3d = fieldmodule.findMeshByDimension(3)
+            self.assertEqual(expectedElementsCount, mesh3d.getSize())
+            nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+            self.assertEqual(expectedNodesCount, nodes.getSize())
+            self.assertIsNotNone(findAnnotationGroupByName(annotationGroups, "core"))
+            coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+            minimums, maximums = evaluateFieldNodesetRange(coordinates, nodes)
+            assertAlmostEqualList(self, minimums, [0.0, -0.5894427190999916, -0.10000000000000002], X_TOL)
+            assertAlmostEqualList(self, maximums, [2.044721359549996, 0.5894427190999916, 0.10000000000000002], X_TOL)
+            with ChangeManager(fieldmodule):
+                fieldcache = fieldmodule.createFieldcache()
+                volumeField = fieldmodule.createFieldMeshIntegral(
+                    fieldmodule.createFieldConstant(1.0), coordinates, mesh3d)
+                volumeField.setNumbersOfPoints(4)
+                result, volume = volumeField.evaluateReal(fieldcache, 1)
+                self.assertEqual(result, RESULT_OK)
+                self.assertAlmostEqual(volume, expectedVolume, delta=X_TOL)
+
+            # compare with mesh generated independently at the same density
+            levelSettings = copy.deepcopy(settings)
+            levelSettings["Target element density along longest segment"] = density
+            levelRegion = rootRegion.createChild("independent" + str(density))
+            MeshType_3d_tubenetwork1.generateBaseMesh(levelRegion, levelSettings)
+            levelFieldmodule = levelRegion.getFieldmodule()
+            levelNodes = levelFieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+            levelCoordinates = levelFieldmodule.findFieldByName("coordinates").castFiniteElement()
+            self.assertEqual(expectedElementsCount, levelFieldmodule.findMeshByDimension(3).getSize())
+            self.assertEqual(get_nodeset_field_parameters(levelNodes, levelCoordinates),
+                             get_nodeset_field_parameters(nodes, coordinates))
+
+    def test_3d_tube_network_bifurcation_sample_cache(self):
+        """
+        Test bifurcation 3-D tube network with solid core regenerated with segment tube coordinates from a sample
+        cache, in memory and saved to files, matches the original mesh.
+        """
+        scaffoldPackage = ScaffoldPackage(MeshType_3d_tubenetwork1, defaultParameterSetName="Bifurcation")
+        settings = scaffoldPackage.getScaffoldSettings()
+        settings["Core"] = True
+
+        context = Context("Test")
+        rootRegion = context.getDefaultRegion()
+        nodeParametersList = []
+        with tempfile.TemporaryDirectory() as cacheDirectory:
+            caches = [TubeSegmentSampleCache(cacheDirectory), TubeSegmentSampleCache(cacheDirectory)]
+            try:
+                for i, sampleCache in enumerate([caches[0], caches[0], caches[1]]):
+                    TubeNetworkMeshBuilder.setDefaultSampleCache(sampleCache)
+                    region = rootRegion.createChild("region" + str(i))
+                    MeshType_3d_tubenetwork1.generateBaseMesh(region, settings)
+                    fieldmodule = region.getFieldmodule()
+                    nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+                    coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+                    valueLabels, nodeParameters = get_nodeset_field_parameters(nodes, coordinates)
+                    nodeParametersList.append(nodeParameters)
+            finally:
+                TubeNetworkMeshBuilder.setDefaultSampleCache(None)
+            # raw coordinates for 2 paths and sampled coordinates for each of 3 segments
+            fileNames = os.listdir(cacheDirectory)
+            self.assertEqual(9, len(fileNames))
+            # truncated cache file is treated as not cached
+            with open(os.path.join(cacheDirectory, fileNames[0]), "wb"):
+                pass
+            brokenCache = TubeSegmentSampleCache(cacheDirectory)
+            self.assertIsNone(brokenCache.get(fileNames[0][:-len(".pkl")]))
+            self.assertEqual(1, brokenCache.getMissesCount())
+        self.assertIsNone(TubeNetworkMeshBuilder.getDefaultSampleCache())
+        self.assertIsNotNone(TubeNetworkMeshBuilder.__doc__)
+        self.assertNotEqual(TubeSegmentSampleCache.getKey("raw", 1), TubeSegmentSampleCache.getKey("raw", 2))
+        self.assertEqual(9, caches[0].getMissesCount())
+        self.assertEqual(9, caches[0].getHitsCount())
+        self.assertEqual(0, caches[1].getMissesCount())
+        self.assertEqual(9, caches[1].getHitsCount())
+        self.assertEqual(len(nodeParametersList[0]), len(nodeParametersList[1]))
+        self.assertEqual(nodeParametersList[0], nodeParametersList[1])
+        self.assertEqual(nodeParametersList[0], nodeParametersList[2])
+
+    def test_3d_tube_network_bifurcation_build_profile(self):
+        """
+        Test build profile of bifurcation 3-D tube network with solid core, reported in scaffold metadata.
+        """
+        scaffoldPackage = ScaffoldPackage(MeshType_3d_tubenetwork1, defaultParameterSetName="Bifurcation")
+        settings = scaffoldPackage.getScaffoldSettings()
+        settings["Core"] = True
+
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        NetworkMeshBuilder.setDefaultProfiling(True)
+        try:
+            scaffoldPackage.generate(region)
+        finally:
+            NetworkMeshBuilder.setDefaultProfiling(False)
+        profile = scaffoldPackage.getConstructionObject()
+        self.assertIsInstance(profile, NetworkMeshBuildProfile)
+
+        records = scaffoldPackage.getMetadata()["network mesh build profile"]
+        self.assertEqual(["segment 1-2", "segment 2-3", "segment 2-4", "junction 1", "junction 2", "junction 3",
+                          "junction 4"], [record["name"] for record in records])
+        fieldmodule = region.getFieldmodule()
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        mesh3d = fieldmodule.findMeshByDimension(3)
+        self.assertEqual(nodes.getSize(), sum(record["nodes"] for record in records))
+        self.assertEqual(mesh3d.getSize(), sum(record["elements"] for record in records))
+        junction2 = records[4]
+        self.assertGreater(junction2["create time"], 0.0)
+        self.assertGreater(junction2["sample time"], 0.0)
+        self.assertGreater(junction2["generate time"], 0.0)
+        self.assertGreater(junction2["nodes"], 0)
+        self.assertGreater(junction2["elements"], 0)
+        self.assertGreater(junction2["track surface iterations"], 0)
+        self.assertGreater(junction2["element field templates"], 0)
+        for record in records[3:]:
+            if record is not junction2:
+                self.assertEqual(0, record["elements"])
+                self.assertEqual(0, record["track surface iterations"])
+        for record in records[:3]:
+            self.assertGreater(record["elements"], 0)
+        table = profile.getTable()
+        self.assertEqual(len(records) + 2, len(table.split("\n")))
+        self.assertTrue(table.startswith("name"))
+        self.assertEqual(records, json.loads(profile.getJSON()))
+
+        # default is not to profile
+        region = context.getDefaultRegion().createChild("unprofiled")
+        scaffoldPackage = ScaffoldPackage(MeshType_3d_tubenetwork1, defaultParameterSetName="Bifurcation")
+        scaffoldPackage.generate(region)
+        self.assertIsNone(scaffoldPackage.getConstructionObject())
+
     def test_3d_tube_network_converging_bifurcation_core(self):
         """
         Test converging bifurcation 3-D tube network with solid core and 12, 12, 8 elements around.
@@ -1077,6 +1334,28 @@ class NetworkScaffoldTestCase(unittest.TestCase):
             expectedSurfaceArea = 6 * 0.2 * 0.2 + 4 * 0.2 * (1.0 + 2 * L2)
             self.assertAlmostEqual(surfaceArea, expectedSurfaceArea, delta=X_TOL)
 
+    def test_3d_box_network_bifurcation_build_profile(self):
+        """
+        Test build profile of bifurcation 3-D box network counts element field templates, as does the layout.
+        """
+        scaffoldPackage = ScaffoldPackage(MeshType_3d_boxnetwork1, defaultParameterSetName="Bifurcation")
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        startEftsCount = getElementfieldtemplateCreationsCount()
+        NetworkMeshBuilder.setDefaultProfiling(True)
+        try:
+            scaffoldPackage.generate(region)
+        finally:
+            NetworkMeshBuilder.setDefaultProfiling(False)
+        self.assertIsInstance(scaffoldPackage.getConstructionObject(), NetworkMeshBuildProfile)
+        records = scaffoldPackage.getMetadata()["network mesh build profile"]
+        self.assertEqual(["segment 1-2", "segment 2-3", "segment 2-4", "junction 1", "junction 2", "junction 3",
+                          "junction 4"], [record["name"] for record in records])
+        self.assertEqual([1, 1, 1, 0, 0, 0, 0], [record["element field templates"] for record in records])
+        # remaining templates are made by the network layout
+        buildEftsCount = sum(record["element field templates"] for record in records)
+        self.assertEqual(buildEftsCount + 3, getElementfieldtemplateCreationsCount() - startEftsCount)
+
     def test_3d_box_network_smooth(self):
         """
         Test 3-D box network derivative smoothing is working between segments sharing a version.
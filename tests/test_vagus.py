@@ -14,12 +14,17 @@ from scaffoldmaker.annotation.annotationgroup import findAnnotationGroupByName
 from scaffoldmaker.annotation.vagus_terms import vagus_branch_terms, vagus_marker_terms
 from scaffoldmaker.meshtypes.meshtype_3d_nerve1 import MeshType_3d_nerve1, get_left_vagus_marker_locations_list
 from scaffoldmaker.utils.interpolation import get_curve_from_points, getCubicHermiteCurvesLength
+from scaffoldmaker.utils.nerve_graph import (
+    bfs_to_furthest, build_undirected_graph, get_branch_parent_map, get_graph_path_through_ends)
 from scaffoldmaker.utils.read_vagus_data import VagusInputData
 from testutils import assertAlmostEqualList, check_annotation_term_ids
 
 import math
 import os
+import tempfile
+import time
 import unittest
+from unittest import mock
 
 
 here = os.path.abspath(os.path.dirname(__file__))
@@ -67,6 +72,15 @@ def reorder_vagus_test_data1(testcase, region):
 
 class VagusScaffoldTestCase(unittest.TestCase):
 
+    def setUp(self):
+        # cache parsed input data in a temporary directory instead of the user cache directory
+        self._cache_directory = tempfile.TemporaryDirectory()
+        self._environ_patcher = mock.patch.dict(os.environ, {"SCAFFOLDMAKER_CACHE_DIR": self._cache_directory.name})
+        self._environ_patcher.start()
+
+    def tearDown(self):
+        self._environ_patcher.stop()
+        self._cache_directory.cleanup()
 
     def test_vagus_terms(self):
         """
@@ -202,6 +216,93 @@ class VagusScaffoldTestCase(unittest.TestCase):
             for branch_name in left_thoracic_cardiopulmonary_branches:
                 self.assertTrue(branch_name in branch_common_groups["left thoracic cardiopulmonary branch of vagus nerve"])
 
+            # parse and save to cache, then read the same data from cache
+            with tempfile.TemporaryDirectory() as cache_directory:
+                cache_vagus_data = VagusInputData(data_region, cache_directory)
+                cache_file_names = os.listdir(cache_directory)
+                self.assertEqual(1, len(cache_file_names))
+                read_cache_vagus_data = VagusInputData(data_region, cache_directory)
+                self.assertEqual(cache_file_names, os.listdir(cache_directory))
+                for data in (cache_vagus_data, read_cache_vagus_data):
+                    self.assertEqual(vagus_data.get_annotation_term_map(), data.get_annotation_term_map())
+                    self.assertEqual(branch_data, data.get_branch_data())
+                    self.assertEqual(branch_parents, data.get_branch_parent_map())
+                    self.assertEqual(branch_common_groups, data.get_branch_common_group_map())
+                    self.assertEqual(vagus_data.get_branch_radius_data(), data.get_branch_radius_data())
+                    self.assertEqual(marker_data, data.get_level_markers())
+                    self.assertEqual(orientation_data, data.get_orientation_data())
+                    self.assertEqual(vagus_data.get_segments_trunk_coordinates(),
+                                     data.get_segments_trunk_coordinates())
+                    self.assertEqual('left', data.get_side_label())
+                    self.assertEqual(trunk_group_name, data.get_trunk_group_name())
+                    self.assertEqual(trunk_coordinates, data.get_trunk_coordinates())
+                    self.assertEqual(vagus_data.get_trunk_radius(), data.get_trunk_radius())
+                    os.remove(data.get_datafile_path())
+            os.remove(vagus_data.get_datafile_path())
+
+    def _check_nerve_graph_pieces_branches(self, pieces_count, piece_nodes_count):
+        """
+        Check ordering a synthetic nerve trunk in disconnected pieces, and finding parents of branches from every
+        100th trunk point and sub-branches from every branch.
+        :param pieces_count: Number of disconnected trunk pieces.
+        :param piece_nodes_count: Number of nodes in each trunk piece, a multiple of 100.
+        :return: Times in seconds to order trunk, and to find branch parents.
+        """
+        trunk_nodes_count = pieces_count * piece_nodes_count
+        # trunk pieces are stored in reverse order with node identifiers decreasing along trunk
+        trunk_node_ids = list(range(trunk_nodes_count, 0, -1))
+        node_coordinates = {node_id: [float(trunk_nodes_count - node_id), 0.0, 0.0] for node_id in trunk_node_ids}
+        edges = [(node_id, node_id - 1) for node_id in trunk_node_ids[:-1] if (node_id - 1) % piece_nodes_count]
+        branch_node_ids_map = {}
+        node_id = trunk_nodes_count + 1
+        for branch_index, trunk_node_id in enumerate(range(50, trunk_nodes_count, 100)):
+            branch_node_ids = [trunk_node_id] + list(range(node_id, node_id + 10))
+            branch_node_ids_map["branch " + str(branch_index + 1)] = branch_node_ids
+            branch_node_ids_map["branch " + str(branch_index + 1) + " sub-branch"] = \
+                [branch_node_ids[5]] + list(range(node_id + 10, node_id + 15))
+            node_id += 15
+        branches_count = trunk_nodes_count // 100
+
+        start_time = time.perf_counter()
+        graph = build_undirected_graph(trunk_node_ids, edges)
+        path_ids = get_graph_path_through_ends(graph, node_coordinates)
+        path_time = time.perf_counter() - start_time
+        self.assertEqual(trunk_node_ids, path_ids)
+
+        start_time = time.perf_counter()
+        branch_parent_map = get_branch_parent_map(branch_node_ids_map, trunk_node_ids, "trunk")
+        parent_time = time.perf_counter() - start_time
+        self.assertEqual(len(branch_node_ids_map), len(branch_parent_map))
+        self.assertEqual("trunk", branch_parent_map["branch 1"])
+        self.assertEqual("branch 1", branch_parent_map["branch 1 sub-branch"])
+        last_branch_name = "branch " + str(branches_count)
+        self.assertEqual("trunk", branch_parent_map[last_branch_name])
+        self.assertEqual(last_branch_name, branch_parent_map[last_branch_name + " sub-branch"])
+
+        # search stops at excluded nodes
+        self.assertEqual([piece_nodes_count, piece_nodes_count - 1, piece_nodes_count - 2],
+                         bfs_to_furthest(graph, piece_nodes_count, {piece_nodes_count - 3}))
+        self.assertEqual([piece_nodes_count, piece_nodes_count - 1, piece_nodes_count - 2],
+                         bfs_to_furthest(graph, piece_nodes_count, [piece_nodes_count - 3]))
+        return path_time, parent_time
+
+    def test_nerve_graph_pieces_branches(self):
+        """
+        Test ordering a nerve trunk in disconnected pieces and finding parents of branches and sub-branches.
+        """
+        self._check_nerve_graph_pieces_branches(5, 200)
+
+    @unittest.skipUnless(os.environ.get("SCAFFOLDMAKER_BENCHMARK"), "set SCAFFOLDMAKER_BENCHMARK to run benchmarks")
+    def test_nerve_graph_large(self):
+        """
+        Benchmark ordering synthetic nerve trunks of 10^4 and 10^5 points in disconnected pieces and finding parents
+        of their branches, which must take time roughly linear in the number of points.
+        """
+        small_times = self._check_nerve_graph_pieces_branches(10, 1000)
+        large_times = self._check_nerve_graph_pieces_branches(100, 1000)
+        for small_time, large_time in zip(small_times, large_times):
+            self.assertLess(large_time, 30.0 * small_time + 1.0)
+
     def test_no_input_file(self):
         """
         No input file.
@@ -228,7 +329,7 @@ class VagusScaffoldTestCase(unittest.TestCase):
         parameterSetNames = scaffold.getParameterSetNames()
         self.assertEqual(parameterSetNames, ['Default', 'Human Left Vagus 1', 'Human Right Vagus 1'])
         options = scaffold.getDefaultOptions("Human Left Vagus 1")
-        self.assertEqual(len(options), 8)
+        self.assertEqual(len(options), 11)
         self.assertEqual(options.get('Base parameter set'), 'Human Left Vagus 1')
         self.assertEqual(options.get('Number of elements along the trunk pre-fit'), 30)
         self.assertEqual(options.get('Number of elements along the trunk'), 50)
@@ -237,6 +338,9 @@ class VagusScaffoldTestCase(unittest.TestCase):
         self.assertEqual(options.get('Default anterior direction'), [0.0, 1.0, 0.0])
         self.assertEqual(options.get('Default trunk diameter'), 3.0)
         self.assertEqual(options.get('Branch diameter trunk proportion'), 0.5)
+        self.assertEqual(options.get('Number of branch fit processes'), 1)
+        self.assertTrue(options.get('Cache input data'))
+        self.assertTrue(options.get('Trunk pre-fit with Zinc'))
         # change options to make test fast and consistent, with minor effect on result:
         options['Number of elements along the trunk pre-fit'] = 10
         options['Number of elements along the trunk'] = 25
@@ -280,6 +384,15 @@ class VagusScaffoldTestCase(unittest.TestCase):
             # check annotation groups
             annotation_groups, nerve_metadata = scaffold.generateMesh(region, options)
             self.assertEqual(len(annotation_groups), 20)
+            # parsed input data is cached separately for original and reordered data
+            self.assertEqual(i + 1, len(os.listdir(self._cache_directory.name)))
+            if i == 0:
+                # keep serial output checked against expected values below, to compare with other process counts
+                sir = region.createStreaminformationRegion()
+                srm = sir.createStreamresourceMemory()
+                self.assertEqual(RESULT_OK, region.write(sir))
+                result, expected_buffer = srm.getBuffer()
+                self.assertEqual(RESULT_OK, result)
             metadata = nerve_metadata.getMetadata()["vagus nerve"]
             TOL = 1.0E-6
             expected_metadata = {
@@ -604,6 +717,48 @@ class VagusScaffoldTestCase(unittest.TestCase):
                 self.assertEqual(expected_id, annotation_group.getId())
                 self.assertEqual(expected_mesh_size, annotation_group.getMeshGroup(mesh3d).getSize())
 
+            if i == 0:
+                # test serial and worker process branch fitting give output identical to that checked above,
+                # also with parsed input data read from the cache
+                try:
+                    for processes_count in (1, 2):
+                        options['Number of branch fit processes'] = processes_count
+                        output_region = root_region.createChild('vagus' + str(processes_count))
+                        # keep annotation groups so unmanaged groups are written, as for region
+                        output_annotation_groups = scaffold.generateMesh(output_region, options)[0]
+                        self.assertEqual(len(annotation_groups), len(output_annotation_groups))
+                        sir = output_region.createStreaminformationRegion()
+                        srm = sir.createStreamresourceMemory()
+                        self.assertEqual(RESULT_OK, output_region.write(sir))
+                        result, buffer = srm.getBuffer()
+                        self.assertEqual(RESULT_OK, result)
+                        self.assertEqual(expected_buffer, buffer)
+                finally:
+                    options['Number of branch fit processes'] = 1
+                self.assertEqual(1, len(os.listdir(self._cache_directory.name)))
+
+                # test trunk pre-fit with arrays instead of Zinc gives a close result
+                options['Trunk pre-fit with Zinc'] = False
+                try:
+                    output_region = root_region.createChild('vagus_array_prefit')
+                    output_annotation_groups, output_nerve_metadata = scaffold.generateMesh(output_region, options)
+                finally:
+                    options['Trunk pre-fit with Zinc'] = True
+                self.assertEqual(len(annotation_groups), len(output_annotation_groups))
+                self.assertEqual(mesh3d.getSize(), output_region.getFieldmodule().findMeshByDimension(3).getSize())
+                output_metadata = output_nerve_metadata.getMetadata()["vagus nerve"]
+                self.assertEqual(len(output_metadata), len(expected_metadata))
+                for key, value in output_metadata.items():
+                    expected_value = expected_metadata[key]
+                    if key == 'segments':
+                        for segment_name, vagus_coordinate_range in value.items():
+                            expected_vagus_coordinate_range = expected_value[segment_name]
+                            for range_key, range_value in vagus_coordinate_range.items():
+                                self.assertAlmostEqual(
+                                    range_value, expected_vagus_coordinate_range[range_key], delta=TOL)
+                    else:
+                        self.assertAlmostEqual(value, expected_value, delta=TOL)
+
     def test_arc_vagus(self):
         """
         Test creation of a vagus nerve scaffold following a half circle so longitudinal curvature
@@ -621,8 +776,10 @@ class VagusScaffoldTestCase(unittest.TestCase):
         options['Number of elements along the trunk pre-fit'] = elements_count
         options['Number of elements along the trunk'] = elements_count
         options['Trunk fit number of iterations'] = 2
+        options['Cache input data'] = False
 
         annotation_groups, nerve_metadata = scaffold.generateMesh(region, options)
+        self.assertEqual(0, len(os.listdir(self._cache_directory.name)))
         self.assertEqual(14, len(annotation_groups))
         fit_metadata = nerve_metadata.getMetadata()['vagus nerve']
         self.assertAlmostEqual(fit_metadata['trunk centroid fit error rms'], 0.0, delta=1.0E-4)